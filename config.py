@@ -158,6 +158,8 @@ class PluginConfig(BaseModel):
     enable_expression_user_scope: bool = False # 启用表达模式 user_id 级个性化（默认关闭保持兼容）
     enable_realtime_expression_learning: bool = False # 实时学习关闭时是否仍按消息触发表达学习
     enable_memory_graph: bool = True # 启用记忆图系统
+    memory_graph_snapshot_enabled: bool = True # 为记忆图写入二进制快照以加速冷启动
+    graph_stats_sample_size: int = 256 # 图统计采样估计的节点数（聚类系数/平均最短路径）
     enable_knowledge_graph: bool = True # 启用知识图谱
     enable_time_decay: bool = True # 启用时间衰减机制
 
@@ -172,17 +174,27 @@ class PluginConfig(BaseModel):
 
     # v2 Architecture: Embedding provider (framework-managed)
     embedding_provider_id: Optional[str] = None
+    embedding_disk_cache_enabled: bool = True # 持久化 Embedding 缓存（重启后复用，避免重复调用API）
+    embedding_disk_cache_max_entries: int = 200000 # 持久化 Embedding 缓存最大条数
+    embedding_batch_max_size: int = 32 # 并发单条 Embedding 请求合批的最大条数（1=不合批）
+    embedding_batch_max_wait_ms: float = 5.0 # 单条 Embedding 请求等待合批的最长时间(毫秒)
 
     # v2 Architecture: Reranker provider (framework-managed)
     rerank_provider_id: Optional[str] = None
     rerank_top_k: int = 5
     rerank_min_candidates: int = 3 # 候选文档数低于此阈值时跳过 rerank 以节省延迟
+    exemplar_embedding_dtype: str = "float32" # 风格示例向量存储精度: "float32" | "float16"
+    exemplar_vector_index: str = "flat" # 风格示例向量索引: "flat"(精确) | "ivf"(近似，每群上限远超2048时启用)
+    exemplar_max_per_group: int = 500 # 每个群保留的风格示例上限
     provider_retry_interval_seconds: float = 10.0 # Provider 注册表未就绪时的重试间隔
     enable_realtime_v2_processing: bool = False # 实时学习关闭时是否仍按消息触发V2处理
+    tier2_journal_enabled: bool = True # 将待批量摄入的消息写入持久化日志，重启/崩溃后重放
 
     # v2 Architecture: Knowledge engine
     knowledge_engine: str = "legacy" # "lightrag" | "legacy"
     lightrag_query_mode: str = "local" # "naive" | "local" | "global" | "hybrid" | "mix"
+    lightrag_max_instances: int = 16 # 同时常驻内存的 LightRAG 实例上限（按最近使用淘汰）
+    lightrag_idle_unload_seconds: float = 1800.0 # LightRAG 实例空闲多久后卸载（0=不按空闲卸载）
 
     # v2 Architecture: Memory engine
     memory_engine: str = "legacy" # "mem0" | "legacy"
@@ -205,6 +217,12 @@ class PluginConfig(BaseModel):
     expression_learning_trigger_messages: int = 10 # 表达方式学习触发消息增量
     expression_learning_min_interval_seconds: int = 3600 # 表达方式学习最小触发间隔（秒）
     topic_detection_interval_messages: int = 10 # 话题检测触发消息增量
+    relationship_batch_analysis_enabled: bool = True # 消息关系分析将低置信度消息对合并为批量LLM请求
+    relationship_batch_token_budget: int = 1500 # 单次批量关系分析请求的消息对token预算
+    relationship_batch_concurrency: int = 2 # 批量关系分析的最大并发请求数
+    multidimensional_batch_scoring_enabled: bool = True # 多维度分析将风格/情感各维度合并为一次批量LLM评分
+    multidimensional_batch_token_budget: int = 1500 # 单次批量评分请求的消息token预算
+    multidimensional_llm_tokens_per_hour: int = 60000 # 多维度分析每小时可用的提炼模型token预算
 
     # 筛选参数
     message_min_length: int = 5 # 消息最小长度
@@ -243,6 +261,33 @@ class PluginConfig(BaseModel):
     enable_llm_hooks: bool = False       # 启用 LLM Hook 上下文注入，默认关闭以避免高频调用
     llm_hook_context_timeout: float = 3.0  # LLM Hook 单个上下文源超时（秒）
 
+    # 原始消息写缓冲（组提交）
+    raw_message_flush_batch_size: int = 50      # 单次批量写入的最大消息条数
+    raw_message_flush_interval: float = 0.2     # 首条消息入队后的最长等待时间（秒）
+    raw_message_buffer_max_pending: int = 1000  # 写缓冲最大待写入条数，超过时触发背压
+
+    # 后台工作调度器（按群组排队 + 固定 worker 池）
+    learning_worker_count: int = 8          # 同时运行的后台学习任务数
+    learning_queue_soft_limit: int = 500    # 排队数超过后丢弃实时学习任务
+    learning_queue_hard_limit: int = 2000   # 排队数超过后仅保留原始消息采集
+    learning_queue_max_size: int = 10000    # 排队总数绝对上限，超过后丢弃最早的采集任务
+
+    # 黑话统计预筛（内存上限 + 衰减 + 快照）
+    jargon_filter_max_terms_per_group: int = 5000     # 每个群组最多跟踪的词条数
+    jargon_filter_decay_half_life_days: float = 7.0   # 词频衰减半衰期（天），0 为不衰减
+    jargon_filter_snapshot_interval: int = 600        # 统计快照保存间隔（秒）
+
+    # 分析指标小时汇总（趋势/仪表盘只读汇总表）
+    analytics_rollup_enabled: bool = True       # 启用小时汇总表的定期维护
+    analytics_rollup_interval: int = 300        # 汇总刷新间隔（秒）
+    analytics_rollup_backfill_days: int = 7     # 首次启动时回填的天数
+
+    # LLM 请求调度（优先级排队 + 每个 Provider 的限流与熔断）
+    llm_provider_max_concurrency: int = 4       # 每个 Provider 同时进行的请求数上限
+    llm_provider_tokens_per_minute: int = 0     # 每个 Provider 每分钟的 token 预算，0 为不限
+    llm_circuit_failure_threshold: int = 5      # 连续失败多少次后熔断
+    llm_circuit_cooldown: float = 30.0          # 熔断持续时间（秒），之后放行一个探测请求
+
     # PersonaUpdater配置
     persona_merge_strategy: str = "smart" # 人格合并策略: "replace", "append", "prepend", "smart"
     max_mood_imitation_dialogs: int = 20 # 最大对话风格模仿数量
@@ -261,6 +306,13 @@ class PluginConfig(BaseModel):
     affection_decay_rate: float = 0.95 # 好感度衰减比例
     daily_mood_change: bool = True # 启用每日情绪变化
     mood_affect_affection: bool = True # 情绪影响好感度变化
+    interaction_classifier_enabled: bool = True # 交互类型分级分类（关键词/本地模型优先，仅不确定时批量调用LLM）
+    interaction_local_confidence: float = 0.8 # 本地分类结果直接采用的最低置信度
+    interaction_llm_batch_max_size: int = 16 # 交互类型批量LLM分类的最大消息数
+    interaction_llm_batch_max_wait_ms: int = 50 # 交互类型批量LLM分类的最长等待时间（毫秒）
+    interaction_shadow_sample_rate: float = 0.05 # 本地分类结果抽样交给LLM复核的比例
+    affection_ledger_enabled: bool = False # 在内存中维护群组好感度账本并定期批量写入数据库
+    affection_ledger_flush_interval: int = 30 # 好感度账本写入数据库的间隔（秒）
 
     # 情绪系统配置
     enable_daily_mood: bool = True # 启用每日情绪
@@ -461,6 +513,8 @@ class PluginConfig(BaseModel):
             enable_expression_user_scope=maibot_enhancement.get('enable_expression_user_scope', False),
             enable_realtime_expression_learning=maibot_enhancement.get('enable_realtime_expression_learning', False),
             enable_memory_graph=maibot_enhancement.get('enable_memory_graph', True),
+            memory_graph_snapshot_enabled=maibot_enhancement.get('memory_graph_snapshot_enabled', True),
+            graph_stats_sample_size=maibot_enhancement.get('graph_stats_sample_size', 256),
             enable_knowledge_graph=maibot_enhancement.get('enable_knowledge_graph', True),
             enable_time_decay=maibot_enhancement.get('enable_time_decay', True),
 
@@ -474,17 +528,29 @@ class PluginConfig(BaseModel):
 
             # v2 Architecture
             embedding_provider_id=v2_settings.get('embedding_provider_id', None),
+            embedding_disk_cache_enabled=v2_settings.get('embedding_disk_cache_enabled', True),
+            embedding_disk_cache_max_entries=v2_settings.get(
+                'embedding_disk_cache_max_entries', 200000
+            ),
+            embedding_batch_max_size=v2_settings.get('embedding_batch_max_size', 32),
+            embedding_batch_max_wait_ms=v2_settings.get('embedding_batch_max_wait_ms', 5.0),
             rerank_provider_id=v2_settings.get('rerank_provider_id', None),
             rerank_top_k=v2_settings.get('rerank_top_k', 5),
             rerank_min_candidates=v2_settings.get('rerank_min_candidates', 3),
+            exemplar_embedding_dtype=v2_settings.get('exemplar_embedding_dtype', 'float32'),
+            exemplar_vector_index=v2_settings.get('exemplar_vector_index', 'flat'),
+            exemplar_max_per_group=v2_settings.get('exemplar_max_per_group', 500),
             provider_retry_interval_seconds=v2_settings.get(
                 'provider_retry_interval_seconds', 10.0
             ),
             enable_realtime_v2_processing=v2_settings.get(
                 'enable_realtime_v2_processing', False
             ),
+            tier2_journal_enabled=v2_settings.get('tier2_journal_enabled', True),
             knowledge_engine=v2_settings.get('knowledge_engine', 'legacy'),
             lightrag_query_mode=v2_settings.get('lightrag_query_mode', 'local'),
+            lightrag_max_instances=v2_settings.get('lightrag_max_instances', 16),
+            lightrag_idle_unload_seconds=v2_settings.get('lightrag_idle_unload_seconds', 1800.0),
             memory_engine=v2_settings.get('memory_engine', 'legacy'),
 
             # 功能融合设置
@@ -501,6 +567,12 @@ class PluginConfig(BaseModel):
             expression_learning_trigger_messages=learning_params.get('expression_learning_trigger_messages', 10),
             expression_learning_min_interval_seconds=learning_params.get('expression_learning_min_interval_seconds', 3600),
             topic_detection_interval_messages=learning_params.get('topic_detection_interval_messages', 10),
+            relationship_batch_analysis_enabled=learning_params.get('relationship_batch_analysis_enabled', True),
+            relationship_batch_token_budget=learning_params.get('relationship_batch_token_budget', 1500),
+            relationship_batch_concurrency=learning_params.get('relationship_batch_concurrency', 2),
+            multidimensional_batch_scoring_enabled=learning_params.get('multidimensional_batch_scoring_enabled', True),
+            multidimensional_batch_token_budget=learning_params.get('multidimensional_batch_token_budget', 1500),
+            multidimensional_llm_tokens_per_hour=learning_params.get('multidimensional_llm_tokens_per_hour', 60000),
 
             message_min_length=filter_params.get('message_min_length', 5),
             message_max_length=filter_params.get('message_max_length', 500),
@@ -534,6 +606,13 @@ class PluginConfig(BaseModel):
             affection_decay_rate=affection_settings.get('affection_decay_rate', 0.95),
             daily_mood_change=affection_settings.get('daily_mood_change', True),
             mood_affect_affection=affection_settings.get('mood_affect_affection', True),
+            interaction_classifier_enabled=affection_settings.get('interaction_classifier_enabled', True),
+            interaction_local_confidence=affection_settings.get('interaction_local_confidence', 0.8),
+            interaction_llm_batch_max_size=affection_settings.get('interaction_llm_batch_max_size', 16),
+            interaction_llm_batch_max_wait_ms=affection_settings.get('interaction_llm_batch_max_wait_ms', 50),
+            interaction_shadow_sample_rate=affection_settings.get('interaction_shadow_sample_rate', 0.05),
+            affection_ledger_enabled=affection_settings.get('affection_ledger_enabled', False),
+            affection_ledger_flush_interval=affection_settings.get('affection_ledger_flush_interval', 30),
 
             # 情绪系统配置
             enable_daily_mood=mood_settings.get('enable_daily_mood', True),
@@ -602,6 +681,23 @@ class PluginConfig(BaseModel):
             service_stop_timeout=runtime_internal_settings.get('service_stop_timeout', 5),
             enable_llm_hooks=runtime_internal_settings.get('enable_llm_hooks', False),
             llm_hook_context_timeout=float(runtime_internal_settings.get('llm_hook_context_timeout', 3.0)),
+            raw_message_flush_batch_size=runtime_internal_settings.get('raw_message_flush_batch_size', 50),
+            raw_message_flush_interval=float(runtime_internal_settings.get('raw_message_flush_interval', 0.2)),
+            raw_message_buffer_max_pending=runtime_internal_settings.get('raw_message_buffer_max_pending', 1000),
+            learning_worker_count=runtime_internal_settings.get('learning_worker_count', 8),
+            learning_queue_soft_limit=runtime_internal_settings.get('learning_queue_soft_limit', 500),
+            learning_queue_hard_limit=runtime_internal_settings.get('learning_queue_hard_limit', 2000),
+            learning_queue_max_size=runtime_internal_settings.get('learning_queue_max_size', 10000),
+            jargon_filter_max_terms_per_group=runtime_internal_settings.get('jargon_filter_max_terms_per_group', 5000),
+            jargon_filter_decay_half_life_days=float(runtime_internal_settings.get('jargon_filter_decay_half_life_days', 7.0)),
+            jargon_filter_snapshot_interval=runtime_internal_settings.get('jargon_filter_snapshot_interval', 600),
+            analytics_rollup_enabled=runtime_internal_settings.get('analytics_rollup_enabled', True),
+            analytics_rollup_interval=runtime_internal_settings.get('analytics_rollup_interval', 300),
+            analytics_rollup_backfill_days=runtime_internal_settings.get('analytics_rollup_backfill_days', 7),
+            llm_provider_max_concurrency=runtime_internal_settings.get('llm_provider_max_concurrency', 4),
+            llm_provider_tokens_per_minute=runtime_internal_settings.get('llm_provider_tokens_per_minute', 0),
+            llm_circuit_failure_threshold=runtime_internal_settings.get('llm_circuit_failure_threshold', 5),
+            llm_circuit_cooldown=float(runtime_internal_settings.get('llm_circuit_cooldown', 30.0)),
             llm_hook_injection_target=runtime_internal_settings.get(
                 'llm_hook_injection_target',
                 CACHE_FRIENDLY_LLM_HOOK_TARGET,
@@ -27,6 +27,20 @@ except ImportError:
     from models.orm import Base
 
 
+# 已被复合索引的前缀覆盖、仍可能存在于旧库中的单列索引；自动迁移时删除
+_OBSOLETE_INDEXES = {
+    'raw_messages': (
+        'idx_raw_processed', 'idx_raw_group',
+        'ix_raw_messages_group_id', 'ix_raw_messages_sender_id',
+    ),
+    'filtered_messages': (
+        'idx_filtered_processed', 'idx_filtered_group',
+        'ix_filtered_messages_group_id', 'ix_filtered_messages_sender_id',
+    ),
+    'bot_messages': ('idx_bot_group', 'ix_bot_messages_group_id'),
+}
+
+
 class DatabaseEngine:
     """
     SQLAlchemy 异步数据库引擎封装
@@ -419,6 +433,22 @@ class DatabaseEngine:
                 else:
                     logger.debug("[DatabaseEngine] 所有表索引已与 ORM 模型一致")
 
+                for table_name, index_names in _OBSOLETE_INDEXES.items():
+                    db_indexes = existing_indexes.get(table_name, set())
+                    for index_name in index_names:
+                        if index_name not in db_indexes:
+                            continue
+                        stmt = f"DROP INDEX {quote(index_name)}"
+                        if dialect.name in ('mysql', 'mariadb'):
+                            stmt += f" ON {quote(table_name)}"
+                        try:
+                            await conn.execute(text(stmt))
+                            logger.info(f"[DatabaseEngine] 自动迁移删除冗余索引: {stmt}")
+                        except Exception as index_err:
+                            logger.warning(
+                                f"[DatabaseEngine] 删除冗余索引失败: {index_err}"
+                            )
+
         except Exception as e:
             logger.warning(f"[DatabaseEngine] 自动列迁移检测失败（不影响运行）: {e}")
 
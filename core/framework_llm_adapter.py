@@ -10,10 +10,17 @@ from astrbot.api import logger
 from astrbot.core.provider.provider import Provider
 from astrbot.core.provider.entities import LLMResponse
 
+from .llm_scheduler import (
+    LLMCircuitOpenError,
+    LLMRequestScheduler,
+    estimate_tokens,
+    shared_llm_scheduler,
+)
+
 class FrameworkLLMAdapter:
     """AstrBot框架LLM适配器，用于替换自定义LLMClient"""
     
-    def __init__(self, context):
+    def __init__(self, context, scheduler: Optional[LLMRequestScheduler] = None):
         self.context = context
         self.filter_provider: Optional[Provider] = None
         self.refine_provider: Optional[Provider] = None
@@ -29,12 +36,16 @@ class FrameworkLLMAdapter:
         self._filter_cache: Dict[str, Tuple[float, Optional[str]]] = {}
         self._filter_inflight: Dict[str, asyncio.Task] = {}
 
-        # 添加调用统计
+        # 按优先级排队、按 Provider 限流与熔断的请求调度器（默认进程内共享）
+        self._scheduler = scheduler or shared_llm_scheduler()
+
+        # 添加调用统计（queue_wait_time 为调度器排队耗时，circuit_rejections 为熔断拒绝数）
         self.call_stats = {
-            'filter': {'total_calls': 0, 'total_time': 0, 'errors': 0},
-            'refine': {'total_calls': 0, 'total_time': 0, 'errors': 0},
-            'reinforce': {'total_calls': 0, 'total_time': 0, 'errors': 0},
-            'general': {'total_calls': 0, 'total_time': 0, 'errors': 0}
+            role: {
+                'total_calls': 0, 'total_time': 0, 'errors': 0,
+                'queue_wait_time': 0, 'circuit_rejections': 0,
+            }
+            for role in ('filter', 'refine', 'reinforce', 'general')
         }
         
     def initialize_providers(self, config):
@@ -43,6 +54,12 @@ class FrameworkLLMAdapter:
 
         # 保存配置用于可能的延迟初始化
         self._config = config
+        self._scheduler.configure(
+            max_concurrency=getattr(config, 'llm_provider_max_concurrency', 4),
+            tokens_per_minute=getattr(config, 'llm_provider_tokens_per_minute', 0),
+            failure_threshold=getattr(config, 'llm_circuit_failure_threshold', 5),
+            cooldown=getattr(config, 'llm_circuit_cooldown', 30.0),
+        )
         self.providers_configured = 0
         self.filter_provider = None
         self.refine_provider = None
@@ -272,6 +289,47 @@ class FrameworkLLMAdapter:
             )
             return False
 
+    async def _scheduled_text_chat(
+        self,
+        provider: Provider,
+        role: Optional[str],
+        prompt: str,
+        contexts: List[Dict[str, str]],
+        system_prompt: Optional[str],
+        **kwargs,
+    ) -> Optional[LLMResponse]:
+        """经调度器排队后调用 Provider，按 role 记录排队耗时"""
+        provider_id = provider.meta().id
+        tokens = estimate_tokens(
+            prompt,
+            system_prompt,
+            *(
+                item.get('content')
+                for item in contexts
+                if isinstance(item, dict) and isinstance(item.get('content'), str)
+            ),
+        )
+
+        def _on_wait(wait_ms: float) -> None:
+            if role:
+                self.call_stats[role]['queue_wait_time'] += wait_ms / 1000
+
+        response, _ = await self._scheduler.run(
+            provider_id,
+            lambda: provider.text_chat(
+                prompt=prompt,
+                contexts=contexts,
+                system_prompt=system_prompt,
+                **kwargs,
+            ),
+            tokens=tokens,
+            on_wait=_on_wait,
+        )
+        completion = getattr(response, 'completion_text', None)
+        if isinstance(completion, str) and completion:
+            self._scheduler.charge_tokens(provider_id, estimate_tokens(completion))
+        return response
+
     async def _text_chat_with_rebind_retry(
         self,
         provider_attr: str,
@@ -285,14 +343,19 @@ class FrameworkLLMAdapter:
         if not provider:
             return None
 
+        role = provider_attr.split('_', 1)[0]
         logger.debug(f"调用{role_label}Provider: {provider.meta().id}")
         try:
-            return await provider.text_chat(
+            return await self._scheduled_text_chat(
+                provider,
+                role,
                 prompt=prompt,
                 contexts=contexts,
                 system_prompt=system_prompt,
                 **kwargs,
             )
+        except LLMCircuitOpenError:
+            raise
         except Exception as exc:
             if not self._refresh_provider_bindings_after_error(role_label, exc):
                 raise
@@ -305,7 +368,9 @@ class FrameworkLLMAdapter:
                 f"[LLM适配器] {role_label}Provider 已重新绑定: "
                 f"{retry_provider.meta().id}"
             )
-            return await retry_provider.text_chat(
+            return await self._scheduled_text_chat(
+                retry_provider,
+                role,
                 prompt=prompt,
                 contexts=contexts,
                 system_prompt=system_prompt,
@@ -370,6 +435,11 @@ class FrameworkLLMAdapter:
                 **kwargs,
             )
             return response.completion_text if response else None
+        except LLMCircuitOpenError as e:
+            self.call_stats['filter']['errors'] += 1
+            self.call_stats['filter']['circuit_rejections'] += 1
+            logger.debug(f"筛选模型调用被熔断拒绝: {e}")
+            return None
         except Exception as e:
             self.call_stats['filter']['errors'] += 1
             logger.error(f"筛选模型调用失败: {e}")
@@ -400,7 +470,9 @@ class FrameworkLLMAdapter:
             if fallback_provider:
                 logger.info(f"使用备选Provider: {fallback_provider.meta().id}")
                 try:
-                    response = await fallback_provider.text_chat(
+                    response = await self._scheduled_text_chat(
+                        fallback_provider,
+                        None,
                         prompt=prompt,
                         contexts=contexts,
                         system_prompt=system_prompt,
@@ -458,7 +530,9 @@ class FrameworkLLMAdapter:
             if fallback_provider:
                 logger.info(f"使用备选Provider: {fallback_provider.meta().id}")
                 try:
-                    response = await fallback_provider.text_chat(
+                    response = await self._scheduled_text_chat(
+                        fallback_provider,
+                        None,
                         prompt=prompt,
                         contexts=contexts,
                         system_prompt=system_prompt,
@@ -495,7 +569,11 @@ class FrameworkLLMAdapter:
             elapsed_time = time.time() - start_time
             self.call_stats['refine']['total_time'] += elapsed_time
             self.call_stats['refine']['errors'] += 1
-            
+
+            if isinstance(e, LLMCircuitOpenError):
+                self.call_stats['refine']['circuit_rejections'] += 1
+                logger.debug(f"提炼模型调用被熔断拒绝: {e}")
+                return None
             logger.error(f"提炼模型调用失败: {e}")
             return None
     
@@ -521,7 +599,9 @@ class FrameworkLLMAdapter:
             if fallback_provider:
                 logger.info(f"使用备选Provider: {fallback_provider.meta().id}")
                 try:
-                    response = await fallback_provider.text_chat(
+                    response = await self._scheduled_text_chat(
+                        fallback_provider,
+                        None,
                         prompt=prompt,
                         contexts=contexts,
                         system_prompt=system_prompt,
@@ -558,7 +638,11 @@ class FrameworkLLMAdapter:
             elapsed_time = time.time() - start_time
             self.call_stats['reinforce']['total_time'] += elapsed_time
             self.call_stats['reinforce']['errors'] += 1
-            
+
+            if isinstance(e, LLMCircuitOpenError):
+                self.call_stats['reinforce']['circuit_rejections'] += 1
+                logger.debug(f"强化模型调用被熔断拒绝: {e}")
+                return None
             logger.error(f"强化模型调用失败: {e}")
             return None
 
@@ -568,39 +652,55 @@ class FrameworkLLMAdapter:
         total_calls = 0
         total_time = 0
         total_errors = 0
+        total_wait = 0
+        total_rejections = 0
         
         for provider_type, data in self.call_stats.items():
             calls = data['total_calls']
             time_spent = data['total_time']
             errors = data['errors']
+            wait_time = data.get('queue_wait_time', 0)
+            rejections = data.get('circuit_rejections', 0)
             
             total_calls += calls
             total_time += time_spent
             total_errors += errors
+            total_wait += wait_time
+            total_rejections += rejections
             
             avg_time = (time_spent / calls * 1000) if calls > 0 else 0
+            avg_wait = (wait_time / calls * 1000) if calls > 0 else 0
             success_rate = ((calls - errors) / calls) if calls > 0 else 1.0
             
             stats[provider_type] = {
                 'total_calls': calls,
                 'avg_response_time_ms': round(avg_time, 2),
+                'avg_queue_wait_ms': round(avg_wait, 2),
                 'success_rate': success_rate,
-                'error_count': errors
+                'error_count': errors,
+                'circuit_rejections': rejections
             }
         
         # 添加总体统计
         overall_avg_time = (total_time / total_calls * 1000) if total_calls > 0 else 0
+        overall_avg_wait = (total_wait / total_calls * 1000) if total_calls > 0 else 0
         overall_success_rate = ((total_calls - total_errors) / total_calls) if total_calls > 0 else 1.0
         
         stats['overall'] = {
             'total_calls': total_calls,
             'avg_response_time_ms': round(overall_avg_time, 2),
+            'avg_queue_wait_ms': round(overall_avg_wait, 2),
             'success_rate': overall_success_rate,
-            'error_count': total_errors
+            'error_count': total_errors,
+            'circuit_rejections': total_rejections
         }
         
         return stats
 
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """获取请求调度器统计（各 Provider 并发/熔断状态与各优先级排队等待）"""
+        return self._scheduler.get_stats()
+
     def has_filter_provider(self) -> bool:
         """检查是否有筛选Provider"""
         return self.filter_provider is not None
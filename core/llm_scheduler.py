@@ -0,0 +1,463 @@
+"""LLM 请求调度器 — 按优先级、按 Provider 限流并熔断
+
+``FrameworkLLMAdapter`` 的每次 ``text_chat`` 都经过本调度器，
+而不是直接打到 Provider：
+
+- 优先级：交互（LLM Hook）> 实时（逐消息学习）> 批处理（学习批次、
+  好感度分类、黑话推断等后台任务）；同一 Provider 空出槽位时总是
+  先放行优先级最高、排队最早的请求；
+- 每个 Provider 独立的并发上限与每分钟 token 预算（令牌桶，按提示词
+  长度估算入账，响应返回后补记输出 token）；
+- 熔断器：连续失败达到阈值后在冷却期内直接拒绝请求（快速失败），
+  冷却结束后放行一个探测请求，成功即恢复；
+- 各优先级与各 Provider 的排队等待、拒绝数等统计通过 ``get_stats()`` 暴露。
+
+优先级通过 ``llm_priority()`` 上下文设置，经 contextvars 传递到其中
+创建的子任务，调用方无需逐个修改 LLM 调用点。插件内各处创建的适配器
+默认共用 ``shared_llm_scheduler()``，限流与熔断对同一 Provider 全局生效。
+
+排队状态只属于一个事件循环：插件启动时用 ``bind_loop()`` 绑定主循环；
+其他线程中的事件循环（如 WebUI）发起的请求会被转交到主循环执行，
+同样受排队、限流与熔断约束。
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from astrbot.api import logger
+
+
+# 优先级：数值越小越先被放行
+PRIORITY_INTERACTIVE = 0  # LLM Hook 等用户正在等待的请求
+PRIORITY_REALTIME = 1     # 逐消息的实时学习 / 筛选
+PRIORITY_BATCH = 2        # 学习批次、好感度分类、黑话推断等后台任务
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_REALTIME: 'realtime',
+    PRIORITY_BATCH: 'batch',
+}
+
+_current_priority: ContextVar[Optional[int]] = ContextVar('llm_priority', default=None)
+
+T = TypeVar('T')
+
+
+@contextmanager
+def llm_priority(priority: int) -> Iterator[None]:
+    """在当前上下文（及其中创建的任务）内为 LLM 请求指定优先级
+
+    嵌套时取更高（数值更小）的优先级，避免交互路径被内层降级。
+    """
+    outer = _current_priority.get()
+    effective = priority if outer is None else min(outer, priority)
+    token = _current_priority.set(effective)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_llm_priority(default: int = PRIORITY_BATCH) -> int:
+    """当前上下文的 LLM 请求优先级，未设置时返回 ``default``"""
+    priority = _current_priority.get()
+    return default if priority is None else priority
+
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    """粗略估算 token 数：非 ASCII 字符按 1 个，ASCII 字符按 4 个计 1 个"""
+    total = 0
+    for text in texts:
+        if not text:
+            continue
+        non_ascii = sum(1 for ch in text if ord(ch) > 127)
+        total += non_ascii + (len(text) - non_ascii + 3) // 4
+    return max(1, total)
+
+
+class LLMCircuitOpenError(RuntimeError):
+    """Provider 处于熔断状态，请求被快速拒绝"""
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class _ProviderLane:
+    """单个 Provider 的并发槽位、token 令牌桶与熔断状态"""
+
+    def __init__(
+        self,
+        provider_id: str,
+        max_concurrency: int,
+        tokens_per_minute: int,
+        failure_threshold: int,
+        cooldown: float,
+    ):
+        self.provider_id = provider_id
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.tokens_per_minute = max(0, int(tokens_per_minute))
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = max(0.0, float(cooldown))
+
+        self.in_flight = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+
+        # 令牌桶（tokens_per_minute 为 0 时不限）
+        self._tokens = float(self.tokens_per_minute)
+        self._refilled_at = time.monotonic()
+
+        # 熔断器: closed -> open -> half_open -> closed / open
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.opened_count = 0
+
+    # 熔断
+
+    def check_circuit(self) -> bool:
+        """是否放行；放行半开探测时返回 True 并占用探测名额"""
+        if self.state == 'closed':
+            return True
+        if self.state == 'open':
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self.state = 'half_open'
+            self._probe_in_flight = False
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.completed += 1
+        self.consecutive_failures = 0
+        if self.state != 'closed':
+            logger.info(f"[LLMScheduler] Provider {self.provider_id} 探测成功，熔断恢复")
+        self.state = 'closed'
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failed += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.opened_count += 1
+                logger.warning(
+                    f"[LLMScheduler] Provider {self.provider_id} 连续失败 "
+                    f"{self.consecutive_failures} 次，熔断 {self.cooldown:g} 秒"
+                )
+            self.state = 'open'
+            self._opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """探测请求被取消时归还探测名额"""
+        self._probe_in_flight = False
+
+    # token 预算
+
+    def _refill(self) -> None:
+        if not self.tokens_per_minute:
+            return
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.tokens_per_minute),
+            self._tokens + (now - self._refilled_at) * self.tokens_per_minute / 60.0,
+        )
+        self._refilled_at = now
+
+    def _tokens_ready(self, tokens: int) -> float:
+        """预算足够时返回 0，否则返回需要等待的秒数"""
+        if not self.tokens_per_minute:
+            return 0.0
+        self._refill()
+        # 超过整桶容量的大请求在桶满时放行，避免永久等待
+        need = min(float(tokens), float(self.tokens_per_minute))
+        if self._tokens >= need:
+            return 0.0
+        return (need - self._tokens) * 60.0 / self.tokens_per_minute
+
+    def charge(self, tokens: int) -> None:
+        """记入 token 消耗（可为负债，由后续补充抵扣）"""
+        if self.tokens_per_minute and tokens > 0:
+            self._refill()
+            self._tokens -= tokens
+
+    # 槽位
+
+    async def acquire(self, priority: int, tokens: int) -> None:
+        if not self._waiters and self.in_flight < self.max_concurrency \
+                and self._tokens_ready(tokens) == 0.0:
+            self._grant(tokens)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, _Waiter(priority, next(self._seq), tokens, future))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 槽位已分配但等待方被取消：归还槽位
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _grant(self, tokens: int) -> None:
+        self.in_flight += 1
+        self.charge(tokens)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.max_concurrency:
+            head = self._waiters[0]
+            if head.future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._tokens_ready(head.tokens)
+            if delay > 0:
+                self._schedule_wake(delay)
+                return
+            heapq.heappop(self._waiters)
+            self._grant(head.tokens)
+            head.future.set_result(None)
+
+    def _schedule_wake(self, delay: float) -> None:
+        if self._wake_handle is not None and not self._wake_handle.cancelled():
+            return
+        loop = asyncio.get_running_loop()
+
+        def _fire() -> None:
+            self._wake_handle = None
+            self._wake()
+
+        self._wake_handle = loop.call_later(delay, _fire)
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            'state': self.state,
+            'in_flight': self.in_flight,
+            'queued': sum(1 for w in self._waiters if not w.future.done()),
+            'max_concurrency': self.max_concurrency,
+            'tokens_per_minute': self.tokens_per_minute,
+            'tokens_available': round(self._tokens, 1) if self.tokens_per_minute else None,
+            'consecutive_failures': self.consecutive_failures,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'circuit_opened': self.opened_count,
+        }
+
+
+class LLMRequestScheduler:
+    """按优先级排队、按 Provider 限流与熔断的 LLM 请求调度器
+
+    Args:
+        max_concurrency: 每个 Provider 同时进行的请求数上限。
+        tokens_per_minute: 每个 Provider 每分钟的 token 预算，0 为不限。
+        failure_threshold: 连续失败多少次后熔断。
+        cooldown: 熔断持续秒数，之后放行一个探测请求。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        tokens_per_minute: int = 0,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+    ):
+        self._lanes: Dict[str, _ProviderLane] = {}
+        # 排队状态所属的事件循环；其他循环（如 WebUI 线程）的请求转交到该循环执行
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._forwarded = 0
+        self.configure(max_concurrency, tokens_per_minute, failure_threshold, cooldown)
+
+        self._wait_stats: Dict[int, Dict[str, float]] = {
+            priority: {'requests': 0, 'total_wait_ms': 0.0, 'max_wait_ms': 0.0}
+            for priority in PRIORITY_NAMES
+        }
+
+    def configure(
+        self,
+        max_concurrency: int,
+        tokens_per_minute: int,
+        failure_threshold: int,
+        cooldown: float,
+    ) -> None:
+        """更新限流参数；已有 Provider 的排队与熔断状态保持不变"""
+        self._max_concurrency = max(1, int(max_concurrency))
+        self._tokens_per_minute = max(0, int(tokens_per_minute))
+        self._failure_threshold = max(1, int(failure_threshold))
+        self._cooldown = max(0.0, float(cooldown))
+        for lane in self._lanes.values():
+            lane.max_concurrency = self._max_concurrency
+            lane.tokens_per_minute = self._tokens_per_minute
+            lane.failure_threshold = self._failure_threshold
+            lane.cooldown = self._cooldown
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """绑定排队状态所属的事件循环（插件主循环）"""
+        if loop is not self._loop:
+            self._lanes = {}
+            self._loop = loop
+
+    def _owner_loop(self, current: asyncio.AbstractEventLoop) -> asyncio.AbstractEventLoop:
+        """排队状态所属的循环；未绑定或原循环已停止时由当前循环接管"""
+        loop = self._loop
+        if loop is None or loop.is_closed() or (loop is not current and not loop.is_running()):
+            self.bind_loop(current)
+        return self._loop
+
+    async def run(
+        self,
+        provider_id: str,
+        call: Callable[[], Awaitable[T]],
+        priority: Optional[int] = None,
+        tokens: int = 1,
+        on_wait: Optional[Callable[[float], None]] = None,
+    ) -> Tuple[T, float]:
+        """在 Provider 的限流与熔断保护下执行 ``call``
+
+        Args:
+            provider_id: Provider ID，每个 ID 一条独立的排队通道
+            call: 无参协程工厂，实际发起请求
+            priority: ``PRIORITY_*``，为空时取 ``llm_priority()`` 上下文
+            tokens: 预估的输入 token 数，用于 token 预算
+            on_wait: 拿到槽位后以排队毫秒数回调
+
+        Returns:
+            Tuple[T, float]: ``call`` 的结果与排队等待毫秒数
+
+        Raises:
+            LLMCircuitOpenError: Provider 处于熔断期
+        """
+        if priority is None:
+            priority = current_llm_priority()
+        current = asyncio.get_running_loop()
+        owner = self._owner_loop(current)
+        if owner is not current:
+            # 其他线程的事件循环：在所属循环中排队并执行，结果回传
+            self._forwarded += 1
+            future = asyncio.run_coroutine_threadsafe(
+                self.run(provider_id, call, priority, tokens, on_wait), owner
+            )
+            return await asyncio.wrap_future(future)
+
+        priority = min(max(int(priority), PRIORITY_INTERACTIVE), PRIORITY_BATCH)
+        lane = self._lane(provider_id)
+
+        if not lane.check_circuit():
+            lane.rejected += 1
+            raise LLMCircuitOpenError(
+                f"Provider {provider_id} 处于熔断状态，请求已被拒绝"
+            )
+
+        started = time.monotonic()
+        try:
+            await lane.acquire(priority, tokens)
+        except BaseException:
+            lane.release_probe()
+            raise
+        wait_ms = (time.monotonic() - started) * 1000
+        self._record_wait(priority, wait_ms)
+        if on_wait is not None:
+            on_wait(wait_ms)
+
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            lane.release_probe()
+            raise
+        except Exception:
+            lane.record_failure()
+            raise
+        else:
+            lane.record_success()
+            return result, wait_ms
+        finally:
+            lane.release()
+
+    def charge_tokens(self, provider_id: str, tokens: int) -> None:
+        """补记响应产生的输出 token（可从任意线程调用）"""
+        loop = self._loop
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if loop is not None and loop is not current and loop.is_running():
+            loop.call_soon_threadsafe(self._charge, provider_id, tokens)
+        else:
+            self._charge(provider_id, tokens)
+
+    def _charge(self, provider_id: str, tokens: int) -> None:
+        self._lane(provider_id).charge(tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """按 Provider 的槽位/熔断统计与按优先级的排队等待统计"""
+        return {
+            'max_concurrency': self._max_concurrency,
+            'tokens_per_minute': self._tokens_per_minute,
+            'forwarded': self._forwarded,
+            'providers': {pid: lane.get_stats() for pid, lane in list(self._lanes.items())},
+            'queue_wait': {
+                PRIORITY_NAMES[priority]: {
+                    'requests': int(data['requests']),
+                    'avg_wait_ms': (
+                        round(data['total_wait_ms'] / data['requests'], 2)
+                        if data['requests'] else 0.0
+                    ),
+                    'max_wait_ms': round(data['max_wait_ms'], 2),
+                }
+                for priority, data in self._wait_stats.items()
+            },
+        }
+
+    def _lane(self, provider_id: str) -> _ProviderLane:
+        lane = self._lanes.get(provider_id)
+        if lane is None:
+            lane = _ProviderLane(
+                provider_id,
+                self._max_concurrency,
+                self._tokens_per_minute,
+                self._failure_threshold,
+                self._cooldown,
+            )
+            self._lanes[provider_id] = lane
+        return lane
+
+    def _record_wait(self, priority: int, wait_ms: float) -> None:
+        data = self._wait_stats[priority]
+        data['requests'] += 1
+        data['total_wait_ms'] += wait_ms
+        data['max_wait_ms'] = max(data['max_wait_ms'], wait_ms)
+
+
+_shared_scheduler: Optional[LLMRequestScheduler] = None
+
+
+def shared_llm_scheduler() -> LLMRequestScheduler:
+    """进程内共享的调度器，使各处创建的 ``FrameworkLLMAdapter`` 共用同一套限流与熔断状态"""
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        _shared_scheduler = LLMRequestScheduler()
+    return _shared_scheduler
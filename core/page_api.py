@@ -1081,6 +1081,12 @@ class PluginPageApi:
                 provider_info = llm_adapter.get_provider_info() or {}
             except Exception as exc:
                 errors["provider_info"] = str(exc)
+        scheduler_stats = {}
+        if llm_adapter and hasattr(llm_adapter, "get_scheduler_stats"):
+            try:
+                scheduler_stats = llm_adapter.get_scheduler_stats() or {}
+            except Exception as exc:
+                errors["llm_scheduler"] = str(exc)
 
         return {
             "intelligence": intelligence,
@@ -1091,6 +1097,7 @@ class PluginPageApi:
             "llm": {
                 "call_statistics": llm_stats,
                 "provider_info": provider_info,
+                "scheduler": scheduler_stats,
             },
             "learning": {
                 "active_sessions": self._active_learning_sessions(container),
@@ -1,11 +1,13 @@
 """插件全生命周期编排 — 服务初始化 → 异步启动 → 有序关停"""
 import asyncio
+import os
 from typing import Any, Dict, TYPE_CHECKING
 
 from astrbot.api import logger
 
 from .factory import FactoryManager
 from .feature_delegation import FeatureDelegation
+from .llm_scheduler import shared_llm_scheduler
 from ..exceptions import SelfLearningError
 from ..statics.messages import StatusMessages, LogMessages
 
@@ -111,10 +113,18 @@ class PluginLifecycle:
                 llm_adapter=p.service_factory.create_framework_llm_adapter(),
                 db_manager=p.db_manager,
                 config=plugin_config,
+                on_jargon_changed=p.jargon_query_service.invalidate_group,
             )
             logger.info("黑话挖掘管理器已初始化")
 
-            p.jargon_statistical_filter = JargonStatisticalFilter()
+            p.jargon_statistical_filter = JargonStatisticalFilter(
+                max_terms_per_group=plugin_config.jargon_filter_max_terms_per_group,
+                decay_half_life_days=plugin_config.jargon_filter_decay_half_life_days,
+                snapshot_path=os.path.join(
+                    plugin_config.data_dir, "jargon_filter_snapshot.json"
+                ),
+                snapshot_interval=plugin_config.jargon_filter_snapshot_interval,
+            )
             logger.info("黑话统计预筛器已初始化")
 
             # ------ V2 架构集成（条件创建）------
@@ -137,6 +147,7 @@ class PluginLifecycle:
                         db_manager=p.db_manager,
                         context=context,
                         feature_delegation=getattr(p, "feature_delegation", None),
+                        on_jargon_changed=p.jargon_query_service.invalidate_group,
                     )
                     logger.info(
                         f"V2LearningIntegration initialised "
@@ -174,6 +185,18 @@ class PluginLifecycle:
             # ------ LLM 适配器（状态报告用）------
             p.llm_adapter = p.service_factory.create_framework_llm_adapter()
 
+            # ------ 分析指标小时汇总 ------
+            p.analytics_rollup = None
+            if plugin_config.analytics_rollup_enabled:
+                from ..services.monitoring.rollup_service import AnalyticsRollupService
+
+                p.analytics_rollup = AnalyticsRollupService(
+                    db_manager=p.db_manager,
+                    llm_adapter=p.llm_adapter,
+                    interval=plugin_config.analytics_rollup_interval,
+                    backfill_days=plugin_config.analytics_rollup_backfill_days,
+                )
+
             # ------ 内部组件（QQ过滤/消息过滤/人格更新/调度器）------
             self._setup_internal_components(plugin_config, context, group_id_to_unified_origin)
 
@@ -228,6 +251,14 @@ class PluginLifecycle:
 
             # ------ 消息处理流水线 ------
             from ..services.learning.message_pipeline import MessagePipeline
+            from ..services.learning.work_scheduler import GroupWorkScheduler
+
+            p._work_scheduler = GroupWorkScheduler(
+                worker_count=plugin_config.learning_worker_count,
+                soft_limit=plugin_config.learning_queue_soft_limit,
+                hard_limit=plugin_config.learning_queue_hard_limit,
+                max_size=plugin_config.learning_queue_max_size,
+            )
 
             p._pipeline = MessagePipeline(
                 plugin_config=plugin_config,
@@ -241,6 +272,7 @@ class PluginLifecycle:
                 conversation_goal_manager=getattr(p, "conversation_goal_manager", None),
                 affection_manager=p.affection_manager,
                 db_manager=p.db_manager,
+                work_scheduler=p._work_scheduler,
             )
 
             # ------ 命令处理器 ------
@@ -357,6 +389,9 @@ class PluginLifecycle:
 
         logger.info(StatusMessages.ON_LOAD_START)
 
+        # LLM 排队状态绑定到主循环，WebUI 线程的请求会转交到这里执行
+        shared_llm_scheduler().bind_loop(asyncio.get_running_loop())
+
         # ------ DB 启动（带重试）------
         db_started = False
         max_retries = 3
@@ -397,6 +432,20 @@ class PluginLifecycle:
             except Exception as e:
                 logger.error(f"好感度管理服务启动失败: {e}", exc_info=True)
 
+        # ------ 分析指标小时汇总 ------
+        if db_started and getattr(p, "analytics_rollup", None):
+            try:
+                await p.analytics_rollup.start()
+            except Exception as e:
+                logger.warning(f"小时指标汇总服务启动失败: {e}")
+
+        # ------ 黑话统计预筛（恢复快照） ------
+        if getattr(p, "jargon_statistical_filter", None):
+            try:
+                await p.jargon_statistical_filter.start()
+            except Exception as e:
+                logger.warning(f"黑话统计快照恢复失败: {e}")
+
         # ------ V2 学习集成 ------
         v2_started = False
         if getattr(p, "v2_integration", None):
@@ -489,6 +538,16 @@ class PluginLifecycle:
                     p.learning_scheduler.stop(),
                 )
 
+            # 2.4 停止后台工作调度器（在超时内执行完已排队的采集工作）
+            work_scheduler = getattr(p, "_work_scheduler", None)
+            if work_scheduler:
+                _drain_timeout = p.plugin_config.task_cancel_timeout
+                await self._safe_step(
+                    "停止后台工作调度器",
+                    work_scheduler.stop(drain_timeout=_drain_timeout),
+                    timeout=_drain_timeout + p.plugin_config.shutdown_step_timeout,
+                )
+
             # 2.5 取消流水线子任务
             pipeline = getattr(p, "_pipeline", None)
             if pipeline and hasattr(pipeline, "cancel_subtasks"):
@@ -515,6 +574,13 @@ class PluginLifecycle:
             if hasattr(p, "background_tasks"):
                 p.background_tasks.clear()
 
+            # 3.5 刷新原始消息写缓冲（需在数据库关闭之前完成）
+            if hasattr(p, "message_collector"):
+                await self._safe_step(
+                    "刷新消息写缓冲",
+                    p.message_collector.stop(),
+                )
+
             # 4. 停止 V2（在服务工厂之前，确保 buffer flush 可使用完整服务）
             if getattr(p, "v2_integration", None):
                 await self._safe_step(
@@ -522,6 +588,13 @@ class PluginLifecycle:
                     p.v2_integration.stop(),
                 )
 
+            # 4.5 停止小时指标汇总（最后一次汇总需在数据库关闭之前完成）
+            if getattr(p, "analytics_rollup", None):
+                await self._safe_step(
+                    "停止小时指标汇总",
+                    p.analytics_rollup.stop(),
+                )
+
             # 5. 停止服务工厂
             if hasattr(p, "factory_manager"):
                 await self._safe_step(
@@ -561,6 +634,13 @@ class PluginLifecycle:
                     p.message_collector.save_state(),
                 )
 
+            # 7.5 保存黑话统计快照
+            if getattr(p, "jargon_statistical_filter", None):
+                await self._safe_step(
+                    "保存黑话统计快照",
+                    p.jargon_statistical_filter.stop(),
+                )
+
             # 8. 停止 WebUI
             if self._webui_manager:
                 await self._safe_step(
@@ -21,6 +21,7 @@ from .config import DEFAULT_DATA_DIR, PluginConfig
 from .core.plugin_lifecycle import PluginLifecycle
 from .services.hooks.perf_tracker import PerfTracker
 from .services.monitoring.instrumentation import monitored, reset_trace_context
+from .services.learning.work_scheduler import PRIORITY_CAPTURE, PRIORITY_NORMAL
 from .services.learning.sample_filter import (
     extract_learning_event_metadata,
     should_ignore_learning_sample,
@@ -380,9 +381,12 @@ class SelfLearningPlugin(star.Star):
                 and self.plugin_config.enable_affection_system
                 and pipeline
             ):
-                self._track_task(asyncio.create_task(
-                    pipeline.process_affection(group_id, sender_id, message_text)
-                ))
+                self._schedule_background(
+                    group_id,
+                    pipeline.process_affection(group_id, sender_id, message_text),
+                    kind="affection",
+                    priority=PRIORITY_NORMAL,
+                )
 
             if not self.plugin_config or not self.plugin_config.enable_message_capture:
                 self._log_message_capture_diag("skip:capture_disabled", event, message_text, level="info")
@@ -404,10 +408,16 @@ class SelfLearningPlugin(star.Star):
                 self._log_message_capture_diag("skip:pipeline_missing", event, message_text, level="info")
                 return
 
-            # 后台学习流水线
-            self._track_task(asyncio.create_task(
-                self._process_learning_message(group_id, sender_id, message_text, event)
-            ))
+            # 后台学习流水线（含原始消息采集，调度器过载时也不会丢弃）
+            accepted = self._schedule_background(
+                group_id,
+                self._process_learning_message(group_id, sender_id, message_text, event),
+                kind="capture",
+                priority=PRIORITY_CAPTURE,
+            )
+            if not accepted:
+                self._log_message_capture_diag("skip:work_queue_closed", event, message_text)
+                return
 
             self._log_message_capture_diag("queued:learning_pipeline", event, message_text)
 
@@ -436,6 +446,20 @@ class SelfLearningPlugin(star.Star):
         else:
             self._log_message_capture_diag("fail:raw_message_not_saved", event, message_text, level="info")
 
+    def _schedule_background(
+        self,
+        group_id: str,
+        coro,
+        kind: str,
+        priority: int,
+    ) -> bool:
+        """Queue per-message work on the bounded scheduler (falls back to create_task)."""
+        scheduler = getattr(self, '_work_scheduler', None)
+        if scheduler is not None:
+            return scheduler.submit(group_id, coro, kind=kind, priority=priority)
+        self._track_task(asyncio.create_task(coro))
+        return True
+
     def _track_task(self, task: asyncio.Task) -> None:
         """Register a fire-and-forget task for cancellation during shutdown."""
         bg = getattr(self, 'background_tasks', None)
@@ -5,13 +5,16 @@ from .base import Base
 from .affection import (
     UserAffection,
     AffectionInteraction,
+    InteractionLabel,
     UserConversationHistory,
     UserDiversity
 )
 from .memory import (
     Memory,
     MemoryEmbedding,
-    MemorySummary
+    MemorySummary,
+    MemoryGraphNode,
+    MemoryGraphEdge,
 )
 from .psychological import (
     CompositePsychologicalState,
@@ -59,6 +62,9 @@ from .expression import (
 from .performance import (
     LearningPerformanceHistory
 )
+from .analytics import (
+    HourlyGroupRollup
+)
 from .message import (
     RawMessage,
     FilteredMessage,
@@ -95,12 +101,15 @@ __all__ = [
     # Affection
     'UserAffection',
     'AffectionInteraction',
+    'InteractionLabel',
     'UserConversationHistory',
     'UserDiversity',
     # Memory
     'Memory',
     'MemoryEmbedding',
     'MemorySummary',
+    'MemoryGraphNode',
+    'MemoryGraphEdge',
     # Psychological
     'CompositePsychologicalState',
     'PsychologicalStateComponent',
@@ -141,6 +150,8 @@ __all__ = [
     'LanguageStylePattern',
     # Performance
     'LearningPerformanceHistory',
+    # Analytics
+    'HourlyGroupRollup',
     # Message
     'RawMessage',
     'FilteredMessage',
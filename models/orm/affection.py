@@ -46,6 +46,23 @@ class AffectionInteraction(Base):
     )
 
 
+class InteractionLabel(Base):
+    """交互类型标注表（LLM 分类结果，用于训练本地交互分类器）"""
+    __tablename__ = 'interaction_labels'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    text_hash = Column(String(64), nullable=False)
+    normalized_text = Column(Text, nullable=False)
+    interaction_type = Column(String(50), nullable=False)
+    source = Column(String(20), nullable=False, default='llm')
+    created_at = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index('idx_interaction_label_hash', 'text_hash', unique=True),
+        Index('idx_interaction_label_created', 'created_at'),
+    )
+
+
 class UserConversationHistory(Base):
     """用户对话历史表"""
     __tablename__ = 'user_conversation_history'
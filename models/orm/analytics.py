@@ -0,0 +1,32 @@
+"""
+分析汇总相关的 ORM 模型
+
+按群组、按小时预聚合的指标，供趋势图与仪表盘直接读取，
+避免每次请求扫描原始消息与学习记录。
+"""
+from sqlalchemy import Column, Integer, String, Float, Index, BigInteger
+from .base import Base
+
+
+class HourlyGroupRollup(Base):
+    """群组小时指标汇总表"""
+    __tablename__ = 'hourly_group_rollups'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    group_id = Column(String(255), nullable=False)  # 全局指标（如 LLM 调用）使用 '*'
+    hour_start = Column(BigInteger, nullable=False)  # 小时起点（Unix 秒，整点）
+    raw_messages = Column(Integer, default=0, nullable=False)
+    active_users = Column(Integer, default=0, nullable=False)  # 该小时内不同发送者数
+    filtered_messages = Column(Integer, default=0, nullable=False)
+    bot_messages = Column(Integer, default=0, nullable=False)
+    llm_calls = Column(Integer, default=0, nullable=False)
+    llm_response_ms = Column(Float, default=0.0, nullable=False)  # 响应时间累计（毫秒）
+    learning_batches = Column(Integer, default=0, nullable=False)
+    learning_successes = Column(Integer, default=0, nullable=False)
+    persona_updates = Column(Integer, default=0, nullable=False)
+    updated_at = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index('uk_rollup_group_hour', 'group_id', 'hour_start', unique=True),
+        Index('idx_rollup_hour', 'hour_start'),
+    )
@@ -14,10 +14,11 @@ from sqlalchemy import (
     Float,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
 )
-from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy.dialects.mysql import MEDIUMBLOB, MEDIUMTEXT
 
 from .base import Base
 
@@ -25,6 +26,10 @@ from .base import Base
 # Required for high-dimensional embedding vectors (e.g. 3072-dim ≈ 69 KB JSON).
 _EmbeddingText = Text().with_variant(MEDIUMTEXT(), "mysql")
 
+# Packed little-endian float32/float16 vector. MEDIUMBLOB on MySQL so very
+# high-dimensional float32 vectors never hit the 64 KB BLOB limit.
+_EmbeddingBlob = LargeBinary().with_variant(MEDIUMBLOB(), "mysql")
+
 
 class Exemplar(Base):
     """Few-shot style exemplar record.
@@ -34,7 +39,11 @@ class Exemplar(Base):
         content: The original message text serving as style example.
         sender_id: ID of the message sender.
         group_id: Chat group identifier.
-        embedding_json: Serialised embedding vector (JSON float array).
+        embedding_json: Legacy serialised embedding vector (JSON float
+            array). New rows use ``embedding_blob``; legacy rows are
+            converted lazily when their group's vectors are loaded.
+        embedding_blob: Packed little-endian float32 (or float16) vector.
+            The element width is ``len(embedding_blob) // dimensions``.
         weight: Quality weight (adjusted by feedback, default 1.0).
         dimensions: Embedding vector dimensionality (for validation).
         created_at: Unix timestamp of record creation.
@@ -48,6 +57,7 @@ class Exemplar(Base):
     sender_id = Column(String(255), nullable=True)
     group_id = Column(String(255), nullable=False)
     embedding_json = Column(_EmbeddingText, nullable=True)
+    embedding_blob = Column(_EmbeddingBlob, nullable=True)
     weight = Column(Float, default=1.0)
     dimensions = Column(Integer, default=0)
     created_at = Column(BigInteger, nullable=False, default=lambda: int(time.time()))
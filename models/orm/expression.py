@@ -20,6 +20,8 @@ class ExpressionPattern(Base):
     weight = Column(Float, default=1.0, nullable=False)  # 权重
     last_active_time = Column(Float, nullable=False)  # 最后活跃时间
     create_time = Column(Float, nullable=False)  # 创建时间
+    # 作用域+场景+表达的哈希（批量 upsert 的唯一键；历史数据为 NULL）
+    pattern_key = Column(String(64), nullable=True)
 
     # 关系
     generation_results = relationship("ExpressionGenerationResult", back_populates="pattern", lazy="selectin")
@@ -29,6 +31,7 @@ class ExpressionPattern(Base):
         Index('idx_group_persona_active', 'group_id', 'persona_id', 'last_active_time'),
         Index('idx_expression_scope_user_weight', 'group_id', 'persona_id', 'user_id', 'weight'),
         Index('idx_expression_scope_user_active', 'group_id', 'persona_id', 'user_id', 'last_active_time'),
+        Index('uk_expression_pattern_key', 'pattern_key', unique=True),
     )
 
     def to_dict(self):
@@ -1,7 +1,7 @@
 """
 记忆系统相关的 ORM 模型
 """
-from sqlalchemy import Column, Integer, String, Text, Float, Index, BigInteger
+from sqlalchemy import Column, Integer, String, Text, Float, Index, BigInteger, UniqueConstraint
 from .base import Base
 
 
@@ -57,3 +57,37 @@ class MemorySummary(Base):
     __table_args__ = (
         Index('idx_group_user_summary', 'group_id', 'user_id', 'summary_type'),
     )
+
+
+class MemoryGraphNode(Base):
+    """记忆图概念节点表（每个群组每个概念一行，增量 upsert）"""
+    __tablename__ = 'memory_graph_nodes'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    group_id = Column(String(100), nullable=False, index=True)
+    concept = Column(String(191), nullable=False)
+    memory_items = Column(Text, nullable=False)
+    weight = Column(Float, default=1.0, nullable=False)
+    created_time = Column(Float, nullable=False)
+    last_modified = Column(Float, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('group_id', 'concept', name='uq_memory_graph_node'),
+    )
+
+
+class MemoryGraphEdge(Base):
+    """记忆图概念关联表（concept1 < concept2，无向边只存一行）"""
+    __tablename__ = 'memory_graph_edges'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    group_id = Column(String(100), nullable=False, index=True)
+    concept1 = Column(String(191), nullable=False)
+    concept2 = Column(String(191), nullable=False)
+    strength = Column(Float, default=1.0, nullable=False)
+    created_time = Column(Float, nullable=False)
+    last_modified = Column(Float, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('group_id', 'concept1', 'concept2', name='uq_memory_graph_edge'),
+    )
@@ -11,11 +11,11 @@ class RawMessage(Base):
     __tablename__ = 'raw_messages'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    sender_id = Column(String(255), nullable=False, index=True)
+    sender_id = Column(String(255), nullable=False)
     sender_name = Column(String(255))
     sender_qq = Column(String(32), nullable=True, index=True)
     message = Column(Text, nullable=False)
-    group_id = Column(String(255), index=True)
+    group_id = Column(String(255))
     timestamp = Column(BigInteger, nullable=False)
     platform = Column(String(100))
     message_id = Column(String(255), nullable=True)  # 可能在旧表中不存在
@@ -26,8 +26,12 @@ class RawMessage(Base):
     __table_args__ = (
         Index('idx_raw_timestamp', 'timestamp'),
         Index('idx_raw_sender', 'sender_id'),
-        Index('idx_raw_processed', 'processed'),
-        Index('idx_raw_group', 'group_id'),
+        # 热点查询：按群组取最近/未处理消息、按群组+发送者聚合、按 message_id 去重
+        Index('idx_raw_group_timestamp', 'group_id', 'timestamp'),
+        Index('idx_raw_group_processed_timestamp', 'group_id', 'processed', 'timestamp'),
+        Index('idx_raw_processed_timestamp', 'processed', 'timestamp'),
+        Index('idx_raw_group_sender', 'group_id', 'sender_id'),
+        Index('idx_raw_message_id', 'message_id'),
     )
 
 
@@ -38,8 +42,8 @@ class FilteredMessage(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     raw_message_id = Column(Integer)
     message = Column(Text, nullable=False)
-    sender_id = Column(String(255), nullable=False, index=True)
-    group_id = Column(String(255), index=True)
+    sender_id = Column(String(255), nullable=False)
+    group_id = Column(String(255))
     timestamp = Column(BigInteger, nullable=False)
     confidence = Column(Float)
     quality_scores = Column(Text)  # JSON 字符串，存储多个质量分数（与传统 database_manager 保持一致）
@@ -50,8 +54,9 @@ class FilteredMessage(Base):
     __table_args__ = (
         Index('idx_filtered_timestamp', 'timestamp'),
         Index('idx_filtered_sender', 'sender_id'),
-        Index('idx_filtered_processed', 'processed'),
-        Index('idx_filtered_group', 'group_id'),
+        Index('idx_filtered_group_timestamp', 'group_id', 'timestamp'),
+        Index('idx_filtered_group_processed_timestamp', 'group_id', 'processed', 'timestamp'),
+        Index('idx_filtered_processed_timestamp', 'processed', 'timestamp'),
     )
 
 
@@ -60,14 +65,14 @@ class BotMessage(Base):
     __tablename__ = 'bot_messages'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    group_id = Column(String(255), nullable=False, index=True)
+    group_id = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
     timestamp = Column(BigInteger, nullable=False)
     created_at = Column(BigInteger, nullable=False)
 
     __table_args__ = (
         Index('idx_bot_timestamp', 'timestamp'),
-        Index('idx_bot_group', 'group_id'),
+        Index('idx_bot_group_timestamp', 'group_id', 'timestamp'),
     )
 
 
@@ -10,6 +10,7 @@ from .shadow_profile_repository import ShadowProfileRepository
 from .affection_repository import (
     AffectionRepository,
     InteractionRepository,
+    InteractionLabelRepository,
     ConversationHistoryRepository,
     DiversityRepository
 )
@@ -18,7 +19,9 @@ from .affection_repository import (
 from .memory_repository import (
     MemoryRepository,
     MemoryEmbeddingRepository,
-    MemorySummaryRepository
+    MemorySummaryRepository,
+    MemoryGraphNodeRepository,
+    MemoryGraphEdgeRepository,
 )
 
 # 心理状态相关
@@ -91,6 +94,9 @@ from .bot_mood_repository import BotMoodRepository
 # 人格备份
 from .persona_backup_repository import PersonaBackupRepository
 
+# 小时指标汇总
+from .analytics_rollup_repository import HourlyRollupRepository
+
 # 知识图谱
 from .knowledge_graph_repository import (
     KnowledgeEntityRepository,
@@ -102,16 +108,19 @@ __all__ = [
     # 基础
     'BaseRepository',
 
-    # 好感度系统 (4个)
+    # 好感度系统 (5个)
     'AffectionRepository',
     'InteractionRepository',
+    'InteractionLabelRepository',
     'ConversationHistoryRepository',
     'DiversityRepository',
 
-    # 记忆系统 (3个)
+    # 记忆系统 (5个)
     'MemoryRepository',
     'MemoryEmbeddingRepository',
     'MemorySummaryRepository',
+    'MemoryGraphNodeRepository',
+    'MemoryGraphEdgeRepository',
 
     # 心理状态系统 (3个)
     'PsychologicalStateRepository',
@@ -169,6 +178,9 @@ __all__ = [
     # 人格备份 (1个)
     'PersonaBackupRepository',
 
+    # 小时指标汇总 (1个)
+    'HourlyRollupRepository',
+
     # 知识图谱 (3个)
     'KnowledgeEntityRepository',
     'KnowledgeRelationRepository',
@@ -11,6 +11,7 @@ try:
     from ..models.orm import (
         UserAffection,
         AffectionInteraction,
+        InteractionLabel,
         UserConversationHistory,
         UserDiversity
     )
@@ -18,6 +19,7 @@ except ImportError:
     from models.orm import (
         UserAffection,
         AffectionInteraction,
+        InteractionLabel,
         UserConversationHistory,
         UserDiversity
     )
@@ -86,6 +88,41 @@ class AffectionRepository(BaseRepository[UserAffection]):
                 updated_at=int(time.time())
             )
 
+    async def bulk_set_levels(
+        self,
+        group_id: str,
+        levels: Dict[str, int],
+        max_affection: int = 100
+    ) -> bool:
+        """
+        批量设置群组内多个用户的好感度（一条 upsert 语句）
+
+        Args:
+            group_id: 群组 ID
+            levels: user_id -> 新好感度
+            max_affection: 最大好感度
+
+        Returns:
+            bool: 是否写入成功
+        """
+        now = int(time.time())
+        records = [
+            {
+                'group_id': group_id,
+                'user_id': user_id,
+                'affection_level': min(max_affection, max(0, int(level))),
+                'max_affection': max_affection,
+                'created_at': now,
+                'updated_at': now,
+            }
+            for user_id, level in levels.items()
+        ]
+        return await self.bulk_upsert(
+            records,
+            conflict_columns=['group_id', 'user_id'],
+            update_columns=['affection_level', 'updated_at'],
+        )
+
     async def get_top_users(
         self,
         group_id: str,
@@ -211,6 +248,62 @@ class InteractionRepository(BaseRepository[AffectionInteraction]):
             return []
 
 
+class InteractionLabelRepository(BaseRepository[InteractionLabel]):
+    """交互类型标注 Repository"""
+
+    def __init__(self, session):
+        super().__init__(session, InteractionLabel)
+
+    async def save_labels(self, labels: List[Dict]) -> bool:
+        """
+        批量保存标注（同一文本哈希只保留最新标注）
+
+        Args:
+            labels: 标注列表，每条包含 text_hash/normalized_text/interaction_type/source
+
+        Returns:
+            bool: 是否保存成功
+        """
+        now = int(time.time())
+        records = [
+            {
+                'text_hash': label['text_hash'],
+                'normalized_text': label['normalized_text'],
+                'interaction_type': label['interaction_type'],
+                'source': label.get('source', 'llm'),
+                'created_at': now,
+            }
+            for label in labels
+        ]
+        return await self.bulk_upsert(
+            records,
+            conflict_columns=['text_hash'],
+            update_columns=['interaction_type', 'source', 'created_at'],
+        )
+
+    async def get_recent_labels(self, limit: int = 5000) -> List[InteractionLabel]:
+        """
+        获取最近的标注（用于训练本地分类器）
+
+        Args:
+            limit: 返回数量
+
+        Returns:
+            List[InteractionLabel]: 标注列表（新的在前）
+        """
+        try:
+            stmt = select(InteractionLabel).order_by(
+                InteractionLabel.created_at.desc()
+            ).limit(limit)
+
+            result = await self.session.execute(stmt)
+            return list(result.scalars().all())
+
+        except Exception as e:
+            logger.error(f"[InteractionLabelRepository] 获取交互标注失败: {e}")
+            return []
+
+
 class ConversationHistoryRepository(BaseRepository[UserConversationHistory]):
     """对话历史 Repository"""
 
@@ -0,0 +1,318 @@
+"""
+小时指标汇总 Repository
+
+以集合式 GROUP BY 从消息与学习表重算指定时间窗的小时桶，并 upsert 到
+hourly_group_rollups；读取侧只查询汇总表，行数与历史长度无关。汇总表
+未启用时，同样的聚合可直接作用于源表（``compute_hourly_totals``）。
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, and_, case, cast, delete, distinct, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from astrbot.api import logger
+
+from .base_repository import BaseRepository
+try:
+    from ..models.orm import (
+        HourlyGroupRollup,
+        RawMessage,
+        FilteredMessage,
+        BotMessage,
+        LearningBatch,
+        PersonaLearningReview,
+    )
+except ImportError:
+    from models.orm import (
+        HourlyGroupRollup,
+        RawMessage,
+        FilteredMessage,
+        BotMessage,
+        LearningBatch,
+        PersonaLearningReview,
+    )
+
+HOUR_SECONDS = 3600
+
+# 不区分群组的全局指标（如 LLM 调用）记在该伪群组下
+GLOBAL_ROLLUP_GROUP = '*'
+
+# 由源表重算的列（LLM 列由调用统计增量写入，不参与重算）
+SOURCE_COLUMNS = (
+    'raw_messages', 'active_users', 'filtered_messages', 'bot_messages',
+    'learning_batches', 'learning_successes', 'persona_updates',
+)
+
+SUMMED_COLUMNS = SOURCE_COLUMNS + ('llm_calls', 'llm_response_ms')
+
+
+def floor_hour(timestamp: float) -> int:
+    """时间戳向下取整到小时起点"""
+    return int(timestamp) - int(timestamp) % HOUR_SECONDS
+
+
+def _hour_bucket(column):
+    """SQL 侧的小时桶表达式（整数取模，SQLite / MySQL / PostgreSQL 通用）"""
+    seconds = cast(column, BigInteger)
+    return seconds - seconds % HOUR_SECONDS
+
+
+class HourlyRollupRepository(BaseRepository[HourlyGroupRollup]):
+    """群组小时指标汇总 Repository"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, HourlyGroupRollup)
+
+    async def rebuild_hours(self, start_ts: float, end_ts: float) -> Optional[int]:
+        """
+        重算 [start_ts, end_ts) 覆盖的小时桶
+
+        每个源表执行一条按 (group_id, 小时) 分组的聚合查询；先删除区间内
+        的群组小时桶，再单条 upsert 写回，源数据被删除的桶也随之清除。
+        全局伪群组的 LLM 统计不由源表重算，予以保留。重复执行结果幂等，
+        可用于补算迟到数据。
+
+        Args:
+            start_ts: 起始时间戳（向下取整到整点）
+            end_ts: 结束时间戳（不含）
+
+        Returns:
+            Optional[int]: 写入的小时桶数量；失败时返回 None
+        """
+        start = floor_hour(start_ts)
+        end = int(end_ts)
+        if end <= start:
+            return 0
+
+        try:
+            buckets = await self._compute_buckets(start, end)
+            now = int(time.time())
+            records = [
+                {
+                    'group_id': group_id,
+                    'hour_start': hour_start,
+                    **{name: values.get(name, 0) for name in SOURCE_COLUMNS},
+                    'updated_at': now,
+                }
+                for (group_id, hour_start), values in buckets.items()
+            ]
+            await self.session.execute(
+                delete(HourlyGroupRollup).where(
+                    HourlyGroupRollup.hour_start >= start,
+                    HourlyGroupRollup.hour_start < end,
+                    HourlyGroupRollup.group_id != GLOBAL_ROLLUP_GROUP,
+                )
+            )
+            ok = await self.bulk_upsert(
+                records,
+                conflict_columns=['group_id', 'hour_start'],
+                update_columns=[*SOURCE_COLUMNS, 'updated_at'],
+                commit=False,
+            )
+            if not ok:
+                await self.session.rollback()
+                return None
+            await self.session.commit()
+            return len(records)
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"[HourlyRollupRepository] 重算小时汇总失败: {e}")
+            return None
+
+    async def compute_hourly_totals(
+        self, start_ts: float, end_ts: float, group_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        直接从源表按小时聚合（不读写汇总表）
+
+        汇总表未启用或尚未生成时的回退路径，返回格式与
+        ``get_hourly_totals`` 相同；源表不含 LLM 调用统计，相关列为 0。
+        """
+        buckets = await self._compute_buckets(
+            floor_hour(start_ts), int(end_ts), group_id
+        )
+        hours: Dict[int, Dict[str, Any]] = {}
+        for (_, hour_start), values in buckets.items():
+            row = hours.setdefault(hour_start, {
+                'hour_start': hour_start,
+                **{name: 0 for name in SOURCE_COLUMNS},
+                'llm_calls': 0,
+                'llm_response_ms': 0.0,
+            })
+            for name in SOURCE_COLUMNS:
+                row[name] += values.get(name, 0)
+        return [hours[hour] for hour in sorted(hours)]
+
+    async def _compute_buckets(
+        self, start: int, end: int, group_id: Optional[str] = None
+    ) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        """每个源表一条 GROUP BY，合并为 (group_id, 小时) -> 指标"""
+        buckets: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        if end <= start:
+            return buckets
+
+        def _merge(rows, columns):
+            for row in rows:
+                key = (row[0], int(row[1]))
+                bucket = buckets.setdefault(key, {})
+                for name, value in zip(columns, row[2:]):
+                    bucket[name] = int(value or 0)
+
+        raw_hour = _hour_bucket(RawMessage.timestamp)
+        _merge(await self._aggregate(
+            RawMessage.group_id, raw_hour,
+            [func.count(), func.count(distinct(RawMessage.sender_id))],
+            RawMessage.timestamp, start, end, group_id,
+        ), ('raw_messages', 'active_users'))
+
+        _merge(await self._aggregate(
+            FilteredMessage.group_id, _hour_bucket(FilteredMessage.timestamp),
+            [func.count()], FilteredMessage.timestamp, start, end, group_id,
+        ), ('filtered_messages',))
+
+        _merge(await self._aggregate(
+            BotMessage.group_id, _hour_bucket(BotMessage.timestamp),
+            [func.count()], BotMessage.timestamp, start, end, group_id,
+        ), ('bot_messages',))
+
+        _merge(await self._aggregate(
+            LearningBatch.group_id, _hour_bucket(LearningBatch.start_time),
+            [func.count(), func.sum(case((LearningBatch.success == True, 1), else_=0))],  # noqa: E712
+            LearningBatch.start_time, start, end, group_id,
+        ), ('learning_batches', 'learning_successes'))
+
+        _merge(await self._aggregate(
+            PersonaLearningReview.group_id, _hour_bucket(PersonaLearningReview.timestamp),
+            [func.count()], PersonaLearningReview.timestamp, start, end, group_id,
+        ), ('persona_updates',))
+        return buckets
+
+    async def _aggregate(
+        self, group_col, hour_expr, measures, time_col, start: int, end: int,
+        group_id: Optional[str] = None,
+    ):
+        conditions = [
+            time_col >= start,
+            time_col < end,
+            group_col.isnot(None),
+        ]
+        if group_id:
+            conditions.append(group_col == group_id)
+        stmt = (
+            select(group_col, hour_expr.label('hour_start'), *measures)
+            .where(and_(*conditions))
+            .group_by(group_col, hour_expr)
+        )
+        return (await self.session.execute(stmt)).all()
+
+    async def add_llm_usage(
+        self, hour_start: int, calls: int, response_ms: float
+    ) -> bool:
+        """把一段时间内的 LLM 调用次数与耗时累加到全局小时桶"""
+        if calls <= 0:
+            return True
+        try:
+            dialect = self.session.get_bind().dialect.name
+            table = HourlyGroupRollup.__table__
+            record = {
+                'group_id': GLOBAL_ROLLUP_GROUP,
+                'hour_start': floor_hour(hour_start),
+                'llm_calls': int(calls),
+                'llm_response_ms': float(response_ms),
+                'updated_at': int(time.time()),
+            }
+
+            if dialect in ('sqlite', 'postgresql'):
+                if dialect == 'sqlite':
+                    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+                else:
+                    from sqlalchemy.dialects.postgresql import insert as dialect_insert
+                stmt = dialect_insert(table).values(record)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['group_id', 'hour_start'],
+                    set_={
+                        'llm_calls': table.c.llm_calls + stmt.excluded.llm_calls,
+                        'llm_response_ms': table.c.llm_response_ms + stmt.excluded.llm_response_ms,
+                        'updated_at': stmt.excluded.updated_at,
+                    },
+                )
+                await self.session.execute(stmt)
+            elif dialect in ('mysql', 'mariadb'):
+                from sqlalchemy.dialects.mysql import insert as mysql_insert
+                stmt = mysql_insert(table).values(record)
+                stmt = stmt.on_duplicate_key_update(
+                    llm_calls=table.c.llm_calls + stmt.inserted.llm_calls,
+                    llm_response_ms=table.c.llm_response_ms + stmt.inserted.llm_response_ms,
+                    updated_at=stmt.inserted.updated_at,
+                )
+                await self.session.execute(stmt)
+            else:
+                current = (await self.session.execute(
+                    select(HourlyGroupRollup).where(
+                        HourlyGroupRollup.group_id == GLOBAL_ROLLUP_GROUP,
+                        HourlyGroupRollup.hour_start == record['hour_start'],
+                    )
+                )).scalars().first()
+                if current is None:
+                    self.session.add(HourlyGroupRollup(**record))
+                else:
+                    current.llm_calls += record['llm_calls']
+                    current.llm_response_ms += record['llm_response_ms']
+                    current.updated_at = record['updated_at']
+
+            await self.session.commit()
+            return True
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"[HourlyRollupRepository] 累加 LLM 调用统计失败: {e}")
+            return False
+
+    async def get_latest_hour(self) -> Optional[int]:
+        """最近一个已汇总的小时起点（不含全局伪群组）"""
+        stmt = select(func.max(HourlyGroupRollup.hour_start)).where(
+            HourlyGroupRollup.group_id != GLOBAL_ROLLUP_GROUP
+        )
+        value = (await self.session.execute(stmt)).scalar()
+        return int(value) if value is not None else None
+
+    async def get_hourly_totals(
+        self, start_ts: float, end_ts: float, group_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        按小时汇总指标
+
+        Args:
+            start_ts: 起始时间戳（向下取整到整点）
+            end_ts: 结束时间戳（不含）
+            group_id: 指定群组；为空时汇总所有群组并包含全局 LLM 指标
+
+        Returns:
+            List[Dict[str, Any]]: 按 hour_start 升序的小时指标（active_users 为各群之和）
+        """
+        stmt = (
+            select(
+                HourlyGroupRollup.hour_start,
+                *[func.sum(getattr(HourlyGroupRollup, name)).label(name) for name in SUMMED_COLUMNS],
+            )
+            .where(
+                HourlyGroupRollup.hour_start >= floor_hour(start_ts),
+                HourlyGroupRollup.hour_start < int(end_ts),
+            )
+            .group_by(HourlyGroupRollup.hour_start)
+            .order_by(HourlyGroupRollup.hour_start)
+        )
+        if group_id:
+            stmt = stmt.where(HourlyGroupRollup.group_id == group_id)
+
+        rows = (await self.session.execute(stmt)).mappings().all()
+        return [
+            {
+                'hour_start': int(row['hour_start']),
+                **{
+                    name: float(row[name] or 0.0) if name == 'llm_response_ms' else int(row[name] or 0)
+                    for name in SUMMED_COLUMNS
+                },
+            }
+            for row in rows
+        ]
@@ -345,3 +345,73 @@ class BaseRepository(Generic[T]):
             await self.session.rollback()
             logger.error(f"[{self.model_class.__name__}] 批量删除记录失败: {e}")
             return 0
+
+    async def bulk_upsert(
+        self,
+        records: List[Dict[str, Any]],
+        conflict_columns: List[str],
+        update_columns: List[str],
+        commit: bool = True,
+    ) -> bool:
+        """
+        批量 upsert（按唯一键插入或更新）
+
+        SQLite / PostgreSQL 使用 ON CONFLICT DO UPDATE，MySQL 使用
+        ON DUPLICATE KEY UPDATE，整批记录只执行一条语句；其他后端逐条
+        查询后写入。
+
+        Args:
+            records: 记录数据列表（每条需包含 conflict_columns 中的字段）
+            conflict_columns: 唯一约束字段
+            update_columns: 冲突时需要更新的字段
+            commit: 是否在写入后提交（False 时由调用方统一提交）
+
+        Returns:
+            bool: 是否写入成功
+        """
+        if not records:
+            return True
+        try:
+            dialect = self.session.get_bind().dialect.name
+            table = self.model_class.__table__
+
+            if dialect in ('sqlite', 'postgresql'):
+                if dialect == 'sqlite':
+                    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+                else:
+                    from sqlalchemy.dialects.postgresql import insert as dialect_insert
+                stmt = dialect_insert(table)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=conflict_columns,
+                    set_={col: stmt.excluded[col] for col in update_columns},
+                )
+                await self.session.execute(stmt, records)
+            elif dialect in ('mysql', 'mariadb'):
+                from sqlalchemy.dialects.mysql import insert as mysql_insert
+                stmt = mysql_insert(table)
+                stmt = stmt.on_duplicate_key_update(
+                    {col: stmt.inserted[col] for col in update_columns}
+                )
+                await self.session.execute(stmt, records)
+            else:
+                for record in records:
+                    query = select(self.model_class)
+                    for col in conflict_columns:
+                        query = query.where(
+                            getattr(self.model_class, col) == record[col]
+                        )
+                    existing = (await self.session.execute(query)).scalars().first()
+                    if existing is None:
+                        self.session.add(self.model_class(**record))
+                    else:
+                        for col in update_columns:
+                            setattr(existing, col, record[col])
+
+            if commit:
+                await self.session.commit()
+            return True
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"[{self.model_class.__name__}] 批量 upsert 失败: {e}")
+            return False
@@ -2,9 +2,10 @@
 表达模式相关的 Repository
 提供表达模式的数据访问方法
 """
+import hashlib
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, func, distinct
-from typing import List, Dict, Any, Optional
+from sqlalchemy import select, desc, func, distinct, update, bindparam
+from typing import List, Dict, Any, Optional, Tuple
 from astrbot.api import logger
 
 from .base_repository import BaseRepository
@@ -18,6 +19,18 @@ except ImportError:
     from models.orm import ExpressionPattern
 
 
+def expression_pattern_key(
+    group_id: str,
+    persona_id: str,
+    user_id: Optional[str],
+    situation: str,
+    expression: str,
+) -> str:
+    """计算表达模式唯一键（作用域 + 场景 + 表达的 SHA-256）"""
+    raw = "\x1f".join([group_id, persona_id, user_id or "", situation, expression])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
 class ExpressionPatternRepository(BaseRepository[ExpressionPattern]):
     """表达模式 Repository"""
 
@@ -156,3 +169,162 @@ class ExpressionPatternRepository(BaseRepository[ExpressionPattern]):
         except Exception as e:
             logger.error(f"[ExpressionPatternRepository] 获取最佳表达模式失败: {e}")
             return []
+
+    async def upsert_learned_patterns(
+        self, records: List[Dict[str, Any]], commit: bool = True
+    ) -> Dict[str, int]:
+        """
+        批量保存学习到的表达模式
+
+        一次 IN 查询按 (group_id, situation, expression) 取回已有记录，
+        新模式与已有模式合并为一条基于 ``pattern_key`` 唯一索引的 upsert
+        （SQLite / PostgreSQL: ON CONFLICT，MySQL: ON DUPLICATE KEY UPDATE）。
+        已有模式权重 +1 并刷新 last_active_time；同批次重复的模式累加计数。
+        尚无 ``pattern_key`` 的历史记录在同一批次内按主键补写唯一键。
+
+        Args:
+            records: 模式字典列表（group_id, persona_id, user_id, situation,
+                expression, weight, last_active_time, create_time）
+            commit: 是否在写入后提交
+
+        Returns:
+            Dict[str, int]: {'inserted': 新增数量, 'updated': 更新数量}
+        """
+        stats = {'inserted': 0, 'updated': 0}
+        if not records:
+            return stats
+
+        # 同批次内按唯一键合并，hits 为出现次数
+        merged: Dict[str, Tuple[Dict[str, Any], int]] = {}
+        for record in records:
+            key = expression_pattern_key(
+                record['group_id'], record['persona_id'], record.get('user_id'),
+                record['situation'], record['expression'],
+            )
+            if key in merged:
+                first, hits = merged[key]
+                first['last_active_time'] = record['last_active_time']
+                merged[key] = (first, hits + 1)
+            else:
+                merged[key] = (dict(record, pattern_key=key), 1)
+
+        try:
+            rows = (await self.session.execute(
+                select(
+                    ExpressionPattern.id, ExpressionPattern.group_id,
+                    ExpressionPattern.persona_id, ExpressionPattern.user_id,
+                    ExpressionPattern.situation, ExpressionPattern.expression,
+                    ExpressionPattern.weight, ExpressionPattern.last_active_time,
+                    ExpressionPattern.pattern_key,
+                ).where(
+                    ExpressionPattern.group_id.in_({r['group_id'] for r, _ in merged.values()}),
+                    ExpressionPattern.situation.in_({r['situation'] for r, _ in merged.values()}),
+                    ExpressionPattern.expression.in_({r['expression'] for r, _ in merged.values()}),
+                )
+            )).all()
+
+            existing: Dict[str, List[Any]] = {}
+            for row in rows:
+                key = expression_pattern_key(
+                    row.group_id, row.persona_id, row.user_id, row.situation, row.expression
+                )
+                if key in merged:
+                    existing.setdefault(key, []).append(row)
+
+            upserts = []
+            legacy_updates = []
+            for key, (record, hits) in merged.items():
+                matches = existing.get(key)
+                if not matches:
+                    # 新模式：重复出现的次数计入初始权重
+                    record['weight'] = record['weight'] + hits - 1
+                    upserts.append(record)
+                    stats['inserted'] += 1
+                    continue
+
+                stats['updated'] += 1
+                if len(matches) > 1:
+                    logger.warning(
+                        "发现重复表达模式记录，已复用权重最高记录: "
+                        f"group_id={record['group_id']}, situation={record['situation']!r}, "
+                        f"expression={record['expression']!r}, "
+                        f"persona_id={record['persona_id']}, "
+                        f"user_id={record.get('user_id') or 'group-level'}, count={len(matches)}"
+                    )
+                keyed = [m for m in matches if m.pattern_key == key]
+                if keyed:
+                    # 冲突分支把 weight 当作增量累加
+                    upserts.append(dict(record, weight=float(hits)))
+                else:
+                    best = max(matches, key=lambda m: (m.weight, m.last_active_time, m.id))
+                    legacy_updates.append({
+                        'b_id': best.id,
+                        'b_key': key,
+                        'b_hits': float(hits),
+                        'b_active': record['last_active_time'],
+                    })
+
+            if legacy_updates:
+                table = ExpressionPattern.__table__
+                await self.session.execute(
+                    update(table)
+                    .where(table.c.id == bindparam('b_id'))
+                    .values(
+                        pattern_key=bindparam('b_key'),
+                        weight=table.c.weight + bindparam('b_hits'),
+                        last_active_time=bindparam('b_active'),
+                    ),
+                    legacy_updates,
+                )
+
+            if upserts:
+                await self._upsert_by_pattern_key(upserts)
+
+            if commit:
+                await self.session.commit()
+            return stats
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"[ExpressionPatternRepository] 批量保存表达模式失败: {e}")
+            raise
+
+    async def _upsert_by_pattern_key(self, records: List[Dict[str, Any]]) -> None:
+        """按 pattern_key 执行单条 upsert：冲突时 weight 累加、刷新活跃时间"""
+        dialect = self.session.get_bind().dialect.name
+        table = ExpressionPattern.__table__
+
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['pattern_key'],
+                set_={
+                    'weight': table.c.weight + stmt.excluded.weight,
+                    'last_active_time': stmt.excluded.last_active_time,
+                },
+            )
+            await self.session.execute(stmt, records)
+        elif dialect in ('mysql', 'mariadb'):
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+            stmt = mysql_insert(table)
+            stmt = stmt.on_duplicate_key_update(
+                weight=table.c.weight + stmt.inserted.weight,
+                last_active_time=stmt.inserted.last_active_time,
+            )
+            await self.session.execute(stmt, records)
+        else:
+            for record in records:
+                current = (await self.session.execute(
+                    select(ExpressionPattern).where(
+                        ExpressionPattern.pattern_key == record['pattern_key']
+                    )
+                )).scalars().first()
+                if current is None:
+                    self.session.add(ExpressionPattern(**record))
+                else:
+                    current.weight += record['weight']
+                    current.last_active_time = record['last_active_time']
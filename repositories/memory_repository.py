@@ -2,15 +2,19 @@
 记忆系统相关的 Repository
 """
 import time
-from sqlalchemy import select, and_, or_
-from typing import Optional, List
+from sqlalchemy import select, and_, or_, func
+from typing import Optional, List, Dict, Any, Tuple
 from astrbot.api import logger
 
 from .base_repository import BaseRepository
 try:
-    from ..models.orm import Memory, MemoryEmbedding, MemorySummary
+    from ..models.orm import (
+        Memory, MemoryEmbedding, MemorySummary, MemoryGraphNode, MemoryGraphEdge
+    )
 except ImportError:
-    from models.orm import Memory, MemoryEmbedding, MemorySummary
+    from models.orm import (
+        Memory, MemoryEmbedding, MemorySummary, MemoryGraphNode, MemoryGraphEdge
+    )
 
 
 class MemoryRepository(BaseRepository[Memory]):
@@ -348,3 +352,187 @@ class MemorySummaryRepository(BaseRepository[MemorySummary]):
         except Exception as e:
             logger.error(f"[MemorySummaryRepository] 根据时间范围获取摘要失败: {e}")
             return []
+
+
+class MemoryGraphNodeRepository(BaseRepository[MemoryGraphNode]):
+    """记忆图节点 Repository"""
+
+    def __init__(self, session):
+        super().__init__(session, MemoryGraphNode)
+
+    async def upsert_nodes(
+        self,
+        rows: List[Dict[str, Any]],
+        commit: bool = True
+    ) -> bool:
+        """
+        批量写入概念节点（按 group_id + concept 插入或更新）
+
+        Args:
+            rows: 节点数据列表
+            commit: 是否立即提交
+
+        Returns:
+            bool: 是否写入成功
+        """
+        return await self.bulk_upsert(
+            rows,
+            conflict_columns=['group_id', 'concept'],
+            update_columns=['memory_items', 'weight', 'last_modified'],
+            commit=commit,
+        )
+
+    async def get_by_group(self, group_id: str) -> List[MemoryGraphNode]:
+        """
+        获取群组的全部概念节点
+
+        Args:
+            group_id: 群组 ID
+
+        Returns:
+            List[MemoryGraphNode]: 节点列表
+        """
+        try:
+            stmt = select(MemoryGraphNode).where(
+                MemoryGraphNode.group_id == group_id
+            )
+            result = await self.session.execute(stmt)
+            return list(result.scalars().all())
+
+        except Exception as e:
+            logger.error(f"[MemoryGraphNodeRepository] 获取节点失败: {e}")
+            return []
+
+    async def get_rows_by_group(self, group_id: str) -> List[Tuple]:
+        """
+        以元组形式获取群组全部节点（不构造 ORM 对象，用于批量恢复）
+
+        Args:
+            group_id: 群组 ID
+
+        Returns:
+            List[Tuple]: (concept, memory_items, weight, created_time, last_modified)
+        """
+        try:
+            stmt = select(
+                MemoryGraphNode.concept,
+                MemoryGraphNode.memory_items,
+                MemoryGraphNode.weight,
+                MemoryGraphNode.created_time,
+                MemoryGraphNode.last_modified,
+            ).where(MemoryGraphNode.group_id == group_id)
+            result = await self.session.execute(stmt)
+            return [tuple(row) for row in result.all()]
+
+        except Exception as e:
+            logger.error(f"[MemoryGraphNodeRepository] 批量读取节点失败: {e}")
+            return []
+
+    async def get_watermark(self, group_id: str) -> Tuple[int, float]:
+        """
+        获取群组节点水位 (行数, 最大 last_modified)，用于校验快照
+
+        Args:
+            group_id: 群组 ID
+
+        Returns:
+            Tuple[int, float]: 行数与最大修改时间
+        """
+        stmt = select(
+            func.count(MemoryGraphNode.id),
+            func.max(MemoryGraphNode.last_modified),
+        ).where(MemoryGraphNode.group_id == group_id)
+        count, latest = (await self.session.execute(stmt)).one()
+        return int(count or 0), float(latest or 0.0)
+
+
+class MemoryGraphEdgeRepository(BaseRepository[MemoryGraphEdge]):
+    """记忆图关联 Repository"""
+
+    def __init__(self, session):
+        super().__init__(session, MemoryGraphEdge)
+
+    async def upsert_edges(
+        self,
+        rows: List[Dict[str, Any]],
+        commit: bool = True
+    ) -> bool:
+        """
+        批量写入概念关联（按 group_id + concept1 + concept2 插入或更新）
+
+        Args:
+            rows: 关联数据列表（concept1 < concept2）
+            commit: 是否立即提交
+
+        Returns:
+            bool: 是否写入成功
+        """
+        return await self.bulk_upsert(
+            rows,
+            conflict_columns=['group_id', 'concept1', 'concept2'],
+            update_columns=['strength', 'last_modified'],
+            commit=commit,
+        )
+
+    async def get_by_group(self, group_id: str) -> List[MemoryGraphEdge]:
+        """
+        获取群组的全部概念关联
+
+        Args:
+            group_id: 群组 ID
+
+        Returns:
+            List[MemoryGraphEdge]: 关联列表
+        """
+        try:
+            stmt = select(MemoryGraphEdge).where(
+                MemoryGraphEdge.group_id == group_id
+            )
+            result = await self.session.execute(stmt)
+            return list(result.scalars().all())
+
+        except Exception as e:
+            logger.error(f"[MemoryGraphEdgeRepository] 获取关联失败: {e}")
+            return []
+
+    async def get_rows_by_group(self, group_id: str) -> List[Tuple]:
+        """
+        以元组形式获取群组全部关联（不构造 ORM 对象，用于批量恢复）
+
+        Args:
+            group_id: 群组 ID
+
+        Returns:
+            List[Tuple]: (concept1, concept2, strength, created_time, last_modified)
+        """
+        try:
+            stmt = select(
+                MemoryGraphEdge.concept1,
+                MemoryGraphEdge.concept2,
+                MemoryGraphEdge.strength,
+                MemoryGraphEdge.created_time,
+                MemoryGraphEdge.last_modified,
+            ).where(MemoryGraphEdge.group_id == group_id)
+            result = await self.session.execute(stmt)
+            return [tuple(row) for row in result.all()]
+
+        except Exception as e:
+            logger.error(f"[MemoryGraphEdgeRepository] 批量读取关联失败: {e}")
+            return []
+
+    async def get_watermark(self, group_id: str) -> Tuple[int, float]:
+        """
+        获取群组关联水位 (行数, 最大 last_modified)，用于校验快照
+
+        Args:
+            group_id: 群组 ID
+
+        Returns:
+            Tuple[int, float]: 行数与最大修改时间
+        """
+        stmt = select(
+            func.count(MemoryGraphEdge.id),
+            func.max(MemoryGraphEdge.last_modified),
+        ).where(MemoryGraphEdge.group_id == group_id)
+        count, latest = (await self.session.execute(stmt)).one()
+        return int(count or 0), float(latest or 0.0)
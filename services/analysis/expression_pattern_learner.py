@@ -4,7 +4,6 @@ MaiBot式表达模式学习器 - 实现场景-表达映射的细粒度学习
 """
 import time
 import json
-import random
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 from dataclasses import dataclass, asdict
@@ -354,73 +353,41 @@ class ExpressionPatternLearner:
         group_id: str,
         persona_id: str = "default",
         user_id: Optional[str] = None,
-    ):
-        """保存表达模式到数据库（ORM 版本）"""
+    ) -> Dict[str, int]:
+        """保存表达模式到数据库（批量 upsert，返回新增/更新数量）"""
         try:
-            from sqlalchemy import desc, select
-            from ...models.orm.expression import ExpressionPattern as ExpressionPatternORM
+            from ...repositories.expression_repository import ExpressionPatternRepository
             persona_id = normalize_persona_scope(persona_id)
             user_id = self._normalize_user_scope(user_id)
 
-            async with self.db_manager.get_session() as session:
-                for pattern in patterns:
-                    pattern_persona_id = normalize_persona_scope(
+            records = [
+                {
+                    'group_id': group_id,
+                    'persona_id': normalize_persona_scope(
                         getattr(pattern, "persona_id", None),
                         fallback=persona_id,
-                    )
-                    pattern_user_id = self._normalize_user_scope(
+                    ),
+                    'user_id': self._normalize_user_scope(
                         getattr(pattern, "user_id", None),
                         fallback=user_id,
-                    )
-                    # 查找是否已存在相似模式
-                    stmt = select(ExpressionPatternORM).where(
-                        ExpressionPatternORM.situation == pattern.situation,
-                        ExpressionPatternORM.expression == pattern.expression,
-                        ExpressionPatternORM.group_id == group_id,
-                        ExpressionPatternORM.persona_id == pattern_persona_id,
-                        ExpressionPatternORM.user_id.is_(None)
-                        if pattern_user_id is None
-                        else ExpressionPatternORM.user_id == pattern_user_id,
-                    ).order_by(
-                        desc(ExpressionPatternORM.weight),
-                        desc(ExpressionPatternORM.last_active_time),
-                        desc(ExpressionPatternORM.id),
-                    )
-                    result = await session.execute(stmt)
-                    matches = list(result.scalars().all())
-                    existing = matches[0] if matches else None
-                    if len(matches) > 1:
-                        logger.warning(
-                            "发现重复表达模式记录，已复用权重最高记录: "
-                            f"group_id={group_id}, situation={pattern.situation!r}, "
-                            f"expression={pattern.expression!r}, "
-                            f"persona_id={pattern_persona_id}, "
-                            f"user_id={pattern_user_id or 'group-level'}, count={len(matches)}"
-                        )
+                    ),
+                    'situation': pattern.situation,
+                    'expression': pattern.expression,
+                    'weight': pattern.weight,
+                    'last_active_time': pattern.last_active_time,
+                    'create_time': pattern.create_time,
+                }
+                for pattern in patterns
+            ]
 
-                    if existing:
-                        # 更新现有模式，权重增加，50%概率替换内容
-                        existing.weight += 1.0
-                        existing.last_active_time = pattern.last_active_time
-                        if random.random() < 0.5:
-                            existing.situation = pattern.situation
-                            existing.expression = pattern.expression
-                    else:
-                        # 插入新模式
-                        new_record = ExpressionPatternORM(
-                            situation=pattern.situation,
-                            expression=pattern.expression,
-                            weight=pattern.weight,
-                            last_active_time=pattern.last_active_time,
-                            create_time=pattern.create_time,
-                            group_id=pattern.group_id,
-                            persona_id=pattern_persona_id,
-                            user_id=pattern_user_id,
-                        )
-                        session.add(new_record)
+            async with self.db_manager.get_session() as session:
+                stats = await ExpressionPatternRepository(session).upsert_learned_patterns(records)
 
-                await session.commit()
-                logger.info(f" 保存了 {len(patterns)} 个表达模式到数据库（群组: {group_id}）")
+            logger.info(
+                f" 保存了 {len(patterns)} 个表达模式到数据库（群组: {group_id}，"
+                f"新增 {stats['inserted']}，更新 {stats['updated']}）"
+            )
+            return stats
 
         except Exception as e:
             logger.error(f"保存表达模式失败: {e}", exc_info=True)
@@ -41,6 +41,9 @@ from ..database import DatabaseManager
 
 from ...utils.json_utils import safe_parse_llm_json
 
+from ..integration.conversation_packer import estimate_tokens
+from .style_batch_scorer import StyleBatchScorer, TokenBudgetScheduler
+
 
 @dataclass
 class UserProfile:
@@ -118,6 +121,15 @@ class MultidimensionalAnalyzer:
                 logger.info(" 强化模型未配置，将跳过强化学习功能")
         else:
             logger.info(" 框架LLM适配器未配置，将使用简化算法进行分析")
+
+        # 提炼模型token预算，所有风格/情感LLM调用共享
+        self._llm_budget = TokenBudgetScheduler(config.multidimensional_llm_tokens_per_hour)
+        # 批量多维评分器：N条消息 × 全部风格/情感维度一次请求
+        self.batch_scorer = StyleBatchScorer(
+            llm_adapter,
+            self._llm_budget,
+            max_batch_tokens=config.multidimensional_batch_token_budget,
+        )
         
         # 用户画像存储
         self.user_profiles: Dict[str, UserProfile] = {}
@@ -605,30 +617,11 @@ class MultidimensionalAnalyzer:
         """
         try:
             logger.debug(f"批量分析消息: 发送者={sender_id}, 群组={group_id}, 消息长度={len(message_text)}")
-            
-            # 添加批量分析计数器和限制
-            if not hasattr(self, '_batch_analysis_count'):
-                self._batch_analysis_count = {}
-                self._batch_analysis_start_time = time.time()
-            
-            # 重置计数器（每小时重置一次）
-            if time.time() - self._batch_analysis_start_time > 3600:
-                self._batch_analysis_count = {}
-                self._batch_analysis_start_time = time.time()
-            
-            # 检查是否超过批量分析限制（每小时最多100次LLM调用）
-            current_time = time.time()
-            hour_key = int(current_time // 3600)
-            
-            if hour_key not in self._batch_analysis_count:
-                self._batch_analysis_count[hour_key] = 0
-            
-            if self._batch_analysis_count[hour_key] >= 100:
-                logger.warning("批量分析达到限制，使用简化分析")
-                return await self._analyze_message_context_without_event(message_text)
-            
-            # 增加分析计数
-            self._batch_analysis_count[hour_key] += 1
+
+            # 一次请求完成全部风格/情感维度评分（已由 analyze_messages_batch 预评分时直接命中缓存），
+            # token预算不足时各维度回退到简化算法
+            if self.config.multidimensional_batch_scoring_enabled:
+                await self.batch_scorer.score([message_text])
             
             # 更新用户画像（如果有足够信息）
             if sender_id and group_id:
@@ -640,17 +633,8 @@ class MultidimensionalAnalyzer:
             # 分析情感倾向（已有缓存机制）
             emotional_context = await self._analyze_emotional_context(message_text)
             
-            # 分析沟通风格（添加限制）
-            style_context = {}
-            if self._batch_analysis_count[hour_key] <= 50: # 限制风格分析的调用次数
-                style_context = await self._analyze_communication_style(message_text)
-            else:
-                # 使用简化的风格分析
-                style_context = {
-                    'length_preference': len(message_text),
-                    'emoji_usage': self._calculate_emoji_usage(message_text),
-                    'punctuation_style': self._calculate_punctuation_style(message_text)
-                }
+            # 分析沟通风格
+            style_context = await self._analyze_communication_style(message_text)
             
             # 计算相关性得分
             contextual_relevance = await self._calculate_enhanced_relevance(
@@ -677,6 +661,45 @@ class MultidimensionalAnalyzer:
             # 返回基础分析结果
             return await self._analyze_message_context_without_event(message_text)
 
+    async def analyze_messages_batch(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量分析多条消息
+
+        先用一次（超出单次token预算时为多次）LLM请求为全部消息的风格和情感维度评分，
+        再逐条组装分析结果，逐条分析时的评分直接命中缓存。
+
+        Args:
+            messages: 消息列表，字段同 analyze_message_batch 的参数
+                （message, sender_id, sender_name, group_id, timestamp）
+
+        Returns:
+            List[Dict[str, Any]]: 与输入顺序一致的分析结果
+        """
+        if self.config.multidimensional_batch_scoring_enabled:
+            await self.batch_scorer.score([msg.get('message', '') for msg in messages])
+
+        results = []
+        for msg in messages:
+            results.append(await self.analyze_message_batch(
+                msg.get('message', ''),
+                sender_id=msg.get('sender_id', ''),
+                sender_name=msg.get('sender_name', ''),
+                group_id=msg.get('group_id', ''),
+                timestamp=msg.get('timestamp'),
+            ))
+        return results
+
+    def get_batch_scoring_stats(self) -> Dict[str, Any]:
+        """批量评分与token预算统计（含最近一批的消息数、请求数、token数和耗时）"""
+        return {
+            **self.batch_scorer.stats,
+            'budget': {
+                **self._llm_budget.stats,
+                'capacity': self._llm_budget.capacity,
+                'available': int(self._llm_budget.available),
+            },
+        }
+
     async def _update_user_profile_batch(self, group_id: str, sender_id: str, sender_name: str, 
                                        message_text: str, timestamp: float = None):
         """批量更新用户画像（简化版本）"""
@@ -974,15 +997,27 @@ class MultidimensionalAnalyzer:
                 logger.debug("使用缓存的情感分析结果")
                 return cached
 
+        if self.config.multidimensional_batch_scoring_enabled:
+            batch_scores = await self.batch_scorer.score([message_text])
+            scores = batch_scores.get(StyleBatchScorer.message_hash(message_text))
+            if scores:
+                return dict(scores['emotion'])
+            return self._simple_emotional_analysis(message_text)
+
         if self.llm_adapter and self.llm_adapter.has_refine_provider() and self.llm_adapter.providers_configured >= 2:
             prompt = self.prompts.JSON_ONLY_SYSTEM_PROMPT + "\n\n" + self.prompts.MULTIDIMENSIONAL_ANALYZER_EMOTIONAL_CONTEXT_PROMPT.format(
                 message_text=message_text
             )
+            reserved = self._estimate_llm_cost(prompt)
+            if not self._llm_budget.try_acquire(reserved):
+                logger.debug("情感分析超出token预算，使用简化算法")
+                return self._simple_emotional_analysis(message_text)
             try:
                 response = await self.llm_adapter.refine_chat_completion(
                     prompt=prompt,
                     temperature=0.2
                 )
+                self._llm_budget.settle(reserved, self._estimate_llm_cost(prompt, response))
 
                 if response:
                     emotion_scores = safe_parse_llm_json(
@@ -1072,13 +1107,11 @@ class MultidimensionalAnalyzer:
                 'punctuation_style': self._calculate_punctuation_style(message_text)
             }
 
-            # 只有在批量分析计数较低时才使用LLM增强分析
-            if (hasattr(self, '_batch_analysis_count') and
-                any(count <= 20 for count in self._batch_analysis_count.values())):
-                try:
-                    style_features['formal_level'] = await self._calculate_formal_level(message_text)
-                except Exception as e:
-                    logger.debug(f"LLM正式程度分析失败，使用简化版本: {e}")
+            # 已有批量评分结果时用LLM评分覆盖简化算法结果（不单独发起请求）
+            batch_scores = self.batch_scorer.get_cached(message_text)
+            if batch_scores:
+                for dimension in ('formal_level', 'enthusiasm_level', 'question_tendency'):
+                    style_features[dimension] = batch_scores[dimension]
 
             if hasattr(self, '_style_cache'):
                 self._style_cache[cache_key] = style_features
@@ -1417,14 +1450,17 @@ class MultidimensionalAnalyzer:
         else:
             return '秋季'
 
-    async def _call_llm_for_style_analysis(self, text: str, prompt_template: str, fallback_function: callable, analysis_name: str) -> float:
+    async def _call_llm_for_style_analysis(self, text: str, prompt_template: str, fallback_function: callable,
+                                           analysis_name: str, dimension: str = '') -> float:
         """
         通用的LLM风格分析辅助函数。
+        已有批量评分结果时直接返回对应维度；否则在token预算允许时单独调用LLM。
         Args:
             text: 待分析的文本。
             prompt_template: LLM提示模板。
-            fallback_function: LLM客户端未初始化或调用失败时使用的备用函数。
+            fallback_function: LLM客户端未初始化、预算不足或调用失败时使用的备用函数。
             analysis_name: 分析名称，用于日志记录。
+            dimension: 批量评分中对应的维度名。
         Returns:
             0-1之间的评分。
         """
@@ -1433,12 +1469,21 @@ class MultidimensionalAnalyzer:
             logger.warning(f"提炼模型LLM客户端未初始化，无法使用LLM计算{analysis_name}，使用简化算法。")
             return fallback_function(text)
 
+        batch_scores = self.batch_scorer.get_cached(text)
+        if batch_scores and dimension in batch_scores:
+            return batch_scores[dimension]
+
         try:
             prompt = prompt_template.format(text=text)
+            reserved = self._estimate_llm_cost(prompt)
+            if not self._llm_budget.try_acquire(reserved):
+                logger.debug(f"{analysis_name}分析超出token预算，使用简化算法")
+                return fallback_function(text)
             response = await self.llm_adapter.refine_chat_completion(
                 prompt=prompt,
                 temperature=0.1
             )
+            self._llm_budget.settle(reserved, self._estimate_llm_cost(prompt, response))
             
             if response:
                 # response 是字符串
@@ -1452,10 +1497,15 @@ class MultidimensionalAnalyzer:
             logger.warning(f"LLM{analysis_name}计算失败，使用简化算法: {e}")
             return fallback_function(text)
 
+    @staticmethod
+    def _estimate_llm_cost(prompt: str, response: Optional[str] = None) -> int:
+        """估算单次LLM调用的token开销（未给出响应时按64个输出token预留）"""
+        return estimate_tokens(prompt) + (estimate_tokens(response) if response else 64)
+
     async def _calculate_formal_level(self, text: str) -> float:
         """使用LLM计算正式程度"""
         prompt_template = self.prompts.MULTIDIMENSIONAL_ANALYZER_FORMAL_LEVEL_PROMPT
-        return await self._call_llm_for_style_analysis(text, prompt_template, self._simple_formal_level, "正式程度")
+        return await self._call_llm_for_style_analysis(text, prompt_template, self._simple_formal_level, "正式程度", "formal_level")
 
     def _simple_formal_level(self, text: str) -> float:
         """简化的正式程度计算（备用）"""
@@ -1471,7 +1521,7 @@ class MultidimensionalAnalyzer:
     async def _calculate_enthusiasm_level(self, text: str) -> float:
         """使用LLM计算热情程度"""
         prompt_template = self.prompts.MULTIDIMENSIONAL_ANALYZER_ENTHUSIASM_LEVEL_PROMPT
-        return await self._call_llm_for_style_analysis(text, prompt_template, self._simple_enthusiasm_level, "热情程度")
+        return await self._call_llm_for_style_analysis(text, prompt_template, self._simple_enthusiasm_level, "热情程度", "enthusiasm_level")
 
     def _simple_enthusiasm_level(self, text: str) -> float:
         """简化的热情程度计算（备用）"""
@@ -1482,7 +1532,7 @@ class MultidimensionalAnalyzer:
     async def _calculate_question_tendency(self, text: str) -> float:
         """使用LLM计算提问倾向"""
         prompt_template = self.prompts.MULTIDIMENSIONAL_ANALYZER_QUESTION_TENDENCY_PROMPT
-        return await self._call_llm_for_style_analysis(text, prompt_template, self._simple_question_tendency, "提问倾向")
+        return await self._call_llm_for_style_analysis(text, prompt_template, self._simple_question_tendency, "提问倾向", "question_tendency")
 
     def _simple_question_tendency(self, text: str) -> float:
         """简化的提问倾向计算（备用）"""
@@ -1816,6 +1866,7 @@ class MultidimensionalAnalyzer:
                 self._emotional_cache.clear()
             if hasattr(self, '_style_cache'):
                 self._style_cache.clear()
+            self.batch_scorer.clear()
             if hasattr(self, 'nickname_mapping'):
                 self.nickname_mapping.clear()
             
@@ -0,0 +1,315 @@
+"""
+Batched multi-dimensional style/emotion scoring.
+
+Scores N messages on every style dimension (formal level, enthusiasm,
+question tendency) and every emotion in one structured refine-model call,
+instead of one call per dimension per message. Results are cached by
+message hash, so the per-message analysis paths that run afterwards are
+served locally.
+
+LLM usage is governed by a ``TokenBudgetScheduler``: a token bucket that
+refills continuously up to an hourly budget. A batch that does not fit the
+remaining budget is not sent; its messages stay unscored and callers fall
+back to the heuristic scorers.
+
+Usage::
+
+    scheduler = TokenBudgetScheduler(tokens_per_hour=20000)
+    scorer = StyleBatchScorer(llm_adapter, scheduler)
+    scores = await scorer.score(["消息一", "消息二"])
+    scores[StyleBatchScorer.message_hash("消息一")]["formal_level"]
+"""
+
+import hashlib
+import time
+from typing import Any, Dict, List, Optional
+
+from astrbot.api import logger
+
+from ...utils.cache_manager import TTLCache
+from ..integration.conversation_packer import estimate_tokens
+
+STYLE_DIMENSIONS = ('formal_level', 'enthusiasm_level', 'question_tendency')
+EMOTION_LABELS = ('积极', '消极', '中性', '疑问', '惊讶')
+
+# 批量评分时单条消息在 prompt 中的最大字符数
+_MESSAGE_MAX_CHARS = 300
+# 每条消息预估的输出 token 数（一个 JSON 元素）
+_OUTPUT_TOKENS_PER_MESSAGE = 60
+
+_SYSTEM_PROMPT = "你是一个专业的语言风格与情感分析专家。请逐条评分，只返回JSON数组。"
+
+
+class TokenBudgetScheduler:
+    """Token bucket that refills up to ``tokens_per_hour`` every hour.
+
+    ``try_acquire`` reserves an estimated cost without waiting; callers
+    that are refused degrade to local heuristics. ``settle`` corrects the
+    bucket once the real cost of a request is known.
+    """
+
+    def __init__(self, tokens_per_hour: int, clock=time.monotonic) -> None:
+        self.capacity = max(0, int(tokens_per_hour))
+        self._clock = clock
+        self._available = float(self.capacity)
+        self._updated_at = clock()
+        self.stats: Dict[str, int] = {
+            'granted': 0,
+            'rejected': 0,
+            'tokens_reserved': 0,
+            'tokens_used': 0,
+        }
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated_at)
+        self._updated_at = now
+        self._available = min(
+            float(self.capacity), self._available + elapsed * self.capacity / 3600.0
+        )
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._available
+
+    def try_acquire(self, tokens: int) -> bool:
+        """Reserve ``tokens`` if the budget allows it."""
+        self._refill()
+        if tokens > self._available:
+            self.stats['rejected'] += 1
+            return False
+        self._available -= tokens
+        self.stats['granted'] += 1
+        self.stats['tokens_reserved'] += tokens
+        return True
+
+    def settle(self, reserved: int, actual: int) -> None:
+        """Replace a reservation with the measured cost of the request."""
+        self._refill()
+        self._available = min(float(self.capacity), self._available + reserved - actual)
+        self.stats['tokens_used'] += actual
+
+
+class StyleBatchScorer:
+    """Scores messages on all style and emotion dimensions per LLM call.
+
+    Args:
+        llm_adapter: Adapter exposing ``refine_chat_completion``.
+        scheduler: Shared token budget for refine-model calls.
+        max_batch_tokens: Estimated message-token cap per request; larger
+            inputs are split over several requests.
+        cache_size: Maximum number of cached message scores.
+        cache_ttl: Seconds a cached score stays valid.
+    """
+
+    def __init__(
+        self,
+        llm_adapter: Any,
+        scheduler: TokenBudgetScheduler,
+        max_batch_tokens: int = 1500,
+        cache_size: int = 4000,
+        cache_ttl: float = 1800,
+    ) -> None:
+        self.llm_adapter = llm_adapter
+        self.scheduler = scheduler
+        self.max_batch_tokens = max(1, int(max_batch_tokens))
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.stats: Dict[str, Any] = {
+            'batches': 0,
+            'messages': 0,
+            'cache_hits': 0,
+            'llm_requests': 0,
+            'llm_scored': 0,
+            'budget_rejected': 0,
+            'tokens': 0,
+            'last_batch': {},
+        }
+
+    @staticmethod
+    def message_hash(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+    def is_available(self) -> bool:
+        adapter = self.llm_adapter
+        return bool(
+            adapter
+            and adapter.has_refine_provider()
+            and adapter.providers_configured >= 2
+        )
+
+    def get_cached(self, text: str) -> Optional[Dict[str, Any]]:
+        """Return cached scores for ``text`` without calling the LLM."""
+        if not text:
+            return None
+        return self._cache.get(self.message_hash(text))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    async def score(self, texts: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Score ``texts`` and return ``{message_hash: scores}``.
+
+        ``scores`` holds the three style dimensions and an ``emotion``
+        dict. Messages that could not be scored (no provider, budget
+        exhausted, invalid LLM output) are absent from the result.
+        """
+        started = time.perf_counter()
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, str] = {}
+        for text in texts:
+            if not text:
+                continue
+            key = self.message_hash(text)
+            if key in results or key in pending:
+                continue
+            cached = self._cache.get(key)
+            if cached is not None:
+                results[key] = cached
+                self.stats['cache_hits'] += 1
+            else:
+                pending[key] = text
+
+        self.stats['batches'] += 1
+        self.stats['messages'] += len(results) + len(pending)
+        batch = {'messages': len(results) + len(pending), 'cache_hits': len(results),
+                 'requests': 0, 'tokens': 0, 'scored': 0}
+
+        if pending and self.is_available():
+            for chunk in self._chunk(list(pending.items())):
+                scored, tokens, sent = await self._score_chunk(chunk)
+                if not sent:
+                    # 预算不足，剩余消息交给启发式算法
+                    break
+                batch['requests'] += 1
+                batch['tokens'] += tokens
+                batch['scored'] += len(scored)
+                results.update(scored)
+
+        batch['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        self.stats['last_batch'] = batch
+        if batch['requests']:
+            logger.debug(
+                f"批量多维评分: {batch['messages']}条消息, 缓存命中{batch['cache_hits']}, "
+                f"LLM请求{batch['requests']}次, 约{batch['tokens']} tokens, 耗时{batch['latency_ms']}ms"
+            )
+        return results
+
+    def _chunk(self, items: List[tuple]) -> List[List[tuple]]:
+        """按估算 token 数切分待评分消息（每块至少一条）"""
+        chunks: List[List[tuple]] = []
+        current: List[tuple] = []
+        used = 0
+        for item in items:
+            cost = estimate_tokens(item[1][:_MESSAGE_MAX_CHARS])
+            if current and used + cost > self.max_batch_tokens:
+                chunks.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _score_chunk(self, chunk: List[tuple]):
+        """一次 LLM 请求评分一个块，返回 (结果, 实际token数, 是否已发送)"""
+        prompt = self._build_prompt([text for _, text in chunk])
+        reserved = (
+            estimate_tokens(_SYSTEM_PROMPT) + estimate_tokens(prompt)
+            + _OUTPUT_TOKENS_PER_MESSAGE * len(chunk)
+        )
+        if not self.scheduler.try_acquire(reserved):
+            self.stats['budget_rejected'] += 1
+            logger.debug(f"批量多维评分超出token预算（需要约{reserved}），使用简化算法")
+            return {}, 0, False
+
+        response = None
+        try:
+            self.stats['llm_requests'] += 1
+            response = await self.llm_adapter.refine_chat_completion(
+                prompt=prompt,
+                system_prompt=_SYSTEM_PROMPT,
+                temperature=0.1,
+            )
+        except Exception as e:
+            logger.warning(f"批量多维评分LLM调用失败: {e}")
+        finally:
+            actual = estimate_tokens(_SYSTEM_PROMPT) + estimate_tokens(prompt)
+            if response:
+                actual += estimate_tokens(response)
+            self.scheduler.settle(reserved, actual)
+            self.stats['tokens'] += actual
+
+        if not response:
+            return {}, actual, True
+
+        from ...utils.guardrails_manager import get_guardrails_manager
+        parsed = get_guardrails_manager().validate_and_clean_json(
+            response, expected_type="array"
+        )
+        if not isinstance(parsed, list):
+            logger.warning("批量多维评分LLM返回格式不正确，使用简化算法")
+            return {}, actual, True
+
+        scored: Dict[str, Dict[str, Any]] = {}
+        for item in parsed:
+            if not isinstance(item, dict):
+                continue
+            try:
+                local_index = int(item.get('index', 0)) - 1
+            except (TypeError, ValueError):
+                continue
+            if not 0 <= local_index < len(chunk):
+                continue
+            scores = self._parse_scores(item)
+            if scores is None:
+                continue
+            key = chunk[local_index][0]
+            self._cache[key] = scores
+            scored[key] = scores
+        self.stats['llm_scored'] += len(scored)
+        return scored, actual, True
+
+    @staticmethod
+    def _parse_scores(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """校验单条评分，任一维度缺失或非数值则整条丢弃"""
+        emotion_raw = item.get('emotion')
+        if not isinstance(emotion_raw, dict):
+            return None
+        try:
+            scores: Dict[str, Any] = {
+                dim: min(max(float(item[dim]), 0.0), 1.0) for dim in STYLE_DIMENSIONS
+            }
+            scores['emotion'] = {
+                label: min(max(float(emotion_raw.get(label, 0.0)), 0.0), 1.0)
+                for label in EMOTION_LABELS
+            }
+        except (KeyError, TypeError, ValueError):
+            return None
+        return scores
+
+    @staticmethod
+    def _build_prompt(texts: List[str]) -> str:
+        message_lines = "\n".join(
+            f"{i}. {text[:_MESSAGE_MAX_CHARS]}" for i, text in enumerate(texts, 1)
+        )
+        emotion_fields = ", ".join(f'"{label}": 0.0-1.0' for label in EMOTION_LABELS)
+        return f"""
+请对以下每条群聊消息进行多维度评分，所有分数均为0-1之间的数值。
+
+{message_lines}
+
+评分维度：
+- formal_level: 正式程度，0表示非常随意，1表示非常正式
+- enthusiasm_level: 热情程度，0表示非常冷淡，1表示非常热情
+- question_tendency: 提问倾向，0表示没有疑问，1表示强烈的疑问和求知欲
+- emotion: 积极、消极、中性、疑问、惊讶五种情感的置信度
+
+返回JSON数组，每条消息对应一个元素：
+[
+    {{"index": 消息编号, "formal_level": 0.0-1.0, "enthusiasm_level": 0.0-1.0, "question_tendency": 0.0-1.0, "emotion": {{{emotion_fields}}}}}
+]
+
+请只返回JSON数组，不要其他内容。
+"""
@@ -20,6 +20,7 @@ except ImportError:
     from ...core.interfaces import MessageData
 
 from ..database import DatabaseManager
+from .raw_message_buffer import RawMessageWriteBuffer
 from ..learning.sample_filter import (
     extract_learning_message_metadata,
     should_ignore_learning_sample,
@@ -34,18 +35,24 @@ class MessageCollectorService:
         self.context = context
         self.database_manager = database_manager # 注入数据库管理器
         
-        # 消息缓存（用于批量写入优化）
-        self._message_cache = []
-        self._cache_size_limit = 100
-        self._last_flush_time = time.time()
-        self._flush_interval = 30 # 30秒强制刷新一次
-        
+        # 原始消息组提交写缓冲：按条数/时间窗口合并写入，调用方仍能拿到消息 ID
+        self._write_buffer = RawMessageWriteBuffer(
+            writer=self._write_raw_messages,
+            max_batch_size=getattr(config, 'raw_message_flush_batch_size', 50),
+            flush_interval=getattr(config, 'raw_message_flush_interval', 0.2),
+            max_pending=getattr(config, 'raw_message_buffer_max_pending', 1000),
+        )
+
         logger.info("消息收集服务初始化完成")
 
     # 移除 _init_database 方法，因为数据库初始化现在由 DatabaseManager 负责
 
     async def collect_message(self, message_data: Dict[str, Any]) -> bool:
-        """收集消息并立即写入数据库（实时存储，确保外部API能获取到最新数据）"""
+        """收集消息并写入数据库
+
+        消息进入组提交写缓冲，本方法等待其所在批次 commit 后才返回，
+        因此返回 True 时消息已可被后续查询读到。
+        """
         try:
             # 验证消息数据
             required_fields = ['sender_id', 'message', 'timestamp']
@@ -66,7 +73,6 @@ class MessageCollectorService:
                 )
                 return False
 
-            # 立即写入数据库（移除缓存机制以确保实时性）
             message_obj = MessageData(
                 sender_id=message_data.get('sender_id', ''),
                 sender_name=message_data.get('sender_name', ''),
@@ -78,7 +84,7 @@ class MessageCollectorService:
                 reply_to=message_data.get('reply_to')
             )
 
-            message_id = await self.database_manager.save_raw_message(message_obj)
+            message_id = await self._write_buffer.submit(message_obj)
             if not message_id:
                 logger.error(
                     f"消息保存失败: group={message_data.get('group_id')}, "
@@ -99,41 +105,28 @@ class MessageCollectorService:
             logger.error(f"消息收集失败: {e}")
             raise MessageCollectionError(f"消息收集失败: {str(e)}")
 
+    async def _write_raw_messages(self, messages: List[MessageData]) -> List[int]:
+        """写缓冲的批量写入回调：一个事务写入整批消息"""
+        batch_writer = getattr(self.database_manager, 'save_raw_messages_batch', None)
+        if batch_writer is not None:
+            return await batch_writer(messages)
+        # 兼容未实现批量接口的数据库管理器
+        return [await self.database_manager.save_raw_message(msg) for msg in messages]
+
     async def _flush_message_cache(self):
-        """刷新消息缓存到数据库"""
-        if not self._message_cache:
-            return
-            
+        """刷新写缓冲中尚未提交的消息到数据库"""
         try:
-            # 将字典转换为MessageData对象
-            message_objects = []
-            for msg_dict in self._message_cache:
-                message_data = MessageData(
-                    sender_id=msg_dict.get('sender_id', ''),
-                    sender_name=msg_dict.get('sender_name', ''),
-                    message=msg_dict.get('message', ''),
-                    group_id=msg_dict.get('group_id', ''),
-                    timestamp=msg_dict.get('timestamp', time.time()),
-                    platform=msg_dict.get('platform', 'unknown'),
-                    message_id=msg_dict.get('message_id'),
-                    reply_to=msg_dict.get('reply_to')
-                )
-                message_objects.append(message_data)
-            
-            # 并发插入消息
-            tasks = [self.database_manager.save_raw_message(msg) for msg in message_objects]
-            await asyncio.gather(*tasks)
-            
-            logger.debug(f"已刷新 {len(self._message_cache)} 条消息到数据库")
-            
-            # 清空缓存
-            self._message_cache.clear()
-            self._last_flush_time = time.time()
-            
+            written = await self._write_buffer.flush()
+            if written:
+                logger.debug(f"已刷新 {written} 条消息到数据库")
         except Exception as e:
             logger.error(f"消息缓存刷新失败: {e}")
             raise DataStorageError(f"消息缓存刷新失败: {str(e)}")
 
+    def get_write_buffer_stats(self) -> Dict[str, Any]:
+        """获取原始消息写缓冲统计（队列深度、批次大小、背压次数等）"""
+        return self._write_buffer.get_stats()
+
     async def get_unprocessed_messages(
         self,
         limit: Optional[int] = None,
@@ -202,16 +195,15 @@ class MessageCollectorService:
     async def get_statistics(self, group_id: Optional[str] = None) -> Dict[str, Any]:
         """获取收集统计信息"""
         try:
-            # 先刷新缓存
-            await self._flush_message_cache()
-            
+            # collect_message 在批次提交后才返回，这里无需强制刷新写缓冲
             # 如果指定了group_id，获取特定群组的统计信息
             if group_id:
                 statistics = await self.database_manager.get_group_messages_statistics(group_id)
             else:
                 statistics = await self.database_manager.get_messages_statistics()
             
-            statistics['cache_size'] = len(self._message_cache) # 缓存大小仍然由 MessageCollectorService 管理
+            statistics['cache_size'] = self._write_buffer.pending_count
+            statistics['write_buffer'] = self._write_buffer.get_stats()
             return statistics
             
         except Exception as e:
@@ -236,7 +228,6 @@ class MessageCollectorService:
         try:
             await self._flush_message_cache()
             await self.database_manager.clear_all_messages_data()
-            self._message_cache.clear()
             logger.info("所有学习数据已清空")
             
         except Exception as e:
@@ -272,9 +263,11 @@ class MessageCollectorService:
             raise DataStorageError(f"更新学习批次失败: {str(e)}")
 
     async def stop(self):
-        """停止服务，保存状态"""
+        """停止服务：关闭写缓冲并写入剩余消息（可重复调用）"""
         try:
-            await self.save_state()
+            written = await self._write_buffer.stop()
+            if written:
+                logger.info(f"消息收集服务关停前已写入 {written} 条缓冲消息")
             logger.info("消息收集服务已停止")
             return True
         except Exception as e:
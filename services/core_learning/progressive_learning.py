@@ -499,6 +499,7 @@ class ProgressiveLearningService:
 
             # 2.5 将筛选后的消息写入 FilteredMessage 表（供 WebUI 统计）
             await self._save_filtered_messages_for_stats(group_id, filtered_messages)
+            await self._score_messages_batch(group_id, filtered_messages)
 
             # 3. 获取当前人格设置 (针对特定群组)
             current_persona = await self._get_current_persona(group_id)
@@ -643,6 +644,7 @@ class ProgressiveLearningService:
                 return
 
             await self._save_filtered_messages_for_stats(group_id, filtered_messages)
+            await self._score_messages_batch(group_id, filtered_messages)
 
             # 3. 分析风格并生成候选人格更新；失败时保留统计和风格学习降级记录
             from ...core.interfaces import AnalysisResult
@@ -857,6 +859,22 @@ class ProgressiveLearningService:
 
         return messages
 
+    async def _score_messages_batch(self, group_id: str, messages: List[Dict[str, Any]]):
+        """多维度分析本批消息：风格/情感各维度合并为一次批量LLM评分，并更新用户画像"""
+        analyzer = getattr(self, 'multidimensional_analyzer', None)
+        if (
+            not messages
+            or not getattr(self.config, 'multidimensional_batch_scoring_enabled', False)
+            or not hasattr(analyzer, 'analyze_messages_batch')
+        ):
+            return
+        try:
+            await analyzer.analyze_messages_batch([
+                {**msg, 'group_id': msg.get('group_id') or group_id} for msg in messages
+            ])
+        except Exception as e:
+            logger.warning(f"多维度批量评分失败，跳过: {e}")
+
     @monitored
     async def _get_current_persona(self, group_id: str) -> Dict[str, Any]:
         """获取当前人格设置 (针对特定群组，兼容转发)"""
@@ -0,0 +1,205 @@
+"""
+原始消息组提交写缓冲 — 将高频的单条消息写入合并为批量事务
+
+调用方通过 ``submit()`` 提交一条消息并等待其所在批次提交完成，
+拿到数据库分配的消息 ID（失败为 0），语义与逐条 ``save_raw_message``
+保持一致；缓冲区按"条数阈值 / 时间窗口"两个条件触发刷新，每次刷新
+只开一个会话、执行一次批量 INSERT 和一次 commit。
+
+设计要点:
+    - 有界：待写入条数达到 ``max_pending`` 时，提交方会同步参与刷新
+      （背压），而不是无限堆积在内存中。
+    - 提交方被取消（例如关停时取消后台任务）不会丢弃已入队的消息，
+      这些消息仍会在下一次刷新或 ``stop()`` 时写入。
+    - ``stop()`` 之后的提交直接走单批次同步写入，保证关停过程中到达的
+      消息不会丢失。
+    - 批量写入失败时拆成两半分别重试，直到单条消息；一条坏数据只会
+      导致它自己写入失败，不会拖累同批次的其他消息。
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+
+
+BatchWriter = Callable[[List[Any]], Awaitable[List[int]]]
+
+
+class RawMessageWriteBuffer:
+    """原始消息组提交写缓冲
+
+    Args:
+        writer: 批量写入函数，接收消息列表，返回与输入一一对应的 ID 列表。
+        max_batch_size: 单次刷新最多写入的消息条数，达到即立即刷新。
+        flush_interval: 首条消息入队后最长等待时间（秒），超时即刷新。
+        max_pending: 缓冲区允许的最大待写入条数，超过时触发背压。
+    """
+
+    def __init__(
+        self,
+        writer: BatchWriter,
+        max_batch_size: int = 50,
+        flush_interval: float = 0.2,
+        max_pending: int = 1000,
+    ):
+        self._writer = writer
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._flush_interval = max(0.0, float(flush_interval))
+        self._max_pending = max(self._max_batch_size, int(max_pending))
+
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_lock = asyncio.Lock()
+        self._timer_task: Optional[asyncio.Task] = None
+        self._flush_tasks: set = set()
+        self._closed = False
+
+        self._stats: Dict[str, Any] = {
+            'submitted': 0,
+            'written': 0,
+            'failed': 0,
+            'flushes': 0,
+            'size_triggered_flushes': 0,
+            'time_triggered_flushes': 0,
+            'backpressure_waits': 0,
+            'split_retries': 0,
+            'max_batch_size_seen': 0,
+            'last_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+        }
+
+    @property
+    def pending_count(self) -> int:
+        """当前等待写入的消息条数"""
+        return len(self._pending)
+
+    async def submit(self, message: Any) -> int:
+        """提交一条消息并等待其所在批次提交
+
+        Returns:
+            int: 数据库分配的消息 ID，写入失败返回 0
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._stats['submitted'] += 1
+
+        if self._closed:
+            self._pending.append((message, future))
+            await self.flush()
+            return future.result()
+
+        while len(self._pending) >= self._max_pending:
+            self._stats['backpressure_waits'] += 1
+            await self.flush()
+
+        self._pending.append((message, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._stats['size_triggered_flushes'] += 1
+            self._spawn_flush()
+        elif self._timer_task is None or self._timer_task.done():
+            self._timer_task = asyncio.create_task(self._delayed_flush())
+
+        # shield: 提交方被取消时，消息仍保留在批次中等待写入
+        return await asyncio.shield(future)
+
+    async def flush(self) -> int:
+        """立即写入所有待写入消息
+
+        Returns:
+            int: 本次成功写入的条数
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self._max_batch_size]
+                del self._pending[:self._max_batch_size]
+                written += await self._write_batch(batch)
+        return written
+
+    async def stop(self) -> int:
+        """停止定时刷新并写入剩余消息（幂等）"""
+        self._closed = True
+        if self._timer_task and not self._timer_task.done():
+            self._timer_task.cancel()
+            try:
+                await self._timer_task
+            except asyncio.CancelledError:
+                pass
+        self._timer_task = None
+        if self._flush_tasks:
+            await asyncio.gather(*list(self._flush_tasks), return_exceptions=True)
+        return await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取写缓冲统计（含背压与批次大小指标）"""
+        stats = dict(self._stats)
+        flushes = stats['flushes']
+        stats['pending'] = len(self._pending)
+        stats['max_pending'] = self._max_pending
+        stats['avg_batch_size'] = (
+            round(stats['written'] / flushes, 2) if flushes else 0.0
+        )
+        stats['avg_flush_ms'] = (
+            round(stats['total_flush_ms'] / flushes, 2) if flushes else 0.0
+        )
+        return stats
+
+    # 内部实现
+
+    def _spawn_flush(self) -> None:
+        task = asyncio.create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self._flush_interval)
+        if self._pending:
+            self._stats['time_triggered_flushes'] += 1
+            await self.flush()
+
+    async def _write_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> int:
+        messages = [message for message, _ in batch]
+        start = time.perf_counter()
+        ids = await self._write_messages(messages)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        written = sum(1 for message_id in ids if message_id)
+        self._stats['flushes'] += 1
+        self._stats['written'] += written
+        self._stats['failed'] += len(batch) - written
+        self._stats['max_batch_size_seen'] = max(
+            self._stats['max_batch_size_seen'], len(batch)
+        )
+        self._stats['last_flush_ms'] = round(elapsed_ms, 2)
+        self._stats['total_flush_ms'] += elapsed_ms
+
+        for (_, future), message_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(message_id)
+
+        logger.debug(
+            f"[RawMessageWriteBuffer] 已批量写入 {written}/{len(batch)} 条消息，"
+            f"耗时 {elapsed_ms:.1f}ms"
+        )
+        return written
+
+    async def _write_messages(self, messages: List[Any]) -> List[int]:
+        """写入一组消息；整批失败时二分重试，返回与输入对应的 ID（失败为 0）"""
+        try:
+            ids = await self._writer(messages)
+        except Exception as e:
+            logger.error(f"[RawMessageWriteBuffer] 批量写入原始消息失败: {e}")
+            ids = []
+
+        if len(ids) == len(messages):
+            return list(ids)
+        if len(messages) == 1:
+            return [0]
+
+        self._stats['split_retries'] += 1
+        mid = len(messages) // 2
+        return (
+            await self._write_messages(messages[:mid])
+            + await self._write_messages(messages[mid:])
+        )
@@ -30,9 +30,11 @@ Design notes:
 
 import asyncio
 import hashlib
+import os
 import time
 from collections import defaultdict
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from astrbot.api import logger
 
@@ -43,6 +45,7 @@ from ..monitoring.instrumentation import monitored
 from ..quality import (
     BatchTriggerPolicy,
     TieredLearningTrigger,
+    Tier2Journal,
     TriggerResult,
 )
 
@@ -52,6 +55,17 @@ _MIN_INGESTION_LENGTH = 15
 # Maximum buffered messages per group before force-flushing.
 _INGESTION_BUFFER_MAX = 10
 
+# Tier 2 operation name; also the journal key for buffered messages.
+_INGESTION_OP = "ingestion_flush"
+
+# Flushes an engine may fail on the same messages before they are dropped.
+_INGESTION_MAX_ATTEMPTS = 3
+
+
+def _batch_succeeded(result: Dict[str, int]) -> bool:
+    """A batch ingest failed if it had messages and ingested none of them."""
+    return not (result.get("failed", 0) and not result.get("messages", 0))
+
 
 class V2LearningIntegration:
     """Facade that initialises, wires, and exposes v2 learning modules.
@@ -72,12 +86,16 @@ class V2LearningIntegration:
         db_manager: Optional[Any] = None,
         context: Optional[Any] = None,
         feature_delegation: Optional[Any] = None,
+        on_jargon_changed: Optional[Callable[[str], None]] = None,
     ) -> None:
         self._config = config
         self._llm = llm_adapter
         self._db = db_manager
         self._context = context
         self._feature_delegation = feature_delegation
+        # Called with the group id after jargon is written, so cached
+        # jargon matchers pick up the new terms.
+        self._on_jargon_changed = on_jargon_changed
         self._started = False
         self._provider_retry_lock = asyncio.Lock()
         self._last_provider_retry: float = 0.0
@@ -107,6 +125,30 @@ class V2LearningIntegration:
         # must not run per-message. Instead, messages are buffered here
         # and flushed as a batch in a Tier 2 operation.
         self._ingestion_buffer: Dict[str, List[MessageData]] = defaultdict(list)
+        self._ingestion_stats: Dict[str, float] = {
+            "flushes": 0,
+            "messages": 0,
+            "extraction_passes": 0,
+            "saved_passes": 0,
+            "total_ms": 0.0,
+            "last_ms": 0.0,
+        }
+
+        # --- Durable journal for buffered Tier 2 work ----------------
+        # Buffered messages are journaled before they enter the buffer
+        # and committed once flushed, so a crash or restart replays them
+        # instead of losing them. ``_journal_seq`` holds the latest
+        # journal sequence number buffered per group.
+        self._journal = self._create_tier2_journal()
+        self._journal_seq: Dict[str, int] = {}
+        # Messages an engine failed to ingest, retried with the group's
+        # next flush: group -> engine -> (messages, failed attempts).
+        # While a group has retries pending its journal offset is not
+        # committed (a commit would cover the failed range);
+        # ``_journal_pending_seq`` remembers the offset to commit once
+        # the retries succeed.
+        self._ingestion_retry: Dict[str, Dict[str, Tuple[List[MessageData], int]]] = {}
+        self._journal_pending_seq: Dict[str, int] = {}
 
         # --- Tiered trigger ------------------------------------------
         self._trigger = TieredLearningTrigger()
@@ -133,6 +175,7 @@ class V2LearningIntegration:
             if module and hasattr(module, "start")
         ))
         self._started = True
+        await self._replay_journal()
         logger.info("[V2Integration] All modules started")
 
     async def refresh_provider_bindings(self, *, force: bool = False) -> bool:
@@ -294,7 +337,9 @@ class V2LearningIntegration:
         """
         _flush_timeout = self._config.task_cancel_timeout
 
-        for group_id in list(self._ingestion_buffer.keys()):
+        groups = list(self._ingestion_buffer.keys())
+        groups += [g for g in self._ingestion_retry if g not in groups]
+        for group_id in groups:
             try:
                 await asyncio.wait_for(
                     self._flush_ingestion_buffer(group_id),
@@ -302,10 +347,17 @@ class V2LearningIntegration:
                 )
             except asyncio.TimeoutError:
                 dropped = len(self._ingestion_buffer.pop(group_id, []))
-                logger.warning(
-                    f"[V2Integration] Buffer flush timeout for group "
-                    f"{group_id}, dropped {dropped} messages"
-                )
+                if self._journal and self._journal.enabled:
+                    logger.warning(
+                        f"[V2Integration] Buffer flush timeout for group "
+                        f"{group_id}, {dropped} messages kept in the "
+                        f"journal for replay"
+                    )
+                else:
+                    logger.warning(
+                        f"[V2Integration] Buffer flush timeout for group "
+                        f"{group_id}, dropped {dropped} messages"
+                    )
             except Exception as exc:
                 logger.warning(
                     f"[V2Integration] Buffer flush failed on stop "
@@ -334,6 +386,12 @@ class V2LearningIntegration:
             except Exception as exc:
                 logger.warning(f"[V2Integration] Reranker close failed: {exc}")
 
+        async def _close_embedding() -> None:
+            try:
+                await self._embedding_provider.close()
+            except Exception as exc:
+                logger.warning(f"[V2Integration] Embedding close failed: {exc}")
+
         tasks = [
             _stop_one(name, module)
             for name, module in modules
@@ -343,6 +401,14 @@ class V2LearningIntegration:
             tasks.append(_close_reranker())
 
         await asyncio.gather(*tasks)
+        # Modules may still embed while stopping; close the provider last.
+        if self._embedding_provider and hasattr(self._embedding_provider, "close"):
+            await _close_embedding()
+        if self._journal:
+            try:
+                await self._journal.close()
+            except Exception as exc:
+                logger.warning(f"[V2Integration] Journal close failed: {exc}")
         logger.info("[V2Integration] All modules stopped")
 
     # Public API
@@ -611,18 +677,49 @@ class V2LearningIntegration:
             return None
         try:
             from ..integration import ExemplarLibrary
-            return ExemplarLibrary(self._db, self._embedding_provider)
+            return ExemplarLibrary(
+                self._db,
+                self._embedding_provider,
+                embedding_dtype=getattr(
+                    self._config, "exemplar_embedding_dtype", "float32"
+                ),
+                index_dir=os.path.join(self._config.data_dir, "exemplar_index"),
+                vector_index=getattr(
+                    self._config, "exemplar_vector_index", "flat"
+                ),
+                max_exemplars_per_group=getattr(
+                    self._config, "exemplar_max_per_group", 500
+                ),
+            )
         except Exception as exc:
             logger.debug(
                 f"[V2Integration] ExemplarLibrary init failed: {exc}"
             )
             return None
 
+    def _create_tier2_journal(self) -> Optional[Tier2Journal]:
+        """Create the Tier 2 journal when a batch ingestion engine is configured."""
+        if not getattr(self._config, "tier2_journal_enabled", True):
+            return None
+        engines_configured = (
+            self._config.knowledge_engine == "lightrag"
+            or self._config.memory_engine == "mem0"
+        )
+        if not engines_configured:
+            return None
+        return Tier2Journal(
+            os.path.join(self._config.data_dir, "tier2_journal.db")
+        )
+
     def _create_social_analyzer(self) -> Optional[Any]:
         """Create social graph analyzer."""
         try:
             from ..social import SocialGraphAnalyzer
-            return SocialGraphAnalyzer(self._llm, self._db)
+            return SocialGraphAnalyzer(
+                self._llm,
+                self._db,
+                stats_sample_size=self._config.graph_stats_sample_size,
+            )
         except Exception as exc:
             logger.debug(
                 f"[V2Integration] SocialGraphAnalyzer init failed: {exc}"
@@ -683,6 +780,8 @@ class V2LearningIntegration:
         # with a sub-millisecond append operation.
         if self._knowledge_manager or self._memory_manager:
             buf = self._ingestion_buffer
+            journal = self._journal
+            journal_seq = self._journal_seq
 
             async def _buffer_message(
                 message: MessageData, group_id: str
@@ -691,7 +790,16 @@ class V2LearningIntegration:
                     message.message
                     and len(message.message.strip()) >= _MIN_INGESTION_LENGTH
                 ):
+                    seq = 0
+                    if journal:
+                        seq = await journal.append(
+                            _INGESTION_OP, group_id, asdict(message)
+                        )
+                    # No await between here and the journal append, so
+                    # buffer order always matches journal order.
                     buf[group_id].append(message)
+                    if seq:
+                        journal_seq[group_id] = seq
 
             self._trigger.register_tier1("ingestion_buffer", _buffer_message)
 
@@ -715,7 +823,7 @@ class V2LearningIntegration:
         # and reduces total API calls.
         if self._knowledge_manager or self._memory_manager:
             self._trigger.register_tier2(
-                "ingestion_flush",
+                _INGESTION_OP,
                 self._flush_ingestion_buffer,
                 BatchTriggerPolicy(
                     message_threshold=5, cooldown_seconds=60
@@ -751,6 +859,7 @@ class V2LearningIntegration:
                 )
                 if not candidates or not llm:
                     return
+                saved = 0
                 for candidate in candidates[:10]:
                     try:
                         meaning = await llm.generate_response(
@@ -775,11 +884,14 @@ class V2LearningIntegration:
                                     "is_complete": True,
                                 },
                             )
+                            saved += 1
                     except Exception as exc:
                         logger.debug(
                             f"[V2Integration] Jargon inference failed "
                             f"for '{candidate['term']}': {exc}"
                         )
+                if saved:
+                    self._notify_jargon_changed(group_id)
 
             self._trigger.register_tier2(
                 "jargon",
@@ -815,28 +927,67 @@ class V2LearningIntegration:
                 ),
             )
 
+    def _notify_jargon_changed(self, group_id: str) -> None:
+        if not self._on_jargon_changed:
+            return
+        try:
+            self._on_jargon_changed(group_id)
+        except Exception as exc:
+            logger.debug(f"[V2Integration] Jargon change notify failed: {exc}")
+
     # Batch ingestion
 
     async def _flush_ingestion_buffer(self, group_id: str) -> None:
         """Flush buffered messages for a group through knowledge and memory.
 
-        Processes all buffered messages concurrently through LightRAG and
-        Mem0 in a single batch operation, then clears the buffer. Messages
-        within each engine are processed sequentially to avoid overwhelming
-        the underlying LLM providers with concurrent requests.
+        Knowledge and memory ingestion run concurrently. Engines that
+        offer a batch API (``process_messages_batch`` /
+        ``add_memories_batch``) receive the whole buffer packed into
+        conversation-window documents, so a flush costs one extraction
+        pass per window rather than one per message. Other engines get
+        the messages one by one, sequentially, to avoid overwhelming the
+        underlying LLM providers.
+
+        An engine that raised or ingested none of its messages keeps them
+        for retry with the group's next flush (up to
+        ``_INGESTION_MAX_ATTEMPTS`` flushes); only that engine receives
+        them again, so the other engine does not ingest duplicates. The
+        Tier 2 journal offset is committed once a flush leaves no retries
+        pending, covering every range flushed before it. Single messages
+        an engine rejected after splitting its batch are not retried.
         """
         messages = self._ingestion_buffer.pop(group_id, [])
-        if not messages:
+        journal_seq = max(
+            self._journal_seq.pop(group_id, 0),
+            self._journal_pending_seq.pop(group_id, 0),
+        )
+        retry = self._ingestion_retry.pop(group_id, {})
+        if not messages and not retry:
             return
+        knowledge_messages = retry.get("knowledge", ([], 0))[0] + messages
+        memory_messages = retry.get("memory", ([], 0))[0] + messages
 
         logger.debug(
             f"[V2Integration] Flushing ingestion buffer: "
-            f"group={group_id}, count={len(messages)}"
+            f"group={group_id}, count={len(messages)}, "
+            f"retried={len(knowledge_messages) + len(memory_messages) - 2 * len(messages)}"
         )
+        started = time.perf_counter()
 
-        async def _ingest_knowledge() -> None:
-            if not self._knowledge_manager:
-                return
+        async def _ingest_knowledge(batch: List[MessageData]) -> Tuple[int, bool]:
+            if not self._knowledge_manager or not batch:
+                return 0, True
+            if hasattr(self._knowledge_manager, "process_messages_batch"):
+                try:
+                    result = await self._knowledge_manager.process_messages_batch(
+                        batch, group_id
+                    )
+                except Exception as exc:
+                    logger.debug(
+                        f"[V2Integration] Batched knowledge ingestion failed: {exc}"
+                    )
+                    return 0, False
+                return int(result.get("documents", 0)), _batch_succeeded(result)
             method = None
             if hasattr(
                 self._knowledge_manager,
@@ -848,38 +999,157 @@ class V2LearningIntegration:
             ):
                 method = self._knowledge_manager.process_message_for_knowledge
             if not method:
-                return
-            for msg in messages:
+                return 0, True
+            failed = 0
+            for msg in batch:
                 try:
                     await method(msg, group_id)
                 except Exception as exc:
+                    failed += 1
                     logger.debug(
                         f"[V2Integration] Knowledge ingestion failed: {exc}"
                     )
+            return len(batch), failed < len(batch)
 
-        async def _ingest_memory() -> None:
+        async def _ingest_memory(batch: List[MessageData]) -> Tuple[int, bool]:
             if self._memory_delegated():
                 logger.debug("[V2Integration] Memory ingestion delegated to LivingMemory")
-                return
-            if not self._memory_manager:
-                return
-            for msg in messages:
+                return 0, True
+            if not self._memory_manager or not batch:
+                return 0, True
+            if hasattr(self._memory_manager, "add_memories_batch"):
+                try:
+                    result = await self._memory_manager.add_memories_batch(
+                        batch, group_id
+                    )
+                except Exception as exc:
+                    logger.debug(
+                        f"[V2Integration] Batched memory ingestion failed: {exc}"
+                    )
+                    return 0, False
+                return int(result.get("documents", 0)), _batch_succeeded(result)
+            failed = 0
+            for msg in batch:
                 try:
                     await self._memory_manager.add_memory_from_message(
                         msg, group_id
                     )
                 except Exception as exc:
+                    failed += 1
                     logger.debug(
                         f"[V2Integration] Memory ingestion failed: {exc}"
                     )
+            return len(batch), failed < len(batch)
 
-        # Run knowledge and memory ingestion concurrently across engines,
-        # but sequentially within each engine to avoid provider overload.
-        await asyncio.gather(
-            _ingest_knowledge(),
-            _ingest_memory(),
+        (knowledge_docs, knowledge_ok), (memory_docs, memory_ok) = (
+            await asyncio.gather(
+                _ingest_knowledge(knowledge_messages),
+                _ingest_memory(memory_messages),
+            )
+        )
+        self._record_flush(
+            len(messages),
+            knowledge_docs,
+            memory_docs,
+            (time.perf_counter() - started) * 1000.0,
         )
 
+        pending: Dict[str, Tuple[List[MessageData], int]] = {}
+        for engine, ok, batch in (
+            ("knowledge", knowledge_ok, knowledge_messages),
+            ("memory", memory_ok, memory_messages),
+        ):
+            if ok:
+                continue
+            retried, attempts = retry.get(engine, ([], 0))
+            if attempts + 1 < _INGESTION_MAX_ATTEMPTS:
+                pending[engine] = (batch, attempts + 1)
+                continue
+            # The retried range is dropped; this flush's messages get
+            # their own attempts.
+            logger.warning(
+                f"[V2Integration] Giving up {engine} ingestion of "
+                f"{len(retried)} messages for group {group_id} after "
+                f"{attempts + 1} failed flushes"
+            )
+            if messages:
+                pending[engine] = (messages, 1)
+        if pending:
+            self._ingestion_retry[group_id] = pending
+            if journal_seq:
+                self._journal_pending_seq[group_id] = journal_seq
+            return
+        # Keep journaled messages for replay while no engine is available
+        # to ingest them.
+        if journal_seq and (self._knowledge_manager or self._memory_manager):
+            await self._journal.commit(_INGESTION_OP, group_id, journal_seq)
+
+    async def _replay_journal(self) -> None:
+        """Restore journaled messages that were buffered but never flushed."""
+        if not self._journal:
+            return
+        pending = await self._journal.replay()
+        restored = 0
+        for (operation, group_id), items in pending.items():
+            if operation != _INGESTION_OP:
+                continue
+            messages: List[MessageData] = []
+            for _, payload in items:
+                try:
+                    messages.append(MessageData(**payload))
+                except TypeError as exc:
+                    logger.debug(
+                        f"[V2Integration] Skipping malformed journal entry: {exc}"
+                    )
+            # Replayed messages predate anything buffered since start.
+            self._ingestion_buffer[group_id][:0] = messages
+            self._journal_seq[group_id] = max(
+                self._journal_seq.get(group_id, 0), items[-1][0]
+            )
+            restored += len(messages)
+        if restored:
+            logger.info(
+                f"[V2Integration] Replayed {restored} unflushed messages "
+                f"from the Tier 2 journal ({len(pending)} group(s))"
+            )
+
+    def _record_flush(
+        self,
+        message_count: int,
+        knowledge_docs: int,
+        memory_docs: int,
+        elapsed_ms: float,
+    ) -> None:
+        """Accumulate flush statistics.
+
+        ``saved_passes`` counts extraction passes avoided versus the
+        per-message path (one pass per message per active engine).
+        """
+        stats = self._ingestion_stats
+        engines = int(bool(knowledge_docs)) + int(bool(memory_docs))
+        passes = knowledge_docs + memory_docs
+        saved = max(0, message_count * engines - passes)
+        stats["flushes"] += 1
+        stats["messages"] += message_count
+        stats["extraction_passes"] += passes
+        stats["saved_passes"] += saved
+        stats["total_ms"] += elapsed_ms
+        stats["last_ms"] = elapsed_ms
+        logger.debug(
+            f"[V2Integration] Flushed {message_count} messages as "
+            f"{knowledge_docs} knowledge + {memory_docs} memory document(s) "
+            f"in {elapsed_ms:.0f}ms (saved {saved} extraction passes)"
+        )
+
+    def get_ingestion_stats(self) -> Dict[str, Any]:
+        """Cumulative ingestion flush statistics."""
+        stats: Dict[str, Any] = dict(self._ingestion_stats)
+        flushes = stats["flushes"]
+        stats["avg_flush_ms"] = round(stats["total_ms"] / flushes, 1) if flushes else 0.0
+        stats["total_ms"] = round(stats["total_ms"], 1)
+        stats["last_ms"] = round(stats["last_ms"], 1)
+        return stats
+
     def _memory_delegated(self) -> bool:
         delegation = self._feature_delegation
         if not delegation or not hasattr(delegation, "should_delegate_memory"):
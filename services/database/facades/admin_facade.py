@@ -25,7 +25,9 @@ try:
     )
     from ....models.orm.jargon import Jargon, JargonUsageFrequency
     from ....models.orm.knowledge_graph import KGEntity, KGRelation, KGParagraphHash
-    from ....models.orm.memory import Memory, MemoryEmbedding, MemorySummary
+    from ....models.orm.memory import (
+        Memory, MemoryEmbedding, MemorySummary, MemoryGraphNode, MemoryGraphEdge,
+    )
     from ....models.orm.performance import LearningPerformanceHistory
     from ....models.orm.reinforcement import (
         PersonaFusionHistory, ReinforcementLearningResult, StrategyOptimizationResult,
@@ -40,6 +42,7 @@ try:
         AffectionInteraction, UserAffection, UserConversationHistory,
         UserDiversity,
     )
+    from ....models.orm.analytics import HourlyGroupRollup
     from ....models.orm.conversation_goal import ConversationGoal
     from ....models.orm.exemplar import Exemplar
     from ....models.orm.social_analysis import (
@@ -67,7 +70,9 @@ except ImportError:
     )
     from models.orm.jargon import Jargon, JargonUsageFrequency
     from models.orm.knowledge_graph import KGEntity, KGRelation, KGParagraphHash
-    from models.orm.memory import Memory, MemoryEmbedding, MemorySummary
+    from models.orm.memory import (
+        Memory, MemoryEmbedding, MemorySummary, MemoryGraphNode, MemoryGraphEdge,
+    )
     from models.orm.performance import LearningPerformanceHistory
     from models.orm.reinforcement import (
         PersonaFusionHistory, ReinforcementLearningResult, StrategyOptimizationResult,
@@ -82,6 +87,7 @@ except ImportError:
         AffectionInteraction, UserAffection, UserConversationHistory,
         UserDiversity,
     )
+    from models.orm.analytics import HourlyGroupRollup
     from models.orm.conversation_goal import ConversationGoal
     from models.orm.exemplar import Exemplar
     from models.orm.social_analysis import (
@@ -135,6 +141,7 @@ class AdminFacade(BaseFacade):
                     FilteredMessage, RawMessage, LearningBatch,
                     ReinforcementLearningResult, PersonaFusionHistory,
                     StrategyOptimizationResult, LearningPerformanceHistory,
+                    HourlyGroupRollup,
                 ]
                 await self._bulk_delete(session, tables)
                 await session.commit()
@@ -148,6 +155,8 @@ class AdminFacade(BaseFacade):
         RawMessage, FilteredMessage, BotMessage,
         ConversationContext, ConversationTopicClustering,
         ConversationQualityMetrics, ContextSimilarityCache,
+        # 小时汇总由上述消息表派生，一并清除以免趋势图残留旧数据
+        HourlyGroupRollup,
     ]
 
     async def clear_messages_data(self) -> Dict[str, Any]:
@@ -283,7 +292,9 @@ class AdminFacade(BaseFacade):
 
     # ── clear: memory ───────────────────────────────────────
 
-    _MEMORY_TABLES = [MemoryEmbedding, MemorySummary, Memory]
+    _MEMORY_TABLES = [
+        MemoryEmbedding, MemorySummary, Memory, MemoryGraphEdge, MemoryGraphNode,
+    ]
 
     async def clear_memory_data(self) -> Dict[str, Any]:
         """清除所有本地长期记忆数据"""
@@ -9,10 +9,14 @@ from astrbot.api import logger
 
 from ._base import BaseFacade
 try:
-    from ....repositories.affection_repository import AffectionRepository
+    from ....repositories.affection_repository import (
+        AffectionRepository, InteractionLabelRepository,
+    )
     from ....repositories.bot_mood_repository import BotMoodRepository
 except ImportError:
-    from repositories.affection_repository import AffectionRepository
+    from repositories.affection_repository import (
+        AffectionRepository, InteractionLabelRepository,
+    )
     from repositories.bot_mood_repository import BotMoodRepository
 
 
@@ -64,6 +68,18 @@ class AffectionFacade(BaseFacade):
             self._logger.error(f"[AffectionFacade] 更新好感度失败: {e}")
             return False
 
+    async def bulk_set_user_affections(self, group_id: str, levels: Dict[str, int]) -> bool:
+        """批量设置群组内多个用户的好感度（单次写入）"""
+        if not levels:
+            return True
+        try:
+            async with self.get_session() as session:
+                repo = AffectionRepository(session)
+                return await repo.bulk_set_levels(group_id, levels, max_affection=100)
+        except Exception as e:
+            self._logger.error(f"[AffectionFacade] 批量更新好感度失败: {e}")
+            return False
+
     async def get_all_user_affections(self, group_id: str) -> List[Dict[str, Any]]:
         """获取群组所有用户好感度"""
         try:
@@ -95,6 +111,38 @@ class AffectionFacade(BaseFacade):
             self._logger.error(f"[AffectionFacade] 获取总好感度失败: {e}")
             return 0
 
+    async def save_interaction_labels(self, labels: List[Dict[str, Any]]) -> bool:
+        """批量保存交互类型标注（按文本哈希去重）"""
+        if not labels:
+            return True
+        try:
+            async with self.get_session() as session:
+                repo = InteractionLabelRepository(session)
+                return await repo.save_labels(labels)
+        except Exception as e:
+            self._logger.error(f"[AffectionFacade] 保存交互标注失败: {e}")
+            return False
+
+    async def get_interaction_labels(self, limit: int = 5000) -> List[Dict[str, Any]]:
+        """获取最近的交互类型标注"""
+        try:
+            async with self.get_session() as session:
+                repo = InteractionLabelRepository(session)
+                labels = await repo.get_recent_labels(limit)
+                return [
+                    {
+                        'text_hash': label.text_hash,
+                        'normalized_text': label.normalized_text,
+                        'interaction_type': label.interaction_type,
+                        'source': label.source,
+                        'created_at': label.created_at,
+                    }
+                    for label in labels
+                ]
+        except Exception as e:
+            self._logger.error(f"[AffectionFacade] 获取交互标注失败: {e}")
+            return []
+
     async def save_bot_mood(
         self,
         group_id: str,
@@ -29,6 +29,28 @@ class MessageFacade(BaseFacade):
 
     # ---- 原始消息 ----
 
+    @staticmethod
+    def _build_raw_message(message_data, now: int) -> RawMessage:
+        """将消息对象或字典构造为 RawMessage ORM 实例"""
+        if hasattr(message_data, '__dict__'):
+            data = message_data.__dict__
+        else:
+            data = message_data
+
+        return RawMessage(
+            sender_id=str(data.get('sender_id', '')),
+            sender_name=data.get('sender_name', ''),
+            sender_qq=data.get('sender_qq') or None,
+            message=data.get('message', ''),
+            group_id=data.get('group_id', ''),
+            timestamp=int(data.get('timestamp', time.time())),
+            platform=data.get('platform', ''),
+            message_id=data.get('message_id'),
+            reply_to=data.get('reply_to'),
+            created_at=now,
+            processed=False,
+        )
+
     async def save_raw_message(self, message_data) -> int:
         """保存原始消息
 
@@ -40,25 +62,7 @@ class MessageFacade(BaseFacade):
         """
         try:
             async with self.get_session() as session:
-
-                if hasattr(message_data, '__dict__'):
-                    data = message_data.__dict__
-                else:
-                    data = message_data
-
-                raw_msg = RawMessage(
-                    sender_id=str(data.get('sender_id', '')),
-                    sender_name=data.get('sender_name', ''),
-                    sender_qq=data.get('sender_qq') or None,
-                    message=data.get('message', ''),
-                    group_id=data.get('group_id', ''),
-                    timestamp=int(data.get('timestamp', time.time())),
-                    platform=data.get('platform', ''),
-                    message_id=data.get('message_id'),
-                    reply_to=data.get('reply_to'),
-                    created_at=int(time.time()),
-                    processed=False,
-                )
+                raw_msg = self._build_raw_message(message_data, int(time.time()))
                 session.add(raw_msg)
                 await session.commit()
                 await session.refresh(raw_msg)
@@ -67,6 +71,33 @@ class MessageFacade(BaseFacade):
             self._logger.error(f"[MessageFacade] 保存原始消息失败: {e}")
             return 0
 
+    async def save_raw_messages_batch(self, messages: List[Any]) -> List[int]:
+        """在单个事务中批量保存原始消息
+
+        使用一次 ``add_all`` + 一次 commit；SQLAlchemy 2.x 会在支持
+        RETURNING 的方言上将其合并为多行 INSERT 并回填主键。
+
+        Args:
+            messages: 消息数据列表（对象或字典）
+
+        Returns:
+            List[int]: 与输入顺序一致的消息 ID 列表（失败返回空列表）
+        """
+        if not messages:
+            return []
+        try:
+            async with self.get_session() as session:
+                now = int(time.time())
+                rows = [self._build_raw_message(m, now) for m in messages]
+                session.add_all(rows)
+                await session.commit()
+                return [row.id or 0 for row in rows]
+        except Exception as e:
+            self._logger.error(
+                f"[MessageFacade] 批量保存原始消息失败 ({len(messages)} 条): {e}"
+            )
+            return []
+
     async def save_manual_memory(
         self,
         group_id: str,
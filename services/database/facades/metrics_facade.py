@@ -2,6 +2,7 @@
 指标聚合 Facade — 跨域统计指标的业务入口
 """
 import time
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
 from astrbot.api import logger
@@ -16,6 +17,9 @@ try:
         StyleLearningReview,
     )
     from ....models.orm.message import BotMessage, FilteredMessage, RawMessage
+    from ....repositories.analytics_rollup_repository import (
+        HOUR_SECONDS, HourlyRollupRepository, floor_hour,
+    )
 except ImportError:
     from models.orm.learning import (
         LearningBatch,
@@ -24,6 +28,11 @@ except ImportError:
         StyleLearningReview,
     )
     from models.orm.message import BotMessage, FilteredMessage, RawMessage
+    from repositories.analytics_rollup_repository import (
+        HOUR_SECONDS, HourlyRollupRepository, floor_hour,
+    )
+
+_WEEKDAYS = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
 
 
 class MetricsFacade(BaseFacade):
@@ -116,24 +125,20 @@ class MetricsFacade(BaseFacade):
             }
 
     async def get_trends_data(self) -> Dict[str, Any]:
-        """获取趋势数据"""
+        """获取趋势数据（每日消息数来自小时汇总表，未启用时直接聚合源表）"""
         try:
+            now = time.time()
+            start = self._local_midnight(now) - 6 * 86400
             async with self.get_session() as session:
-
-                # 过去7天每天的消息数
-                cutoff = int(time.time()) - (7 * 24 * 3600)
-                msg_stmt = (
-                    select(RawMessage)
-                    .where(RawMessage.timestamp >= cutoff)
-                    .order_by(RawMessage.timestamp)
+                hours = await self._load_hourly_totals(
+                    session, start, floor_hour(now) + HOUR_SECONDS
                 )
-                msg_result = await session.execute(msg_stmt)
-                messages = msg_result.scalars().all()
 
                 daily: Dict[str, int] = {}
-                for m in messages:
-                    day = time.strftime('%Y-%m-%d', time.localtime(m.timestamp))
-                    daily[day] = daily.get(day, 0) + 1
+                for row in hours:
+                    if row['raw_messages']:
+                        day = time.strftime('%Y-%m-%d', time.localtime(row['hour_start']))
+                        daily[day] = daily.get(day, 0) + row['raw_messages']
 
                 # 最近的学习批次
                 batch_stmt = (
@@ -151,3 +156,140 @@ class MetricsFacade(BaseFacade):
         except Exception as e:
             self._logger.error(f"[MetricsFacade] 获取趋势数据失败: {e}")
             return {'daily_messages': {}, 'recent_batches': []}
+
+    async def get_analytics_trends(self, group_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取分析趋势（24 小时趋势 + 7 天趋势 + 活跃热力图）
+
+        优先读取小时汇总表：最多 7×24 行，与历史数据量无关；汇总表未启用
+        或尚无数据时回退为对源表的按小时 GROUP BY。
+        """
+        now = time.time()
+        current_hour = floor_hour(now)
+        hourly_start = current_hour - 23 * HOUR_SECONDS
+        daily_start = self._local_midnight(now) - 6 * 86400
+        try:
+            async with self.get_session() as session:
+                rows = await self._load_hourly_totals(
+                    session, min(hourly_start, daily_start),
+                    current_hour + HOUR_SECONDS, group_id,
+                )
+        except Exception as e:
+            self._logger.error(f"[MetricsFacade] 获取分析趋势失败: {e}")
+            rows = []
+
+        by_hour = {row['hour_start']: row for row in rows}
+        empty: Dict[str, Any] = {}
+
+        hourly_trends = []
+        for i in range(24):
+            hour_start = hourly_start + i * HOUR_SECONDS
+            row = by_hour.get(hour_start, empty)
+            calls = row.get('llm_calls', 0)
+            hourly_trends.append({
+                'time': time.strftime('%H:%M', time.localtime(hour_start)),
+                'raw_messages': row.get('raw_messages', 0),
+                'filtered_messages': row.get('filtered_messages', 0),
+                'active_users': row.get('active_users', 0),
+                'llm_calls': calls,
+                'response_time': round(row.get('llm_response_ms', 0.0) / calls) if calls else 0,
+            })
+
+        first_day = datetime.fromtimestamp(daily_start).date()
+        days: Dict[Any, Dict[str, int]] = {
+            first_day + timedelta(days=i): {
+                'total_messages': 0, 'learning_sessions': 0,
+                'learning_successes': 0, 'persona_updates': 0,
+            }
+            for i in range(7)
+        }
+        heatmap: Dict[tuple, int] = {}
+        for row in rows:
+            if row['hour_start'] < daily_start:
+                continue
+            local = datetime.fromtimestamp(row['hour_start'])
+            day = days.get(local.date())
+            if day is not None:
+                day['total_messages'] += row['raw_messages']
+                day['learning_sessions'] += row['learning_batches']
+                day['learning_successes'] += row['learning_successes']
+                day['persona_updates'] += row['persona_updates']
+            key = (local.hour, local.weekday())
+            heatmap[key] = heatmap.get(key, 0) + row['raw_messages']
+
+        daily_trends = [
+            {
+                'date': date.strftime('%m-%d'),
+                'total_messages': values['total_messages'],
+                'learning_sessions': values['learning_sessions'],
+                'persona_updates': values['persona_updates'],
+                'success_rate': round(
+                    values['learning_successes'] / values['learning_sessions'], 2
+                ) if values['learning_sessions'] else 0.0,
+            }
+            for date, values in days.items()
+        ]
+
+        return {
+            'hourly_trends': hourly_trends,
+            'daily_trends': daily_trends,
+            'activity_heatmap': {
+                'data': [
+                    [hour, day_idx, heatmap.get((hour, day_idx), 0)]
+                    for day_idx in range(7) for hour in range(24)
+                ],
+                'days': _WEEKDAYS,
+                'hours': [f"{i}:00" for i in range(24)],
+            },
+        }
+
+    async def refresh_hourly_rollups(
+        self, start_ts: float, end_ts: Optional[float] = None
+    ) -> Optional[int]:
+        """从源表重算 [start_ts, end_ts) 的小时汇总，返回写入的小时桶数；失败返回 None"""
+        try:
+            async with self.get_session() as session:
+                return await HourlyRollupRepository(session).rebuild_hours(
+                    start_ts, end_ts if end_ts is not None else time.time() + 1
+                )
+        except Exception as e:
+            self._logger.error(f"[MetricsFacade] 重算小时汇总失败: {e}")
+            return None
+
+    async def record_llm_usage(
+        self, calls: int, response_ms: float, timestamp: Optional[float] = None
+    ) -> bool:
+        """累加 LLM 调用次数与耗时到对应小时的全局汇总"""
+        try:
+            async with self.get_session() as session:
+                return await HourlyRollupRepository(session).add_llm_usage(
+                    floor_hour(timestamp if timestamp is not None else time.time()),
+                    calls, response_ms,
+                )
+        except Exception as e:
+            self._logger.error(f"[MetricsFacade] 记录 LLM 调用汇总失败: {e}")
+            return False
+
+    async def get_latest_rollup_hour(self) -> Optional[int]:
+        """最近一个已汇总的小时起点，尚无汇总时返回 None"""
+        try:
+            async with self.get_session() as session:
+                return await HourlyRollupRepository(session).get_latest_hour()
+        except Exception as e:
+            self._logger.error(f"[MetricsFacade] 获取汇总进度失败: {e}")
+            return None
+
+    async def _load_hourly_totals(
+        self, session, start_ts: float, end_ts: float, group_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """小时指标：汇总表可用时读汇总表，否则直接聚合源表"""
+        repo = HourlyRollupRepository(session)
+        if getattr(self.config, 'analytics_rollup_enabled', True) \
+                and await repo.get_latest_hour() is not None:
+            return await repo.get_hourly_totals(start_ts, end_ts, group_id)
+        return await repo.compute_hourly_totals(start_ts, end_ts, group_id)
+
+    @staticmethod
+    def _local_midnight(timestamp: float) -> float:
+        local = datetime.fromtimestamp(timestamp)
+        return local.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
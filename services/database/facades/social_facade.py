@@ -238,7 +238,12 @@ class SocialFacade(BaseFacade):
                 )
                 session.add(component)
                 await session.commit()
-                return True
+            _notify_social_graph_index(
+                'upsert_component', group_id, component.from_user_id,
+                component.to_user_id, component.relation_type,
+                component.value, component.frequency,
+            )
+            return True
         except Exception as e:
             self._logger.error(f"[SocialFacade] 保存社交关系失败: {e}")
             return False
@@ -268,3 +273,15 @@ class SocialFacade(BaseFacade):
         except Exception as e:
             self._logger.error(f"[SocialFacade] 获取用户社交关系失败: {e}")
             return {'user_id': user_id, 'group_id': group_id, 'relations': []}
+
+
+def _notify_social_graph_index(method: str, *args) -> None:
+    """把已提交的关系写入同步到内存社交图索引（失败不影响写库结果）"""
+    try:
+        try:
+            from ....services.social.social_graph_index import get_social_graph_index
+        except ImportError:
+            from services.social.social_graph_index import get_social_graph_index
+        getattr(get_social_graph_index(), method)(*args)
+    except Exception as e:
+        logger.debug(f"[SocialFacade] 更新社交图索引失败: {e}")
@@ -221,6 +221,14 @@ class SQLAlchemyDatabaseManager:
             'recent_batches': [],
         }
 
+    @staticmethod
+    def _empty_analytics_trends() -> Dict[str, Any]:
+        return {
+            'hourly_trends': [],
+            'daily_trends': [],
+            'activity_heatmap': {'data': [], 'days': [], 'hours': []},
+        }
+
     @staticmethod
     def _empty_jargon_statistics() -> Dict[str, Any]:
         return {
@@ -594,12 +602,21 @@ class SQLAlchemyDatabaseManager:
             group_id, user_id, new_level, change_reason, bot_mood,
         )
 
+    async def bulk_set_user_affections(self, group_id: str, levels: Dict[str, int]) -> bool:
+        return await self._affection.bulk_set_user_affections(group_id, levels)
+
     async def get_all_user_affections(self, group_id: str) -> List[Dict[str, Any]]:
         return await self._affection.get_all_user_affections(group_id)
 
     async def get_total_affection(self, group_id: str) -> int:
         return await self._affection.get_total_affection(group_id)
 
+    async def save_interaction_labels(self, labels: List[Dict[str, Any]]) -> bool:
+        return await self._affection.save_interaction_labels(labels)
+
+    async def get_interaction_labels(self, limit: int = 5000) -> List[Dict[str, Any]]:
+        return await self._affection.get_interaction_labels(limit)
+
     async def save_bot_mood(
         self, group_id: str, mood_type: str, mood_intensity: float,
         mood_description: str, duration_hours: int = 24,
@@ -616,6 +633,9 @@ class SQLAlchemyDatabaseManager:
     async def save_raw_message(self, message_data) -> int:
         return await self._message.save_raw_message(message_data)
 
+    async def save_raw_messages_batch(self, messages: List[Any]) -> List[int]:
+        return await self._message.save_raw_messages_batch(messages)
+
     async def save_manual_memory(
         self,
         group_id: str,
@@ -1319,6 +1339,26 @@ class SQLAlchemyDatabaseManager:
     async def get_trends_data(self) -> Dict[str, Any]:
         return await self._call_metrics("get_trends_data", self._empty_trends_data())
 
+    async def get_analytics_trends(self, group_id: str = None) -> Dict[str, Any]:
+        return await self._call_metrics(
+            "get_analytics_trends", self._empty_analytics_trends(), group_id,
+        )
+
+    async def refresh_hourly_rollups(
+        self, start_ts: float, end_ts: Optional[float] = None,
+    ) -> Optional[int]:
+        return await self._call_metrics("refresh_hourly_rollups", None, start_ts, end_ts)
+
+    async def record_llm_usage(
+        self, calls: int, response_ms: float, timestamp: Optional[float] = None,
+    ) -> bool:
+        return await self._call_metrics(
+            "record_llm_usage", False, calls, response_ms, timestamp,
+        )
+
+    async def get_latest_rollup_hour(self) -> Optional[int]:
+        return await self._call_metrics("get_latest_rollup_hour", None)
+
     # Domain delegates: AdminFacade
 
     async def clear_all_messages_data(self) -> bool:
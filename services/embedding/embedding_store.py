@@ -0,0 +1,221 @@
+"""
+Persistent embedding store.
+
+SQLite-backed second cache tier behind ``FrameworkEmbeddingAdapter``'s
+in-memory LRU. Vectors are keyed by a content hash of
+``(model name, dimensions, text)``, so switching the embedding model or
+its output size never returns a stale vector, and the same text embedded
+by the exemplar library, LightRAG and Mem0 is paid for only once — also
+across restarts.
+
+Vectors are stored as packed little-endian float32. The store is bounded
+by ``max_entries``; the least recently used rows are pruned once the
+table grows past it. All SQLite work runs in a worker thread so the
+event loop never blocks on disk I/O. While the store is known to be
+empty (no file yet, or an empty table and nothing written since),
+lookups return immediately without a worker-thread round trip.
+
+Usage::
+
+    store = EmbeddingDiskStore(os.path.join(data_dir, "embedding_cache.db"))
+    hits = await store.get_many("text-embedding-3-small", 1536, texts)
+    await store.put_many("text-embedding-3-small", 1536, {text: vec})
+    await store.close()
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from astrbot.api import logger
+
+# Prune back to this fraction of ``max_entries`` when over capacity.
+_PRUNE_TARGET_RATIO = 0.9
+
+# Check the row count every N inserted vectors.
+_PRUNE_CHECK_INTERVAL = 256
+
+# SQLite host-parameter limit headroom for ``IN (...)`` lookups.
+_LOOKUP_CHUNK = 500
+
+
+class EmbeddingDiskStore:
+    """Content-hash keyed on-disk embedding cache.
+
+    Args:
+        path: SQLite database file path (created on first use).
+        max_entries: Upper bound on stored vectors; LRU rows beyond it
+            are pruned.
+    """
+
+    # Paths any store in this process has written to; several adapters
+    # may share one cache file.
+    _populated_paths: Set[str] = set()
+
+    def __init__(self, path: str, max_entries: int = 200_000) -> None:
+        self._path = path
+        self._max_entries = max(1, int(max_entries))
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self._disabled = False
+        # True while the table is known to hold no vectors; None = unknown.
+        self._empty: Optional[bool] = None
+
+    # Public API
+
+    async def get_many(
+        self, model: str, dims: int, texts: List[str]
+    ) -> Dict[str, List[float]]:
+        """Return stored vectors for ``texts`` (missing texts are omitted)."""
+        if self._disabled or not texts or self._known_empty():
+            return {}
+        try:
+            return await asyncio.to_thread(self._get_many, model, dims, texts)
+        except Exception as exc:
+            logger.debug(f"[EmbeddingStore] Lookup failed: {exc}")
+            return {}
+
+    async def put_many(
+        self, model: str, dims: int, vectors: Dict[str, List[float]]
+    ) -> None:
+        """Store vectors for texts, replacing existing entries."""
+        if self._disabled or not vectors:
+            return
+        try:
+            await asyncio.to_thread(self._put_many, model, dims, vectors)
+        except Exception as exc:
+            logger.debug(f"[EmbeddingStore] Write failed: {exc}")
+            return
+        self._empty = False
+        self._populated_paths.add(self._path)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    def _known_empty(self) -> bool:
+        if self._path in self._populated_paths:
+            return False
+        if self._empty is None and not os.path.exists(self._path):
+            self._empty = True
+        return self._empty is True
+
+    # Internal helpers (worker thread)
+
+    @staticmethod
+    def _key(model: str, dims: int, text: str) -> bytes:
+        return hashlib.sha256(
+            f"{model}\x00{dims}\x00{text}".encode("utf-8")
+        ).digest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            try:
+                conn = sqlite3.connect(self._path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                    " key BLOB PRIMARY KEY,"
+                    " vector BLOB NOT NULL,"
+                    " last_used INTEGER NOT NULL"
+                    ") WITHOUT ROWID"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used"
+                    " ON embedding_cache (last_used)"
+                )
+                conn.commit()
+                if self._empty is None:
+                    self._empty = conn.execute(
+                        "SELECT 1 FROM embedding_cache LIMIT 1"
+                    ).fetchone() is None
+            except Exception:
+                # An unusable file disables the tier instead of failing
+                # every embedding call.
+                self._disabled = True
+                raise
+            self._conn = conn
+        return self._conn
+
+    def _get_many(
+        self, model: str, dims: int, texts: List[str]
+    ) -> Dict[str, List[float]]:
+        by_key = {self._key(model, dims, text): text for text in texts}
+        keys = list(by_key)
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embedding_cache "
+                    f"WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    if len(blob) != dims * 4:
+                        continue
+                    found[by_key[bytes(key)]] = list(
+                        struct.unpack(f"<{dims}f", blob)
+                    )
+            if found:
+                now = int(time.time())
+                conn.executemany(
+                    "UPDATE embedding_cache SET last_used = ? WHERE key = ?",
+                    [(now, self._key(model, dims, t)) for t in found],
+                )
+                conn.commit()
+        return found
+
+    def _put_many(
+        self, model: str, dims: int, vectors: Dict[str, List[float]]
+    ) -> None:
+        now = int(time.time())
+        rows = [
+            (self._key(model, dims, text), struct.pack(f"<{dims}f", *vec), now)
+            for text, vec in vectors.items()
+            if len(vec) == dims
+        ]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, vector, last_used)"
+                " VALUES (?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+            self._puts_since_prune += len(rows)
+            if self._puts_since_prune >= _PRUNE_CHECK_INTERVAL:
+                self._puts_since_prune = 0
+                self._prune(conn)
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        count = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        if count <= self._max_entries:
+            return
+        excess = count - int(self._max_entries * _PRUNE_TARGET_RATIO)
+        conn.execute(
+            "DELETE FROM embedding_cache WHERE key IN ("
+            " SELECT key FROM embedding_cache ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        conn.commit()
+        logger.debug(f"[EmbeddingStore] Pruned {excess} least recently used vectors")
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
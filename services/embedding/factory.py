@@ -9,7 +9,8 @@ This follows the same pattern as the plugin's ``FrameworkLLMAdapter``:
 wrapped in a thin adapter.
 """
 
-from typing import Optional
+import os
+from typing import Any, Dict, Optional
 
 from astrbot.api import logger
 from astrbot.core.provider.provider import EmbeddingProvider
@@ -21,6 +22,7 @@ from ..provider_registry import (
     normalize_provider_id,
 )
 from .base import IEmbeddingProvider
+from .embedding_store import EmbeddingDiskStore
 from .framework_adapter import FrameworkEmbeddingAdapter
 
 
@@ -39,8 +41,12 @@ class EmbeddingProviderFactory:
         """Create an embedding provider from plugin configuration.
 
         Args:
-            config: ``PluginConfig`` instance.  Expected field:
+            config: ``PluginConfig`` instance.  Expected fields:
                 - ``embedding_provider_id``: AstrBot provider ID string.
+                - ``embedding_disk_cache_enabled`` / ``data_dir``: enable
+                  the persistent embedding cache under ``data_dir``.
+                - ``embedding_batch_max_size`` / ``embedding_batch_max_wait_ms``:
+                  micro-batching of concurrent single-text requests.
             context: AstrBot plugin context (provides ``get_provider_by_id``).
 
         Returns:
@@ -66,12 +72,37 @@ class EmbeddingProviderFactory:
             return None
 
         return EmbeddingProviderFactory._resolve_framework_provider(
-            provider_id, context
+            provider_id,
+            context,
+            adapter_options=EmbeddingProviderFactory._adapter_options(config),
         )
 
+    @staticmethod
+    def _adapter_options(config) -> Dict[str, Any]:
+        """Adapter keyword arguments (cache tier, micro-batching) from config."""
+        options: Dict[str, Any] = {}
+        data_dir = getattr(config, "data_dir", None)
+        if data_dir and getattr(config, "embedding_disk_cache_enabled", False):
+            options["disk_store"] = EmbeddingDiskStore(
+                os.path.join(data_dir, "embedding_cache.db"),
+                max_entries=getattr(
+                    config, "embedding_disk_cache_max_entries", 200_000
+                ),
+            )
+        for option, attr in (
+            ("batch_max_size", "embedding_batch_max_size"),
+            ("batch_max_wait_ms", "embedding_batch_max_wait_ms"),
+        ):
+            value = getattr(config, attr, None)
+            if isinstance(value, (int, float)):
+                options[option] = value
+        return options
+
     @staticmethod
     def _resolve_framework_provider(
-        provider_id: str, context
+        provider_id: str,
+        context,
+        adapter_options: Optional[Dict[str, Any]] = None,
     ) -> Optional[IEmbeddingProvider]:
         """Resolve the framework provider by ID and wrap in adapter."""
         providers, inspected, errors = collect_framework_providers(
@@ -87,7 +118,7 @@ class EmbeddingProviderFactory:
             provider = find_provider_by_id(providers, provider_id)
             if provider is not None:
                 return EmbeddingProviderFactory._wrap_provider(
-                    provider_id, provider
+                    provider_id, provider, adapter_options
                 )
 
             if not providers:
@@ -134,12 +165,15 @@ class EmbeddingProviderFactory:
             )
             return None
 
-        return EmbeddingProviderFactory._wrap_provider(provider_id, provider)
+        return EmbeddingProviderFactory._wrap_provider(
+            provider_id, provider, adapter_options
+        )
 
     @staticmethod
     def _wrap_provider(
         provider_id: str,
         provider: EmbeddingProvider,
+        adapter_options: Optional[Dict[str, Any]] = None,
     ) -> Optional[IEmbeddingProvider]:
         """Validate and wrap an already-resolved framework provider."""
         if not isinstance(provider, EmbeddingProvider):
@@ -149,7 +183,7 @@ class EmbeddingProviderFactory:
             )
             return None
 
-        adapter = FrameworkEmbeddingAdapter(provider)
+        adapter = FrameworkEmbeddingAdapter(provider, **(adapter_options or {}))
         logger.info(
             f"[EmbeddingFactory] Resolved embedding provider: "
             f"id={provider_id}, model={adapter.get_model_name()}, "
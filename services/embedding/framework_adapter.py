@@ -5,9 +5,17 @@ Thin adapter that wraps AstrBot's ``EmbeddingProvider`` instance behind the
 plugin's ``IEmbeddingProvider`` interface. All heavy lifting (HTTP calls,
 batching, retries, connection pooling) is delegated to the framework provider.
 
-Includes a per-text TTL cache so that repeated embedding requests for the
-same text (common across ExemplarLibrary, LightRAG, etc.) hit memory instead
-of the remote API.
+Includes a per-text LRU/TTL cache so that repeated embedding requests for
+the same text (common across ExemplarLibrary, LightRAG, etc.) hit memory
+instead of the remote API. An optional ``EmbeddingDiskStore`` adds a
+persistent second tier keyed by model name + dimensions + content hash, so
+vectors also survive restarts.
+
+Single-text misses from concurrent callers (LLM hook, exemplar screening,
+LightRAG bridge, ...) are micro-batched: distinct texts are collected for
+at most ``batch_max_wait_ms`` (or until ``batch_max_size`` texts are
+pending) and sent as one ``get_embeddings`` call whose results are fanned
+back out to the waiting callers.
 
 Usage::
 
@@ -19,19 +27,25 @@ Usage::
 """
 
 import asyncio
-import time
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from astrbot.api import logger
 from astrbot.core.provider.provider import EmbeddingProvider
 
 from .base import IEmbeddingProvider, EmbeddingProviderError
+from .embedding_store import EmbeddingDiskStore
 from ..monitoring.instrumentation import monitored
+from ..monitoring.metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_CALLS_SAVED_TOTAL
+from ...utils.cache_manager import TTLCache
 
 # Embedding cache parameters.
 _CACHE_TTL = 300  # seconds (5 minutes)
 _MAX_CACHE_SIZE = 500
 
+# Micro-batching defaults for single-text requests.
+_BATCH_MAX_SIZE = 32
+_BATCH_MAX_WAIT_MS = 5.0
+
 
 class FrameworkEmbeddingAdapter(IEmbeddingProvider):
     """Adapter bridging AstrBot ``EmbeddingProvider`` -> plugin ``IEmbeddingProvider``.
@@ -41,29 +55,52 @@ class FrameworkEmbeddingAdapter(IEmbeddingProvider):
 
     Args:
         provider: A fully-initialised AstrBot ``EmbeddingProvider`` instance.
+        disk_store: Optional persistent second cache tier.
+        batch_max_size: Pending distinct texts that trigger an immediate
+            batched call (1 disables micro-batching).
+        batch_max_wait_ms: Longest a single-text request waits for other
+            texts to join its batch.
     """
 
-    def __init__(self, provider: EmbeddingProvider) -> None:
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        disk_store: Optional[EmbeddingDiskStore] = None,
+        batch_max_size: int = _BATCH_MAX_SIZE,
+        batch_max_wait_ms: float = _BATCH_MAX_WAIT_MS,
+    ) -> None:
         if provider is None:
             raise ValueError("provider must not be None")
         self._provider = provider
-        # Per-text TTL cache: text -> (timestamp, vector).
-        self._embed_cache: Dict[str, Tuple[float, List[float]]] = {}
+        # Per-text LRU cache with TTL (O(1) get/put/evict): text -> vector.
+        self._embed_cache: TTLCache = TTLCache(
+            maxsize=_MAX_CACHE_SIZE, ttl=_CACHE_TTL
+        )
+        self._disk_store = disk_store
+        self._store_namespace: Optional[Tuple[str, int]] = None
         # In-flight request deduplication: text -> Future.
         # Prevents concurrent calls for the same text from each making
         # a separate API request.
         self._inflight: Dict[str, asyncio.Future] = {}
+        # Micro-batching: texts waiting for the next batched provider call.
+        self._batch_max_size = max(1, int(batch_max_size))
+        self._batch_max_wait = max(0.0, float(batch_max_wait_ms)) / 1000.0
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._batch_stats: Dict[str, int] = {
+            "batches": 0,
+            "texts": 0,
+            "saved_calls": 0,
+        }
 
     # IEmbeddingProvider implementation
 
     @monitored
     async def get_embedding(self, text: str) -> List[float]:
         cached = self._embed_cache.get(text)
-        if cached:
-            ts, vec = cached
-            if time.time() - ts < _CACHE_TTL:
-                return vec
-            del self._embed_cache[text]
+        if cached is not None:
+            return cached
 
         # Request coalescing: if another coroutine is already fetching this
         # exact text, wait on the same future instead of issuing a second call.
@@ -75,14 +112,25 @@ class FrameworkEmbeddingAdapter(IEmbeddingProvider):
         self._inflight[text] = fut
 
         try:
-            # Route through the batch API which is ~20x faster than the
-            # single-text provider path on most framework backends.
-            vecs = await self._provider.get_embeddings([text])
-            vec = vecs[0]
+            stored = await self._disk_get([text])
+            if text in stored:
+                vec = stored[text]
+                self._embed_cache[text] = vec
+                fut.set_result(vec)
+                return vec
+            # Join the next micro-batch; concurrent misses share one
+            # get_embeddings call.
+            vec = await self._enqueue(text)
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
         except Exception as exc:
             fut.set_exception(EmbeddingProviderError(
                 f"Framework embedding call failed: {exc}"
             ))
+            # Duplicate waiters (if any) still see the error; this only
+            # silences the "exception never retrieved" warning.
+            fut.exception()
             raise EmbeddingProviderError(
                 f"Framework embedding call failed: {exc}"
             ) from exc
@@ -91,7 +139,8 @@ class FrameworkEmbeddingAdapter(IEmbeddingProvider):
         finally:
             self._inflight.pop(text, None)
 
-        self._cache_put(text, vec)
+        self._embed_cache[text] = vec
+        await self._disk_put({text: vec})
         return vec
 
     @monitored
@@ -99,19 +148,33 @@ class FrameworkEmbeddingAdapter(IEmbeddingProvider):
         if not texts:
             raise ValueError("texts must be a non-empty list")
 
-        now = time.time()
         results: List[List[float] | None] = [None] * len(texts)
         uncached_indices: List[int] = []
         uncached_texts: List[str] = []
 
         for i, text in enumerate(texts):
             cached = self._embed_cache.get(text)
-            if cached and now - cached[0] < _CACHE_TTL:
-                results[i] = cached[1]
+            if cached is not None:
+                results[i] = cached
             else:
                 uncached_indices.append(i)
                 uncached_texts.append(text)
 
+        if uncached_texts:
+            stored = await self._disk_get(list(dict.fromkeys(uncached_texts)))
+            if stored:
+                missing_indices: List[int] = []
+                missing_texts: List[str] = []
+                for idx, text in zip(uncached_indices, uncached_texts):
+                    vec = stored.get(text)
+                    if vec is not None:
+                        results[idx] = vec
+                        self._embed_cache[text] = vec
+                    else:
+                        missing_indices.append(idx)
+                        missing_texts.append(text)
+                uncached_indices, uncached_texts = missing_indices, missing_texts
+
         if uncached_texts:
             try:
                 new_vecs = await self._provider.get_embeddings(uncached_texts)
@@ -121,7 +184,8 @@ class FrameworkEmbeddingAdapter(IEmbeddingProvider):
                 ) from exc
             for idx, text, vec in zip(uncached_indices, uncached_texts, new_vecs):
                 results[idx] = vec
-                self._cache_put(text, vec)
+                self._embed_cache[text] = vec
+            await self._disk_put(dict(zip(uncached_texts, new_vecs)))
 
         return results  # type: ignore[return-value]
 
@@ -131,9 +195,23 @@ class FrameworkEmbeddingAdapter(IEmbeddingProvider):
     def get_model_name(self) -> str:
         return self._provider.get_model()
 
+    def get_batch_stats(self) -> Dict[str, Any]:
+        """Micro-batching counters: batches sent, texts, calls saved."""
+        stats: Dict[str, Any] = dict(self._batch_stats)
+        stats["pending"] = len(self._pending)
+        stats["avg_batch_size"] = round(
+            stats["texts"] / stats["batches"], 2
+        ) if stats["batches"] else 0.0
+        return stats
+
     async def close(self) -> None:
-        # Framework manages its own provider lifecycle; nothing to release.
-        pass
+        # Framework manages its own provider lifecycle; only pending batches
+        # and the disk tier are ours.
+        self._flush_pending()
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        if self._disk_store is not None:
+            await self._disk_store.close()
 
     # Extended helpers (delegated to framework)
 
@@ -171,11 +249,92 @@ class FrameworkEmbeddingAdapter(IEmbeddingProvider):
         except (ValueError, KeyError):
             return "<unknown>"
 
+    # Micro-batching
+
+    async def _enqueue(self, text: str) -> List[float]:
+        """Add ``text`` to the pending batch and wait for its vector."""
+        fut = self._pending.get(text)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            self._pending[text] = fut
+            if len(self._pending) >= self._batch_max_size:
+                self._flush_pending()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(
+                    self._batch_max_wait, self._flush_pending
+                )
+        return await fut
+
+    def _flush_pending(self) -> None:
+        """Send all pending texts as one batch (runs in a task)."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: Dict[str, asyncio.Future]) -> None:
+        texts = list(batch)
+        try:
+            vecs = await self._provider.get_embeddings(texts)
+            if len(vecs) != len(texts):
+                raise ValueError(
+                    f"provider returned {len(vecs)} vectors for {len(texts)} texts"
+                )
+        except Exception as exc:
+            for fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+
+        for text, vec in zip(texts, vecs):
+            fut = batch[text]
+            if not fut.done():
+                fut.set_result(vec)
+
+        saved = len(texts) - 1
+        self._batch_stats["batches"] += 1
+        self._batch_stats["texts"] += len(texts)
+        self._batch_stats["saved_calls"] += saved
+        EMBEDDING_BATCH_SIZE.observe(len(texts))
+        if saved:
+            EMBEDDING_CALLS_SAVED_TOTAL.inc(saved)
+
     # Cache helpers
 
-    def _cache_put(self, text: str, vec: List[float]) -> None:
-        """Store an embedding in the TTL cache, evicting the oldest if full."""
-        if len(self._embed_cache) >= _MAX_CACHE_SIZE:
-            oldest = min(self._embed_cache, key=lambda k: self._embed_cache[k][0])
-            del self._embed_cache[oldest]
-        self._embed_cache[text] = (time.time(), vec)
+    def _namespace(self) -> Optional[Tuple[str, int]]:
+        """``(model, dims)`` that scope disk entries, or ``None`` if unknown."""
+        if self._store_namespace is None:
+            try:
+                self._store_namespace = (
+                    str(self._provider.get_model()),
+                    int(self._provider.get_dim()),
+                )
+            except Exception as exc:
+                logger.debug(
+                    f"[EmbeddingAdapter] Disk cache disabled, model/dim "
+                    f"unavailable: {exc}"
+                )
+                self._disk_store = None
+                return None
+        return self._store_namespace
+
+    async def _disk_get(self, texts: List[str]) -> Dict[str, List[float]]:
+        if self._disk_store is None:
+            return {}
+        namespace = self._namespace()
+        if namespace is None:
+            return {}
+        return await self._disk_store.get_many(*namespace, texts)
+
+    async def _disk_put(self, vectors: Dict[str, List[float]]) -> None:
+        if self._disk_store is None:
+            return
+        namespace = self._namespace()
+        if namespace is not None:
+            await self._disk_store.put_many(*namespace, vectors)
@@ -19,6 +19,7 @@ from typing import Any, Dict, List, Optional
 from astrbot.api import logger
 from astrbot.api.event import AstrMessageEvent
 
+from ...core.llm_scheduler import PRIORITY_INTERACTIVE, llm_priority
 from ..monitoring.instrumentation import monitored
 try:
     from ...config import CACHE_FRIENDLY_LLM_HOOK_TARGET, LEGACY_LLM_HOOK_TARGETS
@@ -92,7 +93,15 @@ class LLMHookHandler:
 
     @monitored
     async def handle(self, event: AstrMessageEvent, req: Any) -> None:
-        """Process an LLM request hook — inject context into *req*."""
+        """Process an LLM request hook — inject context into *req*.
+
+        Any LLM calls made by the context providers are scheduled with
+        interactive priority, ahead of realtime and batch learning work.
+        """
+        with llm_priority(PRIORITY_INTERACTIVE):
+            await self._handle(event, req)
+
+    async def _handle(self, event: AstrMessageEvent, req: Any) -> None:
         hook_start = time.time()
         social_ms = v2_ms = diversity_ms = jargon_ms = few_shots_ms = shadow_ms = 0.0
 
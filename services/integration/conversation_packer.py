@@ -0,0 +1,80 @@
+"""
+Conversation-window packing for batched knowledge/memory ingestion.
+
+Buffered chat messages are packed, in order, into a few documents whose
+estimated token count stays within a budget (LightRAG's
+``chunk_token_size``). Ingesting one multi-document batch instead of one
+document per message turns N extraction passes into roughly
+``total_tokens / budget`` passes, and gives the extractor the
+surrounding conversation instead of isolated lines.
+
+Token counts are estimated without a tokenizer: each CJK character
+counts as one token and other text as one token per four characters,
+which is close enough for budgeting.
+"""
+
+from typing import List
+
+from ...core.interfaces import MessageData
+
+# Unicode ranges counted as one token per character.
+_CJK_RANGES = (
+    (0x3040, 0x30FF),    # Hiragana / Katakana
+    (0x3400, 0x4DBF),    # CJK Extension A
+    (0x4E00, 0x9FFF),    # CJK Unified Ideographs
+    (0xAC00, 0xD7AF),    # Hangul syllables
+    (0xF900, 0xFAFF),    # CJK Compatibility Ideographs
+    (0xFF00, 0xFFEF),    # Full-width forms
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for budgeting (no tokenizer dependency)."""
+    cjk = 0
+    for ch in text:
+        code = ord(ch)
+        for low, high in _CJK_RANGES:
+            if low <= code <= high:
+                cjk += 1
+                break
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def format_message_line(message: MessageData, min_length: int = 1) -> str:
+    """Render a message as ``[sender]: text``; empty if too short."""
+    text = (getattr(message, "message", "") or "").strip()
+    if len(text) < min_length:
+        return ""
+    sender = getattr(message, "sender_name", None) or "Unknown"
+    return f"[{sender}]: {text}"
+
+
+def group_conversation_windows(
+    lines: List[str], max_tokens: int
+) -> List[List[str]]:
+    """Split lines, in order, into windows of <= ``max_tokens`` each.
+
+    A single line longer than the budget forms its own window (the
+    downstream chunker splits it further).
+    """
+    max_tokens = max(1, int(max_tokens))
+    windows: List[List[str]] = []
+    window: List[str] = []
+    window_tokens = 0
+    for line in lines:
+        if not line:
+            continue
+        tokens = estimate_tokens(line) + 1  # +1 for the joining newline
+        if window and window_tokens + tokens > max_tokens:
+            windows.append(window)
+            window, window_tokens = [], 0
+        window.append(line)
+        window_tokens += tokens
+    if window:
+        windows.append(window)
+    return windows
+
+
+def pack_conversation_windows(lines: List[str], max_tokens: int) -> List[str]:
+    """Like ``group_conversation_windows`` but joins each window into a document."""
+    return ["\n".join(window) for window in group_conversation_windows(lines, max_tokens)]
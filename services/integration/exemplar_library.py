@@ -9,37 +9,76 @@ similarity search uses vector cosine distance. Without an embedding
 provider the library degrades to recency-weighted random sampling.
 
 Performance notes:
-    - An in-memory vector index (per-group TTL cache) avoids repeated
-      DB loads and JSON deserialization on every query.
-    - When numpy is available, cosine similarity is computed via a single
-      matrix–vector multiply (~1000x faster than the pure-Python fallback).
-    - Similarity search loads at most ``_SIMILARITY_SEARCH_LIMIT`` exemplars
-      (by weight desc) to bound DB I/O and memory.
+    - Each group's vectors live in an in-memory vector index (see
+      ``vector_index``), so retrieval considers *every* exemplar of the
+      group, not just the highest-weighted ones. The default ``flat``
+      index is an exact scan. ``ivf`` is opt-in for caps well above
+      ``_IVF_TRAIN_THRESHOLD`` rows: it scans only the nearest k-means
+      partitions at sub-linear cost, and below that size it stays
+      untrained and behaves exactly like ``flat``.
+    - The index is maintained incrementally by ``add_exemplar``,
+      ``delete_exemplar``, ``adjust_weight`` and capacity eviction. An
+      incremental add that makes the IVF quantiser due for retraining
+      retrains in a worker thread, like a full rebuild. The index is
+      only rebuilt when the DB signature changes behind our back (e.g. a
+      write from another instance), checked at most every
+      ``_VECTOR_CACHE_TTL`` seconds.
+    - Vectors are stored as packed little-endian float32 (or float16)
+      blobs and decoded with ``np.frombuffer`` instead of ``json.loads``.
+    - When an index directory is configured, each group's L2-normalised
+      matrix is also written to an ``.npy`` file and reopened with
+      ``mmap_mode="r"`` on a cold cache, so a cold load costs one aggregate
+      query plus a map instead of fetching and decoding every vector row.
+      The ``flat`` index searches the mapped array in place until the
+      group is next modified; ``ivf`` routes it into its partitions.
+      The file is validated against a cheap DB signature (row count,
+      max id, max ``updated_at``, weight sum) and rebuilt when stale.
+    - Without numpy the library falls back to a pure-Python linear scan.
+    - The index returns ``max(k * _CANDIDATE_MULTIPLIER, _MIN_CANDIDATES)``
+      nearest candidates, which are then re-ranked with the quality
+      weight (``cosine * 0.8 + weight * 0.2``).
 
 Design notes:
-    - Embedding vectors stored as JSON text columns for DB portability.
+    - Embedding vectors are stored in the ``embedding_blob`` binary column;
+      the element width is implied by ``len(blob) // dimensions``. Legacy
+      ``embedding_json`` rows are converted to blobs the first time their
+      group is loaded (lazy migration).
     - Weight field supports feedback-driven quality adjustment.
     - Thread-safe for single-event-loop asyncio usage.
 """
 
+import asyncio
+import hashlib
 import json
+import os
+import struct
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
 from astrbot.api import logger
-from sqlalchemy import case, delete, desc, select, update
+from sqlalchemy import case, delete, desc, or_, select, update
 from sqlalchemy.sql import func
 
 from ...models.orm.exemplar import Exemplar
 from ...utils.cache_manager import get_cache_manager
 from ..monitoring.instrumentation import monitored
 
-# Optional numpy for vectorised cosine similarity.
+# Optional numpy for vectorised cosine similarity and the ANN index.
 try:
     import numpy as np
+    from .vector_index import (
+        _DEFAULT_TRAIN_THRESHOLD as _IVF_TRAIN_THRESHOLD,
+        VECTOR_INDEX_KINDS,
+        create_vector_index,
+        normalize_rows,
+    )
     _HAS_NUMPY = True
 except ImportError:
     np = None  # type: ignore[assignment]
+    _IVF_TRAIN_THRESHOLD = 2048
+    VECTOR_INDEX_KINDS = ("flat", "ivf")
+    create_vector_index = None  # type: ignore[assignment]
+    normalize_rows = None  # type: ignore[assignment]
     _HAS_NUMPY = False
 
 
@@ -52,12 +91,98 @@ _MAX_EXEMPLARS_PER_GROUP = 500
 # Default number of few-shot examples to retrieve.
 _DEFAULT_TOP_K = 5
 
-# Maximum exemplars loaded from DB for similarity search (by weight desc).
-_SIMILARITY_SEARCH_LIMIT = 100
+# Nearest-neighbour candidates fetched per query before weight re-ranking.
+_CANDIDATE_MULTIPLIER = 4
+_MIN_CANDIDATES = 32
 
-# In-memory vector cache TTL (seconds).
+# How often (seconds) a cached group index is re-validated against the DB.
 _VECTOR_CACHE_TTL = 120
 
+# Supported on-disk element types for ``embedding_blob``:
+# name -> (numpy dtype, struct format char).
+_EMBEDDING_DTYPES = {
+    "float32": ("<f4", "f"),
+    "float16": ("<f2", "e"),
+}
+_ITEMSIZE_TO_DTYPE = {4: "float32", 2: "float16"}
+
+# Row has a vector in either the binary or the legacy JSON column.
+_HAS_VECTOR = or_(
+    Exemplar.embedding_blob.isnot(None),
+    Exemplar.embedding_json.isnot(None),
+)
+
+
+class _GroupIndex:
+    """Cached search state for one group: id -> content/weight plus vectors.
+
+    ``index`` is a ``vector_index`` instance when numpy is available;
+    otherwise ``vectors`` holds plain lists for the pure-Python scan.
+    """
+
+    __slots__ = (
+        "signature", "checked_at", "dims",
+        "contents", "weights", "index", "vectors",
+    )
+
+    def __init__(self, signature: Optional[str], dims: int, index=None) -> None:
+        self.signature = signature
+        self.checked_at = time.time()
+        self.dims = dims
+        self.contents: Dict[int, str] = {}
+        self.weights: Dict[int, float] = {}
+        self.index = index
+        self.vectors: Dict[int, List[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def add(
+        self,
+        ids: List[int],
+        contents: List[str],
+        vectors: Any,
+        weights: List[float],
+        train: bool = True,
+    ) -> None:
+        if self.index is not None:
+            if (
+                isinstance(vectors, np.memmap)
+                and not len(self.index)
+                and hasattr(self.index, "adopt")
+            ):
+                # Index files hold normalised rows: search the map in place.
+                self.index.adopt(ids, vectors)
+            else:
+                self.index.add(ids, vectors, train=train)
+        else:
+            for row_id, vec in zip(ids, vectors):
+                self.vectors[row_id] = list(vec)
+        for row_id, content, weight in zip(ids, contents, weights):
+            self.contents[row_id] = content
+            self.weights[row_id] = weight
+
+    def remove(self, ids: List[int]) -> None:
+        if self.index is not None:
+            self.index.remove(ids)
+        for row_id in ids:
+            self.contents.pop(row_id, None)
+            self.weights.pop(row_id, None)
+            self.vectors.pop(row_id, None)
+
+    def search(
+        self, query_vec: List[float], n: int
+    ) -> List[Tuple[int, float]]:
+        """Return up to ``n`` nearest ``(id, cosine)`` pairs."""
+        if self.index is not None:
+            return self.index.search(query_vec, n)
+        scored = [
+            (row_id, ExemplarLibrary._cosine_similarity(query_vec, vec))
+            for row_id, vec in self.vectors.items()
+        ]
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return scored[:n]
+
 
 class ExemplarLibrary:
     """Few-shot style exemplar library.
@@ -71,7 +196,15 @@ class ExemplarLibrary:
 
     _schema_migrated = False # class-level flag: run migration once per process
 
-    def __init__(self, db_manager, embedding_provider=None) -> None:
+    def __init__(
+        self,
+        db_manager,
+        embedding_provider=None,
+        embedding_dtype: str = "float32",
+        index_dir: Optional[str] = None,
+        vector_index: str = "flat",
+        max_exemplars_per_group: int = _MAX_EXEMPLARS_PER_GROUP,
+    ) -> None:
         """Initialise the exemplar library.
 
         Args:
@@ -79,15 +212,44 @@ class ExemplarLibrary:
             embedding_provider: Optional ``IEmbeddingProvider`` for vector
                 similarity search. When ``None``, falls back to
                 weight-based random sampling.
+            embedding_dtype: Storage precision for new vectors,
+                ``"float32"`` or ``"float16"`` (half the size).
+            index_dir: Optional directory for per-group memory-mapped
+                vector matrices. ``None`` keeps the index in memory only.
+            vector_index: In-memory index kind, ``"flat"`` (exact linear
+                scan) or ``"ivf"`` (approximate, sub-linear; only pays off
+                when ``max_exemplars_per_group`` is well above
+                ``_IVF_TRAIN_THRESHOLD``).
+            max_exemplars_per_group: Capacity per group; the lowest-weight
+                exemplars are evicted beyond it.
         """
         self._db = db_manager
         self._embedding = embedding_provider
+        if embedding_dtype not in _EMBEDDING_DTYPES:
+            logger.warning(
+                f"[ExemplarLibrary] Unsupported embedding dtype "
+                f"'{embedding_dtype}', using float32"
+            )
+            embedding_dtype = "float32"
+        self._embedding_dtype = embedding_dtype
+        self._index_dir = index_dir if _HAS_NUMPY else None
+        if vector_index not in VECTOR_INDEX_KINDS:
+            logger.warning(
+                f"[ExemplarLibrary] Unknown vector index '{vector_index}', "
+                f"using flat"
+            )
+            vector_index = "flat"
+        self._vector_index_kind = vector_index
+        self._max_per_group = max(1, int(max_exemplars_per_group))
+        if vector_index == "ivf" and self._max_per_group < _IVF_TRAIN_THRESHOLD:
+            logger.info(
+                f"[ExemplarLibrary] ivf index needs {_IVF_TRAIN_THRESHOLD} "
+                f"exemplars per group to train; with a cap of "
+                f"{self._max_per_group} it behaves as an exact flat scan"
+            )
 
-        # In-memory vector index per group.
-        # group_id -> (timestamp, contents, vectors, weights)
-        self._vector_cache: Dict[
-            str, Tuple[float, List[str], Any, List[float]]
-        ] = {}
+        # In-memory vector index per group: group_id -> _GroupIndex
+        self._vector_cache: Dict[str, _GroupIndex] = {}
 
     # Public API
 
@@ -119,14 +281,16 @@ class ExemplarLibrary:
         now = int(time.time())
 
         # Compute embedding if provider is available.
-        embedding_json = None
+        vec = None
+        embedding_blob = None
         dimensions = 0
         if self._embedding:
             try:
                 vec = await self._embedding.get_embedding(content)
-                embedding_json = json.dumps(vec)
+                embedding_blob = self._encode_embedding(vec, self._embedding_dtype)
                 dimensions = len(vec)
             except Exception as exc:
+                vec = None
                 logger.debug(
                     f"[ExemplarLibrary] Embedding failed for exemplar, "
                     f"storing without vector: {exc}"
@@ -138,7 +302,7 @@ class ExemplarLibrary:
                     content=content,
                     sender_id=sender_id,
                     group_id=group_id,
-                    embedding_json=embedding_json,
+                    embedding_blob=embedding_blob,
                     weight=1.0,
                     dimensions=dimensions,
                     created_at=now,
@@ -150,12 +314,15 @@ class ExemplarLibrary:
                 await session.commit()
 
                 # Evict excess exemplars if over capacity.
-                await self._evict_excess(session, group_id)
+                evicted = await self._evict_excess(session, group_id)
 
-                # Invalidate vector cache so next query picks up the new data.
-                self._vector_cache.pop(group_id, None)
+            # Keep a cached group index in step with the DB.
+            added = None
+            if embedding_blob is not None:
+                added = ([record_id], [content], [vec], [1.0])
+            await self._update_group_index(group_id, added, evicted)
 
-                return record_id
+            return record_id
 
         except Exception as exc:
             logger.warning(f"[ExemplarLibrary] Failed to save exemplar: {exc}")
@@ -217,13 +384,23 @@ class ExemplarLibrary:
                 )
                 result = await session.execute(stmt)
                 await session.commit()
-                return result.rowcount > 0
+                updated = result.rowcount > 0
         except Exception as exc:
             logger.warning(
                 f"[ExemplarLibrary] Weight adjustment failed: {exc}"
             )
             return False
 
+        if updated:
+            group_id = self._cached_group_of(exemplar_id)
+            if group_id is not None:
+                entry = self._vector_cache[group_id]
+                entry.weights[exemplar_id] = max(
+                    0.0, entry.weights[exemplar_id] + delta
+                )
+                await self._update_group_index(group_id)
+        return updated
+
     async def get_group_stats(self, group_id: str) -> Dict[str, Any]:
         """Return summary statistics for a group's exemplar collection."""
         try:
@@ -233,7 +410,7 @@ class ExemplarLibrary:
                     func.avg(Exemplar.weight),
                     func.sum(
                         case(
-                            (Exemplar.embedding_json.isnot(None), 1),
+                            (_HAS_VECTOR, 1),
                             else_=0,
                         )
                     ),
@@ -259,11 +436,17 @@ class ExemplarLibrary:
                 stmt = delete(Exemplar).where(Exemplar.id == exemplar_id)
                 result = await session.execute(stmt)
                 await session.commit()
-                return result.rowcount > 0
+                deleted = result.rowcount > 0
         except Exception as exc:
             logger.warning(f"[ExemplarLibrary] Delete failed: {exc}")
             return False
 
+        if deleted:
+            group_id = self._cached_group_of(exemplar_id)
+            if group_id is not None:
+                await self._update_group_index(group_id, removed=[exemplar_id])
+        return deleted
+
     # Internal helpers
 
     async def _migrate_embedding_column(self) -> None:
@@ -292,7 +475,7 @@ class ExemplarLibrary:
     async def _similarity_search(
         self, query: str, group_id: str, k: int
     ) -> List[str]:
-        """Vector cosine similarity search with in-memory caching.
+        """Nearest-neighbour search over the group index, re-ranked by weight.
 
         Query embeddings are cached via CacheManager to avoid redundant
         embedding API calls for repeated or identical queries.
@@ -304,87 +487,322 @@ class ExemplarLibrary:
             query_vec = await self._embedding.get_embedding(query)
             cache.set("embedding_query", cache_key, query_vec)
 
-        # Use cached vectors or load from DB.
-        cached = self._vector_cache.get(group_id)
-        if cached and time.time() - cached[0] < _VECTOR_CACHE_TTL:
-            contents, vectors, weights = cached[1], cached[2], cached[3]
-        else:
-            contents, vectors, weights = await self._load_vectors(group_id)
-            if not contents:
-                return await self._weight_based_search(group_id, k)
-            self._vector_cache[group_id] = (
-                time.time(), contents, vectors, weights,
-            )
-
-        if not contents:
+        entry = await self._get_group_index(group_id)
+        if entry is None or not len(entry):
             return await self._weight_based_search(group_id, k)
+        if len(query_vec) != entry.dims:
+            raise ValueError(
+                f"query dim {len(query_vec)} != index dim {entry.dims}"
+            )
 
-        # Numpy-accelerated path.
-        if _HAS_NUMPY and isinstance(vectors, np.ndarray):
-            scores = self._numpy_cosine_scores(query_vec, vectors, weights)
-            top_k = min(k, len(contents))
-            top_indices = np.argsort(scores)[-top_k:][::-1]
-            return [contents[i] for i in top_indices]
-
-        # Pure Python fallback.
-        scored = []
-        for content, vec, weight in zip(contents, vectors, weights):
-            sim = self._cosine_similarity(query_vec, vec)
-            score = sim * 0.8 + (weight or 1.0) * 0.2
-            scored.append((content, score))
+        candidates = entry.search(
+            query_vec, max(k * _CANDIDATE_MULTIPLIER, _MIN_CANDIDATES)
+        )
+        scored = [
+            (row_id, sim * 0.8 + (entry.weights.get(row_id) or 1.0) * 0.2)
+            for row_id, sim in candidates
+        ]
         scored.sort(key=lambda x: x[1], reverse=True)
-        return [c for c, _ in scored[:k]]
+        return [entry.contents[row_id] for row_id, _ in scored[:k]]
+
+    async def _get_group_index(self, group_id: str) -> Optional[_GroupIndex]:
+        """Return the cached group index, revalidating it every TTL.
+
+        Revalidation is one aggregate query; the index is only rebuilt
+        when the signature no longer matches what this instance wrote.
+        """
+        entry = self._vector_cache.get(group_id)
+        now = time.time()
+        if entry is not None and now - entry.checked_at < _VECTOR_CACHE_TTL:
+            return entry
+
+        signature = await self._index_signature(group_id)
+        if entry is not None and entry.signature == signature:
+            entry.checked_at = now
+            return entry
+
+        # Drop the stale entry first so it releases any mapped index file
+        # before that file is rewritten.
+        self._vector_cache.pop(group_id, None)
+        entry = None
+        ids, contents, vectors, weights = await self._load_index(
+            group_id, signature
+        )
+        if not ids:
+            return None
+        entry = await asyncio.to_thread(
+            self._build_group_index, signature, ids, contents, vectors, weights
+        )
+        self._vector_cache[group_id] = entry
+        return entry
+
+    def _build_group_index(
+        self,
+        signature: Optional[str],
+        ids: List[int],
+        contents: List[str],
+        vectors: Any,
+        weights: List[float],
+    ) -> _GroupIndex:
+        dims = len(vectors[0])
+        index = None
+        if _HAS_NUMPY:
+            index = create_vector_index(self._vector_index_kind, dims)
+        entry = _GroupIndex(signature, dims, index)
+        entry.add(ids, contents, vectors, weights)
+        return entry
+
+    async def _update_group_index(
+        self,
+        group_id: str,
+        added: Optional[Tuple[List[int], List[str], List[Any], List[float]]] = None,
+        removed: Optional[List[int]] = None,
+    ) -> None:
+        """Apply this instance's own writes to a cached group index.
+
+        The signature is refreshed afterwards so the next revalidation
+        does not mistake our own write for a foreign one. On any error
+        the entry is dropped and rebuilt lazily.
+        """
+        entry = self._vector_cache.get(group_id)
+        if entry is None:
+            return
+        try:
+            if added is not None and len(added[2][0]) != entry.dims:
+                # Embedding provider switched dimensions: rebuild lazily.
+                self._vector_cache.pop(group_id, None)
+                return
+            if added is not None:
+                entry.add(*added, train=False)
+            if removed:
+                entry.remove(removed)
+            index = entry.index
+            if getattr(index, "needs_training", False):
+                # 重训练量化器开销与组规模成正比，放到工作线程，
+                # 期间事件循环仍可检索旧的分区；若中途被修改则放弃本次结果
+                state = await asyncio.to_thread(index.compute_training)
+                index.apply_training(state)
+            entry.signature = await self._index_signature(group_id)
+        except Exception as exc:
+            logger.debug(f"[ExemplarLibrary] Index update failed: {exc}")
+            self._vector_cache.pop(group_id, None)
+
+    def _cached_group_of(self, exemplar_id: int) -> Optional[str]:
+        for group_id, entry in self._vector_cache.items():
+            if exemplar_id in entry.contents:
+                return group_id
+        return None
+
+    async def _load_index(
+        self, group_id: str, signature: Optional[str] = None
+    ) -> Tuple[List[int], List[str], Any, List[float]]:
+        """Load a group's vectors, preferring the memory-mapped file.
+
+        Without an index directory this is just ``_load_vectors``. With
+        one, the DB signature decides whether the on-disk matrix is
+        still current; if so it is mapped zero-copy, otherwise the
+        vectors are reloaded from the DB and the file rewritten.
+        """
+        if not self._index_dir:
+            return await self._load_vectors(group_id)
+
+        if signature is None:
+            signature = await self._index_signature(group_id)
+        try:
+            loaded = await asyncio.to_thread(
+                self._read_index_files, group_id, signature
+            )
+        except Exception as exc:
+            logger.debug(f"[ExemplarLibrary] Vector index read failed: {exc}")
+            loaded = None
+        if loaded is not None:
+            return loaded
+
+        ids, contents, vectors, weights = await self._load_vectors(group_id)
+        if ids and isinstance(vectors, np.ndarray):
+            try:
+                await asyncio.to_thread(
+                    self._write_index_files,
+                    group_id, signature, ids, contents, vectors, weights,
+                )
+            except Exception as exc:
+                logger.debug(
+                    f"[ExemplarLibrary] Vector index write failed: {exc}"
+                )
+        return ids, contents, vectors, weights
 
     async def _load_vectors(
         self, group_id: str
-    ) -> Tuple[List[str], Any, List[float]]:
-        """Load exemplar vectors from DB and build an in-memory index.
+    ) -> Tuple[List[int], List[str], Any, List[float]]:
+        """Load all of a group's exemplar vectors from the DB.
+
+        Binary rows are decoded with ``np.frombuffer``; legacy JSON rows
+        are decoded once and written back as blobs.
 
         Returns:
-            ``(contents, vectors, weights)`` where *vectors* is a numpy
-            matrix (N, D) when numpy is available, or a list of lists
-            otherwise. Returns empty lists if no data.
+            ``(ids, contents, vectors, weights)`` where *vectors* is a
+            numpy matrix (N, D) when numpy is available, or a list of
+            lists otherwise. Returns empty lists if no data.
         """
         async with self._db.get_session() as session:
             stmt = (
                 select(
+                    Exemplar.id,
                     Exemplar.content,
+                    Exemplar.embedding_blob,
                     Exemplar.embedding_json,
+                    Exemplar.dimensions,
                     Exemplar.weight,
                 )
-                .where(
-                    Exemplar.group_id == group_id,
-                    Exemplar.embedding_json.isnot(None),
-                )
+                .where(Exemplar.group_id == group_id, _HAS_VECTOR)
                 .order_by(desc(Exemplar.weight))
-                .limit(_SIMILARITY_SEARCH_LIMIT)
             )
             result = await session.execute(stmt)
             rows = result.all()
 
         if not rows:
-            return [], None, []
+            return [], [], None, []
 
+        ids: List[int] = []
         contents: List[str] = []
-        raw_vectors: List[List[float]] = []
+        raw_vectors: List[Any] = []
         weights: List[float] = []
-        for content, emb_json, weight in rows:
-            try:
-                vec = json.loads(emb_json)
-                contents.append(content)
-                raw_vectors.append(vec)
-                weights.append(weight or 1.0)
-            except (json.JSONDecodeError, TypeError):
+        legacy: Dict[int, bytes] = {}
+        expected_dims: Optional[int] = None
+        for row_id, content, emb_blob, emb_json, dims, weight in rows:
+            vec = None
+            if emb_blob:
+                vec = self._decode_embedding(emb_blob, dims)
+            elif emb_json:
+                try:
+                    vec = json.loads(emb_json)
+                except (json.JSONDecodeError, TypeError):
+                    vec = None
+                if vec:
+                    legacy[row_id] = self._encode_embedding(
+                        vec, self._embedding_dtype
+                    )
+            if vec is None or not len(vec):
+                continue
+            # Mixed dimensions (provider switched) cannot share one matrix.
+            if expected_dims is None:
+                expected_dims = len(vec)
+            elif len(vec) != expected_dims:
                 continue
+            ids.append(row_id)
+            contents.append(content)
+            raw_vectors.append(vec)
+            weights.append(weight or 1.0)
 
-        if not contents:
-            return [], None, []
+        if legacy:
+            await self._migrate_legacy_rows(legacy)
+
+        if not ids:
+            return [], [], None, []
 
         if _HAS_NUMPY:
-            matrix = np.array(raw_vectors, dtype=np.float32)
-            return contents, matrix, weights
+            matrix = np.vstack(raw_vectors).astype(np.float32, copy=False)
+            return ids, contents, matrix, weights
+
+        return ids, contents, [list(v) for v in raw_vectors], weights
+
+    async def _migrate_legacy_rows(self, blobs: Dict[int, bytes]) -> None:
+        """Move legacy JSON vectors into ``embedding_blob``.
+
+        ``updated_at`` is left untouched so the index signature is stable.
+        """
+        try:
+            async with self._db.get_session() as session:
+                for row_id, blob in blobs.items():
+                    await session.execute(
+                        update(Exemplar)
+                        .where(Exemplar.id == row_id)
+                        .values(embedding_blob=blob, embedding_json=None)
+                    )
+                await session.commit()
+            logger.debug(
+                f"[ExemplarLibrary] Migrated {len(blobs)} JSON embeddings "
+                f"to binary storage"
+            )
+        except Exception as exc:
+            logger.debug(f"[ExemplarLibrary] Embedding migration failed: {exc}")
+
+    async def _index_signature(self, group_id: str) -> str:
+        """Cheap fingerprint of a group's vector rows for index validation."""
+        async with self._db.get_session() as session:
+            stmt = select(
+                func.count(Exemplar.id),
+                func.max(Exemplar.id),
+                func.max(Exemplar.updated_at),
+                func.sum(Exemplar.weight),
+            ).where(Exemplar.group_id == group_id, _HAS_VECTOR)
+            result = await session.execute(stmt)
+            count, max_id, max_updated, weight_sum = result.one()
+        return f"{count or 0}:{max_id or 0}:{max_updated or 0}:{float(weight_sum or 0):.6f}"
+
+    def _index_paths(self, group_id: str) -> Tuple[str, str]:
+        key = hashlib.sha1(str(group_id).encode("utf-8")).hexdigest()
+        base = os.path.join(self._index_dir, key)
+        return f"{base}.npy", f"{base}.json"
+
+    def _read_index_files(
+        self, group_id: str, signature: str
+    ) -> Optional[Tuple[List[int], List[str], Any, List[float]]]:
+        matrix_path, meta_path = self._index_paths(group_id)
+        if not os.path.exists(meta_path) or not os.path.exists(matrix_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("signature") != signature:
+            return None
+        matrix = np.load(matrix_path, mmap_mode="r")
+        ids = meta.get("ids") or []
+        contents = meta.get("contents") or []
+        if (
+            matrix.ndim != 2
+            or matrix.shape[0] != len(contents)
+            or len(ids) != len(contents)
+        ):
+            return None
+        return ids, contents, matrix, list(meta.get("weights") or [])
 
-        return contents, raw_vectors, weights
+    def _write_index_files(
+        self,
+        group_id: str,
+        signature: str,
+        ids: List[int],
+        contents: List[str],
+        matrix: "np.ndarray",
+        weights: List[float],
+    ) -> None:
+        """Write the matrix, then the metadata (which acts as the commit marker)."""
+        os.makedirs(self._index_dir, exist_ok=True)
+        matrix_path, meta_path = self._index_paths(group_id)
+        tmp_matrix = f"{matrix_path}.tmp"
+        with open(tmp_matrix, 'wb') as f:
+            np.save(
+                f,
+                np.ascontiguousarray(
+                    normalize_rows(np.asarray(matrix, dtype=np.float32)),
+                    dtype=np.float32,
+                ),
+            )
+        os.replace(tmp_matrix, matrix_path)
+
+        tmp_meta = f"{meta_path}.tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(
+                {
+                    "signature": signature,
+                    "group_id": group_id,
+                    "ids": ids,
+                    "contents": contents,
+                    "weights": weights,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_meta, meta_path)
 
     async def _weight_based_search(
         self, group_id: str, k: int
@@ -404,8 +822,12 @@ class ExemplarLibrary:
             logger.debug(f"[ExemplarLibrary] Weight search failed: {exc}")
             return []
 
-    async def _evict_excess(self, session, group_id: str) -> None:
-        """Remove lowest-weight exemplars when over capacity."""
+    async def _evict_excess(self, session, group_id: str) -> List[int]:
+        """Remove lowest-weight exemplars when over capacity.
+
+        Returns:
+            IDs of the evicted rows (empty when nothing was evicted).
+        """
         try:
             count_stmt = select(func.count(Exemplar.id)).where(
                 Exemplar.group_id == group_id
@@ -413,10 +835,10 @@ class ExemplarLibrary:
             result = await session.execute(count_stmt)
             total = result.scalar() or 0
 
-            if total <= _MAX_EXEMPLARS_PER_GROUP:
-                return
+            if total <= self._max_per_group:
+                return []
 
-            excess = total - _MAX_EXEMPLARS_PER_GROUP
+            excess = total - self._max_per_group
             # Find IDs of lowest-weight records.
             ids_stmt = (
                 select(Exemplar.id)
@@ -435,33 +857,42 @@ class ExemplarLibrary:
                     f"[ExemplarLibrary] Evicted {len(ids_to_delete)} "
                     f"excess exemplars from group {group_id}"
                 )
+            return ids_to_delete
         except Exception as exc:
             logger.debug(f"[ExemplarLibrary] Eviction failed: {exc}")
+            return []
 
-    # Cosine similarity helpers
+    # Embedding codec
 
     @staticmethod
-    def _numpy_cosine_scores(
-        query_vec: List[float],
-        matrix: "np.ndarray",
-        weights: List[float],
-    ) -> "np.ndarray":
-        """Vectorised cosine similarity blended with quality weights.
+    def _encode_embedding(vec: List[float], dtype: str = "float32") -> bytes:
+        """Pack a vector as little-endian float32/float16 bytes."""
+        np_dtype, fmt = _EMBEDDING_DTYPES[dtype]
+        if _HAS_NUMPY:
+            return np.asarray(vec, dtype=np_dtype).tobytes()
+        return struct.pack(f"<{len(vec)}{fmt}", *vec)
 
-        Computes ``score = cosine_sim * 0.8 + weight * 0.2`` for all
-        rows in a single matrix–vector multiply.
-        """
-        query_np = np.array(query_vec, dtype=np.float32)
-        query_norm = np.linalg.norm(query_np)
-        if query_norm < 1e-10:
-            return np.zeros(len(weights), dtype=np.float32)
+    @staticmethod
+    def _decode_embedding(blob: bytes, dimensions: Optional[int] = None) -> Any:
+        """Unpack an ``embedding_blob``; the element width comes from its size.
 
-        row_norms = np.linalg.norm(matrix, axis=1)
-        safe_norms = np.maximum(row_norms, 1e-10)
-        sims = (matrix @ query_np) / (safe_norms * query_norm)
+        Returns a read-only numpy view when numpy is available, otherwise a
+        list of floats. Returns ``None`` for malformed blobs.
+        """
+        size = len(blob)
+        if dimensions:
+            itemsize = size // dimensions if size % dimensions == 0 else 0
+        else:
+            itemsize = 4
+        dtype = _ITEMSIZE_TO_DTYPE.get(itemsize)
+        if dtype is None or size % itemsize:
+            return None
+        np_dtype, fmt = _EMBEDDING_DTYPES[dtype]
+        if _HAS_NUMPY:
+            return np.frombuffer(blob, dtype=np_dtype)
+        return list(struct.unpack(f"<{size // itemsize}{fmt}", blob))
 
-        weight_arr = np.array(weights, dtype=np.float32)
-        return sims * 0.8 + weight_arr * 0.2
+    # Cosine similarity helpers
 
     @staticmethod
     def _cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
@@ -0,0 +1,233 @@
+"""
+Bounded pool of heavyweight per-group instances.
+
+Keeps at most ``max_size`` instances loaded (LRU eviction) and unloads
+instances that have not been used for ``idle_timeout`` seconds. Unloaded
+instances are re-created lazily by the ``loader`` on next use.
+
+Instances in use are protected by leases: ``async with pool.lease(key)``
+pins the instance so eviction never finalises it under a running
+operation. When every loaded instance is leased the pool may temporarily
+exceed ``max_size``; it shrinks again as leases are released.
+
+Load and unload of the same key are serialised by a per-key lock, so an
+instance is always fully flushed by ``unloader`` before it is reloaded
+from the same storage.
+
+Usage::
+
+    pool = AsyncInstancePool(load_rag, finalize_rag, max_size=16)
+    async with pool.lease("group1") as rag:
+        await rag.aquery(...)
+    await pool.close()
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from astrbot.api import logger
+
+T = TypeVar("T")
+
+
+class AsyncInstancePool(Generic[T]):
+    """LRU-bounded, idle-unloading pool of async-created instances.
+
+    Args:
+        loader: ``async (key) -> instance``; creates and initialises.
+        unloader: ``async (key, instance) -> None``; flushes and releases.
+        max_size: Soft upper bound on loaded instances.
+        idle_timeout: Seconds without use before an instance is unloaded
+            by ``evict_idle``; ``0`` disables idle unloading.
+        name: Label used in log messages.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[T]],
+        unloader: Callable[[str, T], Awaitable[None]],
+        max_size: int = 16,
+        idle_timeout: float = 1800.0,
+        name: str = "InstancePool",
+    ) -> None:
+        self._loader = loader
+        self._unloader = unloader
+        self._max_size = max(1, int(max_size))
+        self._idle_timeout = max(0.0, float(idle_timeout))
+        self._name = name
+
+        # key -> instance, least recently used first.
+        self._items: "OrderedDict[str, T]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._leases: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+        self._stats: Dict[str, float] = {
+            "hits": 0,
+            "loads": 0,
+            "load_failures": 0,
+            "evictions": 0,
+            "idle_unloads": 0,
+            "total_load_ms": 0.0,
+            "last_load_ms": 0.0,
+        }
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def items(self) -> "OrderedDict[str, T]":
+        """Loaded instances (read-only view by convention)."""
+        return self._items
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def idle_timeout(self) -> float:
+        return self._idle_timeout
+
+    # Public API
+
+    @asynccontextmanager
+    async def lease(self, key: str) -> AsyncIterator[T]:
+        """Acquire the instance for ``key`` and pin it while in use."""
+        instance = await self._acquire(key)
+        try:
+            yield instance
+        finally:
+            self._release(key)
+
+    async def get(self, key: str) -> T:
+        """Load (if needed) and return the instance without pinning it."""
+        instance = await self._acquire(key)
+        self._release(key)
+        return instance
+
+    async def evict_idle(self) -> int:
+        """Unload instances idle for longer than ``idle_timeout``."""
+        if not self._idle_timeout:
+            return 0
+        cutoff = time.monotonic() - self._idle_timeout
+        idle = [
+            key for key in list(self._items)
+            if self._last_used.get(key, 0.0) < cutoff and not self._leases.get(key)
+        ]
+        unloaded = 0
+        for key in idle:
+            if await self._unload(key):
+                unloaded += 1
+        if unloaded:
+            self._stats["idle_unloads"] += unloaded
+            logger.info(f"[{self._name}] Unloaded {unloaded} idle instance(s)")
+        return unloaded
+
+    async def close(self) -> None:
+        """Unload every instance, regardless of leases."""
+        for key in list(self._items):
+            await self._unload(key, force=True)
+        self._locks.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        loads = int(self._stats["loads"])
+        return {
+            "loaded_instances": len(self._items),
+            "max_instances": self._max_size,
+            "idle_timeout_seconds": self._idle_timeout,
+            "hits": int(self._stats["hits"]),
+            "loads": loads,
+            "load_failures": int(self._stats["load_failures"]),
+            "evictions": int(self._stats["evictions"]),
+            "idle_unloads": int(self._stats["idle_unloads"]),
+            "avg_load_ms": round(self._stats["total_load_ms"] / loads, 2) if loads else 0.0,
+            "last_load_ms": round(self._stats["last_load_ms"], 2),
+        }
+
+    # Internal helpers
+
+    async def _acquire(self, key: str) -> T:
+        instance = self._items.get(key)
+        if instance is not None:
+            self._touch(key)
+            self._stats["hits"] += 1
+            return instance
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            instance = self._items.get(key)
+            if instance is None:
+                started = time.perf_counter()
+                try:
+                    instance = await self._loader(key)
+                except Exception:
+                    self._stats["load_failures"] += 1
+                    raise
+                elapsed_ms = (time.perf_counter() - started) * 1000.0
+                self._stats["loads"] += 1
+                self._stats["total_load_ms"] += elapsed_ms
+                self._stats["last_load_ms"] = elapsed_ms
+                self._items[key] = instance
+            else:
+                self._stats["hits"] += 1
+            self._touch(key)
+
+        await self._evict_over_capacity(protect=key)
+        return instance
+
+    def _touch(self, key: str) -> None:
+        self._items.move_to_end(key)
+        self._last_used[key] = time.monotonic()
+        self._leases[key] = self._leases.get(key, 0) + 1
+
+    def _release(self, key: str) -> None:
+        remaining = self._leases.get(key, 0) - 1
+        if remaining > 0:
+            self._leases[key] = remaining
+        else:
+            self._leases.pop(key, None)
+        if key in self._items:
+            self._last_used[key] = time.monotonic()
+
+    async def _evict_over_capacity(self, protect: Optional[str] = None) -> None:
+        while len(self._items) > self._max_size:
+            victims: List[str] = [
+                key for key in self._items
+                if key != protect and not self._leases.get(key)
+            ]
+            if not victims:
+                return
+            if await self._unload(victims[0]):
+                self._stats["evictions"] += 1
+
+    async def _unload(self, key: str, force: bool = False) -> bool:
+        # Leases are checked and the entry popped without awaiting in
+        # between, so no caller can pick the instance up mid-unload.
+        if self._leases.get(key) and not force:
+            return False
+        instance = self._items.pop(key, None)
+        self._last_used.pop(key, None)
+        if instance is None:
+            return False
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            try:
+                await self._unloader(key, instance)
+            except Exception as exc:
+                logger.warning(f"[{self._name}] Unload failed for {key}: {exc}")
+        return True
@@ -8,6 +8,11 @@ config, this module is activated instead of the SQL-based implementation.
 
 Design notes:
     - One ``LightRAG`` instance per group (data isolation via working_dir).
+      Instances live in an ``AsyncInstancePool``: at most
+      ``lightrag_max_instances`` are loaded (LRU eviction), instances idle
+      for ``lightrag_idle_unload_seconds`` are unloaded, and both paths
+      call ``finalize_storages()`` so data is flushed before release. An
+      unloaded group is re-initialised lazily on its next insert/query.
     - LLM and embedding calls are bridged to the existing framework adapters
       so that no additional API keys are required.
     - Query uses ``only_need_context=True`` to return raw context without
@@ -23,7 +28,7 @@ Design notes:
 import asyncio
 import os
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from astrbot.api import logger
 
@@ -31,6 +36,11 @@ from ...config import PluginConfig
 from ...core.interfaces import MessageData, ServiceLifecycle
 from ..embedding.base import IEmbeddingProvider
 from ..monitoring.instrumentation import monitored
+from .conversation_packer import (
+    format_message_line,
+    group_conversation_windows,
+)
+from .instance_pool import AsyncInstancePool
 
 # Lazy import guard -- LightRAG is an optional dependency.
 _LIGHTRAG_AVAILABLE = False
@@ -44,6 +54,12 @@ except ImportError:
     QueryParam = None # type: ignore[assignment,misc]
     EmbeddingFunc = None # type: ignore[assignment,misc]
 
+# LightRAG chunking parameters; batched ingestion packs messages into
+# documents of about one chunk each.
+_CHUNK_TOKEN_SIZE = 1200
+_CHUNK_OVERLAP_TOKEN_SIZE = 100
+_MIN_MESSAGE_LENGTH = 10
+
 
 class LightRAGKnowledgeManager:
     """Knowledge manager backed by the LightRAG library.
@@ -84,11 +100,15 @@ class LightRAGKnowledgeManager:
         self._embedding = embedding_provider
         self._status = ServiceLifecycle.CREATED
 
-        # Per-group LightRAG instances (lazy-initialised).
-        self._instances: Dict[str, LightRAG] = {}
-
-        # Per-group initialisation locks to prevent concurrent creation.
-        self._init_locks: Dict[str, asyncio.Lock] = {}
+        # Per-group LightRAG instances (lazy-initialised, LRU-bounded).
+        self._pool: AsyncInstancePool = AsyncInstancePool(
+            self._load_rag,
+            self._unload_rag,
+            max_size=getattr(config, "lightrag_max_instances", 16),
+            idle_timeout=getattr(config, "lightrag_idle_unload_seconds", 1800.0),
+            name="LightRAG",
+        )
+        self._idle_task: Optional[asyncio.Task] = None
 
         # Base directory for all LightRAG data.
         self._base_dir = os.path.join(config.data_dir, "lightrag")
@@ -102,29 +122,40 @@ class LightRAGKnowledgeManager:
 
     # Lifecycle
 
+    @property
+    def _instances(self) -> Dict[str, LightRAG]:
+        """Currently loaded instances, keyed by group id."""
+        return self._pool.items
+
     async def start(self) -> bool:
         """Start the knowledge manager service."""
         self._status = ServiceLifecycle.RUNNING
+        if self._idle_task is None and self._pool.idle_timeout:
+            self._idle_task = asyncio.create_task(self._idle_unload_loop())
         logger.info("[LightRAG] Knowledge manager started")
         return True
 
     async def warmup_instances(self, group_ids: List[str]) -> int:
         """Pre-create LightRAG instances for known active groups.
 
-        Eliminates the cold-start penalty that occurs when ``_get_rag``
-        is first called during a user query. Instances that fail to
+        Eliminates the cold-start penalty that occurs when an instance
+        is first needed during a user query. Instances that fail to
         initialise are silently skipped.
 
+        Only the first ``max_instances`` groups are warmed; warming more
+        would just evict the earlier ones again.
+
         Returns:
             Number of instances that are ready after this call.
         """
-        already_warm = sum(1 for gid in group_ids if gid in self._instances)
+        group_ids = list(group_ids)[:self._pool.max_size]
+        already_warm = sum(1 for gid in group_ids if gid in self._pool)
         newly_warmed = 0
         for gid in group_ids:
-            if gid in self._instances:
+            if gid in self._pool:
                 continue
             try:
-                await self._get_rag(gid)
+                await self._pool.get(gid)
                 newly_warmed += 1
             except Exception as exc:
                 logger.debug(
@@ -147,22 +178,15 @@ class LightRAGKnowledgeManager:
         """Stop the service and release all LightRAG storage handles."""
         self._status = ServiceLifecycle.STOPPING
 
-        # Snapshot to avoid RuntimeError from dict mutation during iteration.
-        instances_snapshot = list(self._instances.items())
-        self._instances.clear()
-
-        for group_id, rag in instances_snapshot:
+        if self._idle_task is not None:
+            self._idle_task.cancel()
             try:
-                await rag.finalize_storages()
-                logger.debug(
-                    f"[LightRAG] Finalized storages for group {group_id}"
-                )
-            except Exception as exc:
-                logger.warning(
-                    f"[LightRAG] Error finalizing group {group_id}: {exc}"
-                )
+                await self._idle_task
+            except asyncio.CancelledError:
+                pass
+            self._idle_task = None
 
-        self._init_locks.clear()
+        await self._pool.close()
         self._status = ServiceLifecycle.STOPPED
         logger.info("[LightRAG] Knowledge manager stopped")
         return True
@@ -178,13 +202,13 @@ class LightRAGKnowledgeManager:
         ``KnowledgeGraphManager.process_message_for_knowledge_graph`` name
         for drop-in compatibility.
         """
-        if not message.message or len(message.message.strip()) < 10:
+        if not message.message or len(message.message.strip()) < _MIN_MESSAGE_LENGTH:
             return
 
         text = f"[{message.sender_name}]: {message.message}"
         try:
-            rag = await self._get_rag(group_id)
-            await rag.ainsert(text)
+            async with self._pool.lease(group_id) as rag:
+                await rag.ainsert(text)
             self._processed_counts[group_id] = (
                 self._processed_counts.get(group_id, 0) + 1
             )
@@ -199,6 +223,53 @@ class LightRAGKnowledgeManager:
         """Short alias for ``process_message_for_knowledge_graph``."""
         await self.process_message_for_knowledge_graph(message, group_id)
 
+    async def process_messages_batch(
+        self, messages: List[MessageData], group_id: str
+    ) -> Dict[str, int]:
+        """Ingest a buffer of messages as one multi-document insert.
+
+        Messages are packed in order into conversation windows of about
+        one LightRAG chunk each, and all windows are submitted in a
+        single ``ainsert`` call, so extraction runs once per window
+        instead of once per message. If that insert fails, the batch is
+        retried in halves (down to single messages), so one bad document
+        does not drop the rest of the buffer.
+
+        Returns:
+            ``{"messages": ingested, "documents": inserted,
+            "failed": messages not ingested}``.
+        """
+        lines = [
+            format_message_line(msg, _MIN_MESSAGE_LENGTH) for msg in messages
+        ]
+        lines = [line for line in lines if line]
+        windows = group_conversation_windows(
+            lines, _CHUNK_TOKEN_SIZE - _CHUNK_OVERLAP_TOKEN_SIZE
+        )
+        if not windows:
+            return {"messages": 0, "documents": 0, "failed": 0}
+
+        try:
+            async with self._pool.lease(group_id) as rag:
+                ingested, documents = await self._insert_windows(
+                    rag, windows, group_id
+                )
+        except Exception as exc:
+            logger.warning(
+                f"[LightRAG] Batch insert failed for group {group_id}: {exc}"
+            )
+            return {"messages": 0, "documents": 0, "failed": len(lines)}
+
+        if ingested:
+            self._processed_counts[group_id] = (
+                self._processed_counts.get(group_id, 0) + ingested
+            )
+        return {
+            "messages": ingested,
+            "documents": documents,
+            "failed": len(lines) - ingested,
+        }
+
     @monitored
     async def query_knowledge(
         self,
@@ -222,15 +293,15 @@ class LightRAGKnowledgeManager:
             Retrieved context string. Empty string if nothing relevant.
         """
         try:
-            rag = await self._get_rag(group_id)
-            result = await rag.aquery(
-                query,
-                param=QueryParam(
-                    mode=mode,
-                    only_need_context=True,
-                    top_k=top_k,
-                ),
-            )
+            async with self._pool.lease(group_id) as rag:
+                result = await rag.aquery(
+                    query,
+                    param=QueryParam(
+                        mode=mode,
+                        only_need_context=True,
+                        top_k=top_k,
+                    ),
+                )
             if isinstance(result, dict):
                 # When only_need_context=True, LightRAG may return a dict
                 # with context sections. Flatten to a single string.
@@ -284,9 +355,21 @@ class LightRAGKnowledgeManager:
     ) -> Dict[str, Any]:
         """Return summary statistics for a group's knowledge graph.
 
-        Results are cached for ``_stats_cache_ttl`` seconds to avoid
+        Graph counts are cached for ``_stats_cache_ttl`` seconds to avoid
         repeatedly parsing the GraphML file on frequent status queries.
+        The counts come from the persisted graph, so they are available
+        even when the group's instance is currently unloaded.
+        ``instance_pool`` (loaded instances, load latency, evictions) is
+        always current.
         """
+        stats = await self._graph_statistics(group_id)
+        return {
+            **stats,
+            "instance_loaded": group_id in self._pool,
+            "instance_pool": self._pool.get_stats(),
+        }
+
+    async def _graph_statistics(self, group_id: str) -> Dict[str, Any]:
         # Check TTL cache first
         if group_id in self._stats_cache:
             cached_ts, cached_stats = self._stats_cache[group_id]
@@ -300,9 +383,6 @@ class LightRAGKnowledgeManager:
             "processed_messages": self._processed_counts.get(group_id, 0),
         }
 
-        if group_id not in self._instances:
-            return stats
-
         working_dir = os.path.join(self._base_dir, group_id)
         graph_file = os.path.join(
             working_dir, "graph_chunk_entity_relation.graphml"
@@ -320,7 +400,8 @@ class LightRAGKnowledgeManager:
             return stats
 
         try:
-            graph = nx.read_graphml(graph_file)
+            # Parsing a large GraphML file is blocking XML work.
+            graph = await asyncio.to_thread(nx.read_graphml, graph_file)
             stats["entity_count"] = graph.number_of_nodes()
             stats["relation_count"] = graph.number_of_edges()
         except Exception as exc:
@@ -331,60 +412,100 @@ class LightRAGKnowledgeManager:
 
     # Internal helpers
 
-    async def _get_rag(self, group_id: str) -> LightRAG:
-        """Return the LightRAG instance for *group_id*, creating if needed.
+    async def _insert_windows(
+        self, rag: Any, windows: List[List[str]], group_id: str
+    ) -> Tuple[int, int]:
+        """Insert windows, splitting in halves on failure.
 
-        Uses a per-group asyncio lock to prevent concurrent initialisation
-        of the same group (TOCTOU race).
+        LightRAG keys documents by content hash, so windows that were
+        already stored by a failed multi-document call are skipped when
+        retried. Returns ``(messages, documents)`` actually inserted.
         """
-        if group_id in self._instances:
-            return self._instances[group_id]
-
-        # Retrieve or create the lock (dict key assignment is atomic in
-        # CPython's GIL, so no race on the lock creation itself).
-        if group_id not in self._init_locks:
-            self._init_locks[group_id] = asyncio.Lock()
-
-        async with self._init_locks[group_id]:
-            # Re-check after acquiring the lock.
-            if group_id in self._instances:
-                return self._instances[group_id]
-
-            working_dir = os.path.join(self._base_dir, group_id)
-            os.makedirs(working_dir, exist_ok=True)
-
-            rag_kwargs: Dict[str, Any] = {
-                "working_dir": working_dir,
-                "llm_model_func": self._make_llm_func(),
-                "chunk_token_size": 1200,
-                "chunk_overlap_token_size": 100,
-                "entity_extract_max_gleaning": 1,
-            }
-
-            # Attach embedding function -- required for vector storage.
-            if not self._embedding:
-                raise RuntimeError(
-                    "embedding_func is required for LightRAG vector storage "
-                    "but no embedding provider was configured. "
-                    "Please configure an embedding provider or disable "
-                    "the LightRAG knowledge engine."
+        try:
+            await rag.ainsert(["\n".join(window) for window in windows])
+            return sum(len(window) for window in windows), len(windows)
+        except Exception as exc:
+            if len(windows) == 1 and len(windows[0]) == 1:
+                logger.warning(
+                    f"[LightRAG] Dropping message for group {group_id} "
+                    f"after insert failure: {exc}"
                 )
-            rag_kwargs["embedding_func"] = EmbeddingFunc(
-                embedding_dim=self._embedding.get_dim(),
-                max_token_size=8192,
-                func=self._make_embedding_func(),
+                return 0, 0
+            logger.debug(
+                f"[LightRAG] Insert of {len(windows)} window(s) failed for "
+                f"group {group_id}, retrying in halves: {exc}"
             )
 
-            rag = LightRAG(**rag_kwargs)
-            await rag.initialize_storages()
-            if hasattr(rag, "initialize_pipeline_status"):
-                await rag.initialize_pipeline_status()
+        if len(windows) > 1:
+            mid = len(windows) // 2
+            halves = [windows[:mid], windows[mid:]]
+        else:
+            lines = windows[0]
+            mid = len(lines) // 2
+            halves = [[lines[:mid]], [lines[mid:]]]
+        ingested = documents = 0
+        for half in halves:
+            half_messages, half_documents = await self._insert_windows(
+                rag, half, group_id
+            )
+            ingested += half_messages
+            documents += half_documents
+        return ingested, documents
+
+    async def _idle_unload_loop(self) -> None:
+        """Periodically unload instances that have been idle too long."""
+        interval = min(300.0, max(5.0, self._pool.idle_timeout / 4))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._pool.evict_idle()
+            except Exception as exc:
+                logger.debug(f"[LightRAG] Idle unload sweep failed: {exc}")
 
-            self._instances[group_id] = rag
-            logger.info(
-                f"[LightRAG] Initialised instance for group {group_id}"
+    async def _unload_rag(self, group_id: str, rag: LightRAG) -> None:
+        """Flush a group's storages to disk and release the instance."""
+        await rag.finalize_storages()
+        logger.debug(f"[LightRAG] Finalized storages for group {group_id}")
+
+    async def _load_rag(self, group_id: str) -> LightRAG:
+        """Create and initialise the LightRAG instance for *group_id*.
+
+        Called by the instance pool, which serialises loads per group.
+        """
+        working_dir = os.path.join(self._base_dir, group_id)
+        os.makedirs(working_dir, exist_ok=True)
+
+        rag_kwargs: Dict[str, Any] = {
+            "working_dir": working_dir,
+            "llm_model_func": self._make_llm_func(),
+            "chunk_token_size": _CHUNK_TOKEN_SIZE,
+            "chunk_overlap_token_size": _CHUNK_OVERLAP_TOKEN_SIZE,
+            "entity_extract_max_gleaning": 1,
+        }
+
+        # Attach embedding function -- required for vector storage.
+        if not self._embedding:
+            raise RuntimeError(
+                "embedding_func is required for LightRAG vector storage "
+                "but no embedding provider was configured. "
+                "Please configure an embedding provider or disable "
+                "the LightRAG knowledge engine."
             )
-            return rag
+        rag_kwargs["embedding_func"] = EmbeddingFunc(
+            embedding_dim=self._embedding.get_dim(),
+            max_token_size=8192,
+            func=self._make_embedding_func(),
+        )
+
+        rag = LightRAG(**rag_kwargs)
+        await rag.initialize_storages()
+        if hasattr(rag, "initialize_pipeline_status"):
+            await rag.initialize_pipeline_status()
+
+        logger.info(
+            f"[LightRAG] Initialised instance for group {group_id}"
+        )
+        return rag
 
     def _make_llm_func(self):
         """Build an async callable matching LightRAG's LLM function signature.
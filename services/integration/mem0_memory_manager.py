@@ -27,14 +27,16 @@ Design notes:
 """
 
 import asyncio
+import hashlib
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from astrbot.api import logger
 
 from ...config import PluginConfig
 from ...core.interfaces import MessageData, ServiceLifecycle
 from ..monitoring.instrumentation import monitored
+from .conversation_packer import estimate_tokens, group_conversation_windows
 
 # Lazy import guard -- mem0ai is an optional dependency.
 _MEM0_AVAILABLE = False
@@ -49,6 +51,9 @@ except ImportError:
     EmbeddingBase = None # type: ignore[assignment,misc]
     LLMBase = None # type: ignore[assignment,misc]
 
+# Token budget per batched ``Memory.add`` call (one fact-extraction pass).
+_BATCH_WINDOW_TOKENS = 1200
+
 
 def _create_framework_embedder(embedding_provider):
     """Build a mem0-compatible embedder that delegates to the framework.
@@ -260,6 +265,106 @@ class Mem0MemoryManager:
         except Exception as exc:
             logger.debug(f"[Mem0] add_memory failed: {exc}")
 
+    async def add_memories_batch(
+        self, messages: List[MessageData], group_id: str
+    ) -> Dict[str, int]:
+        """Extract memories from a buffer of messages in few LLM passes.
+
+        Messages are packed in order into conversation windows of about
+        ``_BATCH_WINDOW_TOKENS``; each window is passed to ``Memory.add``
+        as one multi-message conversation, so mem0 runs its extraction
+        and update pipeline once per window instead of once per message.
+        Windows are scoped by ``agent_id=group_id`` only, since a window
+        mixes several senders. A window whose ``add`` fails is retried in
+        halves, down to single messages, so one bad message does not drop
+        the rest of the window. Every ``add`` is tagged with a hash of its
+        window; memories a failed call managed to write are deleted by
+        that tag before the retry, so a partial success is not duplicated.
+
+        Returns:
+            ``{"messages": ingested, "documents": add calls that succeeded,
+            "failed": messages not ingested}``.
+        """
+        if not self._memory:
+            return {"messages": 0, "documents": 0, "failed": 0}
+
+        lines = [self._extract_text(msg) for msg in messages]
+        lines = [line for line in lines if line]
+        windows = group_conversation_windows(lines, _BATCH_WINDOW_TOKENS)
+
+        ingested = 0
+        documents = 0
+        for window in windows:
+            window_messages, window_documents = await self._add_window(
+                window, group_id
+            )
+            ingested += window_messages
+            documents += window_documents
+        return {
+            "messages": ingested,
+            "documents": documents,
+            "failed": len(lines) - ingested,
+        }
+
+    async def _add_window(
+        self, window: List[str], group_id: str
+    ) -> Tuple[int, int]:
+        """Add one conversation window, splitting it in halves on failure.
+
+        Returns ``(messages, add calls)`` that succeeded.
+        """
+        window_hash = hashlib.sha1(
+            "\n".join(window).encode("utf-8")
+        ).hexdigest()[:16]
+        try:
+            await asyncio.to_thread(
+                self._memory.add,
+                [{"role": "user", "content": line} for line in window],
+                agent_id=group_id,
+                metadata={
+                    "batched": True,
+                    "window_hash": window_hash,
+                    "estimated_tokens": sum(estimate_tokens(l) for l in window),
+                },
+            )
+            return len(window), 1
+        except Exception as exc:
+            await self._discard_window_memories(window_hash, group_id)
+            if len(window) == 1:
+                logger.debug(f"[Mem0] batched add_memory failed: {exc}")
+                return 0, 0
+            logger.debug(
+                f"[Mem0] batched add_memory failed for {len(window)} "
+                f"messages, retrying in halves: {exc}"
+            )
+        mid = len(window) // 2
+        first = await self._add_window(window[:mid], group_id)
+        second = await self._add_window(window[mid:], group_id)
+        return first[0] + second[0], first[1] + second[1]
+
+    async def _discard_window_memories(self, window_hash: str, group_id: str) -> None:
+        """Delete memories written by a failed ``add`` of one window."""
+        try:
+            existing = await asyncio.to_thread(
+                self._memory.get_all, agent_id=group_id
+            )
+            entries = existing.get("results", []) if isinstance(existing, dict) else existing
+            stale = [
+                entry["id"]
+                for entry in entries or []
+                if isinstance(entry, dict)
+                and entry.get("id")
+                and (entry.get("metadata") or {}).get("window_hash") == window_hash
+            ]
+            for memory_id in stale:
+                await asyncio.to_thread(self._memory.delete, memory_id)
+            if stale:
+                logger.debug(
+                    f"[Mem0] removed {len(stale)} memories from a failed batched add"
+                )
+        except Exception as exc:
+            logger.debug(f"[Mem0] cleanup after failed batched add failed: {exc}")
+
     @monitored
     async def get_related_memories(
         self,
@@ -0,0 +1,499 @@
+"""
+In-process vector indexes for exemplar retrieval.
+
+Two interchangeable indexes share one interface (``add`` / ``remove`` /
+``search`` / ``__len__``), selected via ``create_vector_index``:
+
+``flat``
+    Exact cosine search: one matrix–vector multiply over every row.
+
+``ivf``
+    Inverted-file index (IVF-Flat) in pure NumPy. Rows are stored in
+    ``nlist ≈ sqrt(N)`` partitions around spherical k-means centroids; a
+    query only scans the partitions of its ``nprobe`` nearest centroids.
+    Below ``train_threshold`` rows the index stays untrained and behaves
+    exactly like ``flat``, so small groups keep exact results. The coarse
+    quantiser is retrained when the index has grown ``_RETRAIN_GROWTH``x
+    since the last training. ``add(..., train=False)`` plus
+    ``compute_training`` / ``apply_training`` let callers move that
+    retraining off the event loop.
+
+Both indexes are maintained incrementally: ``add`` appends (amortised
+O(1) with capacity doubling) and ``remove`` swap-deletes in O(1) per id.
+Vectors are L2-normalised on insert so cosine similarity is a dot product.
+``FlatIndex.adopt`` serves an already-normalised matrix (e.g. a read-only
+``np.memmap``) in place; the first mutation copies it into a private buffer.
+Requires numpy; callers fall back to their own pure-Python path without it.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Rows needed before the IVF coarse quantiser is trained.
+_DEFAULT_TRAIN_THRESHOLD = 2048
+
+# Retrain once the index has grown this many times since the last training.
+_RETRAIN_GROWTH = 4
+
+# Training sample size per centroid (rule of thumb for k-means quality).
+_TRAIN_SAMPLES_PER_LIST = 40
+
+_KMEANS_ITERATIONS = 10
+
+# Rows per block when routing rows to partitions (bounds temporary memory).
+_ASSIGN_BLOCK = 8192
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise each row (zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-10)
+
+
+def _unit_query(query: Sequence[float], dim: int) -> Optional[np.ndarray]:
+    q = np.asarray(query, dtype=np.float32).reshape(-1)
+    if q.shape[0] != dim:
+        raise ValueError(f"query dim {q.shape[0]} != index dim {dim}")
+    norm = float(np.linalg.norm(q))
+    if norm < 1e-10:
+        return None
+    return q / norm
+
+
+def _top_k(
+    ids: np.ndarray, sims: np.ndarray, k: int
+) -> List[Tuple[int, float]]:
+    k = min(k, len(sims))
+    if k < len(sims):
+        part = np.argpartition(-sims, k - 1)[:k]
+    else:
+        part = np.arange(len(sims))
+    order = part[np.argsort(-sims[part])]
+    return [(int(ids[i]), float(sims[i])) for i in order]
+
+
+class FlatIndex:
+    """Exact cosine index over an incrementally maintained matrix."""
+
+    def __init__(self, dim: int) -> None:
+        self.dim = int(dim)
+        self._vecs = np.empty((0, self.dim), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._size = 0
+        self._pos: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._pos
+
+    def add(
+        self, ids: Sequence[int], vectors: np.ndarray, train: bool = True
+    ) -> None:
+        """Insert (or replace) rows. ``vectors`` has shape (n, dim).
+
+        ``train`` is accepted for interface parity with ``IVFFlatIndex``.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(ids) != vectors.shape[0]:
+            raise ValueError("ids and vectors length mismatch")
+        self.remove([i for i in ids if i in self._pos])
+        if not len(ids):
+            return
+        self._ensure_writable()
+        self._reserve(self._size + len(ids))
+        start = self._size
+        end = start + len(ids)
+        self._vecs[start:end] = normalize_rows(vectors)
+        self._ids[start:end] = ids
+        for offset, item_id in enumerate(ids):
+            self._pos[int(item_id)] = start + offset
+        self._size = end
+
+    def adopt(self, ids: Sequence[int], unit_vectors: np.ndarray) -> None:
+        """Serve an L2-normalised (n, dim) matrix in place, without copying.
+
+        The index must be empty. ``unit_vectors`` may be read-only (e.g. a
+        ``np.memmap``); it is copied on the first ``add`` or ``remove``.
+        """
+        if self._size:
+            raise ValueError("adopt requires an empty index")
+        if unit_vectors.ndim != 2 or unit_vectors.shape[1] != self.dim:
+            raise ValueError("unit_vectors must have shape (n, dim)")
+        if len(ids) != unit_vectors.shape[0]:
+            raise ValueError("ids and vectors length mismatch")
+        self._vecs = unit_vectors
+        self._ids = np.asarray(ids, dtype=np.int64)
+        self._pos = {int(item_id): row for row, item_id in enumerate(ids)}
+        self._size = len(ids)
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Delete rows by id; unknown ids are ignored. Returns rows removed."""
+        removed = 0
+        for item_id in ids:
+            row = self._pos.pop(int(item_id), None)
+            if row is None:
+                continue
+            self._ensure_writable()
+            last = self._size - 1
+            if row != last:
+                self._vecs[row] = self._vecs[last]
+                moved_id = int(self._ids[last])
+                self._ids[row] = moved_id
+                self._pos[moved_id] = row
+            self._size = last
+            removed += 1
+        return removed
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        """Return up to ``k`` ``(id, cosine)`` pairs, best first."""
+        if not self._size or k <= 0:
+            return []
+        q = _unit_query(query, self.dim)
+        if q is None:
+            return []
+        sims = self._vecs[:self._size] @ q
+        return _top_k(self._ids[:self._size], sims, k)
+
+    # Internal helpers
+
+    def _ensure_writable(self) -> None:
+        if not self._vecs.flags.writeable:
+            self._vecs = np.array(self._vecs, dtype=np.float32)
+        if not self._ids.flags.writeable:
+            self._ids = self._ids.copy()
+
+    def _reserve(self, needed: int) -> None:
+        capacity = self._vecs.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        vecs = np.empty((new_capacity, self.dim), dtype=np.float32)
+        vecs[:self._size] = self._vecs[:self._size]
+        ids = np.empty(new_capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        self._vecs, self._ids = vecs, ids
+
+
+class _InvertedList:
+    """One IVF partition: contiguous growable vectors plus their ids."""
+
+    __slots__ = ("vecs", "ids", "size")
+
+    def __init__(self, dim: int) -> None:
+        self.vecs = np.empty((0, dim), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.size = 0
+
+    def append(self, ids: np.ndarray, vectors: np.ndarray) -> int:
+        """Append rows; returns the first new row position."""
+        needed = self.size + len(ids)
+        capacity = self.vecs.shape[0]
+        if needed > capacity:
+            new_capacity = max(needed, capacity * 2, 16)
+            vecs = np.empty((new_capacity, self.vecs.shape[1]), dtype=np.float32)
+            vecs[:self.size] = self.vecs[:self.size]
+            new_ids = np.empty(new_capacity, dtype=np.int64)
+            new_ids[:self.size] = self.ids[:self.size]
+            self.vecs, self.ids = vecs, new_ids
+        start = self.size
+        self.vecs[start:needed] = vectors
+        self.ids[start:needed] = ids
+        self.size = needed
+        return start
+
+
+class IVFFlatIndex:
+    """Approximate cosine index: spherical k-means inverted lists.
+
+    Each partition stores its rows contiguously, so a query touches only
+    the ``nprobe`` probed partitions. Before training everything lives in
+    a single partition and search is exact.
+
+    Training only materialises a sample of rows (``_TRAIN_SAMPLES_PER_LIST``
+    per centroid); rows are then routed partition by partition, so a bulk
+    load from a memory-mapped matrix never copies the whole matrix twice.
+
+    Args:
+        dim: Vector dimensionality.
+        nprobe: Partitions scanned per query. ``None`` picks
+            ``max(8, nlist // 16)``.
+        train_threshold: Rows required before training; smaller indexes
+            answer exactly.
+        seed: Random seed for training sample and centroid init.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        nprobe: Optional[int] = None,
+        train_threshold: int = _DEFAULT_TRAIN_THRESHOLD,
+        seed: int = 0,
+    ) -> None:
+        self.dim = int(dim)
+        self._nprobe = nprobe
+        self._train_threshold = max(2, int(train_threshold))
+        self._rng = np.random.default_rng(seed)
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[_InvertedList] = [_InvertedList(self.dim)]
+        # id -> (list number, row within list)
+        self._pos: Dict[int, Tuple[int, int]] = {}
+        self._trained_size = 0
+        # Bumped on every mutation; lets off-thread training detect races.
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._pos
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def nlist(self) -> int:
+        return 0 if self._centroids is None else self._centroids.shape[0]
+
+    @property
+    def train_threshold(self) -> int:
+        return self._train_threshold
+
+    @property
+    def needs_training(self) -> bool:
+        """Whether the quantiser should be (re)trained at the current size."""
+        size = len(self._pos)
+        if self._centroids is None:
+            return size >= self._train_threshold
+        return size >= self._trained_size * _RETRAIN_GROWTH
+
+    def add(
+        self, ids: Sequence[int], vectors: np.ndarray, train: bool = True
+    ) -> None:
+        """Insert (or replace) rows. ``vectors`` has shape (n, dim).
+
+        With ``train=False`` the index never retrains inside this call;
+        the caller checks ``needs_training`` and runs ``compute_training``
+        elsewhere (e.g. in a worker thread).
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(ids) != vectors.shape[0]:
+            raise ValueError("ids and vectors length mismatch")
+        self.remove([i for i in ids if i in self._pos])
+        if not len(ids):
+            return
+        ids = np.asarray(ids, dtype=np.int64)
+        self._version += 1
+
+        if (
+            train
+            and self._centroids is None
+            and not self._pos
+            and len(ids) >= self._train_threshold
+        ):
+            # Bulk load into an empty index: train on a sample of the input
+            # and route it straight into the final partitions.
+            centroids = self._fit_centroids([vectors], normalize=True)
+            if centroids is not None:
+                self._centroids = centroids
+                self._trained_size = len(ids)
+                self._lists = [
+                    _InvertedList(self.dim) for _ in range(centroids.shape[0])
+                ]
+        self._route(ids, vectors, self._centroids, self._lists, self._pos, True)
+
+        if train and self.needs_training:
+            self.train()
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Delete rows by id; unknown ids are ignored. Returns rows removed."""
+        removed = 0
+        for item_id in ids:
+            loc = self._pos.pop(int(item_id), None)
+            if loc is None:
+                continue
+            list_no, row = loc
+            inv = self._lists[list_no]
+            last = inv.size - 1
+            if row != last:
+                inv.vecs[row] = inv.vecs[last]
+                moved_id = int(inv.ids[last])
+                inv.ids[row] = moved_id
+                self._pos[moved_id] = (list_no, row)
+            inv.size = last
+            removed += 1
+        if removed:
+            self._version += 1
+        return removed
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        """Return up to ``k`` ``(id, cosine)`` pairs, best first."""
+        if not self._pos or k <= 0:
+            return []
+        q = _unit_query(query, self.dim)
+        if q is None:
+            return []
+
+        sims_parts = []
+        ids_parts = []
+        for list_no in self._probe(q):
+            inv = self._lists[list_no]
+            if inv.size:
+                sims_parts.append(inv.vecs[:inv.size] @ q)
+                ids_parts.append(inv.ids[:inv.size])
+        if not sims_parts:
+            return []
+        return _top_k(np.concatenate(ids_parts), np.concatenate(sims_parts), k)
+
+    def scanned_rows(self, query: Sequence[float]) -> int:
+        """Rows a query for ``query`` would scan (for benchmarking)."""
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        return sum(self._lists[n].size for n in self._probe(q))
+
+    def train(self) -> None:
+        """(Re)build the coarse quantiser and redistribute all rows."""
+        self.apply_training(self.compute_training())
+
+    def compute_training(self):
+        """Build a retrained partition layout without mutating the index.
+
+        Only reads the index, so it may run in a worker thread while the
+        event loop keeps searching. Returns an opaque state for
+        ``apply_training`` or ``None`` when the index is too small.
+        """
+        version = self._version
+        lists = self._lists
+        size = len(self._pos)
+        sources = []
+        for inv in lists:
+            rows = min(inv.size, len(inv.ids), inv.vecs.shape[0])
+            if rows:
+                sources.append((inv.ids[:rows], inv.vecs[:rows]))
+        centroids = self._fit_centroids([vecs for _, vecs in sources])
+        if centroids is None:
+            return None
+
+        new_lists = [_InvertedList(self.dim) for _ in range(centroids.shape[0])]
+        new_pos: Dict[int, Tuple[int, int]] = {}
+        for ids, vecs in sources:
+            self._route(ids, vecs, centroids, new_lists, new_pos, False)
+        return version, centroids, new_lists, new_pos, size
+
+    def apply_training(self, state) -> bool:
+        """Install a layout from ``compute_training``.
+
+        Returns False (and keeps the current layout) when the index was
+        mutated after the layout was computed.
+        """
+        if state is None:
+            return False
+        version, centroids, lists, pos, size = state
+        if version != self._version:
+            return False
+        self._centroids = centroids
+        self._lists = lists
+        self._pos = pos
+        self._trained_size = size
+        self._version += 1
+        return True
+
+    # Internal helpers
+
+    def _probe(self, query: np.ndarray) -> Iterable[int]:
+        if self._centroids is None:
+            return (0,)
+        nlist = self._centroids.shape[0]
+        nprobe = min(self._nprobe or max(8, nlist // 16), nlist)
+        if nprobe >= nlist:
+            return range(nlist)
+        centroid_sims = self._centroids @ query
+        return np.argpartition(-centroid_sims, nprobe - 1)[:nprobe].tolist()
+
+    def _fit_centroids(
+        self, sources: List[np.ndarray], normalize: bool = False
+    ) -> Optional[np.ndarray]:
+        """Spherical k-means on a row sample gathered from ``sources``.
+
+        Only the sampled rows are copied; ``sources`` may be views into
+        partitions or a memory-mapped matrix.
+        """
+        counts = [len(src) for src in sources]
+        size = sum(counts)
+        nlist = max(1, int(round(math.sqrt(size))))
+        if size < self._train_threshold or nlist < 2:
+            return None
+
+        sample_size = min(size, nlist * _TRAIN_SAMPLES_PER_LIST)
+        picks = np.sort(self._rng.choice(size, sample_size, replace=False))
+        offsets = np.cumsum([0] + counts)
+        parts = []
+        for src_no, src in enumerate(sources):
+            lo, hi = np.searchsorted(picks, offsets[src_no:src_no + 2])
+            if hi > lo:
+                parts.append(
+                    np.asarray(src[picks[lo:hi] - offsets[src_no]], dtype=np.float32)
+                )
+        sample = np.concatenate(parts)
+        if normalize:
+            sample = normalize_rows(sample)
+
+        centroids = sample[self._rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(_KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            if empty.any():
+                # Re-seed empty partitions from random sample rows.
+                sums[empty] = sample[
+                    self._rng.choice(sample_size, int(empty.sum()), replace=False)
+                ]
+            centroids = normalize_rows(sums)
+        return centroids.astype(np.float32)
+
+    def _route(
+        self,
+        ids: np.ndarray,
+        vecs: np.ndarray,
+        centroids: Optional[np.ndarray],
+        lists: List[_InvertedList],
+        pos: Dict[int, Tuple[int, int]],
+        normalize: bool,
+    ) -> None:
+        """Append rows to their partitions block by block."""
+        for block in range(0, len(ids), _ASSIGN_BLOCK):
+            stop = min(block + _ASSIGN_BLOCK, len(ids))
+            block_ids = ids[block:stop]
+            block_vecs = vecs[block:stop]
+            if normalize:
+                block_vecs = normalize_rows(block_vecs)
+            if centroids is None:
+                labels = np.zeros(len(block_ids), dtype=np.int64)
+            else:
+                labels = np.argmax(block_vecs @ centroids.T, axis=1)
+            order = np.argsort(labels, kind="stable")
+            bounds = np.flatnonzero(np.diff(labels[order])) + 1
+            for group in np.split(order, bounds):
+                if not len(group):
+                    continue
+                list_no = int(labels[group[0]])
+                start = lists[list_no].append(block_ids[group], block_vecs[group])
+                for offset, item_id in enumerate(block_ids[group].tolist()):
+                    pos[item_id] = (list_no, start + offset)
+
+
+VECTOR_INDEX_KINDS = ("flat", "ivf")
+
+
+def create_vector_index(kind: str, dim: int, **kwargs):
+    """Create a vector index by name (``"flat"`` or ``"ivf"``)."""
+    if kind == "ivf":
+        return IVFFlatIndex(dim, **kwargs)
+    if kind == "flat":
+        return FlatIndex(dim)
+    raise ValueError(f"Unknown vector index kind: {kind}")
@@ -1,10 +1,12 @@
 """Jargon detection, mining, and query services."""
 
+from .jargon_matcher import JargonMatcher
 from .jargon_miner import JargonMiner, JargonMinerManager
 from .jargon_query import JargonQueryService
 from .jargon_statistical_filter import JargonStatisticalFilter
 
 __all__ = [
+    "JargonMatcher",
     "JargonMiner",
     "JargonMinerManager",
     "JargonQueryService",
@@ -0,0 +1,135 @@
+"""
+黑话多模式匹配器 - Aho-Corasick 自动机
+
+将一个群组（含全局共享）的全部已确认黑话编译为一个自动机，
+对消息做一次线性扫描即可找出所有命中的黑话，替代逐词子串/正则检查。
+
+匹配规则与 ``JargonQueryService._contains_jargon`` 保持一致:
+    - 纯 ASCII 缩写（``[A-Za-z0-9_+-]+``）忽略大小写，且两侧必须是词边界，
+      避免 ``abc`` 命中 ``xabcx``；
+    - 其他黑话按原文精确子串匹配。
+"""
+from collections import deque
+from typing import Any, Dict, List, Sequence
+import re
+
+# ASCII 缩写判定与词边界字符，与 JargonQueryService._contains_jargon 一致
+_ASCII_TERM = re.compile(r'[A-Za-z0-9_+-]+')
+_BOUNDARY_CHARS = frozenset(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_+-'
+)
+
+# 仅转换 ASCII 大写字母，保证文本长度不变，匹配位置可直接映射回原文
+_ASCII_LOWER = str.maketrans(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'
+)
+
+
+class JargonMatcher:
+    """按群组编译的黑话 Aho-Corasick 自动机（构建后只读）"""
+
+    __slots__ = ('_items', '_patterns', '_ascii', '_goto', '_fail', '_out')
+
+    def __init__(self, jargon_list: Sequence[Dict[str, Any]]):
+        """
+        编译黑话自动机
+
+        Args:
+            jargon_list: 黑话记录列表（需含 content/meaning），顺序即命中结果的优先级。
+                内容为空、重复或含义未推断的记录会被跳过。
+        """
+        self._items: List[Dict[str, Any]] = []
+        self._patterns: List[str] = []
+        self._ascii: List[bool] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        seen_contents = set()
+        for item in jargon_list:
+            content = str(item.get('content') or '').strip()
+            meaning = str(item.get('meaning') or '').strip()
+            if not content or content in seen_contents:
+                continue
+            if not meaning or meaning == '含义待推断':
+                continue
+            seen_contents.add(content)
+            self._add_pattern(content, item)
+
+        self._build_fail_links()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def find(self, text: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        单次线性扫描文本，返回命中的黑话记录
+
+        Args:
+            text: 要检查的文本
+            limit: 最多返回的记录数
+
+        Returns:
+            命中的黑话记录，按构建时的列表顺序排列
+        """
+        if not text or not self._patterns:
+            return []
+
+        normalized = text.translate(_ASCII_LOWER)
+        goto, fail, out = self._goto, self._fail, self._out
+        matched = set()
+        state = 0
+        for pos, ch in enumerate(normalized):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                if idx not in matched and self._accept(text, idx, pos + 1):
+                    matched.add(idx)
+
+        return [self._items[idx] for idx in sorted(matched)[:limit]]
+
+    # 内部实现
+
+    def _add_pattern(self, content: str, item: Dict[str, Any]) -> None:
+        idx = len(self._patterns)
+        self._patterns.append(content)
+        self._items.append(item)
+        self._ascii.append(_ASCII_TERM.fullmatch(content) is not None)
+
+        state = 0
+        for ch in content.translate(_ASCII_LOWER):
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(idx)
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _accept(self, text: str, idx: int, end: int) -> bool:
+        """校验候选命中：ASCII 缩写检查词边界，其他黑话检查原文大小写"""
+        content = self._patterns[idx]
+        start = end - len(content)
+        if self._ascii[idx]:
+            if start > 0 and text[start - 1] in _BOUNDARY_CHARS:
+                return False
+            if end < len(text) and text[end] in _BOUNDARY_CHARS:
+                return False
+            return True
+        return text[start:end] == content
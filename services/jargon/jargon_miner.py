@@ -6,7 +6,7 @@
 import json
 import time
 import asyncio
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any
 from datetime import datetime
 
 from astrbot.api import logger
@@ -192,13 +192,16 @@ class JargonMiner(AsyncServiceBase):
         chat_id: str,
         llm_adapter: FrameworkLLMAdapter,
         db_manager,
-        config
+        config,
+        on_jargon_changed: Optional[Callable[[str], None]] = None,
     ):
         super().__init__(f"jargon_miner_{chat_id}")
         self.chat_id = chat_id
         self.llm = llm_adapter
         self.db = db_manager
         self.config = config
+        # 黑话确认状态/含义变更后的回调（用于使查询侧的匹配自动机失效）
+        self._on_jargon_changed = on_jargon_changed
 
         # 推断引擎
         self.inference_engine = JargonInferenceEngine(llm_adapter)
@@ -649,6 +652,7 @@ class JargonMiner(AsyncServiceBase):
 
             jargon.updated_at = datetime.now()
             await self.db.update_jargon(self._jargon_to_dict(jargon))
+            self._notify_jargon_changed()
 
             # 记录日志
             if jargon.is_jargon:
@@ -659,6 +663,14 @@ class JargonMiner(AsyncServiceBase):
         except Exception as e:
             logger.error(f"推断黑话失败: {e}")
 
+    def _notify_jargon_changed(self) -> None:
+        if not self._on_jargon_changed:
+            return
+        try:
+            self._on_jargon_changed(self.chat_id)
+        except Exception as e:
+            logger.debug(f"[{self.chat_id}] 黑话变更通知失败: {e}")
+
     async def run_once(
         self,
         chat_messages: str,
@@ -751,10 +763,17 @@ class JargonMiner(AsyncServiceBase):
 class JargonMinerManager:
     """黑话挖掘器管理器"""
 
-    def __init__(self, llm_adapter: FrameworkLLMAdapter, db_manager, config):
+    def __init__(
+        self,
+        llm_adapter: FrameworkLLMAdapter,
+        db_manager,
+        config,
+        on_jargon_changed: Optional[Callable[[str], None]] = None,
+    ):
         self.llm = llm_adapter
         self.db = db_manager
         self.config = config
+        self._on_jargon_changed = on_jargon_changed
         self._miners: Dict[str, JargonMiner] = {}
 
     def get_miner(self, chat_id: str) -> JargonMiner:
@@ -764,7 +783,8 @@ class JargonMinerManager:
                 chat_id,
                 self.llm,
                 self.db,
-                self.config
+                self.config,
+                on_jargon_changed=self._on_jargon_changed,
             )
         return self._miners[chat_id]
 
@@ -8,6 +8,7 @@ import re
 from astrbot.api import logger
 
 from ..monitoring.instrumentation import monitored
+from .jargon_matcher import JargonMatcher
 
 try:
     from ...utils.cache_manager import TTLCache
@@ -15,21 +16,30 @@ except ImportError:
     from utils.cache_manager import TTLCache
 
 
+# 构建匹配自动机时分页拉取已确认黑话，每个来源的最大条数
+_VOCAB_PAGE_SIZE = 500
+_MAX_VOCAB_PER_SOURCE = 20000
+
+
 class JargonQueryService:
     """黑话查询服务 - 供LLM工具调用"""
 
-    def __init__(self, db_manager, cache_ttl: int = 60):
+    def __init__(self, db_manager, cache_ttl: int = 60, matcher_ttl: int = 600):
         """
         初始化黑话查询服务
 
         Args:
             db_manager: 数据库管理器实例
             cache_ttl: 缓存有效期（秒），默认60秒
+            matcher_ttl: 黑话匹配自动机的兜底有效期（秒），
+                黑话写入时会通过 ``invalidate_group`` 主动失效
         """
         self.db = db_manager
 
         # 使用 cachetools.TTLCache - 自动过期管理
         self._cache = TTLCache(maxsize=500, ttl=cache_ttl)
+        # chat_id → JargonMatcher，构建成本较高，单独缓存
+        self._matchers = TTLCache(maxsize=200, ttl=matcher_ttl)
         logger.info(f"[黑话查询] 使用 TTLCache (maxsize=500, ttl={cache_ttl}s)")
 
     def _get_from_cache(self, key: str) -> Optional[Any]:
@@ -43,6 +53,21 @@ class JargonQueryService:
     def clear_cache(self) -> None:
         """清空黑话查询缓存。"""
         self._cache.clear()
+        self._matchers.clear()
+
+    def invalidate_group(self, chat_id: Optional[str] = None) -> None:
+        """黑话写入后使对应群组的匹配自动机失效
+
+        Args:
+            chat_id: 发生变更的群组ID；为 None 时（如全局黑话变更）使全部群组失效
+        """
+        if chat_id is None:
+            self._matchers.clear()
+        else:
+            self._matchers.pop(chat_id, None)
+        for key in [k for k in list(self._cache.keys()) if k.startswith('jargon_context_')]:
+            if chat_id is None or key.startswith(f"jargon_context_{chat_id}_"):
+                self._cache.pop(key, None)
 
     async def query_jargon(
         self,
@@ -175,38 +200,12 @@ class JargonQueryService:
             如果找到黑话则返回解释文本,否则返回None
         """
         try:
-            # 先从缓存获取该群组 + 全局共享的黑话列表
-            cache_key = f"jargon_list_{chat_id}"
-            jargon_list = self._get_from_cache(cache_key)
-
-            if jargon_list is None:
-                # 缓存未命中，从数据库获取
-                jargon_list = await self._get_group_and_global_jargon_list(
-                    chat_id=chat_id,
-                    limit=100,
-                )
-                # 缓存黑话列表
-                self._set_to_cache(cache_key, jargon_list)
-
-            if not jargon_list:
+            matcher = await self._get_matcher(chat_id)
+            if not len(matcher):
                 return None
 
-            # 检查文本中是否包含黑话，避免短词/英文缩写的误命中导致污染
-            found_jargon = []
-            seen_contents = set()
-            for j in jargon_list:
-                content = str(j.get('content') or '').strip()
-                meaning = str(j.get('meaning') or '').strip()
-                if not content or content in seen_contents:
-                    continue
-                if not meaning or meaning == '含义待推断':
-                    continue
-                if not self._contains_jargon(text, content):
-                    continue
-                found_jargon.append(j)
-                seen_contents.add(content)
-                if len(found_jargon) >= 5:
-                    break
+            # 单次线性扫描命中全部已确认黑话（ASCII 缩写带边界校验，避免误命中污染）
+            found_jargon = matcher.find(text, limit=5)
 
             if not found_jargon:
                 return None
@@ -224,6 +223,49 @@ class JargonQueryService:
             logger.error(f"检查黑话失败: {e}")
             return None
 
+    async def _get_matcher(self, chat_id: str) -> JargonMatcher:
+        """获取（必要时构建）群组 + 全局已确认黑话的匹配自动机"""
+        matcher = self._matchers.get(chat_id)
+        if matcher is None:
+            group_results: List[Dict[str, Any]] = []
+            if chat_id:
+                group_results = await self._get_all_confirmed_jargon(chat_id=chat_id)
+            global_results = await self._get_all_confirmed_jargon(
+                chat_id=None, global_only=True
+            )
+            matcher = JargonMatcher(
+                self._merge_jargon_by_content(group_results, global_results)
+            )
+            self._matchers[chat_id] = matcher
+            logger.debug(f"[黑话查询] 群组 {chat_id} 黑话自动机已构建 ({len(matcher)} 条)")
+        return matcher
+
+    async def _get_all_confirmed_jargon(
+        self,
+        chat_id: Optional[str],
+        global_only: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """分页拉取某个来源的全部已确认黑话（最近优先）"""
+        kwargs: Dict[str, Any] = {'chat_id': chat_id, 'only_confirmed': True}
+        if global_only:
+            kwargs['global_only'] = True
+
+        results: List[Dict[str, Any]] = []
+        offset = 0
+        while offset < _MAX_VOCAB_PER_SOURCE:
+            page = await self.db.get_recent_jargon_list(
+                limit=_VOCAB_PAGE_SIZE,
+                offset=offset,
+                **kwargs,
+            )
+            if not page:
+                break
+            results.extend(page)
+            if len(page) < _VOCAB_PAGE_SIZE:
+                break
+            offset += _VOCAB_PAGE_SIZE
+        return results
+
     async def _get_group_and_global_jargon_list(
         self,
         chat_id: str,
@@ -7,16 +7,33 @@ jargon candidates *before* any LLM call. This reduces LLM cost by 70-80%
 by only forwarding high-confidence candidates to the inference engine.
 
 Design notes:
-    - All state is held in memory (dict-of-dicts) for O(1) update per message.
+    - All state is held in memory for O(1) update per message. Each group
+      owns one compact ``_GroupTermTable``; term and sender strings are
+      interned so a term shared by many groups is stored once.
+    - A term → group-count (document frequency) index is maintained
+      incrementally, so cross-group IDF is an O(1) lookup per term instead
+      of a scan over every group's term table.
+    - Counts decay exponentially (configurable half-life) and cold terms
+      are pruned. Decay is applied lazily from the elapsed time whenever a
+      group is written, read or evicted, and the snapshot loop sweeps idle
+      groups so their counts decay even without new messages.
+    - Each group is capped at ``max_terms_per_group`` terms; eviction drops
+      the lowest decayed counts first, and terms first seen within
+      ``_EVICTION_GRACE`` seconds are only evicted when nothing older is left.
+    - Optional snapshot persistence: ``start()`` restores the tables from
+      ``snapshot_path`` and saves periodically, ``stop()`` saves a final
+      snapshot, so the signals survive restarts without re-reading history.
     - Tokenisation uses ``jieba`` (already a project dependency).
-    - The filter is stateless across restarts — rebuilt implicitly from the
-      message stream. A future enhancement could persist snapshots to DB.
     - Thread-safe for single-event-loop asyncio usage (no concurrent writes).
 """
 
+import asyncio
+import heapq
+import json
 import math
+import os
+import sys
 import time
-from collections import defaultdict
 from typing import Any, Dict, List, Optional, Set
 
 from astrbot.api import logger
@@ -29,7 +46,30 @@ _MIN_TERM_LENGTH = 2
 _MIN_FREQUENCY = 5
 
 # Maximum number of context examples to retain per term.
-_MAX_CONTEXT_EXAMPLES = 10
+_MAX_CONTEXT_EXAMPLES = 5
+
+# Context examples are truncated to this many characters.
+_MAX_CONTEXT_LENGTH = 200
+
+# Distinct senders tracked per term. User concentration is 1 / unique_users,
+# so beyond this the signal is effectively zero and exact counts are moot.
+_MAX_TRACKED_USERS = 32
+
+# Seconds between decay passes over a group's table.
+_DECAY_INTERVAL = 3600.0
+
+# Decayed counts below this value are pruned.
+_PRUNE_THRESHOLD = 0.5
+
+# Newly seen terms are protected from eviction for this many seconds so
+# they have a chance to build up counts.
+_EVICTION_GRACE = 600.0
+
+# When a group exceeds its term budget it is shrunk to this fraction of it,
+# so eviction cost is amortised over many inserts.
+_EVICT_TARGET_RATIO = 0.9
+
+_SNAPSHOT_VERSION = 1
 
 # Jieba dictionary frequency threshold.
 # Words with frequency > this value in jieba's built-in dictionary are treated
@@ -46,6 +86,19 @@ _WEIGHT_BURST = 0.3
 _WEIGHT_CONCENTRATION = 0.3
 
 
+class _GroupTermTable:
+    """Term statistics for one group (decayed counts, senders, contexts)."""
+
+    __slots__ = ("freq", "users", "first_seen", "contexts", "last_decay")
+
+    def __init__(self, last_decay: float) -> None:
+        self.freq: Dict[str, float] = {}
+        self.users: Dict[str, Set[str]] = {}
+        self.first_seen: Dict[str, float] = {}
+        self.contexts: Dict[str, List[str]] = {}
+        self.last_decay = last_decay
+
+
 class JargonStatisticalFilter:
     """Zero-cost statistical pre-filter for jargon candidate detection.
 
@@ -62,37 +115,164 @@ class JargonStatisticalFilter:
 
         # Batch trigger:
         candidates = jfilter.get_jargon_candidates(group_id, top_k=20)
-    """
-
-    def __init__(self) -> None:
-        # group_id → {term → count}
-        self._group_term_freq: Dict[str, Dict[str, int]] = defaultdict(
-            lambda: defaultdict(int)
-        )
 
-        # term → total count across all groups
-        self._global_term_freq: Dict[str, int] = defaultdict(int)
+    Args:
+        max_terms_per_group: Per-group term budget; the coldest terms are
+            evicted once it is exceeded.
+        decay_half_life_days: Half-life of term counts in days. ``0``
+            disables decay.
+        snapshot_path: Optional JSON file used by ``start``/``stop`` and
+            the periodic snapshot loop.
+        snapshot_interval: Seconds between periodic snapshots.
+    """
 
-        # group_id → {term → {sender_id → count}}
-        self._user_term_freq: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(
-            lambda: defaultdict(lambda: defaultdict(int))
-        )
+    def __init__(
+        self,
+        max_terms_per_group: int = 5000,
+        decay_half_life_days: float = 7.0,
+        snapshot_path: Optional[str] = None,
+        snapshot_interval: float = 600.0,
+    ) -> None:
+        self._max_terms_per_group = max(1, int(max_terms_per_group))
+        self._half_life_seconds = max(0.0, float(decay_half_life_days)) * 86400.0
+        self._snapshot_path = snapshot_path
+        self._snapshot_interval = max(1.0, float(snapshot_interval))
 
-        # group_id → {term → first_seen_timestamp}
-        self._term_first_seen: Dict[str, Dict[str, float]] = defaultdict(dict)
+        # group_id → term table
+        self._groups: Dict[str, _GroupTermTable] = {}
 
-        # group_id → {term → [context_examples]}
-        self._term_contexts: Dict[str, Dict[str, List[str]]] = defaultdict(
-            lambda: defaultdict(list)
-        )
+        # term → number of groups whose term table contains it (document
+        # frequency). Kept in sync with the group tables on insert/prune/reset.
+        self._term_group_count: Dict[str, int] = {}
 
         # Set of groups that have been updated since last candidate pull.
         self._dirty_groups: Set[str] = set()
 
+        self._snapshot_dirty = False
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._terms_pruned = 0
+        self._terms_evicted = 0
+
         # jieba instance (lazy-loaded).
         self._jieba_loaded = False
         self._jieba_freq: Dict[str, int] = {}  # cached reference to jieba.dt.FREQ
 
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Restore the last snapshot and start periodic snapshotting."""
+        if not self._snapshot_path:
+            return
+        await self.load_snapshot()
+        if self._snapshot_task is None or self._snapshot_task.done():
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+
+    async def stop(self) -> None:
+        """Stop periodic snapshotting and save a final snapshot."""
+        if self._snapshot_task and not self._snapshot_task.done():
+            self._snapshot_task.cancel()
+            try:
+                await self._snapshot_task
+            except asyncio.CancelledError:
+                pass
+        self._snapshot_task = None
+        await self.save_snapshot()
+
+    async def load_snapshot(self, path: Optional[str] = None) -> int:
+        """Restore the term tables from ``path`` (default ``snapshot_path``).
+
+        Returns:
+            Number of groups restored (``0`` if there is no snapshot).
+        """
+        path = path or self._snapshot_path
+        if not path or not os.path.exists(path):
+            return 0
+        try:
+            state = await asyncio.to_thread(self._read_snapshot_file, path)
+            restored = self.import_state(state)
+            logger.info(
+                f"[JargonFilter] Restored statistics for {restored} groups "
+                f"from snapshot"
+            )
+            return restored
+        except Exception as exc:
+            logger.warning(f"[JargonFilter] Snapshot load failed: {exc}")
+            return 0
+
+    async def save_snapshot(self, path: Optional[str] = None) -> bool:
+        """Persist the term tables to ``path`` (default ``snapshot_path``).
+
+        The state is exported on the event loop (consistent view) and
+        serialised/written in a worker thread. The file is replaced
+        atomically so a crash mid-write never corrupts the last snapshot.
+        """
+        path = path or self._snapshot_path
+        if not path:
+            return False
+        state = self.export_state()
+        self._snapshot_dirty = False
+        try:
+            await asyncio.to_thread(self._write_snapshot_file, path, state)
+            return True
+        except Exception as exc:
+            self._snapshot_dirty = True
+            logger.warning(f"[JargonFilter] Snapshot save failed: {exc}")
+            return False
+
+    def export_state(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable copy of all term tables."""
+        groups: Dict[str, Any] = {}
+        for group_id, table in self._groups.items():
+            groups[group_id] = {
+                "last_decay": table.last_decay,
+                "terms": {
+                    term: [
+                        round(freq, 3),
+                        table.first_seen.get(term, 0.0),
+                        list(table.users.get(term, ())),
+                        list(table.contexts.get(term, ())),
+                    ]
+                    for term, freq in table.freq.items()
+                },
+            }
+        return {
+            "version": _SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "groups": groups,
+        }
+
+    def import_state(self, state: Dict[str, Any]) -> int:
+        """Replace all term tables with ``state`` from ``export_state``.
+
+        Returns:
+            Number of groups restored.
+        """
+        if not isinstance(state, dict) or state.get("version") != _SNAPSHOT_VERSION:
+            return 0
+
+        self._groups.clear()
+        self._term_group_count.clear()
+        now = time.time()
+        for group_id, data in (state.get("groups") or {}).items():
+            table = _GroupTermTable(float(data.get("last_decay", now)))
+            for term, entry in (data.get("terms") or {}).items():
+                freq, first_seen, users, contexts = entry
+                term = sys.intern(term)
+                table.freq[term] = float(freq)
+                if first_seen:
+                    table.first_seen[term] = float(first_seen)
+                if users:
+                    table.users[term] = {sys.intern(u) for u in users}
+                if contexts:
+                    table.contexts[term] = list(contexts)[:_MAX_CONTEXT_EXAMPLES]
+                self._term_group_count[term] = (
+                    self._term_group_count.get(term, 0) + 1
+                )
+            if table.freq:
+                self._groups[sys.intern(group_id)] = table
+                self._shrink_to_budget(table)
+        return len(self._groups)
+
     # Public API
 
     def update_from_message(
@@ -119,25 +299,45 @@ class JargonStatisticalFilter:
             return
 
         now = time.time()
-        group_freq = self._group_term_freq[group_id]
-        user_freq = self._user_term_freq[group_id]
-        first_seen = self._term_first_seen[group_id]
-        contexts = self._term_contexts[group_id]
-
+        table = self._groups.get(group_id)
+        if table is None:
+            table = _GroupTermTable(now)
+            self._groups[sys.intern(group_id)] = table
+        else:
+            self._maybe_decay(table, now)
+
+        sender = sys.intern(str(sender_id))
+        context = content[:_MAX_CONTEXT_LENGTH]
+        freq_table = table.freq
         for token in tokens:
-            group_freq[token] += 1
-            self._global_term_freq[token] += 1
-            user_freq[token][sender_id] += 1
+            if token not in freq_table:
+                token = sys.intern(token)
+                self._term_group_count[token] = (
+                    self._term_group_count.get(token, 0) + 1
+                )
+                freq_table[token] = 1.0
+                table.first_seen[token] = now
+            else:
+                freq_table[token] += 1.0
 
-            if token not in first_seen:
-                first_seen[token] = now
+            users = table.users.get(token)
+            if users is None:
+                table.users[token] = {sender}
+            elif len(users) < _MAX_TRACKED_USERS:
+                users.add(sender)
 
             # Store limited context examples.
-            ctx_list = contexts[token]
-            if len(ctx_list) < _MAX_CONTEXT_EXAMPLES:
-                ctx_list.append(content)
+            ctx_list = table.contexts.get(token)
+            if ctx_list is None:
+                table.contexts[token] = [context]
+            elif len(ctx_list) < _MAX_CONTEXT_EXAMPLES:
+                ctx_list.append(context)
+
+        if len(freq_table) > self._max_terms_per_group:
+            self._shrink_to_budget(table)
 
         self._dirty_groups.add(group_id)
+        self._snapshot_dirty = True
 
     def get_jargon_candidates(
         self,
@@ -166,33 +366,33 @@ class JargonStatisticalFilter:
             keys: ``term``, ``score``, ``frequency``, ``idf``,
             ``burst_score``, ``unique_users``, ``context_examples``.
         """
-        group_freq = self._group_term_freq.get(group_id)
-        if not group_freq:
+        table = self._groups.get(group_id)
+        if table is None:
+            return []
+        now = time.time()
+        self._maybe_decay(table, now)
+        if not table.freq:
             return []
 
         exclude = exclude_terms or set()
-        num_groups = max(len(self._group_term_freq), 1)
+        num_groups = max(len(self._groups), 1)
         candidates: List[Dict[str, Any]] = []
 
-        for term, freq in group_freq.items():
+        for term, freq in table.freq.items():
             if freq < _MIN_FREQUENCY:
                 continue
             if term in exclude:
                 continue
 
             # Signal 1: Cross-group IDF.
-            groups_containing = sum(
-                1 for gf in self._group_term_freq.values() if term in gf
-            )
+            groups_containing = self._term_group_count.get(term, 0)
             idf = math.log(num_groups / max(groups_containing, 1))
 
             # Signal 2: Burst frequency (frequency / age_days).
-            burst_score = self._calc_burst_score(term, group_id)
+            burst_score = self._calc_burst_score(table, term, freq, now)
 
             # Signal 3: User concentration (1 / unique_users).
-            unique_users = len(
-                self._user_term_freq.get(group_id, {}).get(term, {})
-            )
+            unique_users = len(table.users.get(term, ()))
             concentration = 1.0 / max(unique_users, 1)
 
             # Composite score.
@@ -205,13 +405,11 @@ class JargonStatisticalFilter:
             candidates.append({
                 "term": term,
                 "score": round(score, 4),
-                "frequency": freq,
+                "frequency": int(round(freq)),
                 "idf": round(idf, 4),
                 "burst_score": round(burst_score, 4),
                 "unique_users": unique_users,
-                "context_examples": self._term_contexts.get(
-                    group_id, {}
-                ).get(term, [])[:5],
+                "context_examples": table.contexts.get(term, [])[:5],
             })
 
         candidates.sort(key=lambda x: x["score"], reverse=True)
@@ -222,21 +420,36 @@ class JargonStatisticalFilter:
 
         Useful for monitoring and dashboard display.
         """
-        group_freq = self._group_term_freq.get(group_id, {})
+        table = self._groups.get(group_id)
+        if table is not None:
+            self._maybe_decay(table, time.time())
+        freqs = table.freq.values() if table else ()
         return {
-            "total_unique_terms": len(group_freq),
-            "total_occurrences": sum(group_freq.values()),
+            "total_unique_terms": len(freqs),
+            "total_occurrences": int(round(sum(freqs))),
             "terms_above_threshold": sum(
-                1 for f in group_freq.values() if f >= _MIN_FREQUENCY
+                1 for f in freqs if f >= _MIN_FREQUENCY
             ),
         }
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Return memory/decay statistics across all groups."""
+        return {
+            "groups": len(self._groups),
+            "tracked_terms": sum(len(t.freq) for t in self._groups.values()),
+            "distinct_terms": len(self._term_group_count),
+            "max_terms_per_group": self._max_terms_per_group,
+            "terms_pruned": self._terms_pruned,
+            "terms_evicted": self._terms_evicted,
+        }
+
     def reset_group(self, group_id: str) -> None:
         """Clear all statistical data for a specific group."""
-        self._group_term_freq.pop(group_id, None)
-        self._user_term_freq.pop(group_id, None)
-        self._term_first_seen.pop(group_id, None)
-        self._term_contexts.pop(group_id, None)
+        table = self._groups.pop(group_id, None)
+        if table is not None:
+            for term in table.freq:
+                self._release_term(term)
+            self._snapshot_dirty = True
         self._dirty_groups.discard(group_id)
         logger.debug(f"[JargonFilter] Reset statistics for group {group_id}")
 
@@ -313,18 +526,121 @@ class JargonStatisticalFilter:
             return False
         return self._jieba_freq.get(word, 0) > _JIEBA_FREQ_THRESHOLD
 
-    def _calc_burst_score(self, term: str, group_id: str) -> float:
+    @staticmethod
+    def _calc_burst_score(
+        table: _GroupTermTable, term: str, freq: float, now: float,
+    ) -> float:
         """Calculate burst frequency: freq / age_in_days.
 
         A high value means the term gained popularity quickly.
         """
-        first_seen = self._term_first_seen.get(group_id, {}).get(term, 0)
+        first_seen = table.first_seen.get(term, 0)
         if first_seen == 0:
             return 0.0
-        age_days = max((time.time() - first_seen) / 86400.0, 1.0)
-        freq = self._group_term_freq.get(group_id, {}).get(term, 0)
+        age_days = max((now - first_seen) / 86400.0, 1.0)
         return freq / age_days
 
+    def _maybe_decay(self, table: _GroupTermTable, now: float) -> None:
+        """Apply exponential decay at most once per ``_DECAY_INTERVAL``.
+
+        Terms whose decayed count falls below ``_PRUNE_THRESHOLD`` are
+        dropped together with their senders, contexts and DF entry.
+        """
+        elapsed = now - table.last_decay
+        if self._half_life_seconds <= 0 or elapsed < _DECAY_INTERVAL:
+            return
+        table.last_decay = now
+        factor = 0.5 ** (elapsed / self._half_life_seconds)
+        freq_table = table.freq
+        cold: List[str] = []
+        for term, freq in freq_table.items():
+            decayed = freq * factor
+            if decayed < _PRUNE_THRESHOLD:
+                cold.append(term)
+            else:
+                freq_table[term] = decayed
+        for term in cold:
+            self._drop_term(table, term)
+        self._terms_pruned += len(cold)
+        self._snapshot_dirty = True
+
+    def _decay_idle_groups(self, now: float) -> None:
+        """Decay every group due for a pass and drop groups left empty."""
+        for group_id in list(self._groups):
+            table = self._groups[group_id]
+            self._maybe_decay(table, now)
+            if not table.freq:
+                del self._groups[group_id]
+                self._dirty_groups.discard(group_id)
+
+    def _shrink_to_budget(self, table: _GroupTermTable) -> None:
+        """Evict the coldest terms once a group exceeds its term budget."""
+        overflow = len(table.freq) - int(
+            self._max_terms_per_group * _EVICT_TARGET_RATIO
+        )
+        if overflow <= 0 or len(table.freq) <= self._max_terms_per_group:
+            return
+        now = time.time()
+        self._maybe_decay(table, now)
+        overflow = len(table.freq) - int(
+            self._max_terms_per_group * _EVICT_TARGET_RATIO
+        )
+        if overflow <= 0 or len(table.freq) <= self._max_terms_per_group:
+            return
+        first_seen = table.first_seen
+        grace_start = now - _EVICTION_GRACE
+
+        def _eviction_key(kv):
+            seen = first_seen.get(kv[0], 0.0)
+            # Terms still in their grace period sort after all older terms.
+            return (seen > grace_start, kv[1], seen)
+
+        victims = heapq.nsmallest(overflow, table.freq.items(), key=_eviction_key)
+        for term, _ in victims:
+            self._drop_term(table, term)
+        self._terms_evicted += len(victims)
+
+    def _drop_term(self, table: _GroupTermTable, term: str) -> None:
+        table.freq.pop(term, None)
+        table.users.pop(term, None)
+        table.first_seen.pop(term, None)
+        table.contexts.pop(term, None)
+        self._release_term(term)
+
+    def _release_term(self, term: str) -> None:
+        remaining = self._term_group_count.get(term, 0) - 1
+        if remaining > 0:
+            self._term_group_count[term] = remaining
+        else:
+            self._term_group_count.pop(term, None)
+
+    # Snapshot persistence
+
+    async def _snapshot_loop(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self._snapshot_interval)
+                self._decay_idle_groups(time.time())
+                if self._snapshot_dirty:
+                    await self.save_snapshot()
+        except asyncio.CancelledError:
+            pass
+
+    @staticmethod
+    def _read_snapshot_file(path: str) -> Dict[str, Any]:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_snapshot_file(path: str, state: Dict[str, Any]) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
     @staticmethod
     def _is_stopword(word: str) -> bool:
         """Quick check for common Chinese stopwords, punctuation, and everyday words."""
@@ -2,5 +2,6 @@
 
 from .message_pipeline import MessagePipeline
 from .remember_service import RememberResult, RememberService
+from .work_scheduler import GroupWorkScheduler
 
-__all__ = ["MessagePipeline", "RememberResult", "RememberService"]
+__all__ = ["GroupWorkScheduler", "MessagePipeline", "RememberResult", "RememberService"]
@@ -9,6 +9,7 @@ from ...core.interfaces import MessageData
 from ...statics.messages import LogMessages
 from ..monitoring.instrumentation import monitored
 from .jargon_learning import JargonLearningModule
+from .work_scheduler import PRIORITY_NORMAL, PRIORITY_REALTIME
 from .sample_filter import (
     extract_learning_event_metadata,
     filter_learning_messages,
@@ -33,6 +34,7 @@ class MessagePipeline:
         conversation_goal_manager: Optional[Any],
         affection_manager: Any,
         db_manager: Any,
+        work_scheduler: Optional[Any] = None,
     ):
         self._config = plugin_config
         self._message_collector = message_collector
@@ -45,6 +47,7 @@ class MessagePipeline:
         self._conversation_goal_manager = conversation_goal_manager
         self._affection_manager = affection_manager
         self._db_manager = db_manager
+        self._work_scheduler = work_scheduler
         self._subtasks: Set[asyncio.Task] = set()
         self._jargon_learning = JargonLearningModule(
             config=plugin_config,
@@ -80,7 +83,7 @@ class MessagePipeline:
     ) -> bool:
         """后台处理学习相关操作（非阻塞）
 
-        通过 asyncio.create_task() 在后台运行。
+        由 GroupWorkScheduler 的 worker（未配置调度器时为 asyncio.create_task()）在后台运行。
         为避免 'Future attached to different loop' 错误，数据库操作包装在异常处理中。
         """
         message_collected = False
@@ -162,18 +165,24 @@ class MessagePipeline:
                 except Exception as e:
                     logger.debug(f"V2 message processing failed: {e}")
 
-            # 4. 实时学习
+            # 4. 实时学习（过载时最先被调度器丢弃）
             if self._config.enable_realtime_learning:
-                self._spawn(
+                self._dispatch(
+                    group_id,
                     self._realtime_processor.process_realtime_background(
                         group_id, message_text, sender_id, persona_id=persona_id
-                    )
+                    ),
+                    kind="realtime",
+                    priority=PRIORITY_REALTIME,
                 )
             elif getattr(self._config, "enable_realtime_expression_learning", False):
-                self._spawn(
+                self._dispatch(
+                    group_id,
                     self._realtime_processor.process_expression_learning_background(
                         group_id, message_text, sender_id, persona_id=persona_id
-                    )
+                    ),
+                    kind="realtime_expression",
+                    priority=PRIORITY_REALTIME,
                 )
 
             # 5. 智能启动学习任务
@@ -268,6 +277,17 @@ class MessagePipeline:
     def _spawn_jargon_task(self, group_id: str, raw_message_count: int) -> None:
         """Spawn a jargon-mining task and track group-level trigger state."""
         self._jargon_learning.mark_mining_started(group_id, raw_message_count)
+        if self._work_scheduler is not None:
+            accepted = self._work_scheduler.submit(
+                group_id,
+                self._mine_jargon_and_release(group_id),
+                kind="jargon",
+                priority=PRIORITY_NORMAL,
+            )
+            if not accepted:
+                self._jargon_learning.mark_mining_finished(group_id)
+            return
+
         task = self._spawn(self.mine_jargon(group_id))
 
         def _on_complete(_: asyncio.Task) -> None:
@@ -275,6 +295,28 @@ class MessagePipeline:
 
         task.add_done_callback(_on_complete)
 
+    async def _mine_jargon_and_release(self, group_id: str) -> None:
+        """Run jargon mining inside the work scheduler and clear the active flag."""
+        try:
+            await self.mine_jargon(group_id)
+        finally:
+            self._jargon_learning.mark_mining_finished(group_id)
+
+    def _dispatch(
+        self,
+        group_id: str,
+        coro,
+        kind: str,
+        priority: int = PRIORITY_NORMAL,
+    ) -> bool:
+        """Queue follow-up work on the bounded scheduler, or spawn it directly."""
+        if self._work_scheduler is not None:
+            return self._work_scheduler.submit(
+                group_id, coro, kind=kind, priority=priority
+            )
+        self._spawn(coro)
+        return True
+
     def _spawn(self, coro) -> asyncio.Task:
         """Create a background task and track it for shutdown cancellation."""
         task = asyncio.create_task(coro)
@@ -11,6 +11,7 @@ from typing import Any, Callable, Coroutine, Dict, List, Optional
 from astrbot.api import logger
 
 from ...core.interfaces import MessageData
+from ...core.llm_scheduler import PRIORITY_REALTIME, llm_priority
 from ...statics.messages import StatusMessages
 from ..monitoring.instrumentation import monitored
 from .dialog_analyzer import DialogAnalyzer
@@ -78,12 +79,13 @@ class RealtimeProcessor:
     ) -> None:
         """Background wrapper — fully async, never blocks the main flow."""
         try:
-            await self.process_message_realtime(
-                group_id,
-                message_text,
-                sender_id,
-                persona_id=persona_id,
-            )
+            with llm_priority(PRIORITY_REALTIME):
+                await self.process_message_realtime(
+                    group_id,
+                    message_text,
+                    sender_id,
+                    persona_id=persona_id,
+                )
         except Exception as e:
             logger.error(
                 f"实时学习后台处理失败 (group={group_id}): {e}", exc_info=True
@@ -99,12 +101,13 @@ class RealtimeProcessor:
     ) -> None:
         """Run expression-style learning without enabling realtime filtering."""
         try:
-            await self.process_expression_learning(
-                group_id,
-                message_text,
-                sender_id,
-                persona_id=persona_id,
-            )
+            with llm_priority(PRIORITY_REALTIME):
+                await self.process_expression_learning(
+                    group_id,
+                    message_text,
+                    sender_id,
+                    persona_id=persona_id,
+                )
         except Exception as e:
             logger.error(
                 f"表达风格学习后台处理失败 (group={group_id}): {e}",
@@ -0,0 +1,276 @@
+"""按群组排队的后台工作调度器 — 替代逐消息 create_task 的无界扇出
+
+每条消息触发的后台工作（学习流水线、好感度、实时学习、黑话挖掘）
+不再直接 ``asyncio.create_task``，而是进入按群组划分的 FIFO 队列，
+由固定数量的 worker 轮询各群组队列执行：
+
+- 固定 worker 池：同时运行的后台任务数恒定，不随消息量增长；
+- 群组间轮询：单个刷屏群组无法饿死其他群组；
+- 排队上限与分级丢弃：超过软上限时丢弃实时学习等可再生工作，
+  超过硬上限时只保留原始消息采集；队列总长另有绝对上限 ``max_size``，
+  数据库写入停滞导致采集工作积压到该上限时丢弃最早的采集工作并计数，
+  保证内存占用有界；
+- 队列深度、运行数、丢弃数等统计通过 ``get_stats()`` 暴露，
+  并由 ``MetricCollector`` 镜像到 prometheus 指标。
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Coroutine, Deque, Dict, List, Optional
+
+from astrbot.api import logger
+
+
+# 优先级：数值越大越先被丢弃
+PRIORITY_CAPTURE = 0   # 原始消息采集（学习流水线入口），仅在队列达到绝对上限时丢弃最早的一项
+PRIORITY_NORMAL = 1    # 好感度、黑话挖掘等，超过硬上限时丢弃
+PRIORITY_REALTIME = 2  # 实时学习等可再生工作，超过软上限时优先丢弃
+
+
+@dataclass
+class _WorkItem:
+    group_id: str
+    coro: Coroutine
+    kind: str
+    priority: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class GroupWorkScheduler:
+    """按群组 FIFO 排队 + 固定 worker 池的后台工作调度器
+
+    Args:
+        worker_count: worker 数量，即同时运行的后台任务上限。
+        soft_limit: 排队总数达到该值后丢弃 ``PRIORITY_REALTIME`` 工作。
+        hard_limit: 排队总数达到该值后丢弃所有可丢弃工作，
+            采集工作到达时会挤出已排队的可丢弃工作。
+        max_size: 排队总数的绝对上限（不小于 ``hard_limit``）；队列中已无
+            可丢弃工作时，新的采集工作会挤出最早排队的采集工作。
+    """
+
+    def __init__(
+        self,
+        worker_count: int = 8,
+        soft_limit: int = 500,
+        hard_limit: int = 2000,
+        max_size: int = 10000,
+    ):
+        self._worker_count = max(1, int(worker_count))
+        self._hard_limit = max(1, int(hard_limit))
+        self._soft_limit = max(1, min(int(soft_limit), self._hard_limit))
+        self._max_size = max(self._hard_limit, int(max_size))
+
+        self._queues: Dict[str, Deque[_WorkItem]] = {}
+        self._ready: Deque[str] = deque()
+        self._available: Optional[asyncio.Semaphore] = None
+        self._workers: List[asyncio.Task] = []
+        self._queued = 0
+        self._running = 0
+        self._closed = False
+
+        self._submitted: Dict[str, int] = {}
+        self._completed: Dict[str, int] = {}
+        self._failed: Dict[str, int] = {}
+        self._shed: Dict[str, int] = {}
+        self._max_queued_seen = 0
+        self._capture_dropped = 0
+        self._total_wait_ms = 0.0
+        self._started_jobs = 0
+
+    # 提交
+
+    def submit(
+        self,
+        group_id: str,
+        coro: Coroutine,
+        kind: str = "learning",
+        priority: int = PRIORITY_NORMAL,
+    ) -> bool:
+        """提交一项后台工作
+
+        Args:
+            group_id: 群组 ID，用于按群组排队
+            coro: 尚未开始执行的协程对象
+            kind: 工作类别（用于统计）
+            priority: ``PRIORITY_*`` 常量，决定过载时的丢弃顺序
+
+        Returns:
+            bool: 是否被接受；被拒绝时协程会被关闭
+        """
+        self._submitted[kind] = self._submitted.get(kind, 0) + 1
+
+        if self._closed:
+            self._reject(coro, kind)
+            return False
+
+        if priority > PRIORITY_CAPTURE:
+            limit = self._soft_limit if priority >= PRIORITY_REALTIME else self._hard_limit
+            if self._queued >= limit:
+                self._reject(coro, kind)
+                return False
+        elif self._queued >= self._hard_limit:
+            # 采集工作优先保留：挤出一个已排队的可丢弃工作来控制队列长度，
+            # 没有可丢弃工作且已到绝对上限时挤出最早的采集工作
+            if not self._evict_one_sheddable() and self._queued >= self._max_size:
+                self._evict_oldest_capture()
+
+        self._ensure_workers()
+        queue = self._queues.get(group_id)
+        if queue is None:
+            queue = deque()
+            self._queues[group_id] = queue
+            self._ready.append(group_id)
+        queue.append(_WorkItem(group_id, coro, kind, priority))
+        self._queued += 1
+        self._max_queued_seen = max(self._max_queued_seen, self._queued)
+        self._available.release()
+        return True
+
+    # 生命周期
+
+    async def stop(self, drain_timeout: float = 3.0) -> None:
+        """停止接收新工作，在超时内尽量执行完剩余工作后关闭 worker"""
+        self._closed = True
+        if self._workers and self._queued:
+            deadline = time.monotonic() + max(0.0, drain_timeout)
+            while self._queued and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+
+        for task in self._workers:
+            if not task.done():
+                task.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+        dropped = 0
+        for queue in self._queues.values():
+            while queue:
+                item = queue.popleft()
+                self._reject(item.coro, item.kind)
+                dropped += 1
+        self._queues.clear()
+        self._ready.clear()
+        self._queued = 0
+        if dropped:
+            logger.warning(f"[WorkScheduler] 关停时丢弃 {dropped} 项未执行的后台工作")
+
+    # 统计
+
+    def get_queue_depths(self) -> Dict[str, int]:
+        """各群组当前排队数"""
+        return {gid: len(queue) for gid, queue in self._queues.items() if queue}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取调度器统计（队列深度、运行数、按类别的提交/完成/失败/丢弃数）"""
+        depths = self.get_queue_depths()
+        busiest = sorted(depths.items(), key=lambda kv: kv[1], reverse=True)[:10]
+        return {
+            'workers': self._worker_count,
+            'running': self._running,
+            'queued': self._queued,
+            'max_queued_seen': self._max_queued_seen,
+            'soft_limit': self._soft_limit,
+            'hard_limit': self._hard_limit,
+            'max_size': self._max_size,
+            'capture_dropped': self._capture_dropped,
+            'queued_groups': len(depths),
+            'busiest_groups': dict(busiest),
+            'submitted': dict(self._submitted),
+            'completed': dict(self._completed),
+            'failed': dict(self._failed),
+            'shed': dict(self._shed),
+            'avg_queue_wait_ms': (
+                round(self._total_wait_ms / self._started_jobs, 2)
+                if self._started_jobs else 0.0
+            ),
+        }
+
+    # 内部实现
+
+    def _ensure_workers(self) -> None:
+        if self._workers:
+            return
+        self._available = asyncio.Semaphore(0)
+        self._workers = [
+            asyncio.create_task(self._worker_loop(i))
+            for i in range(self._worker_count)
+        ]
+
+    def _reject(self, coro: Coroutine, kind: str) -> None:
+        self._shed[kind] = self._shed.get(kind, 0) + 1
+        coro.close()
+
+    def _evict_one_sheddable(self) -> bool:
+        """按优先级从低到高（数值从大到小）挤出最早排队的一项可丢弃工作"""
+        for min_priority in (PRIORITY_REALTIME, PRIORITY_NORMAL):
+            for queue in self._queues.values():
+                for item in queue:
+                    if item.priority >= min_priority:
+                        queue.remove(item)
+                        self._queued -= 1
+                        self._reject(item.coro, item.kind)
+                        return True
+        return False
+
+    def _evict_oldest_capture(self) -> None:
+        """队列达到绝对上限时挤出全局最早排队的一项工作（此时只剩采集工作）"""
+        oldest_queue = min(
+            (queue for queue in self._queues.values() if queue),
+            key=lambda queue: queue[0].enqueued_at,
+            default=None,
+        )
+        if oldest_queue is None:
+            return
+        item = oldest_queue.popleft()
+        self._queued -= 1
+        self._capture_dropped += 1
+        self._reject(item.coro, item.kind)
+        if self._capture_dropped == 1 or self._capture_dropped % 1000 == 0:
+            logger.warning(
+                f"[WorkScheduler] 队列达到上限 {self._max_size}，"
+                f"已累计丢弃 {self._capture_dropped} 项最早的采集工作"
+            )
+
+    def _next_item(self) -> Optional[_WorkItem]:
+        while self._ready:
+            group_id = self._ready.popleft()
+            queue = self._queues.get(group_id)
+            if not queue:
+                self._queues.pop(group_id, None)
+                continue
+            item = queue.popleft()
+            if queue:
+                self._ready.append(group_id)
+            else:
+                del self._queues[group_id]
+            self._queued -= 1
+            return item
+        return None
+
+    async def _worker_loop(self, index: int) -> None:
+        while True:
+            await self._available.acquire()
+            item = self._next_item()
+            if item is None:
+                # 对应的工作已被挤出
+                continue
+
+            self._running += 1
+            self._started_jobs += 1
+            self._total_wait_ms += (time.monotonic() - item.enqueued_at) * 1000
+            try:
+                await item.coro
+                self._completed[item.kind] = self._completed.get(item.kind, 0) + 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed[item.kind] = self._failed.get(item.kind, 0) + 1
+                logger.error(
+                    f"[WorkScheduler] 后台工作失败 (group={item.group_id}, "
+                    f"kind={item.kind}): {e}",
+                    exc_info=True,
+                )
+            finally:
+                self._running -= 1
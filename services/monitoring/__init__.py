@@ -23,6 +23,14 @@ from .metrics import (
     LLM_ERRORS_TOTAL,
     MESSAGES_PROCESSED_TOTAL,
     MESSAGE_PROCESSING_DURATION,
+    WORK_QUEUE_DEPTH,
+    WORK_QUEUE_IN_FLIGHT,
+    WORK_QUEUE_GROUPS,
+    WORK_JOBS_SHED_TOTAL,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CALLS_SAVED_TOTAL,
+    MEMORY_GRAPH_SAVE_DURATION,
+    MEMORY_GRAPH_ROWS_WRITTEN_TOTAL,
     CACHE_HITS_TOTAL,
     CACHE_MISSES_TOTAL,
     CACHE_SIZE,
@@ -45,6 +53,7 @@ from .instrumentation import (
     reset_trace_context,
 )
 from .collector import MetricCollector
+from .rollup_service import AnalyticsRollupService
 from .health_checker import HealthChecker, HealthStatus
 from .profiler import ProfileSession
 
@@ -59,6 +68,14 @@ __all__ = [
     "LLM_ERRORS_TOTAL",
     "MESSAGES_PROCESSED_TOTAL",
     "MESSAGE_PROCESSING_DURATION",
+    "WORK_QUEUE_DEPTH",
+    "WORK_QUEUE_IN_FLIGHT",
+    "WORK_QUEUE_GROUPS",
+    "WORK_JOBS_SHED_TOTAL",
+    "EMBEDDING_BATCH_SIZE",
+    "EMBEDDING_CALLS_SAVED_TOTAL",
+    "MEMORY_GRAPH_SAVE_DURATION",
+    "MEMORY_GRAPH_ROWS_WRITTEN_TOTAL",
     "CACHE_HITS_TOTAL",
     "CACHE_MISSES_TOTAL",
     "CACHE_SIZE",
@@ -80,6 +97,7 @@ __all__ = [
     "reset_trace_context",
     # Services
     "MetricCollector",
+    "AnalyticsRollupService",
     "HealthChecker",
     "HealthStatus",
     "ProfileSession",
@@ -2,8 +2,8 @@
 
 Extends ``AsyncServiceBase`` to run a background collection loop that
 reads from existing scattered data sources (PerfTracker, CacheManager,
-FrameworkLLMAdapter, ServiceRegistry, psutil) and mirrors their values
-into the unified prometheus ``REGISTRY``.
+FrameworkLLMAdapter, ServiceRegistry, GroupWorkScheduler, psutil) and
+mirrors their values into the unified prometheus ``REGISTRY``.
 
 The collector does NOT replace existing data sources. It acts as an
 adapter that unifies heterogeneous metrics into the prometheus model
@@ -34,6 +34,10 @@ from .metrics import (
     SYSTEM_CPU_PERCENT,
     SYSTEM_MEMORY_PERCENT,
     SYSTEM_MEMORY_USED_BYTES,
+    WORK_JOBS_SHED_TOTAL,
+    WORK_QUEUE_DEPTH,
+    WORK_QUEUE_GROUPS,
+    WORK_QUEUE_IN_FLIGHT,
 )
 
 # Mapping from ServiceLifecycle enum to numeric gauge value.
@@ -58,6 +62,8 @@ class MetricCollector(AsyncServiceBase):
         service_registry: Optional ``ServiceRegistry`` instance.
         progressive_learning: Optional progressive-learning service
             for active-session counting.
+        work_scheduler: Optional ``GroupWorkScheduler`` for background
+            queue depth and load-shedding metrics.
     """
 
     def __init__(
@@ -68,6 +74,7 @@ class MetricCollector(AsyncServiceBase):
         llm_adapter: Optional[Any] = None,
         service_registry: Optional[ServiceRegistry] = None,
         progressive_learning: Optional[Any] = None,
+        work_scheduler: Optional[Any] = None,
     ) -> None:
         super().__init__("metric_collector")
         self._interval = interval
@@ -76,6 +83,7 @@ class MetricCollector(AsyncServiceBase):
         self._llm_adapter = llm_adapter
         self._service_registry = service_registry
         self._progressive_learning = progressive_learning
+        self._work_scheduler = work_scheduler
         self._task: Optional[asyncio.Task] = None
         self._extra_providers: Dict[str, IMetricsProvider] = {}
 
@@ -86,6 +94,7 @@ class MetricCollector(AsyncServiceBase):
         self._prev_cache_misses: Dict[str, int] = {}
         self._prev_llm_calls: Dict[str, int] = {}
         self._prev_llm_errors: Dict[str, int] = {}
+        self._prev_shed_jobs: Dict[str, int] = {}
 
     # -- Lifecycle ----------------------------------------------------------
 
@@ -133,6 +142,7 @@ class MetricCollector(AsyncServiceBase):
         self._collect_llm_metrics()
         self._collect_service_metrics()
         self._collect_learning_sessions()
+        self._collect_work_queue_metrics()
 
     # -- Individual collectors ----------------------------------------------
 
@@ -266,3 +276,22 @@ class MetricCollector(AsyncServiceBase):
                 ACTIVE_LEARNING_SESSIONS.set(active)
         except Exception as exc:
             logger.debug(f"[MetricCollector] Learning session error: {exc}")
+
+    def _collect_work_queue_metrics(self) -> None:
+        """Mirror GroupWorkScheduler queue depth and shed counts."""
+        if not self._work_scheduler:
+            return
+        try:
+            stats = self._work_scheduler.get_stats()
+            WORK_QUEUE_DEPTH.set(stats.get("queued", 0))
+            WORK_QUEUE_IN_FLIGHT.set(stats.get("running", 0))
+            WORK_QUEUE_GROUPS.set(stats.get("queued_groups", 0))
+
+            for kind, shed in stats.get("shed", {}).items():
+                prev = self._prev_shed_jobs.get(kind, 0)
+                delta = max(0, shed - prev)
+                if delta > 0:
+                    WORK_JOBS_SHED_TOTAL.labels(kind=kind).inc(delta)
+                self._prev_shed_jobs[kind] = shed
+        except Exception as exc:
+            logger.debug(f"[MetricCollector] Work scheduler error: {exc}")
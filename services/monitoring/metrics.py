@@ -106,6 +106,62 @@ MESSAGE_PROCESSING_DURATION = Histogram(
     registry=REGISTRY,
 )
 
+WORK_QUEUE_DEPTH = Gauge(
+    "work_queue_depth",
+    "Number of background learning jobs waiting in the per-group queues",
+    registry=REGISTRY,
+)
+
+WORK_QUEUE_IN_FLIGHT = Gauge(
+    "work_queue_in_flight",
+    "Number of background learning jobs currently running",
+    registry=REGISTRY,
+)
+
+WORK_QUEUE_GROUPS = Gauge(
+    "work_queue_groups",
+    "Number of groups with queued background learning jobs",
+    registry=REGISTRY,
+)
+
+WORK_JOBS_SHED_TOTAL = Counter(
+    "work_jobs_shed_total",
+    "Total background learning jobs dropped by load shedding",
+    labelnames=["kind"],
+    registry=REGISTRY,
+)
+
+# -- Embedding metrics -----------------------------------------------------
+
+EMBEDDING_BATCH_SIZE = Histogram(
+    "embedding_batch_size",
+    "Distinct texts per coalesced embedding provider call",
+    buckets=[1, 2, 4, 8, 16, 32, 64],
+    registry=REGISTRY,
+)
+
+EMBEDDING_CALLS_SAVED_TOTAL = Counter(
+    "embedding_calls_saved_total",
+    "Embedding provider calls avoided by micro-batching",
+    registry=REGISTRY,
+)
+
+# -- Memory graph metrics --------------------------------------------------
+
+MEMORY_GRAPH_SAVE_DURATION = Histogram(
+    "memory_graph_save_duration_seconds",
+    "Incremental memory graph save latency in seconds",
+    buckets=[0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0],
+    registry=REGISTRY,
+)
+
+MEMORY_GRAPH_ROWS_WRITTEN_TOTAL = Counter(
+    "memory_graph_rows_written_total",
+    "Memory graph rows upserted by incremental saves",
+    labelnames=["kind"],
+    registry=REGISTRY,
+)
+
 # -- Cache metrics ---------------------------------------------------------
 
 CACHE_HITS_TOTAL = Counter(
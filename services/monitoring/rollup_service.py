@@ -0,0 +1,153 @@
+"""Periodic compactor for the hourly analytics rollup tables.
+
+Keeps ``hourly_group_rollups`` current so that trend and analytics
+endpoints only ever read pre-aggregated hourly rows:
+
+- every ``interval`` seconds the hours touched since the last run (plus
+  one hour of slack for late writes) are recomputed from the message
+  and learning tables with set-based ``GROUP BY`` queries;
+- LLM call counts and latency from ``FrameworkLLMAdapter`` are folded
+  into the current hour as deltas, the same way ``MetricCollector``
+  mirrors them into prometheus counters.
+
+On first start the last ``backfill_days`` are rebuilt; later starts
+resume from the newest rollup hour already stored.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from astrbot.api import logger
+
+from ...core.patterns import AsyncServiceBase
+
+_HOUR = 3600
+
+
+class AnalyticsRollupService(AsyncServiceBase):
+    """Maintains the hourly analytics rollups.
+
+    Args:
+        db_manager: Database manager exposing ``refresh_hourly_rollups``
+            (returns ``None`` on failure), ``record_llm_usage`` and
+            ``get_latest_rollup_hour``.
+        llm_adapter: Optional ``FrameworkLLMAdapter`` for call statistics.
+        interval: Seconds between compaction cycles (default 300).
+        backfill_days: Days rebuilt when no rollup exists yet (default 7).
+    """
+
+    def __init__(
+        self,
+        db_manager: Any,
+        llm_adapter: Optional[Any] = None,
+        interval: float = 300.0,
+        backfill_days: int = 7,
+    ) -> None:
+        super().__init__("analytics_rollup")
+        self._db_manager = db_manager
+        self._llm_adapter = llm_adapter
+        self._interval = max(1.0, float(interval))
+        self._backfill_days = max(0, int(backfill_days))
+        self._task: Optional[asyncio.Task] = None
+        self._watermark: Optional[float] = None
+        self._prev_llm_calls = 0
+        self._prev_llm_ms = 0.0
+        self._stats: Dict[str, Any] = {
+            "runs": 0,
+            "failed_runs": 0,
+            "hours_written": 0,
+            "llm_calls_recorded": 0,
+            "last_run_ms": 0.0,
+        }
+
+    # -- Lifecycle ----------------------------------------------------------
+
+    async def _do_start(self) -> bool:
+        self._task = asyncio.create_task(self._compaction_loop())
+        logger.info("[AnalyticsRollup] Compaction loop started")
+        return True
+
+    async def _do_stop(self) -> bool:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        try:
+            await self.compact()
+        except Exception as exc:
+            logger.warning(f"[AnalyticsRollup] Final compaction failed: {exc}")
+        logger.info("[AnalyticsRollup] Compaction loop stopped")
+        return True
+
+    # -- Public API ---------------------------------------------------------
+
+    async def compact(self, now: Optional[float] = None) -> int:
+        """Run one compaction cycle and return the number of hours written."""
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+
+        if self._watermark is None:
+            latest = await self._db_manager.get_latest_rollup_hour()
+            if latest is not None:
+                self._watermark = float(latest)
+            else:
+                self._watermark = now - self._backfill_days * 86400
+
+        # Recompute one extra hour so rows written late still land.
+        since = min(self._watermark, now) - _HOUR
+        hours = await self._db_manager.refresh_hourly_rollups(since, now + 1)
+        if hours is None:
+            # Keep the watermark so the next cycle recomputes this window.
+            self._stats["failed_runs"] += 1
+            logger.warning("[AnalyticsRollup] Rollup refresh failed; will retry")
+            hours = 0
+        else:
+            self._watermark = now
+
+        await self._record_llm_delta(now)
+
+        self._stats["runs"] += 1
+        self._stats["hours_written"] += hours
+        self._stats["last_run_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return hours
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return compaction counters and the current watermark."""
+        return {**self._stats, "watermark": self._watermark}
+
+    # -- Internals ----------------------------------------------------------
+
+    async def _compaction_loop(self) -> None:
+        try:
+            while True:
+                try:
+                    await self.compact()
+                except Exception as exc:
+                    logger.warning(f"[AnalyticsRollup] Compaction cycle error: {exc}")
+                await asyncio.sleep(self._interval)
+        except asyncio.CancelledError:
+            logger.debug("[AnalyticsRollup] Compaction loop cancelled")
+
+    async def _record_llm_delta(self, now: float) -> None:
+        """Fold LLM calls made since the previous cycle into the current hour."""
+        if not self._llm_adapter or not hasattr(self._llm_adapter, "get_call_statistics"):
+            return
+        overall = (self._llm_adapter.get_call_statistics() or {}).get("overall") or {}
+        calls = int(overall.get("total_calls", 0) or 0)
+        total_ms = float(overall.get("avg_response_time_ms", 0) or 0) * calls
+
+        if calls < self._prev_llm_calls:
+            # Adapter statistics were reset; count everything seen since.
+            self._prev_llm_calls, self._prev_llm_ms = 0, 0.0
+        delta_calls = calls - self._prev_llm_calls
+        delta_ms = max(0.0, total_ms - self._prev_llm_ms)
+        if delta_calls <= 0:
+            return
+
+        if await self._db_manager.record_llm_usage(delta_calls, delta_ms, now):
+            self._prev_llm_calls, self._prev_llm_ms = calls, total_ms
+            self._stats["llm_calls_recorded"] += delta_calls
@@ -11,6 +11,7 @@ from .tiered_learning_trigger import (
     BatchTriggerPolicy,
     TriggerResult,
 )
+from .tier2_journal import Tier2Journal
 
 __all__ = [
     "ConversationGoalManager",
@@ -18,4 +19,5 @@ __all__ = [
     "TieredLearningTrigger",
     "BatchTriggerPolicy",
     "TriggerResult",
+    "Tier2Journal",
 ]
@@ -0,0 +1,262 @@
+"""
+Durable journal for pending Tier 2 work.
+
+Tier 1 hands work to Tier 2 batch operations through in-memory buffers
+(e.g. the V2 ingestion buffer). Without a journal, everything not yet
+flushed is lost on restart or crash. ``Tier2Journal`` records each
+pending item in an append-only SQLite table before it enters the
+buffer, and each batch operation commits an offset per group once its
+flush has completed:
+
+    * ``append`` -- journal an item; returns its monotonically
+      increasing sequence number.
+    * ``commit`` -- mark every item of (operation, group) up to a
+      sequence number as processed. Only the offset row is written, so
+      committing is O(1).
+    * ``replay`` -- return uncommitted items, in order, so the caller can
+      rebuild its buffers on startup.
+    * ``compact`` -- delete committed items. Runs automatically after a
+      number of committed items accumulate, and on ``replay``.
+
+Offsets are kept per (operation, group), so independent Tier 2
+operations can consume their own items at different rates. All SQLite
+work runs in a worker thread; appends are serialised so sequence
+numbers and commit offsets always agree with buffer order.
+
+Usage::
+
+    journal = Tier2Journal(os.path.join(data_dir, "tier2_journal.db"))
+    seq = await journal.append("ingestion_flush", group_id, payload)
+    ...
+    await journal.commit("ingestion_flush", group_id, seq)
+    pending = await journal.replay()
+    await journal.close()
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+
+# Compact after this many items have been committed since the last run.
+_COMPACT_INTERVAL = 500
+
+# (operation, group_id) -> [(seq, payload), ...]
+PendingItems = Dict[Tuple[str, str], List[Tuple[int, Any]]]
+
+
+class Tier2Journal:
+    """Append-only, offset-committed SQLite journal for Tier 2 items.
+
+    Args:
+        path: SQLite database file path (created on first use).
+        compact_interval: Committed items that trigger a compaction.
+    """
+
+    def __init__(self, path: str, compact_interval: int = _COMPACT_INTERVAL) -> None:
+        self._path = path
+        self._compact_interval = max(1, int(compact_interval))
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._append_lock = asyncio.Lock()
+        self._committed_since_compact = 0
+        self._disabled = False
+
+        self._stats: Dict[str, int] = {
+            "appended": 0,
+            "committed": 0,
+            "replayed": 0,
+            "compacted": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return not self._disabled
+
+    # Public API
+
+    async def append(self, operation: str, group_id: str, payload: Any) -> int:
+        """Journal one item; returns its sequence number (0 on failure)."""
+        if self._disabled:
+            return 0
+        data = json.dumps(payload, ensure_ascii=False)
+        async with self._append_lock:
+            try:
+                seq = await asyncio.to_thread(
+                    self._append, operation, group_id, data
+                )
+            except Exception as exc:
+                logger.warning(f"[Tier2Journal] Append failed: {exc}")
+                return 0
+        self._stats["appended"] += 1
+        return seq
+
+    async def commit(self, operation: str, group_id: str, seq: int) -> None:
+        """Mark items of (operation, group) with sequence <= ``seq`` processed."""
+        if self._disabled or seq <= 0:
+            return
+        try:
+            committed = await asyncio.to_thread(
+                self._commit, operation, group_id, seq
+            )
+        except Exception as exc:
+            logger.warning(f"[Tier2Journal] Commit failed: {exc}")
+            return
+        self._stats["committed"] += committed
+        self._committed_since_compact += committed
+        if self._committed_since_compact >= self._compact_interval:
+            await self.compact()
+
+    async def replay(self) -> PendingItems:
+        """Return uncommitted items grouped by (operation, group), in order."""
+        if self._disabled:
+            return {}
+        try:
+            await self.compact()
+            pending = await asyncio.to_thread(self._pending)
+        except Exception as exc:
+            logger.warning(f"[Tier2Journal] Replay failed: {exc}")
+            return {}
+        self._stats["replayed"] += sum(len(items) for items in pending.values())
+        return pending
+
+    async def compact(self) -> int:
+        """Delete committed items; returns the number of rows removed."""
+        if self._disabled:
+            return 0
+        self._committed_since_compact = 0
+        try:
+            removed = await asyncio.to_thread(self._compact)
+        except Exception as exc:
+            logger.warning(f"[Tier2Journal] Compaction failed: {exc}")
+            return 0
+        self._stats["compacted"] += removed
+        return removed
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["enabled"] = not self._disabled
+        return stats
+
+    # Internal helpers (worker thread)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            try:
+                conn = sqlite3.connect(self._path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tier2_journal ("
+                    " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                    " operation TEXT NOT NULL,"
+                    " group_id TEXT NOT NULL,"
+                    " payload TEXT NOT NULL,"
+                    " created_at REAL NOT NULL"
+                    ")"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_tier2_journal_op_group"
+                    " ON tier2_journal (operation, group_id, seq)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tier2_offsets ("
+                    " operation TEXT NOT NULL,"
+                    " group_id TEXT NOT NULL,"
+                    " committed_seq INTEGER NOT NULL,"
+                    " PRIMARY KEY (operation, group_id)"
+                    ") WITHOUT ROWID"
+                )
+                conn.commit()
+            except Exception:
+                # An unusable file disables journaling instead of failing
+                # every Tier 1 call.
+                self._disabled = True
+                raise
+            self._conn = conn
+        return self._conn
+
+    def _append(self, operation: str, group_id: str, data: str) -> int:
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "INSERT INTO tier2_journal (operation, group_id, payload, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (operation, group_id, data, time.time()),
+            )
+            conn.commit()
+            return int(cursor.lastrowid)
+
+    def _commit(self, operation: str, group_id: str, seq: int) -> int:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT committed_seq FROM tier2_offsets"
+                " WHERE operation = ? AND group_id = ?",
+                (operation, group_id),
+            ).fetchone()
+            previous = row[0] if row else 0
+            if seq <= previous:
+                return 0
+            newly = conn.execute(
+                "SELECT COUNT(*) FROM tier2_journal"
+                " WHERE operation = ? AND group_id = ? AND seq > ? AND seq <= ?",
+                (operation, group_id, previous, seq),
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO tier2_offsets"
+                " (operation, group_id, committed_seq) VALUES (?, ?, ?)",
+                (operation, group_id, seq),
+            )
+            conn.commit()
+            return int(newly)
+
+    def _pending(self) -> PendingItems:
+        pending: PendingItems = {}
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT j.seq, j.operation, j.group_id, j.payload"
+                " FROM tier2_journal j"
+                " LEFT JOIN tier2_offsets o"
+                "   ON o.operation = j.operation AND o.group_id = j.group_id"
+                " WHERE j.seq > COALESCE(o.committed_seq, 0)"
+                " ORDER BY j.seq"
+            ).fetchall()
+        for seq, operation, group_id, data in rows:
+            try:
+                payload = json.loads(data)
+            except ValueError:
+                logger.debug(f"[Tier2Journal] Skipping corrupt entry {seq}")
+                continue
+            pending.setdefault((operation, group_id), []).append((seq, payload))
+        return pending
+
+    def _compact(self) -> int:
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "DELETE FROM tier2_journal WHERE seq <= ("
+                " SELECT committed_seq FROM tier2_offsets o"
+                " WHERE o.operation = tier2_journal.operation"
+                "   AND o.group_id = tier2_journal.group_id)"
+            )
+            conn.commit()
+            return max(0, cursor.rowcount)
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
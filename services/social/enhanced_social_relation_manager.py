@@ -14,6 +14,7 @@ from ...config import PluginConfig
 from ...core.patterns import AsyncServiceBase
 from ...core.interfaces import IDataStorage
 from ...core.framework_llm_adapter import FrameworkLLMAdapter
+from .social_graph_index import get_social_graph_index
 
 from ...models.social_relation import (
     BloodRelationType, GeographicalRelationType, CareerRelationType,
@@ -693,6 +694,7 @@ class EnhancedSocialRelationManager(AsyncServiceBase):
                 )
 
                 # 保存所有关系组件
+                components = []
                 for relation in profile.relations:
                     rel_type_str = relation.relation_type.value if hasattr(
                         relation.relation_type, 'value') else str(relation.relation_type)
@@ -711,9 +713,17 @@ class EnhancedSocialRelationManager(AsyncServiceBase):
                         created_at=relation.created_at or int(time.time()),
                     )
                     session.add(comp)
+                    components.append(
+                        (comp.to_user_id, comp.relation_type, comp.value, comp.frequency)
+                    )
 
                 await session.commit()
 
+            # 同步内存社交图索引（该用户的出边整体替换）
+            get_social_graph_index().replace_outgoing(
+                profile.group_id, profile.user_id, components
+            )
+
         except Exception as e:
             self._logger.error(f"保存社交档案到数据库失败: {e}", exc_info=True)
 
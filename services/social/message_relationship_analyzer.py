@@ -15,6 +15,12 @@ from ...config import PluginConfig
 from ...core.framework_llm_adapter import FrameworkLLMAdapter
 from ...exceptions import MessageAnalysisError
 from ...utils.json_utils import safe_parse_llm_json
+from ..integration.conversation_packer import estimate_tokens
+
+# 批量分析时单条消息在 prompt 中的最大字符数
+_BATCH_MESSAGE_MAX_CHARS = 200
+
+_RELATIONSHIP_TYPES = ('direct_reply', 'topic_continuation', 'unrelated')
 
 
 @dataclass
@@ -51,6 +57,15 @@ class MessageRelationshipAnalyzer:
         # 分析缓存，避免重复分析
         self.analysis_cache = {}
         self.cache_ttl = 3600  # 缓存1小时
+
+        # 批量分析统计
+        self.batch_stats = {
+            'pairs': 0,
+            'cache_hits': 0,
+            'rule_resolved': 0,
+            'llm_pairs': 0,
+            'llm_requests': 0,
+        }
         
         # 简单规则匹配模式
         self.simple_patterns = {
@@ -96,9 +111,8 @@ class MessageRelationshipAnalyzer:
                 max_messages=20
             )
             
-            relationships = []
-            
-            # 逐对分析相邻消息的关系
+            # 收集需要分析的相邻消息对
+            pairs = []
             for i in range(1, len(context.messages)):
                 prev_msg = context.messages[i-1]
                 curr_msg = context.messages[i]
@@ -112,11 +126,17 @@ class MessageRelationshipAnalyzer:
                 # 跳过同一用户的连续消息
                 if prev_msg.get('sender_id') == curr_msg.get('sender_id'):
                     continue
-                    
-                # 分析消息关系
-                relationship = await self._analyze_message_pair(prev_msg, curr_msg, group_id)
-                if relationship:
-                    relationships.append(relationship)
+
+                pairs.append((prev_msg, curr_msg))
+
+            if self.config.relationship_batch_analysis_enabled:
+                relationships = await self._analyze_message_pairs_batched(pairs, group_id)
+            else:
+                relationships = []
+                for prev_msg, curr_msg in pairs:
+                    relationship = await self._analyze_message_pair(prev_msg, curr_msg, group_id)
+                    if relationship:
+                        relationships.append(relationship)
             
             # 分析更复杂的多消息关系
             complex_relationships = await self._analyze_complex_relationships(
@@ -135,14 +155,10 @@ class MessageRelationshipAnalyzer:
                                    group_id: str) -> Optional[MessageRelationship]:
         """分析两条消息之间的关系"""
         try:
-            # 生成缓存键
-            cache_key = f"{msg1.get('message_id', '')}_{msg2.get('message_id', '')}"
-            
-            # 检查缓存
-            if cache_key in self.analysis_cache:
-                cached_result = self.analysis_cache[cache_key]
-                if time.time() - cached_result['timestamp'] < self.cache_ttl:
-                    return cached_result['result']
+            cache_key = self._pair_cache_key(msg1, msg2)
+            cached_result = self._get_cached_result(cache_key)
+            if cached_result:
+                return cached_result
             
             # 首先使用简单规则
             simple_result = self._simple_rule_analysis(msg1, msg2)
@@ -170,6 +186,191 @@ class MessageRelationshipAnalyzer:
             logger.error(f"分析消息对关系失败: {e}")
             return None
 
+    async def _analyze_message_pairs_batched(
+        self,
+        pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        group_id: str,
+    ) -> List[MessageRelationship]:
+        """
+        批量分析消息对关系
+
+        缓存命中和规则高置信度（> 0.8）的消息对直接确定；其余消息对
+        按 token 预算分块，每块一次 LLM 请求，块之间有限并发。LLM 未给出
+        结果的消息对回退到规则结果。返回顺序与输入消息对一致。
+        """
+        results: List[Optional[MessageRelationship]] = [None] * len(pairs)
+        unresolved = []  # (位置, msg1, msg2, 规则结果)
+        self.batch_stats['pairs'] += len(pairs)
+
+        for pos, (msg1, msg2) in enumerate(pairs):
+            cached_result = self._get_cached_result(self._pair_cache_key(msg1, msg2))
+            if cached_result:
+                self.batch_stats['cache_hits'] += 1
+                results[pos] = cached_result
+                continue
+
+            simple_result = self._simple_rule_analysis(msg1, msg2)
+            if simple_result and simple_result.confidence > 0.8:
+                self.batch_stats['rule_resolved'] += 1
+                self._cache_result(self._pair_cache_key(msg1, msg2), simple_result)
+                results[pos] = simple_result
+                continue
+
+            unresolved.append((pos, msg1, msg2, simple_result))
+
+        llm_results: Dict[int, MessageRelationship] = {}
+        if unresolved and self.llm_adapter and self.llm_adapter.has_filter_provider():
+            llm_results = await self._batch_llm_relationship_analysis(
+                [(msg1, msg2) for _, msg1, msg2, _ in unresolved]
+            )
+
+        for k, (pos, msg1, msg2, simple_result) in enumerate(unresolved):
+            result = llm_results.get(k) or simple_result
+            if result:
+                self._cache_result(self._pair_cache_key(msg1, msg2), result)
+                results[pos] = result
+
+        return [result for result in results if result]
+
+    async def _batch_llm_relationship_analysis(
+        self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> Dict[int, MessageRelationship]:
+        """按 token 预算分块批量调用 LLM，返回 {消息对下标: 关系}"""
+        chunks = self._chunk_pairs_by_budget(pairs)
+        semaphore = asyncio.Semaphore(max(1, self.config.relationship_batch_concurrency))
+
+        async def _run(indices: List[int]) -> Dict[int, MessageRelationship]:
+            async with semaphore:
+                return await self._llm_relationship_chunk(pairs, indices)
+
+        merged: Dict[int, MessageRelationship] = {}
+        for chunk_result in await asyncio.gather(*(_run(chunk) for chunk in chunks)):
+            merged.update(chunk_result)
+        return merged
+
+    def _chunk_pairs_by_budget(
+        self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> List[List[int]]:
+        """按估算 token 数把消息对切分为多个块（每块至少一对）"""
+        budget = max(1, self.config.relationship_batch_token_budget)
+        chunks: List[List[int]] = []
+        current: List[int] = []
+        used = 0
+        for index, (msg1, msg2) in enumerate(pairs):
+            cost = estimate_tokens(self._format_batch_pair(1, msg1, msg2))
+            if current and used + cost > budget:
+                chunks.append(current)
+                current, used = [], 0
+            current.append(index)
+            used += cost
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _llm_relationship_chunk(
+        self,
+        pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        indices: List[int],
+    ) -> Dict[int, MessageRelationship]:
+        """一次 LLM 请求分析一个块内的所有消息对"""
+        try:
+            prompt = self._build_batch_relationship_prompt(
+                [pairs[index] for index in indices]
+            )
+            self.batch_stats['llm_requests'] += 1
+            self.batch_stats['llm_pairs'] += len(indices)
+            response = await self.llm_adapter.filter_chat_completion(
+                prompt=prompt,
+                system_prompt="你是一个专业的对话关系分析专家。请逐一分析每组消息之间的对应关系。"
+            )
+            if not response:
+                return {}
+
+            from ...utils.guardrails_manager import get_guardrails_manager
+            parsed = get_guardrails_manager().validate_and_clean_json(
+                response, expected_type="array"
+            )
+            if not isinstance(parsed, list):
+                logger.warning("批量关系分析LLM返回格式不正确，使用简单规则分析")
+                return {}
+
+            results: Dict[int, MessageRelationship] = {}
+            for item in parsed:
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    local_index = int(item.get('index', 0)) - 1
+                    confidence = float(item.get('confidence', 0.5))
+                except (TypeError, ValueError):
+                    continue
+                relationship_type = item.get('relationship_type')
+                if not 0 <= local_index < len(indices) or relationship_type not in _RELATIONSHIP_TYPES:
+                    continue
+                msg1, msg2 = pairs[indices[local_index]]
+                results[indices[local_index]] = self._build_relationship(
+                    msg1, msg2,
+                    confidence=min(max(confidence, 0.0), 1.0),
+                    relationship_type=relationship_type,
+                    reason=item.get('reason') or 'LLM批量分析结果',
+                )
+            return results
+
+        except Exception as e:
+            logger.error(f"批量LLM关系分析失败: {e}")
+            return {}
+
+    def _build_batch_relationship_prompt(
+        self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> str:
+        """构建批量关系分析prompt（编号消息对 -> JSON数组）"""
+        pair_lines = "\n".join(
+            self._format_batch_pair(i, msg1, msg2)
+            for i, (msg1, msg2) in enumerate(pairs, 1)
+        )
+        return f"""
+请分析以下每组群聊消息之间的对应关系，判断每组中的消息B是否是对消息A的回复，以及它们的关系类型。
+
+{pair_lines}
+
+返回JSON数组，每组消息对应一个元素：
+[
+    {{"index": 组编号, "relationship_type": "direct_reply|topic_continuation|unrelated", "confidence": 0.0-1.0, "reason": "分析原因说明"}}
+]
+
+关系类型说明：
+- direct_reply: 消息B直接回应消息A的内容
+- topic_continuation: 消息B延续了消息A的话题，但不是直接回复
+- unrelated: 两条消息没有明显关系
+
+请只返回JSON数组，不要其他内容。
+"""
+
+    @staticmethod
+    def _format_batch_pair(index: int, msg1: Dict[str, Any], msg2: Dict[str, Any]) -> str:
+        lines = [f"第{index}组:"]
+        for label, msg in (('A', msg1), ('B', msg2)):
+            time_str = datetime.fromtimestamp(msg.get('timestamp', 0)).strftime('%H:%M:%S')
+            content = msg.get('message', '')[:_BATCH_MESSAGE_MAX_CHARS]
+            lines.append(
+                f"  消息{label} [{time_str}] 用户{hash(msg.get('sender_id', '')) % 100:02d}: {content}"
+            )
+        return "\n".join(lines)
+
+    @staticmethod
+    def _build_relationship(msg1: Dict[str, Any], msg2: Dict[str, Any], confidence: float,
+                            relationship_type: str, reason: str) -> MessageRelationship:
+        return MessageRelationship(
+            sender_message_id=msg1.get('message_id', ''),
+            sender_content=msg1.get('message', ''),
+            sender_timestamp=msg1.get('timestamp', 0),
+            reply_message_id=msg2.get('message_id', ''),
+            reply_content=msg2.get('message', ''),
+            reply_timestamp=msg2.get('timestamp', 0),
+            confidence=confidence,
+            relationship_type=relationship_type,
+            analysis_reason=reason
+        )
+
     def _simple_rule_analysis(self, msg1: Dict[str, Any], msg2: Dict[str, Any]) -> Optional[MessageRelationship]:
         """使用简单规则分析消息关系"""
         try:
@@ -406,6 +607,17 @@ class MessageRelationshipAnalyzer:
             
         return False
 
+    @staticmethod
+    def _pair_cache_key(msg1: Dict[str, Any], msg2: Dict[str, Any]) -> str:
+        return f"{msg1.get('message_id', '')}_{msg2.get('message_id', '')}"
+
+    def _get_cached_result(self, cache_key: str) -> Optional[MessageRelationship]:
+        """读取未过期的缓存结果"""
+        cached_result = self.analysis_cache.get(cache_key)
+        if cached_result and time.time() - cached_result['timestamp'] < self.cache_ttl:
+            return cached_result['result']
+        return None
+
     def _cache_result(self, cache_key: str, result: MessageRelationship):
         """缓存分析结果"""
         self.analysis_cache[cache_key] = {
@@ -8,21 +8,23 @@ Adds graph-level analytics on top of the existing
   interaction pairs (positive/negative/neutral).
 * **Community detection**: Louvain algorithm via ``networkx`` to
   identify tightly-knit subgroups within a chat group.
-* **Influence ranking**: PageRank to surface the most influential
-  members of a group.
+* **Influence ranking**: PageRank (sparse power iteration) to surface
+  the most influential members of a group.
 
-All heavy computation is done via ``networkx`` (already a project
-dependency). Sentiment labelling uses the framework LLM adapter
-(remote API, no local model).
+Sentiment labelling uses the framework LLM adapter (remote API, no
+local model).
 
 Design notes:
-    - Builds an in-memory ``nx.DiGraph`` from the ORM
-      ``UserSocialRelationComponent`` rows.
-    - Community detection results are cached per group to avoid
-      recomputing on every request.
+    - Reads the per-group adjacency from ``SocialGraphIndex``, which is
+      loaded from the ORM ``UserSocialRelationComponent`` rows once and
+      then updated by the relation writers.
+    - PageRank and community results are cached on the group graph and
+      recomputed only after enough edges changed; both run in a worker
+      thread on a snapshot of the edge lists.
     - Thread-safe for single-event-loop asyncio usage.
 """
 
+import asyncio
 import time
 from typing import Any, Dict, List, Optional, Set, Tuple
 
@@ -37,6 +39,14 @@ from astrbot.api import logger
 from ..monitoring.instrumentation import monitored
 
 from ...core.framework_llm_adapter import FrameworkLLMAdapter
+from ...utils.graph_statistics import IncrementalGraphCounters, estimate_graph_statistics
+from .social_graph_index import (
+    GroupSocialGraph,
+    SocialGraphIndex,
+    compute_pagerank,
+    get_social_graph_index,
+    louvain_communities,
+)
 
 
 class SimpleDiGraph:
@@ -131,13 +141,18 @@ class SocialGraphAnalyzer:
         self,
         llm_adapter: Optional[FrameworkLLMAdapter] = None,
         db_manager=None,
+        stats_sample_size: int = 256,
+        graph_index: Optional[SocialGraphIndex] = None,
     ) -> None:
         self._llm = llm_adapter
         self._db = db_manager
+        self._stats_sample_size = stats_sample_size
 
-        # Per-group community cache: group_id -> (timestamp, communities).
-        self._community_cache: Dict[str, Tuple[float, List[Set[str]]]] = {}
-        self._cache_ttl = 600 # 10 minutes
+        # Per-group adjacency kept current by the relation writers.
+        self._index = graph_index or get_social_graph_index()
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        # In-flight Louvain runs: (group_id, resolution) -> task.
+        self._community_tasks: Dict[Tuple[str, float], asyncio.Task] = {}
 
         # Per-group statistics cache: group_id -> (timestamp, stats).
         self._stats_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
@@ -145,40 +160,59 @@ class SocialGraphAnalyzer:
 
     # Public API
 
-    async def build_social_graph(self, group_id: str) -> Any:
-        """Build a directed graph from stored social relation components.
+    async def get_group_graph(self, group_id: str) -> GroupSocialGraph:
+        """Return the indexed graph of a group, loading it on first use."""
+        graph = self._index.get(group_id)
+        if graph is not None:
+            return graph
 
-        Nodes are user IDs; edges carry ``weight`` (relation value) and
-        ``relation_type`` attributes.
-        """
-        graph = nx.DiGraph() if nx else SimpleDiGraph()
+        lock = self._load_locks.setdefault(group_id, asyncio.Lock())
+        async with lock:
+            graph = self._index.get(group_id)
+            if graph is not None:
+                return graph
 
+            self._index.begin_load(group_id)
+            try:
+                rows = await self._load_relation_rows(group_id)
+            except Exception as exc:
+                self._index.abort_load(group_id)
+                logger.debug(f"[SocialGraph] Failed to load graph: {exc}")
+                # Not cached, so the next call retries the load.
+                return GroupSocialGraph(group_id)
+            return self._index.finish_load(group_id, rows)
+
+    async def _load_relation_rows(
+        self, group_id: str
+    ) -> List[Tuple[str, str, str, float, int]]:
         if not self._db or not hasattr(self._db, "get_session"):
-            return graph
+            return []
 
-        try:
-            from ...models.orm.social_relation import UserSocialRelationComponent
-            from sqlalchemy import select
+        from ...models.orm.social_relation import UserSocialRelationComponent
+        from sqlalchemy import select
 
-            async with self._db.get_session() as session:
-                stmt = select(UserSocialRelationComponent).where(
-                    UserSocialRelationComponent.group_id == group_id
-                )
-                result = await session.execute(stmt)
-                rows = result.scalars().all()
-
-            for row in rows:
-                graph.add_edge(
-                    row.from_user_id,
-                    row.to_user_id,
-                    weight=row.value,
-                    relation_type=row.relation_type,
-                    frequency=row.frequency,
-                )
+        async with self._db.get_session() as session:
+            stmt = select(
+                UserSocialRelationComponent.from_user_id,
+                UserSocialRelationComponent.to_user_id,
+                UserSocialRelationComponent.relation_type,
+                UserSocialRelationComponent.value,
+                UserSocialRelationComponent.frequency,
+            ).where(UserSocialRelationComponent.group_id == group_id)
+            result = await session.execute(stmt)
+            return [tuple(row) for row in result.all()]
 
-        except Exception as exc:
-            logger.debug(f"[SocialGraph] Failed to build graph: {exc}")
+    async def build_social_graph(self, group_id: str) -> Any:
+        """Build a directed graph from the group's indexed relations.
 
+        Nodes are user IDs; edges carry ``weight`` (summed relation
+        value), ``relation_type`` (strongest component) and
+        ``frequency`` attributes.
+        """
+        graph = nx.DiGraph() if nx else SimpleDiGraph()
+        indexed = await self.get_group_graph(group_id)
+        for source, target in list(indexed.components):
+            graph.add_edge(source, target, **indexed.edge_attributes(source, target))
         return graph
 
     async def detect_communities(
@@ -195,33 +229,41 @@ class SocialGraphAnalyzer:
             List of sets, each set containing user IDs that form a
             community.
         """
-        # Check cache.
-        cached = self._community_cache.get(group_id)
-        if cached:
-            ts, communities = cached
-            if time.time() - ts < self._cache_ttl:
-                return communities
-
-        graph = await self.build_social_graph(group_id)
-        if graph.number_of_nodes() < 2:
+        graph = await self.get_group_graph(group_id)
+        if graph.node_count < 2 or nx is None:
             return []
 
-        if nx is None:
-            communities = []
-        else:
-            # Louvain requires an undirected graph.
-            undirected = graph.to_undirected()
-            try:
-                communities = list(
-                    nx.community.louvain_communities(
-                        undirected, resolution=resolution, seed=42
-                    )
-                )
-            except Exception as exc:
-                logger.debug(f"[SocialGraph] Community detection failed: {exc}")
-                communities = []
+        cached = graph.communities
+        if (
+            cached is not None
+            and cached[0] == resolution
+            and not graph.needs_refresh(graph.communities_version, self._index.refresh_ratio)
+        ):
+            return cached[1]
+
+        key = (group_id, resolution)
+        task = self._community_tasks.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(
+                self._run_louvain(graph, resolution)
+            )
+            self._community_tasks[key] = task
+        try:
+            return await asyncio.shield(task)
+        except Exception as exc:
+            logger.debug(f"[SocialGraph] Community detection failed: {exc}")
+            return []
 
-        self._community_cache[group_id] = (time.time(), communities)
+    async def _run_louvain(
+        self, graph: GroupSocialGraph, resolution: float
+    ) -> List[Set[str]]:
+        # Snapshot on the event loop; Louvain itself runs in a worker.
+        version = graph.version
+        communities = await asyncio.to_thread(
+            louvain_communities, *graph.edge_arrays(), resolution
+        )
+        graph.communities = (resolution, communities)
+        graph.communities_version = version
         return communities
 
     async def get_influence_ranking(
@@ -229,26 +271,41 @@ class SocialGraphAnalyzer:
     ) -> List[Dict[str, Any]]:
         """Rank group members by influence using PageRank.
 
+        Scores are cached on the group graph and only recomputed (warm
+        started from the previous scores) once enough edges changed.
+
         Returns:
             Sorted list of dicts with ``user_id``, ``pagerank``,
             ``degree`` keys. Most influential first.
         """
-        graph = await self.build_social_graph(group_id)
-        if graph.number_of_nodes() == 0:
+        graph = await self.get_group_graph(group_id)
+        if graph.node_count == 0:
             return []
 
-        try:
-            pr = nx.pagerank(graph, weight="weight") if nx else {n: 0.0 for n in graph.nodes}
-        except Exception:
-            pr = {n: 0.0 for n in graph.nodes}
-
-        degree = dict(graph.degree())
+        if self._index.pagerank_is_fresh(graph):
+            self._index.note_pagerank_cache_hit()
+            pr = graph.pagerank
+        else:
+            version = graph.version
+            start = time.perf_counter()
+            try:
+                pr, iterations = await asyncio.to_thread(
+                    compute_pagerank, *graph.edge_arrays(), graph.pagerank
+                )
+            except Exception as exc:
+                logger.debug(f"[SocialGraph] PageRank failed: {exc}")
+                pr, iterations = {n: 0.0 for n in graph.nodes()}, 0
+            else:
+                self._index.record_pagerank(
+                    graph, pr, version, iterations,
+                    (time.perf_counter() - start) * 1000,
+                )
 
         ranking = [
             {
                 "user_id": uid,
                 "pagerank": round(score, 6),
-                "degree": degree.get(uid, 0),
+                "degree": graph.degree(uid),
             }
             for uid, score in pr.items()
         ]
@@ -334,20 +391,41 @@ class SocialGraphAnalyzer:
             if time.time() - ts < self._stats_cache_ttl:
                 return stats
 
-        graph = await self.build_social_graph(group_id)
+        graph = await self.get_group_graph(group_id)
+        node_count = graph.node_count
+        edge_count = graph.edge_count
         stats: Dict[str, Any] = {
-            "node_count": graph.number_of_nodes(),
-            "edge_count": graph.number_of_edges(),
+            "node_count": node_count,
+            "edge_count": edge_count,
             "density": 0.0,
             "communities": 0,
+            "connected_components": 0,
+            "average_clustering": 0.0,
+            "average_shortest_path": 0.0,
+            "approximate": False,
         }
 
-        if graph.number_of_nodes() > 1:
-            edge_count = graph.number_of_edges()
-            node_count = graph.number_of_nodes()
-            stats["density"] = round(nx.density(graph), 4) if nx else round(edge_count / (node_count * (node_count - 1)), 4)
+        if node_count > 1:
+            stats["density"] = round(edge_count / (node_count * (node_count - 1)), 4)
             communities = await self.detect_communities(group_id)
             stats["communities"] = len(communities)
 
+        if node_count > 0:
+            # Sampled estimates on the undirected view, off the event loop.
+            adjacency = graph.undirected_adjacency()
+            estimates = await asyncio.to_thread(
+                estimate_graph_statistics, adjacency, self._stats_sample_size
+            )
+            stats["connected_components"] = _count_components(adjacency)
+            stats["average_clustering"] = round(estimates["average_clustering"], 4)
+            stats["average_shortest_path"] = round(estimates["average_shortest_path"], 4)
+            stats["approximate"] = estimates["approximate"]
+
         self._stats_cache[group_id] = (time.time(), stats)
         return stats
+
+
+def _count_components(adjacency: Dict[str, Set[str]]) -> int:
+    counters = IncrementalGraphCounters()
+    counters.rebuild(adjacency)
+    return counters.component_count
@@ -0,0 +1,477 @@
+"""
+Incremental in-memory index of group social graphs.
+
+``SocialGraphAnalyzer`` used to re-query every
+``UserSocialRelationComponent`` row and rebuild a ``networkx.DiGraph``
+for each community, ranking and statistics request. This module keeps
+one directed, weighted adjacency structure per group instead:
+
+* A group is loaded from the database once (lazily, on first use) and
+  afterwards kept current by the relation writers, which call
+  ``upsert_component`` / ``replace_outgoing`` after committing. Writes
+  for groups that are not loaded are ignored -- the eventual load reads
+  them from the database; writes that race with a load are buffered and
+  applied once it finishes.
+* Edges are stored as parallel ``rows`` / ``cols`` / ``weights`` lists
+  with a slot per (from, to) pair, so an edge update is O(1) and a CSR
+  matrix can be built from list copies without walking Python dicts.
+  Removed edges leave a NaN-weight tombstone until the next compaction.
+* PageRank runs as a sparse power iteration (NumPy/SciPy CSR) warm
+  started from the previous scores, and is only recomputed after the
+  graph has changed by more than ``refresh_ratio`` of its edges. Without
+  SciPy it falls back to ``networkx.pagerank`` with the same warm start.
+
+The edge weight of a (from, to) pair is the sum of its non-negative
+relation component values across relation types.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+    _HAS_SCIPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    sparse = None  # type: ignore[assignment]
+    _HAS_SCIPY = False
+
+try:
+    import networkx as nx
+except ImportError:
+    nx = None  # type: ignore[assignment]
+
+from astrbot.api import logger
+
+# Fraction of edges that must change before PageRank / communities are
+# recomputed (at least one change).
+_DEFAULT_REFRESH_RATIO = 0.01
+
+# Compact tombstoned edge slots once they outnumber live edges.
+_MIN_COMPACT_TOMBSTONES = 64
+
+_PAGERANK_ALPHA = 0.85
+_PAGERANK_TOL = 1.0e-6
+_PAGERANK_MAX_ITER = 100
+
+# (to_user, relation_type, value, frequency)
+OutgoingComponent = Tuple[str, str, float, int]
+
+
+class GroupSocialGraph:
+    """Directed weighted social graph of one group.
+
+    Public attributes are read-only for callers; mutate through
+    ``SocialGraphIndex``.
+    """
+
+    def __init__(self, group_id: str) -> None:
+        self.group_id = group_id
+        # (from, to) -> {relation_type: (value, frequency)}
+        self.components: Dict[Tuple[str, str], Dict[str, Tuple[float, int]]] = {}
+        self.successors: Dict[str, Set[str]] = {}
+        self.predecessors: Dict[str, Set[str]] = {}
+
+        # Edge slot storage (parallel lists) for CSR construction.
+        self.node_names: List[str] = []
+        self._node_ids: Dict[str, int] = {}
+        self.rows: List[int] = []
+        self.cols: List[int] = []
+        self.weights: List[float] = []
+        self._slots: Dict[Tuple[str, str], int] = {}
+        self._tombstones = 0
+
+        # Incremented on every edge change; cached results record the
+        # version they were computed at.
+        self.version = 0
+
+        self.pagerank: Optional[Dict[str, float]] = None
+        self.pagerank_version = 0
+        self.pagerank_iterations = 0
+        # (resolution, communities)
+        self.communities: Optional[Tuple[float, List[Set[str]]]] = None
+        self.communities_version = 0
+
+    # Read helpers
+
+    @property
+    def node_count(self) -> int:
+        return len(self.successors.keys() | self.predecessors.keys())
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.components)
+
+    def degree(self, node: str) -> int:
+        return len(self.successors.get(node, ())) + len(self.predecessors.get(node, ()))
+
+    def nodes(self) -> Set[str]:
+        return set(self.successors) | set(self.predecessors)
+
+    def undirected_adjacency(self) -> Dict[str, Set[str]]:
+        """Symmetric ``node -> neighbours`` mapping without self-loops."""
+        adjacency: Dict[str, Set[str]] = {}
+        for node in self.nodes():
+            neighbours = self.successors.get(node, set()) | self.predecessors.get(node, set())
+            neighbours.discard(node)
+            adjacency[node] = neighbours
+        return adjacency
+
+    def edge_arrays(self) -> Tuple[List[str], List[int], List[int], List[float]]:
+        """Copies of the node names and edge slot lists (for worker threads)."""
+        return list(self.node_names), list(self.rows), list(self.cols), list(self.weights)
+
+    def edge_attributes(self, source: str, target: str) -> Dict[str, Any]:
+        """``weight`` / ``relation_type`` / ``frequency`` of an edge."""
+        components = self.components[(source, target)]
+        dominant = max(components.items(), key=lambda item: item[1][0])[0]
+        return {
+            "weight": self.weights[self._slots[(source, target)]],
+            "relation_type": dominant,
+            "frequency": sum(frequency for _, frequency in components.values()),
+        }
+
+    def needs_refresh(self, computed_at: int, ratio: float) -> bool:
+        """True once more than ``ratio`` of the edges changed since ``computed_at``."""
+        return self.version - computed_at >= max(1.0, ratio * self.edge_count)
+
+    # Mutation (via SocialGraphIndex)
+
+    def _set_component(
+        self, source: str, target: str, relation_type: str, value: float, frequency: int
+    ) -> None:
+        key = (source, target)
+        components = self.components.get(key)
+        if components is None:
+            components = self.components[key] = {}
+            self.successors.setdefault(source, set()).add(target)
+            self.predecessors.setdefault(target, set()).add(source)
+        components[relation_type] = (float(value), int(frequency or 0))
+        self._write_slot(key, sum(max(0.0, v) for v, _ in components.values()))
+
+    def _remove_edge(self, source: str, target: str) -> None:
+        key = (source, target)
+        if self.components.pop(key, None) is None:
+            return
+        for mapping, node, other in (
+            (self.successors, source, target),
+            (self.predecessors, target, source),
+        ):
+            neighbours = mapping.get(node)
+            if neighbours is not None:
+                neighbours.discard(other)
+                if not neighbours:
+                    del mapping[node]
+        slot = self._slots.pop(key)
+        self.weights[slot] = float("nan")
+        self._tombstones += 1
+        self._touch()
+        if self._tombstones >= max(_MIN_COMPACT_TOMBSTONES, len(self._slots)):
+            self._compact()
+
+    def _write_slot(self, key: Tuple[str, str], weight: float) -> None:
+        slot = self._slots.get(key)
+        if slot is None:
+            self._slots[key] = len(self.rows)
+            self.rows.append(self._node_id(key[0]))
+            self.cols.append(self._node_id(key[1]))
+            self.weights.append(weight)
+        else:
+            self.weights[slot] = weight
+        self._touch()
+
+    def _node_id(self, node: str) -> int:
+        node_id = self._node_ids.get(node)
+        if node_id is None:
+            node_id = self._node_ids[node] = len(self.node_names)
+            self.node_names.append(node)
+        return node_id
+
+    def _touch(self) -> None:
+        self.version += 1
+
+    def _compact(self) -> None:
+        """Drop tombstoned slots and nodes without edges."""
+        weights = {key: self.weights[slot] for key, slot in self._slots.items()}
+        self.node_names, self._node_ids = [], {}
+        self.rows, self.cols, self.weights = [], [], []
+        self._slots = {}
+        self._tombstones = 0
+        for key, weight in weights.items():
+            self._slots[key] = len(self.rows)
+            self.rows.append(self._node_id(key[0]))
+            self.cols.append(self._node_id(key[1]))
+            self.weights.append(weight)
+
+
+class SocialGraphIndex:
+    """Per-group ``GroupSocialGraph`` registry shared by writers and readers.
+
+    Args:
+        refresh_ratio: Fraction of edges that must change before cached
+            PageRank scores are recomputed.
+    """
+
+    def __init__(self, refresh_ratio: float = _DEFAULT_REFRESH_RATIO) -> None:
+        self.refresh_ratio = refresh_ratio
+        self._groups: Dict[str, GroupSocialGraph] = {}
+        # Groups being loaded -> writes received meanwhile.
+        self._loading: Dict[str, List[Tuple[str, tuple]]] = {}
+        self._stats: Dict[str, Any] = {
+            "groups_loaded": 0,
+            "updates_applied": 0,
+            "pagerank_runs": 0,
+            "pagerank_cache_hits": 0,
+            "pagerank_iterations": 0,
+            "pagerank_last_ms": 0.0,
+        }
+
+    # Loading
+
+    def get(self, group_id: str) -> Optional[GroupSocialGraph]:
+        return self._groups.get(group_id)
+
+    def begin_load(self, group_id: str) -> None:
+        """Start buffering writes for ``group_id`` until ``finish_load``."""
+        self._loading.setdefault(group_id, [])
+
+    def finish_load(
+        self,
+        group_id: str,
+        rows: Iterable[Tuple[str, str, str, float, int]],
+    ) -> GroupSocialGraph:
+        """Install a group from ``(from, to, relation_type, value, frequency)`` rows."""
+        graph = GroupSocialGraph(group_id)
+        for source, target, relation_type, value, frequency in rows:
+            graph._set_component(source, target, relation_type, value, frequency)
+        for operation, args in self._loading.pop(group_id, []):
+            getattr(self, f"_apply_{operation}")(graph, *args)
+        self._groups[group_id] = graph
+        self._stats["groups_loaded"] += 1
+        return graph
+
+    def abort_load(self, group_id: str) -> None:
+        self._loading.pop(group_id, None)
+
+    def clear(self, group_id: Optional[str] = None) -> None:
+        """Forget one group (or all); the next access reloads from the database."""
+        if group_id is None:
+            self._groups.clear()
+            self._loading.clear()
+        else:
+            self._groups.pop(group_id, None)
+            self._loading.pop(group_id, None)
+
+    # Writes (called by relation writers after commit)
+
+    def upsert_component(
+        self,
+        group_id: str,
+        from_user: str,
+        to_user: str,
+        relation_type: str,
+        value: float,
+        frequency: int = 1,
+    ) -> None:
+        """Record one relation component row."""
+        self._dispatch(
+            group_id, "upsert", (from_user, to_user, relation_type, value, frequency)
+        )
+
+    def replace_outgoing(
+        self,
+        group_id: str,
+        from_user: str,
+        components: Sequence[OutgoingComponent],
+    ) -> None:
+        """Replace every outgoing component of ``from_user`` in the group."""
+        self._dispatch(group_id, "replace", (from_user, list(components)))
+
+    def _dispatch(self, group_id: str, operation: str, args: tuple) -> None:
+        pending = self._loading.get(group_id)
+        if pending is not None:
+            pending.append((operation, args))
+            return
+        graph = self._groups.get(group_id)
+        if graph is None:
+            return
+        getattr(self, f"_apply_{operation}")(graph, *args)
+        self._stats["updates_applied"] += 1
+
+    @staticmethod
+    def _apply_upsert(graph, from_user, to_user, relation_type, value, frequency) -> None:
+        graph._set_component(from_user, to_user, relation_type, value, frequency)
+
+    @staticmethod
+    def _apply_replace(graph, from_user, components) -> None:
+        wanted: Dict[Tuple[str, str], Dict[str, Tuple[float, int]]] = {}
+        for to_user, relation_type, value, frequency in components:
+            wanted.setdefault((from_user, to_user), {})[relation_type] = (value, frequency)
+        for target in list(graph.successors.get(from_user, ())):
+            key = (from_user, target)
+            if key not in wanted or set(graph.components[key]) - set(wanted[key]):
+                graph._remove_edge(from_user, target)
+        for (source, target), by_type in wanted.items():
+            existing = graph.components.get((source, target), {})
+            for relation_type, (value, frequency) in by_type.items():
+                if existing.get(relation_type) != (float(value), int(frequency or 0)):
+                    graph._set_component(source, target, relation_type, value, frequency)
+
+    # PageRank
+
+    def pagerank_is_fresh(self, graph: GroupSocialGraph) -> bool:
+        return graph.pagerank is not None and not graph.needs_refresh(
+            graph.pagerank_version, self.refresh_ratio
+        )
+
+    def record_pagerank(
+        self,
+        graph: GroupSocialGraph,
+        scores: Dict[str, float],
+        computed_at: int,
+        iterations: int,
+        elapsed_ms: float,
+    ) -> None:
+        graph.pagerank = scores
+        graph.pagerank_version = computed_at
+        graph.pagerank_iterations = iterations
+        self._stats["pagerank_runs"] += 1
+        self._stats["pagerank_iterations"] += iterations
+        self._stats["pagerank_last_ms"] = round(elapsed_ms, 3)
+
+    def note_pagerank_cache_hit(self) -> None:
+        self._stats["pagerank_cache_hits"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["groups"] = len(self._groups)
+        stats["scipy"] = _HAS_SCIPY
+        return stats
+
+
+def compute_pagerank(
+    node_names: List[str],
+    rows: List[int],
+    cols: List[int],
+    weights: List[float],
+    warm_start: Optional[Dict[str, float]] = None,
+    alpha: float = _PAGERANK_ALPHA,
+    tol: float = _PAGERANK_TOL,
+    max_iter: int = _PAGERANK_MAX_ITER,
+) -> Tuple[Dict[str, float], int]:
+    """Weighted PageRank over edge slot lists; returns (scores, iterations).
+
+    Nodes without live edges are left out of the result. Pure function
+    of its arguments, safe to run in a worker thread.
+    """
+    if not rows:
+        return {}, 0
+    if not _HAS_SCIPY:
+        return _networkx_pagerank(node_names, rows, cols, weights, warm_start, alpha, tol, max_iter)
+
+    row_idx = np.asarray(rows, dtype=np.int64)
+    col_idx = np.asarray(cols, dtype=np.int64)
+    data = np.asarray(weights, dtype=np.float64)
+    # Tombstoned slots are NaN; nodes that only appear in them are dropped.
+    live = ~np.isnan(data)
+    row_idx, col_idx, data = row_idx[live], col_idx[live], data[live]
+    if not len(data):
+        return {}, 0
+    alive = np.zeros(len(node_names), dtype=bool)
+    alive[row_idx] = True
+    alive[col_idx] = True
+    index = np.cumsum(alive) - 1
+    size = int(alive.sum())
+
+    matrix = sparse.csr_array(
+        (data, (index[row_idx], index[col_idx])), shape=(size, size)
+    )
+    out_weight = np.asarray(matrix.sum(axis=1)).ravel()
+    dangling = out_weight <= 0
+    inverse = np.divide(1.0, out_weight, out=np.zeros(size), where=~dangling)
+    transition_t = (sparse.diags_array(inverse) @ matrix).T.tocsr()
+
+    names = [name for name, keep in zip(node_names, alive) if keep]
+    if warm_start:
+        x = np.fromiter(
+            (warm_start.get(name, 1.0 / size) for name in names),
+            dtype=np.float64,
+            count=size,
+        )
+        x /= x.sum()
+    else:
+        x = np.full(size, 1.0 / size)
+
+    iterations = max_iter
+    for iteration in range(1, max_iter + 1):
+        previous = x
+        x = alpha * (transition_t @ previous + previous[dangling].sum() / size)
+        x += (1.0 - alpha) / size
+        if np.abs(x - previous).sum() < size * tol:
+            iterations = iteration
+            break
+    else:
+        logger.debug(
+            f"[SocialGraphIndex] PageRank did not converge in {max_iter} iterations"
+        )
+    return dict(zip(names, x.tolist())), iterations
+
+
+def _networkx_pagerank(node_names, rows, cols, weights, warm_start, alpha, tol, max_iter):
+    if nx is None:
+        return {}, 0
+    graph = nx.DiGraph()
+    for r, c, w in zip(rows, cols, weights):
+        if w == w:  # skip NaN tombstones
+            graph.add_edge(node_names[r], node_names[c], weight=w)
+    if graph.number_of_nodes() == 0:
+        return {}, 0
+    nstart = None
+    if warm_start:
+        nstart = {node: warm_start.get(node, 1.0 / graph.number_of_nodes()) for node in graph}
+    try:
+        scores = nx.pagerank(graph, alpha=alpha, weight="weight", nstart=nstart, tol=tol, max_iter=max_iter)
+    except Exception as exc:
+        logger.debug(f"[SocialGraphIndex] PageRank failed: {exc}")
+        return {}, 0
+    return scores, 0
+
+
+def louvain_communities(
+    node_names: List[str],
+    rows: List[int],
+    cols: List[int],
+    weights: List[float],
+    resolution: float = 1.0,
+    seed: int = 42,
+) -> List[Set[str]]:
+    """Louvain communities on the undirected view of the edge slot lists.
+
+    Reciprocal edges are merged by summing their weights. Pure function
+    of its arguments, safe to run in a worker thread.
+    """
+    if nx is None:
+        return []
+    graph = nx.Graph()
+    for r, c, w in zip(rows, cols, weights):
+        if r == c or w != w:  # self-loops and NaN tombstones
+            continue
+        u, v = node_names[r], node_names[c]
+        if graph.has_edge(u, v):
+            graph[u][v]["weight"] += w
+        else:
+            graph.add_edge(u, v, weight=w)
+    if graph.number_of_nodes() < 2:
+        return []
+    return list(nx.community.louvain_communities(graph, resolution=resolution, seed=seed))
+
+
+_index: Optional[SocialGraphIndex] = None
+
+
+def get_social_graph_index() -> SocialGraphIndex:
+    """Process-wide index shared by relation writers and the analyzer."""
+    global _index
+    if _index is None:
+        _index = SocialGraphIndex()
+    return _index
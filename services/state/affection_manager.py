@@ -4,7 +4,7 @@
 import asyncio
 import random
 import time
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
@@ -19,6 +19,8 @@ from ...core.interfaces import IDataStorage
 
 from ...core.framework_llm_adapter import FrameworkLLMAdapter  # 导入框架适配器
 
+from .interaction_classifier import InteractionClassifier
+
 
 class MoodType(Enum):
     """情绪类型枚举"""
@@ -118,16 +120,37 @@ class AffectionManager(AsyncServiceBase):
         # 情绪和好感度状态缓存
         self.current_moods: Dict[str, BotMood] = {}  # group_id -> BotMood
         self.user_affections: Dict[str, Dict[str, UserAffection]] = {}  # group_id -> {user_id -> UserAffection}
+        # 内存好感度账本中待写回数据库的用户 group_id -> {user_id}
+        self._dirty_affections: Dict[str, Set[str]] = {}
+        self._ledger_lock = asyncio.Lock()
         
         # 预定义的情绪描述模板
         self.mood_descriptions = self._init_mood_descriptions()
         
         # 好感度变化规则
         self.affection_rules = self._init_affection_rules()
+
+        # 交互类型分级分类器（关键词/本地模型/批量LLM）
+        self.interaction_classifier: Optional[InteractionClassifier] = None
+        if config.interaction_classifier_enabled:
+            self.interaction_classifier = InteractionClassifier(
+                labels=[t.value for t in InteractionType],
+                llm_adapter=llm_adapter,
+                label_store=database_manager,
+                fallback=self._rule_based_interaction_label,
+                confidence_threshold=config.interaction_local_confidence,
+                batch_max_size=config.interaction_llm_batch_max_size,
+                batch_max_wait_ms=config.interaction_llm_batch_max_wait_ms,
+                shadow_sample_rate=config.interaction_shadow_sample_rate,
+            )
     
     async def _do_start(self) -> bool:
         """启动好感度管理服务"""
         try:
+            # 用历史LLM标注训练本地交互分类模型
+            if self.interaction_classifier:
+                await self.interaction_classifier.load_training_labels()
+
             # 为所有活跃群组设置初始随机情绪（如果启用）
             if self.config.enable_startup_random_mood:
                 await self._initialize_random_moods_for_active_groups()
@@ -136,6 +159,10 @@ class AffectionManager(AsyncServiceBase):
             if self.config.enable_daily_mood:
                 self._mood_task = asyncio.create_task(self._daily_mood_updater())
 
+            # 启动好感度账本定期写回任务
+            if self.config.affection_ledger_enabled:
+                self._ledger_task = asyncio.create_task(self._affection_ledger_flush_loop())
+
             self._logger.info("好感度管理服务启动成功")
             return True
         except Exception as e:
@@ -145,13 +172,16 @@ class AffectionManager(AsyncServiceBase):
     async def _do_stop(self) -> bool:
         """停止好感度管理服务"""
         # 取消后台任务
-        task = getattr(self, '_mood_task', None)
-        if task and not task.done():
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
+        for task in (getattr(self, '_mood_task', None), getattr(self, '_ledger_task', None)):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        await self._flush_affection_ledger()
+        if self.interaction_classifier:
+            await self.interaction_classifier.close()
         # 保存当前状态
         await self._save_current_state()
         return True
@@ -521,7 +551,15 @@ class AffectionManager(AsyncServiceBase):
     
     
     async def analyze_interaction_type(self, group_id: str, user_id: str, message: str) -> InteractionType:
-        """使用LLM主分析，规则作为备选"""
+        """分级分类器启用时按 缓存/关键词/本地模型/批量LLM 分析；否则使用LLM主分析，规则作为备选"""
+        if self.interaction_classifier:
+            result = await self.interaction_classifier.classify(message)
+            self._logger.debug(
+                f"交互类型分级分类: {result.interaction_type} "
+                f"(来源: {result.source}, 置信度: {result.confidence:.2f})"
+            )
+            return InteractionType(result.interaction_type)
+
         try:
             # 首先使用LLM进行智能分析
             current_mood = await self.get_current_mood(group_id)
@@ -591,6 +629,16 @@ class AffectionManager(AsyncServiceBase):
         rule_based_type = self._rule_based_interaction_analysis(message)
         return rule_based_type if rule_based_type else InteractionType.CHAT
     
+    def _rule_based_interaction_label(self, message: str) -> Optional[str]:
+        rule_based_type = self._rule_based_interaction_analysis(message)
+        return rule_based_type.value if rule_based_type else None
+
+    def get_interaction_classifier_stats(self) -> Dict[str, Any]:
+        """交互分类各级命中数、耗时及与LLM的抽样一致率"""
+        if not self.interaction_classifier:
+            return {'enabled': False}
+        return {'enabled': True, **self.interaction_classifier.get_stats()}
+
     def _rule_based_interaction_analysis(self, message: str) -> Optional[InteractionType]:
         """基于规则的交互类型分析（备选方案，当LLM分析失败时使用）"""
         message_lower = message.lower().strip()
@@ -660,11 +708,17 @@ class AffectionManager(AsyncServiceBase):
         """更新用户好感度"""
         try:
             # 获取当前好感度
-            current_affection = await self.db_manager.get_user_affection(group_id, user_id)
-            if not current_affection:
-                current_level = 0
+            ledger = None
+            if self.config.affection_ledger_enabled:
+                ledger = await self._get_affection_ledger(group_id)
+                entry = ledger.get(user_id)
+                current_level = entry.affection_level if entry else 0
             else:
-                current_level = current_affection['affection_level']
+                current_affection = await self.db_manager.get_user_affection(group_id, user_id)
+                if not current_affection:
+                    current_level = 0
+                else:
+                    current_level = current_affection['affection_level']
             
             # 获取当前情绪
             current_mood = await self.get_current_mood(group_id)
@@ -690,17 +744,25 @@ class AffectionManager(AsyncServiceBase):
             
             # 检查总好感度限制
             if new_level > current_level:
-                total_affection = await self.db_manager.get_total_affection(group_id)
+                if ledger is not None:
+                    total_affection = sum(e.affection_level for e in ledger.values())
+                else:
+                    total_affection = await self.db_manager.get_total_affection(group_id)
                 if total_affection >= self.config.max_total_affection:
                     # 需要降低其他用户的好感度
                     await self._redistribute_affection(group_id, user_id, new_level - current_level)
             
             # 更新数据库
             mood_str = f"{current_mood.mood_type.value}({current_mood.intensity:.2f})" if current_mood else "unknown"
-            success = await self.db_manager.update_user_affection(
-                group_id, user_id, new_level,
-                change_result['reason'], mood_str
-            )
+            if ledger is not None:
+                # 账本模式：只更新内存，由定期任务批量写回
+                self._set_ledger_level(group_id, ledger, user_id, new_level, interacted=True)
+                success = True
+            else:
+                success = await self.db_manager.update_user_affection(
+                    group_id, user_id, new_level,
+                    change_result['reason'], mood_str
+                )
             
             if success:
                 return {
@@ -923,42 +985,128 @@ class AffectionManager(AsyncServiceBase):
             self._logger.error(f"设置即时情绪失败: {e}")
     
     async def _redistribute_affection(self, group_id: str, target_user_id: str, increase_amount: int):
-        """重新分配好感度以保持总量限制"""
+        """重新分配好感度以保持总量限制（一次计算，一次批量写入）"""
         try:
+            if self.config.affection_ledger_enabled:
+                ledger = await self._get_affection_ledger(group_id)
+                new_levels = self._plan_affection_redistribution(
+                    {user_id: entry.affection_level for user_id, entry in ledger.items()},
+                    target_user_id, increase_amount
+                )
+                for user_id, level in new_levels.items():
+                    self._set_ledger_level(group_id, ledger, user_id, level)
+                return
+
             # 获取所有用户的好感度
             all_affections = await self.db_manager.get_all_user_affections(group_id)
-            
-            # 计算需要减少的总量
-            total_to_decrease = increase_amount
-            
-            # 按好感度从高到低排序，优先减少高好感度用户
-            other_users = [a for a in all_affections if a['user_id'] != target_user_id]
-            other_users.sort(key=lambda x: x['affection_level'], reverse=True)
-            
-            # 按比例减少其他用户的好感度
-            for user_affection in other_users:
-                if total_to_decrease <= 0:
-                    break
-                
-                current_level = user_affection['affection_level']
-                if current_level <= 0:
-                    continue
-                
-                # 计算这个用户应该减少的量（按当前好感度比例）
-                decrease_ratio = min(1.0, total_to_decrease / sum(u['affection_level'] for u in other_users))
-                decrease_amount = max(1, int(current_level * decrease_ratio * self.config.affection_decay_rate))
-                decrease_amount = min(decrease_amount, current_level, total_to_decrease)
-                
-                new_level = current_level - decrease_amount
-                await self.db_manager.update_user_affection(
-                    group_id, user_affection['user_id'], new_level,
-                    f"好感度重新分配，为其他用户让出空间", ""
-                )
-                
-                total_to_decrease -= decrease_amount
-                
+            new_levels = self._plan_affection_redistribution(
+                {a['user_id']: a['affection_level'] for a in all_affections},
+                target_user_id, increase_amount
+            )
+            if new_levels:
+                await self.db_manager.bulk_set_user_affections(group_id, new_levels)
+
         except Exception as e:
             self._logger.error(f"重新分配好感度失败: {e}")
+
+    def _plan_affection_redistribution(self, levels: Dict[str, int], target_user_id: str,
+                                       increase_amount: int) -> Dict[str, int]:
+        """
+        计算重新分配后其他用户的新好感度
+
+        按好感度从高到低依次按比例减少，直到让出 increase_amount。
+        只返回有变化的用户。
+        """
+        # 按好感度从高到低排序，优先减少高好感度用户
+        other_users = sorted(
+            ((user_id, level) for user_id, level in levels.items() if user_id != target_user_id),
+            key=lambda item: item[1], reverse=True
+        )
+        other_total = sum(level for _, level in other_users)
+        if other_total <= 0:
+            return {}
+
+        total_to_decrease = increase_amount
+        new_levels: Dict[str, int] = {}
+        for user_id, current_level in other_users:
+            if total_to_decrease <= 0:
+                break
+            if current_level <= 0:
+                continue
+
+            # 计算这个用户应该减少的量（按当前好感度比例）
+            decrease_ratio = min(1.0, total_to_decrease / other_total)
+            decrease_amount = max(1, int(current_level * decrease_ratio * self.config.affection_decay_rate))
+            decrease_amount = min(decrease_amount, current_level, total_to_decrease)
+
+            new_levels[user_id] = current_level - decrease_amount
+            total_to_decrease -= decrease_amount
+        return new_levels
+
+    async def _get_affection_ledger(self, group_id: str) -> Dict[str, UserAffection]:
+        """获取群组的内存好感度账本，首次访问时从数据库加载"""
+        ledger = self.user_affections.get(group_id)
+        if ledger is not None:
+            return ledger
+        async with self._ledger_lock:
+            ledger = self.user_affections.get(group_id)
+            if ledger is None:
+                rows = await self.db_manager.get_all_user_affections(group_id)
+                ledger = {
+                    row['user_id']: UserAffection(
+                        user_id=row['user_id'],
+                        group_id=group_id,
+                        affection_level=row['affection_level'],
+                        last_interaction=row.get('updated_at') or 0,
+                        interaction_count=0
+                    )
+                    for row in rows
+                }
+                self.user_affections[group_id] = ledger
+        return ledger
+
+    def _set_ledger_level(self, group_id: str, ledger: Dict[str, UserAffection], user_id: str,
+                          level: int, interacted: bool = False):
+        """更新账本中的好感度并标记待写回"""
+        entry = ledger.get(user_id)
+        if entry is None:
+            entry = UserAffection(user_id=user_id, group_id=group_id, affection_level=0,
+                                  last_interaction=time.time(), interaction_count=0)
+            ledger[user_id] = entry
+        entry.affection_level = level
+        if interacted:
+            entry.last_interaction = time.time()
+            entry.interaction_count += 1
+        self._dirty_affections.setdefault(group_id, set()).add(user_id)
+
+    async def _flush_affection_ledger(self, group_id: Optional[str] = None) -> int:
+        """将账本中有改动的好感度批量写回数据库（每个群一次写入），返回写入条数"""
+        written = 0
+        group_ids = [group_id] if group_id else list(self._dirty_affections)
+        for gid in group_ids:
+            dirty = self._dirty_affections.pop(gid, None)
+            if not dirty:
+                continue
+            ledger = self.user_affections.get(gid, {})
+            levels = {user_id: ledger[user_id].affection_level for user_id in dirty if user_id in ledger}
+            if await self.db_manager.bulk_set_user_affections(gid, levels):
+                written += len(levels)
+            else:
+                # 写入失败，下次重试
+                self._dirty_affections.setdefault(gid, set()).update(dirty)
+        return written
+
+    async def _affection_ledger_flush_loop(self):
+        """定期写回好感度账本"""
+        interval = max(1, self.config.affection_ledger_flush_interval)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                written = await self._flush_affection_ledger()
+                if written:
+                    self._logger.debug(f"好感度账本已写回 {written} 条记录")
+            except Exception as e:
+                self._logger.error(f"写回好感度账本失败: {e}")
     
     async def get_mood_influenced_system_prompt(self, group_id: str, base_prompt: str) -> str:
         """获取受情绪影响的系统提示词"""
@@ -1026,6 +1174,8 @@ class AffectionManager(AsyncServiceBase):
     async def get_affection_status(self, group_id: str) -> Dict[str, Any]:
         """获取群组好感度状态"""
         try:
+            if self.config.affection_ledger_enabled:
+                await self._flush_affection_ledger(group_id)
             all_affections = await self.db_manager.get_all_user_affections(group_id)
             total_affection = sum(a['affection_level'] for a in all_affections)
             current_mood = await self.get_current_mood(group_id)
@@ -3,10 +3,13 @@
 使用 CacheManager、Repository 和 TaskScheduler，与现有接口兼容。
 基于 NetworkX 图结构实现概念关联和智能记忆融合。
 """
+import asyncio
+import hashlib
+import os
 import time
 import json
 import math
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from collections import Counter
@@ -23,13 +26,32 @@ from ...core.framework_llm_adapter import FrameworkLLMAdapter
 from ...config import PluginConfig
 from ...utils.cache_manager import get_cache_manager, async_cached
 from ...utils.task_scheduler import get_task_scheduler
+from ...utils.graph_statistics import IncrementalGraphCounters, estimate_graph_statistics
 
 # 导入 Repository
 from ...repositories import (
     MemoryRepository,
     MemoryEmbeddingRepository,
-    MemorySummaryRepository
+    MemorySummaryRepository,
+    MemoryGraphNodeRepository,
+    MemoryGraphEdgeRepository,
 )
+from ..monitoring.metrics import (
+    MEMORY_GRAPH_SAVE_DURATION,
+    MEMORY_GRAPH_ROWS_WRITTEN_TOTAL,
+)
+from .memory_graph_snapshot import read_snapshot, read_snapshot_header, write_snapshot
+
+# 概念字段长度上限（与 memory_graph_nodes.concept 列一致）
+_MAX_CONCEPT_LENGTH = 191
+
+
+def _concept_key(concept: str) -> str:
+    """超长概念截断并附加哈希后缀，保证落库键不超过列宽且彼此不冲突"""
+    if len(concept) <= _MAX_CONCEPT_LENGTH:
+        return concept
+    digest = hashlib.sha1(concept.encode('utf-8')).hexdigest()[:12]
+    return f"{concept[:_MAX_CONCEPT_LENGTH - len(digest) - 1]}#{digest}"
 
 
 class SimpleGraph:
@@ -109,6 +131,99 @@ class MemoryGraph:
 
     def __init__(self):
         self.G = nx.Graph() if nx else SimpleGraph()
+        # 脏标记：自上次保存以来修改过的节点 / 边（边按字典序存储一次）
+        self._dirty_nodes: Set[str] = set()
+        self._dirty_edges: Set[Tuple[str, str]] = set()
+        # 每次修改（含冷启动恢复）递增，用作统计缓存等的版本戳
+        self.version = 0
+        # 增量维护的节点/边/度分布/连通分量计数
+        self._counters = IncrementalGraphCounters()
+        # 采样估计结果缓存（按 version 失效）及进行中的估计任务
+        self._estimate_cache: Optional[Tuple[int, int, Dict[str, Any]]] = None
+        self._estimate_task: Optional[asyncio.Task] = None
+
+    @property
+    def has_changes(self) -> bool:
+        """是否存在未保存的节点或边"""
+        return bool(self._dirty_nodes or self._dirty_edges)
+
+    def mark_dirty(self, nodes=(), edges=()):
+        """标记节点 / 边为待保存（保存失败时用于恢复脏标记）"""
+        self._dirty_nodes.update(nodes)
+        for concept1, concept2 in edges:
+            self._dirty_edges.add(
+                (concept1, concept2) if concept1 <= concept2 else (concept2, concept1)
+            )
+        self.version += 1
+
+    def take_dirty(self) -> Tuple[Set[str], Set[Tuple[str, str]]]:
+        """取出并清空脏标记，返回 (节点集合, 边集合)"""
+        nodes, edges = self._dirty_nodes, self._dirty_edges
+        self._dirty_nodes, self._dirty_edges = set(), set()
+        return nodes, edges
+
+    def restore(self, nodes, edges) -> None:
+        """
+        批量恢复节点和边（冷启动用）
+
+        直接写入图结构，不调用 LLM 整合、不产生脏标记；内存中已有的
+        节点内容和边保持不变。
+
+        Args:
+            nodes: (concept, memory_items, weight, created_time, last_modified) 序列
+            edges: (concept1, concept2, strength, created_time, last_modified) 序列
+        """
+        G = self.G
+        for concept, memory_items, weight, created_time, last_modified in nodes:
+            if concept in G and 'memory_items' in G.nodes[concept]:
+                continue
+            G.add_node(
+                concept,
+                memory_items=memory_items,
+                weight=weight,
+                created_time=created_time,
+                last_modified=last_modified,
+            )
+            self._counters.add_node(concept)
+        for concept1, concept2, strength, created_time, last_modified in edges:
+            if G.has_edge(concept1, concept2):
+                continue
+            G.add_edge(
+                concept1, concept2,
+                strength=strength,
+                created_time=created_time,
+                last_modified=last_modified,
+            )
+            self._counters.add_edge(concept1, concept2)
+        self.version += 1
+
+    def export_rows(self) -> Tuple[List[tuple], List[tuple]]:
+        """导出 (节点行, 边行)，格式与 restore 的输入一致"""
+        G = self.G
+        nodes = []
+        for concept in list(G.nodes):
+            data = G.nodes[concept]
+            if data.get('memory_items'):
+                nodes.append((
+                    concept,
+                    data['memory_items'],
+                    data.get('weight', 1.0),
+                    data.get('created_time', 0.0),
+                    data.get('last_modified', 0.0),
+                ))
+        edges = []
+        for concept1 in list(G.nodes):
+            for concept2 in G.neighbors(concept1):
+                if concept1 < concept2:
+                    data = G[concept1][concept2]
+                    edges.append((
+                        concept1,
+                        concept2,
+                        data.get('strength', 1),
+                        data.get('created_time', 0.0),
+                        data.get('last_modified', 0.0),
+                    ))
+        return nodes, edges
 
     def connect_concepts(self, concept1: str, concept2: str):
         """连接两个概念"""
@@ -116,6 +231,7 @@ class MemoryGraph:
             return
 
         current_time = time.time()
+        self.mark_dirty(edges=((concept1, concept2),))
 
         if self.G.has_edge(concept1, concept2):
             self.G[concept1][concept2]["strength"] = self.G[concept1][concept2].get("strength", 1) + 1
@@ -127,6 +243,7 @@ class MemoryGraph:
                 created_time=current_time,
                 last_modified=current_time,
             )
+            self._counters.add_edge(concept1, concept2)
 
     async def add_memory_node(self, concept: str, memory: str, llm_adapter: Optional[FrameworkLLMAdapter] = None):
         """添加记忆节点，支持 LLM 智能记忆融合"""
@@ -163,6 +280,9 @@ class MemoryGraph:
                 created_time=current_time,
                 last_modified=current_time,
             )
+            self._counters.add_node(concept)
+        # 在修改完成后标记（LLM 整合期间可能发生保存）
+        self.mark_dirty(nodes=(concept,))
 
     async def _integrate_memories_with_llm(self, old_memory: str, new_memory: str, llm_adapter: FrameworkLLMAdapter) -> str:
         """使用 LLM 智能整合记忆"""
@@ -232,28 +352,49 @@ class MemoryGraph:
         return entropy
 
     def get_graph_statistics(self) -> Dict[str, Any]:
-        """获取图的统计信息"""
-        nodes_count = self.G.number_of_nodes()
-        edges_count = self.G.number_of_edges()
-        if nx is None:
-            density = 0.0 if nodes_count <= 1 else (2 * edges_count) / (nodes_count * (nodes_count - 1))
-            return {
-                "nodes_count": nodes_count,
-                "edges_count": edges_count,
-                "density": density,
-                "connected_components": 0,
-                "average_clustering": 0,
-                "average_shortest_path": 0,
-            }
-
-        return {
-            "nodes_count": nodes_count,
-            "edges_count": edges_count,
-            "density": nx.density(self.G),
-            "connected_components": nx.number_connected_components(self.G),
-            "average_clustering": nx.average_clustering(self.G) if nodes_count > 0 else 0,
-            "average_shortest_path": nx.average_shortest_path_length(self.G) if nx.is_connected(self.G) else 0
-        }
+        """
+        获取图的统计信息（同步，O(1)）
+
+        计数类指标来自增量计数器；聚类系数和平均最短路径取最近一次
+        采样估计的缓存结果（尚未估计时为 0），需要最新估计时使用
+        ``get_graph_statistics_async``。
+        """
+        stats = self._counters.snapshot()
+        cached = self._estimate_cache
+        estimates = cached[2] if cached else {}
+        stats.update({
+            "average_clustering": estimates.get("average_clustering", 0),
+            "average_shortest_path": estimates.get("average_shortest_path", 0),
+            "approximate": estimates.get("approximate", False),
+            "version": self.version,
+            "estimated_version": cached[0] if cached else None,
+        })
+        return stats
+
+    async def get_graph_statistics_async(self, sample_size: int = 256) -> Dict[str, Any]:
+        """
+        获取图的统计信息，聚类系数和平均最短路径为采样估计
+
+        估计在工作线程中进行，结果按 (version, sample_size) 缓存；图未变化
+        时直接复用缓存，并发调用共享同一个进行中的估计任务。
+        """
+        cached = self._estimate_cache
+        if cached is None or cached[:2] != (self.version, sample_size):
+            task = self._estimate_task
+            if task is None or task.done():
+                task = asyncio.ensure_future(self._estimate(sample_size))
+                self._estimate_task = task
+            await asyncio.shield(task)
+        return self.get_graph_statistics()
+
+    async def _estimate(self, sample_size: int) -> None:
+        version = self.version
+        # 在事件循环上复制邻接表，线程中只读取副本
+        adjacency = {node: set(self.G.neighbors(node)) for node in list(self.G.nodes)}
+        estimates = await asyncio.to_thread(
+            estimate_graph_statistics, adjacency, sample_size
+        )
+        self._estimate_cache = (version, sample_size, estimates)
 
 
 # 服务类
@@ -311,6 +452,18 @@ class EnhancedMemoryGraphManager:
         # 因为 MemoryGraph 对象包含 NetworkX 图，不适合序列化缓存
         self.memory_graphs: Dict[str, MemoryGraph] = {}
 
+        # 懒加载：首次访问某群组时才从快照/数据库恢复
+        self._loaded_groups: Set[str] = set()
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+
+        # 增量保存统计
+        self._save_stats: Dict[str, float] = {
+            'saves': 0,
+            'nodes_written': 0,
+            'edges_written': 0,
+            'last_save_ms': 0.0,
+        }
+
         self._initialized = True
         logger.info("[增强型记忆图] 初始化完成（使用缓存管理器）")
 
@@ -376,6 +529,12 @@ class EnhancedMemoryGraphManager:
             for group_id in list(self.memory_graphs.keys()):
                 await self.save_memory_graph(group_id)
 
+            # 为已加载且已全部落库的群组写入快照，加快下次启动
+            for group_id in list(self._loaded_groups):
+                graph = self.memory_graphs.get(group_id)
+                if graph is not None and not graph.has_changes:
+                    await self._write_graph_snapshot(group_id, graph)
+
             # 移除定时任务
             self.scheduler.remove_job('memory_cleanup')
             self.scheduler.remove_job('memory_auto_save')
@@ -408,101 +567,256 @@ class EnhancedMemoryGraphManager:
 
         return self.memory_graphs[group_id]
 
+    async def ensure_memory_graph(self, group_id: str) -> MemoryGraph:
+        """
+        获取记忆图，首次访问时从快照或数据库懒加载
+
+        Args:
+            group_id: 群组 ID
+
+        Returns:
+            MemoryGraph: 记忆图对象
+        """
+        if group_id not in self._loaded_groups:
+            lock = self._load_locks.setdefault(group_id, asyncio.Lock())
+            async with lock:
+                if group_id not in self._loaded_groups:
+                    await self.load_memory_graph(group_id)
+        return self.get_memory_graph(group_id)
+
     async def load_memory_graph(self, group_id: str):
         """
-        从数据库加载记忆图
+        从快照或数据库批量恢复记忆图
+
+        节点和边按原样写回图中，不经过 LLM 记忆整合。若快照头部记录的
+        数据库水位（行数 + 最大修改时间）与当前数据库一致，直接读取快照；
+        否则从数据库读取全部行，并重写快照供下次启动使用。
 
         Args:
             group_id: 群组 ID
         """
+        if not hasattr(self.db_manager, 'get_session'):
+            # 降级到原有实现
+            logger.debug("[增强型记忆图] 使用原有数据库加载方式")
+            # TODO: 调用原有的加载逻辑
+            self._loaded_groups.add(group_id)
+            return
+
+        started = time.perf_counter()
+        snapshot_path = self._snapshot_path(group_id)
         try:
-            # 使用 Repository 从数据库加载
-            if hasattr(self.db_manager, 'get_session'):
-                # 新的 SQLAlchemy 版本
-                async with self.db_manager.get_session() as session:
-                    memory_repo = MemoryRepository(session)
-                    memories = await memory_repo.find_many(
-                        group_id=group_id,
-                        limit=1000
-                    )
+            async with self.db_manager.get_session() as session:
+                node_repo = MemoryGraphNodeRepository(session)
+                edge_repo = MemoryGraphEdgeRepository(session)
+                watermark = self._watermark_header(
+                    await node_repo.get_watermark(group_id),
+                    await edge_repo.get_watermark(group_id),
+                )
 
-                    # 重建记忆图
-                    memory_graph = MemoryGraph()
-                    for memory in memories:
-                        # 从 metadata 解析概念和关联
-                        try:
-                            metadata = json.loads(memory.metadata) if memory.metadata else {}
-                            concept = metadata.get('concept')
-                            if concept:
-                                await memory_graph.add_memory_node(
-                                    concept,
-                                    memory.content,
-                                    self.llm_adapter
-                                )
-                        except Exception as e:
-                            logger.debug(f"[增强型记忆图] 解析记忆失败: {e}")
-
-                    self.memory_graphs[group_id] = memory_graph
-                    logger.info(f"[增强型记忆图] 群组 {group_id} 加载了 {len(memories)} 条记忆")
-            else:
-                # 降级到原有实现
-                logger.debug("[增强型记忆图] 使用原有数据库加载方式")
-                # TODO: 调用原有的加载逻辑
+                snapshot = None
+                if snapshot_path and watermark['nodes'][0]:
+                    header = await asyncio.to_thread(read_snapshot_header, snapshot_path)
+                    if header and self._header_matches(header, watermark):
+                        snapshot = await asyncio.to_thread(read_snapshot, snapshot_path)
 
+                if snapshot is not None:
+                    _, nodes, edges = snapshot
+                    source = '快照'
+                else:
+                    nodes = await node_repo.get_rows_by_group(group_id)
+                    edges = await edge_repo.get_rows_by_group(group_id)
+                    source = '数据库'
         except Exception as e:
             logger.error(f"[增强型记忆图] 加载记忆图失败: {e}")
+            return
+
+        self.get_memory_graph(group_id).restore(nodes, edges)
+        self._loaded_groups.add(group_id)
+
+        if snapshot is None and snapshot_path and nodes:
+            await self._save_snapshot_file(
+                snapshot_path, group_id, watermark, nodes, edges
+            )
+
+        if nodes or edges:
+            logger.info(
+                f"[增强型记忆图] 群组 {group_id} 从{source}恢复 {len(nodes)} 个节点、"
+                f"{len(edges)} 条关联，耗时 {(time.perf_counter() - started) * 1000.0:.1f}ms"
+            )
 
     async def save_memory_graph(self, group_id: str):
         """
-        保存记忆图到数据库
+        增量保存记忆图到数据库
+
+        只写入自上次保存以来变更过的节点和边（脏标记），节点与边各一条
+        批量 upsert 语句并在同一事务中提交；写入失败时恢复脏标记，下次
+        保存时重试。
 
         Args:
             group_id: 群组 ID
         """
-        try:
-            if group_id not in self.memory_graphs:
-                return
+        memory_graph = self.memory_graphs.get(group_id)
+        if memory_graph is None or not memory_graph.has_changes:
+            return
 
-            memory_graph = self.memory_graphs[group_id]
+        if not hasattr(self.db_manager, 'get_session'):
+            # 降级到原有实现
+            logger.debug("[增强型记忆图] 使用原有数据库保存方式")
+            # TODO: 调用原有的保存逻辑
+            return
 
-            # 使用 Repository 保存
-            if hasattr(self.db_manager, 'get_session'):
-                # 新的 SQLAlchemy 版本
-                async with self.db_manager.get_session() as session:
-                    memory_repo = MemoryRepository(session)
+        started = time.perf_counter()
+        dirty_nodes, dirty_edges = memory_graph.take_dirty()
+        # 同步构建行数据，保证与取出脏标记时的图状态一致
+        node_rows = self._build_node_rows(group_id, memory_graph, dirty_nodes)
+        edge_rows = self._build_edge_rows(group_id, memory_graph, dirty_edges)
 
-                    # 遍历所有节点保存
-                    for concept in memory_graph.G.nodes():
-                        node_data = memory_graph.G.nodes[concept]
-                        memory_items = node_data.get('memory_items', '')
-
-                        if memory_items:
-                            # 创建或更新记忆
-                            await memory_repo.create_memory(
-                                group_id=group_id,
-                                user_id='', # 群组级别记忆
-                                content=memory_items,
-                                memory_type='concept',
-                                importance=node_data.get('weight', 0.5),
-                                metadata=json.dumps({
-                                    'concept': concept,
-                                    'created_time': node_data.get('created_time'),
-                                    'last_modified': node_data.get('last_modified')
-                                })
-                            )
-
-                    logger.info(
-                        f"[增强型记忆图] 群组 {group_id} 保存了 "
-                        f"{len(memory_graph.G.nodes())} 个概念节点"
+        saved = False
+        try:
+            async with self.db_manager.get_session() as session:
+                saved = (
+                    await MemoryGraphNodeRepository(session).upsert_nodes(
+                        node_rows, commit=False
                     )
-            else:
-                # 降级到原有实现
-                logger.debug("[增强型记忆图] 使用原有数据库保存方式")
-                # TODO: 调用原有的保存逻辑
-
+                    and await MemoryGraphEdgeRepository(session).upsert_edges(
+                        edge_rows, commit=False
+                    )
+                )
+                if saved:
+                    await session.commit()
         except Exception as e:
+            saved = False
             logger.error(f"[增强型记忆图] 保存记忆图失败: {e}")
 
+        if not saved:
+            memory_graph.mark_dirty(dirty_nodes, dirty_edges)
+            return
+
+        elapsed = time.perf_counter() - started
+        MEMORY_GRAPH_SAVE_DURATION.observe(elapsed)
+        MEMORY_GRAPH_ROWS_WRITTEN_TOTAL.labels(kind="node").inc(len(node_rows))
+        MEMORY_GRAPH_ROWS_WRITTEN_TOTAL.labels(kind="edge").inc(len(edge_rows))
+        self._save_stats["saves"] += 1
+        self._save_stats["nodes_written"] += len(node_rows)
+        self._save_stats["edges_written"] += len(edge_rows)
+        self._save_stats["last_save_ms"] = elapsed * 1000.0
+        logger.debug(
+            f"[增强型记忆图] 群组 {group_id} 增量保存 {len(node_rows)} 个节点、"
+            f"{len(edge_rows)} 条关联，耗时 {elapsed * 1000.0:.1f}ms"
+        )
+
+    @staticmethod
+    def _build_node_rows(
+        group_id: str, memory_graph: MemoryGraph, concepts: Set[str]
+    ) -> List[Dict[str, Any]]:
+        """将脏节点转换为 memory_graph_nodes 行数据"""
+        rows = []
+        for concept in concepts:
+            if concept not in memory_graph.G:
+                continue
+            node_data = memory_graph.G.nodes[concept]
+            memory_items = node_data.get('memory_items', '')
+            if not memory_items:
+                continue
+            last_modified = node_data.get('last_modified') or time.time()
+            rows.append({
+                'group_id': group_id,
+                'concept': _concept_key(concept),
+                'memory_items': memory_items,
+                'weight': float(node_data.get('weight', 1.0)),
+                'created_time': node_data.get('created_time') or last_modified,
+                'last_modified': last_modified,
+            })
+        return rows
+
+    @staticmethod
+    def _build_edge_rows(
+        group_id: str,
+        memory_graph: MemoryGraph,
+        edges: Set[Tuple[str, str]],
+    ) -> List[Dict[str, Any]]:
+        """将脏边转换为 memory_graph_edges 行数据"""
+        rows = []
+        for concept1, concept2 in edges:
+            if not memory_graph.G.has_edge(concept1, concept2):
+                continue
+            edge_data = memory_graph.G[concept1][concept2]
+            last_modified = edge_data.get('last_modified') or time.time()
+            rows.append({
+                'group_id': group_id,
+                'concept1': _concept_key(concept1),
+                'concept2': _concept_key(concept2),
+                'strength': float(edge_data.get('strength', 1)),
+                'created_time': edge_data.get('created_time') or last_modified,
+                'last_modified': last_modified,
+            })
+        return rows
+
+    def _snapshot_path(self, group_id: str) -> Optional[str]:
+        """群组快照文件路径；未启用快照时返回 None"""
+        if not self.config or not getattr(self.config, 'memory_graph_snapshot_enabled', True):
+            return None
+        data_dir = getattr(self.config, 'data_dir', None)
+        if not data_dir:
+            return None
+        digest = hashlib.sha1(group_id.encode('utf-8')).hexdigest()
+        return os.path.join(data_dir, 'memory_graph_snapshots', f'{digest}.bin')
+
+    @staticmethod
+    def _watermark_header(
+        node_mark: Tuple[int, float], edge_mark: Tuple[int, float]
+    ) -> Dict[str, List]:
+        return {'nodes': list(node_mark), 'edges': list(edge_mark)}
+
+    @staticmethod
+    def _header_matches(header: Dict[str, Any], watermark: Dict[str, List]) -> bool:
+        return (
+            header.get('nodes') == watermark['nodes']
+            and header.get('edges') == watermark['edges']
+        )
+
+    async def _write_graph_snapshot(self, group_id: str, memory_graph: MemoryGraph):
+        """以当前数据库水位为头部写入内存图快照（图需已全部落库）"""
+        snapshot_path = self._snapshot_path(group_id)
+        if not snapshot_path:
+            return
+        try:
+            async with self.db_manager.get_session() as session:
+                watermark = self._watermark_header(
+                    await MemoryGraphNodeRepository(session).get_watermark(group_id),
+                    await MemoryGraphEdgeRepository(session).get_watermark(group_id),
+                )
+        except Exception as e:
+            logger.debug(f"[增强型记忆图] 读取数据库水位失败: {e}")
+            return
+        nodes, edges = memory_graph.export_rows()
+        if nodes:
+            await self._save_snapshot_file(
+                snapshot_path, group_id, watermark, nodes, edges
+            )
+
+    async def _save_snapshot_file(
+        self,
+        snapshot_path: str,
+        group_id: str,
+        watermark: Dict[str, List],
+        nodes: List[tuple],
+        edges: List[tuple],
+    ):
+        header = dict(watermark, group_id=group_id)
+        try:
+            await asyncio.to_thread(write_snapshot, snapshot_path, header, nodes, edges)
+        except Exception as e:
+            logger.debug(f"[增强型记忆图] 写入快照失败: {e}")
+
+    def get_save_stats(self) -> Dict[str, Any]:
+        """获取增量保存统计"""
+        stats: Dict[str, Any] = dict(self._save_stats)
+        stats['pending_groups'] = sum(
+            1 for graph in self.memory_graphs.values() if graph.has_changes
+        )
+        return stats
+
     async def add_memory_from_message(self, message, group_id: str):
         """
         从消息添加记忆
@@ -523,8 +837,8 @@ class EnhancedMemoryGraphManager:
             if not concepts:
                 return
 
-            # 获取记忆图
-            memory_graph = self.get_memory_graph(group_id)
+            # 获取记忆图（首次访问时懒加载）
+            memory_graph = await self.ensure_memory_graph(group_id)
 
             # 添加记忆节点
             for concept in concepts:
@@ -578,8 +892,8 @@ class EnhancedMemoryGraphManager:
             if not concepts:
                 return []
 
-            # 获取记忆图
-            memory_graph = self.get_memory_graph(group_id)
+            # 获取记忆图（首次访问时懒加载）
+            memory_graph = await self.ensure_memory_graph(group_id)
 
             # 收集相关记忆
             related_memories = []
@@ -607,8 +921,10 @@ class EnhancedMemoryGraphManager:
             Dict: 统计信息
         """
         try:
-            memory_graph = self.get_memory_graph(group_id)
-            return memory_graph.get_graph_statistics()
+            memory_graph = await self.ensure_memory_graph(group_id)
+            return await memory_graph.get_graph_statistics_async(
+                getattr(self.config, 'graph_stats_sample_size', 256)
+            )
 
         except Exception as e:
             logger.error(f"[增强型记忆图] 获取统计信息失败: {e}")
@@ -673,12 +989,16 @@ class EnhancedMemoryGraphManager:
         try:
             logger.debug("[增强型记忆图] 执行自动保存...")
 
-            for group_id in list(self.memory_graphs.keys()):
+            changed = [
+                group_id for group_id, graph in list(self.memory_graphs.items())
+                if graph.has_changes
+            ]
+            for group_id in changed:
                 await self.save_memory_graph(group_id)
 
             logger.debug(
                 f"[增强型记忆图] 自动保存完成，"
-                f"共保存 {len(self.memory_graphs)} 个记忆图"
+                f"共保存 {len(changed)}/{len(self.memory_graphs)} 个有变更的记忆图"
             )
 
         except Exception as e:
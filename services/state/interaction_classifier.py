@@ -0,0 +1,535 @@
+"""
+交互类型分级分类器 - 好感度系统的消息意图识别
+
+按代价从低到高依次尝试，前一级足够确定时直接返回:
+    1. 结果缓存：按归一化文本缓存分类结果；
+    2. 关键词自动机：一次扫描匹配全部带权关键词，按类型累计得分；
+    3. 本地模型：以历史 LLM 标注（interaction_labels 表）训练的
+       字符 n-gram 朴素贝叶斯模型，新标注在线增量学习；
+    4. LLM：仅对前几级都不确定的消息调用筛选模型，并发请求在
+       ``batch_max_wait_ms`` 内合并为一次批量分类。
+
+按 ``shadow_sample_rate`` 抽样的本地结果会在后台再交给 LLM 分类，
+用于统计各级相对纯 LLM 路径的一致率与耗时（见 ``get_stats``）。
+
+分类器只处理交互类型字符串（``InteractionType`` 的值），不依赖好感度
+管理器本身。
+"""
+import asyncio
+import hashlib
+import math
+import random
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from astrbot.api import logger
+
+from ...utils.cache_manager import LRUCache, TTLCache
+from ..jargon.jargon_matcher import JargonMatcher
+
+DEFAULT_LABEL = 'chat'
+
+# 交互类型说明（批量分类 prompt 使用）
+_LABEL_DESCRIPTIONS = {
+    'chat': '普通聊天',
+    'compliment': '称赞鼓励 (例如：你好美、你真棒、好厉害等)',
+    'praise': '夸赞表扬 (例如：做得好、很优秀等)',
+    'encourage': '鼓励支持',
+    'support': '支持认同',
+    'flirt': '撩拨调情 (例如：好看、漂亮、可爱等)',
+    'comfort': '安慰关怀',
+    'help': '寻求帮助',
+    'thanks': '表达感谢',
+    'apology': '道歉认错',
+    'tease': '善意调侃',
+    'care': '关心问候 (例如：你好吗、怎么样等)',
+    'gift': '赠送礼物',
+    'insult': '明确的侮辱攻击 (例如：蠢货、白痴、垃圾等恶毒词汇)',
+    'harassment': '骚扰行为 (例如：持续骚扰、不当言论等)',
+    'abuse': '恶意谩骂 (例如：脏话、恶毒攻击等)',
+    'threat': '威胁恐吓 (例如：威胁、恐吓等)',
+}
+
+# 带权关键词：权重 >= 0.8 的词单独出现即可确定类型，
+# 低权重的泛用词（如“好”“牛”“狗”）需要与其他证据叠加
+_KEYWORD_RULES: Dict[str, Sequence[Tuple[str, float]]] = {
+    'compliment': (
+        ('好美', 0.9), ('漂亮', 0.8), ('可爱', 0.8), ('美丽', 0.9), ('好看', 0.8),
+        ('厉害', 0.8), ('优秀', 0.8), ('聪明', 0.8), ('温柔', 0.8), ('体贴', 0.8),
+        ('贴心', 0.8), ('善良', 0.8), ('完美', 0.8), ('很棒', 0.9), ('真棒', 0.9),
+        ('太棒了', 0.9), ('好棒', 0.9), ('超棒', 0.9), ('好强', 0.8), ('牛逼', 0.8),
+        ('牛批', 0.8), ('牛皮', 0.8), ('给力', 0.8), ('爱了', 0.8), ('好萌', 0.8),
+        ('帅', 0.5), ('美', 0.3), ('棒', 0.5), ('赞', 0.5), ('牛', 0.4),
+        ('强', 0.3), ('萌', 0.5), ('nb', 0.6), ('666', 0.6), ('不错', 0.5),
+        ('真好', 0.5), ('好', 0.2), ('哇', 0.3),
+    ),
+    'thanks': (
+        ('谢谢', 1.0), ('感谢', 1.0), ('多谢', 1.0), ('谢啦', 1.0), ('谢了', 1.0),
+        ('thank', 1.0), ('thx', 1.0), ('谢', 0.5),
+    ),
+    'care': (
+        ('你好', 0.8), ('早上好', 0.9), ('晚上好', 0.9), ('下午好', 0.9), ('晚安', 0.9),
+        ('午安', 0.9), ('最近好吗', 1.0), ('在吗', 0.8), ('在不在', 0.8), ('哈喽', 0.8),
+        ('hello', 0.8), ('hi', 0.7), ('嗨', 0.7), ('怎么样', 0.4), ('早', 0.4),
+    ),
+    'apology': (
+        ('对不起', 1.0), ('抱歉', 1.0), ('不好意思', 0.8), ('我错了', 1.0), ('sorry', 0.9),
+    ),
+    'encourage': (
+        ('加油', 0.9), ('你可以的', 0.9), ('别放弃', 0.9),
+    ),
+    'comfort': (
+        ('别难过', 0.9), ('抱抱', 0.8), ('没事的', 0.8), ('别哭', 0.9), ('摸摸头', 0.8),
+    ),
+    'help': (
+        ('帮帮我', 0.9), ('求助', 0.9), ('帮我', 0.7), ('怎么办', 0.6), ('请问', 0.5),
+    ),
+    'gift': (
+        ('送你', 0.8), ('礼物', 0.7),
+    ),
+    'insult': (
+        ('傻逼', 1.0), ('蠢货', 1.0), ('白痴', 1.0), ('废物', 1.0), ('垃圾', 0.7),
+        ('去死', 1.0), ('畜生', 1.0), ('妈的', 0.8), ('他妈', 0.8), ('滚', 0.5),
+        ('死', 0.2), ('操', 0.5), ('草', 0.3), ('狗', 0.3), ('贱', 0.6), ('婊', 0.8),
+    ),
+    'threat': (
+        ('弄死', 1.0), ('打死', 1.0), ('干掉', 0.8), ('杀了你', 1.0), ('威胁', 0.7),
+        ('揍', 0.6), ('打你', 0.8), ('杀', 0.4),
+    ),
+}
+
+_PUNCT_RE = re.compile(r'[\s\W_]+', re.UNICODE)
+_REPEAT_RE = re.compile(r'(.)\1{3,}')
+_MAX_NORMALIZED_LENGTH = 200
+# 批量分类时单条消息在 prompt 中的最大字符数
+_PROMPT_MESSAGE_MAX_CHARS = 150
+# 标注累计到该数量时写入数据库
+_LABEL_FLUSH_SIZE = 32
+
+_ASCII_UPPER = str.maketrans(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'
+)
+
+
+def normalize_interaction_text(text: str) -> str:
+    """归一化消息文本：小写、去标点空白、压缩超过 3 次的重复字符"""
+    if not text:
+        return ''
+    normalized = _PUNCT_RE.sub('', text.translate(_ASCII_UPPER))
+    normalized = _REPEAT_RE.sub(r'\1\1\1', normalized)
+    return normalized[:_MAX_NORMALIZED_LENGTH]
+
+
+def _text_hash(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class InteractionClassification:
+    """一次分类的结果"""
+    interaction_type: str
+    confidence: float
+    source: str  # cache / keyword / model / llm / fallback
+
+
+class NaiveBayesInteractionModel:
+    """字符 unigram + bigram 多项式朴素贝叶斯，支持增量训练"""
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self._label_counts: Dict[str, int] = defaultdict(int)
+        self._feature_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._feature_totals: Dict[str, int] = defaultdict(int)
+        self._vocabulary: Set[str] = set()
+        self._samples = 0
+
+    def __len__(self) -> int:
+        return self._samples
+
+    @property
+    def label_count(self) -> int:
+        return len(self._label_counts)
+
+    @staticmethod
+    def _features(normalized: str) -> List[str]:
+        features = list(normalized)
+        features.extend(normalized[i:i + 2] for i in range(len(normalized) - 1))
+        return features
+
+    def add(self, normalized: str, label: str) -> None:
+        features = self._features(normalized)
+        if not features:
+            return
+        self._samples += 1
+        self._label_counts[label] += 1
+        counts = self._feature_counts[label]
+        for feature in features:
+            counts[feature] += 1
+            self._vocabulary.add(feature)
+        self._feature_totals[label] += len(features)
+
+    def predict(self, normalized: str) -> Optional[Tuple[str, float]]:
+        """返回 (最可能类型, 后验概率)；未训练时返回 None"""
+        features = self._features(normalized)
+        if not features or not self._label_counts:
+            return None
+        vocab_size = len(self._vocabulary) + 1
+        log_scores: Dict[str, float] = {}
+        for label, label_count in self._label_counts.items():
+            counts = self._feature_counts[label]
+            denominator = self._feature_totals[label] + self.alpha * vocab_size
+            score = math.log(label_count / self._samples)
+            for feature in features:
+                score += math.log((counts.get(feature, 0) + self.alpha) / denominator)
+            log_scores[label] = score
+        best_label = max(log_scores, key=log_scores.get)
+        best = log_scores[best_label]
+        total = sum(math.exp(score - best) for score in log_scores.values())
+        return best_label, 1.0 / total
+
+
+class InteractionClassifier:
+    """缓存 -> 关键词 -> 本地模型 -> 批量 LLM 的分级交互分类器
+
+    Args:
+        labels: 合法的交互类型取值。
+        llm_adapter: 提供 ``filter_chat_completion`` 的框架适配器。
+        label_store: 提供 ``save_interaction_labels`` /
+            ``get_interaction_labels`` 的数据库管理器，用于持久化和加载标注。
+        fallback: LLM 不可用或失败时的规则分类函数 ``(text) -> Optional[str]``。
+        confidence_threshold: 关键词/本地模型直接采用结果所需的最低置信度。
+        model_min_samples: 本地模型参与分类所需的最少标注数。
+        batch_max_size: 待分类消息达到该数量时立即发起批量请求。
+        batch_max_wait_ms: 单条消息等待合并批量请求的最长时间。
+        shadow_sample_rate: 本地结果抽样交给 LLM 复核的比例（0 关闭）。
+    """
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        llm_adapter: Any = None,
+        label_store: Any = None,
+        fallback: Optional[Callable[[str], Optional[str]]] = None,
+        confidence_threshold: float = 0.8,
+        model_min_samples: int = 50,
+        batch_max_size: int = 16,
+        batch_max_wait_ms: float = 50.0,
+        shadow_sample_rate: float = 0.0,
+        cache_size: int = 5000,
+        cache_ttl: float = 3600,
+    ) -> None:
+        self.labels = frozenset(labels)
+        self.llm_adapter = llm_adapter
+        self.label_store = label_store
+        self.fallback = fallback
+        self.confidence_threshold = confidence_threshold
+        self.model_min_samples = max(1, int(model_min_samples))
+        self.shadow_sample_rate = min(max(float(shadow_sample_rate), 0.0), 1.0)
+
+        self.model = NaiveBayesInteractionModel()
+        # 已训练样本的文本哈希（去重用），按 LRU 限制在 cache_size 以内
+        self._trained_hashes = LRUCache(maxsize=cache_size)
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._matcher = JargonMatcher([
+            {'content': keyword, 'meaning': label, 'weight': weight}
+            for label, rules in _KEYWORD_RULES.items() if label in self.labels
+            for keyword, weight in rules
+        ])
+
+        # LLM 微批量
+        self._batch_max_size = max(1, int(batch_max_size))
+        self._batch_max_wait = max(0.0, float(batch_max_wait_ms)) / 1000.0
+        self._pending: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        # 待写入数据库的 LLM 标注
+        self._pending_labels: List[Dict[str, str]] = []
+
+        self._stats: Dict[str, Any] = {
+            'sources': defaultdict(lambda: {'count': 0, 'latency_ms': 0.0}),
+            'llm_batches': 0,
+            'llm_messages': 0,
+            'llm_answered': 0,
+            'llm_latency_ms': 0.0,
+            'shadow': defaultdict(lambda: {'compared': 0, 'agreed': 0}),
+        }
+
+    # 对外接口
+
+    async def load_training_labels(self, limit: int = 5000) -> int:
+        """从数据库加载历史 LLM 标注训练本地模型，返回新增样本数"""
+        if not self.label_store or not hasattr(self.label_store, 'get_interaction_labels'):
+            return 0
+        try:
+            records = await self.label_store.get_interaction_labels(limit)
+        except Exception as e:
+            logger.warning(f"加载交互标注失败: {e}")
+            return 0
+        added = 0
+        for record in records:
+            normalized = record.get('normalized_text') or ''
+            label = record.get('interaction_type')
+            key = record.get('text_hash') or _text_hash(normalized)
+            if not normalized or label not in self.labels or key in self._trained_hashes:
+                continue
+            self._trained_hashes[key] = True
+            self.model.add(normalized, label)
+            added += 1
+        if added:
+            logger.info(f"交互分类模型已加载 {added} 条历史标注")
+        return added
+
+    async def classify(self, text: str) -> InteractionClassification:
+        """分级分类一条消息"""
+        started = time.perf_counter()
+        normalized = normalize_interaction_text(text)
+        if not normalized:
+            return self._finish(InteractionClassification(DEFAULT_LABEL, 0.0, 'fallback'), started)
+        key = _text_hash(normalized)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            return self._finish(InteractionClassification(cached[0], cached[1], 'cache'), started)
+
+        local = self._classify_locally(text, normalized)
+        if local is not None:
+            self._cache[key] = (local.interaction_type, local.confidence)
+            result = self._finish(local, started)
+            if self.shadow_sample_rate and self._llm_available() \
+                    and random.random() < self.shadow_sample_rate:
+                self._spawn(self._shadow_check(key, normalized, text, local))
+            return result
+
+        if self._llm_available():
+            llm_started = time.perf_counter()
+            label = await self._enqueue(key, text)
+            if label:
+                self._record_llm_latency(llm_started)
+                self._cache[key] = (label, 1.0)
+                self._learn(key, normalized, label)
+                return self._finish(InteractionClassification(label, 1.0, 'llm'), started)
+
+        label = self.fallback(text) if self.fallback else None
+        if label not in self.labels:
+            label = DEFAULT_LABEL
+        return self._finish(InteractionClassification(label, 0.0, 'fallback'), started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """各级命中数与平均耗时，以及本地结果相对 LLM 的抽样一致率"""
+        sources = {
+            source: {
+                'count': data['count'],
+                'avg_latency_ms': round(data['latency_ms'] / data['count'], 3) if data['count'] else 0.0,
+            }
+            for source, data in self._stats['sources'].items()
+        }
+        total = sum(data['count'] for data in sources.values())
+        local = sum(sources.get(s, {}).get('count', 0) for s in ('cache', 'keyword', 'model'))
+        llm_messages = self._stats['llm_messages']
+        llm_answered = self._stats['llm_answered']
+        return {
+            'total': total,
+            'local_resolution_rate': round(local / total, 4) if total else 0.0,
+            'sources': sources,
+            'llm_batches': self._stats['llm_batches'],
+            'llm_messages': llm_messages,
+            'llm_avg_batch_size': round(llm_messages / self._stats['llm_batches'], 2)
+            if self._stats['llm_batches'] else 0.0,
+            # 含抽样复核请求，作为纯 LLM 路径的耗时基准
+            'llm_avg_latency_ms': round(self._stats['llm_latency_ms'] / llm_answered, 3)
+            if llm_answered else 0.0,
+            'shadow': {
+                source: {
+                    'compared': data['compared'],
+                    'agreement': round(data['agreed'] / data['compared'], 4) if data['compared'] else None,
+                }
+                for source, data in self._stats['shadow'].items()
+            },
+            'model_samples': len(self.model),
+        }
+
+    async def close(self) -> None:
+        """发出待处理的批量请求，等待后台任务并写入剩余标注"""
+        self._flush_pending()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        await self._flush_labels()
+
+    # 本地分级
+
+    def _classify_locally(self, text: str, normalized: str) -> Optional[InteractionClassification]:
+        # 关键词在保留空白标点的原文上匹配，ASCII 关键词才能正确判断词边界
+        scores: Dict[str, float] = defaultdict(float)
+        for item in self._matcher.find(_REPEAT_RE.sub(r'\1\1\1', text), limit=len(self._matcher)):
+            scores[item['meaning']] += item['weight']
+        if scores:
+            ranked = sorted(scores.values(), reverse=True)
+            best_label = max(scores, key=scores.get)
+            top = ranked[0]
+            runner_up = ranked[1] if len(ranked) > 1 else 0.0
+            confidence = min(top, 1.0) * top / (top + runner_up)
+            if confidence >= self.confidence_threshold:
+                return InteractionClassification(best_label, round(confidence, 4), 'keyword')
+
+        if len(self.model) >= self.model_min_samples and self.model.label_count > 1:
+            prediction = self.model.predict(normalized)
+            if prediction and prediction[1] >= self.confidence_threshold:
+                return InteractionClassification(prediction[0], round(prediction[1], 4), 'model')
+        return None
+
+    def _record_llm_latency(self, started: float) -> None:
+        self._stats['llm_answered'] += 1
+        self._stats['llm_latency_ms'] += (time.perf_counter() - started) * 1000
+
+    def _finish(self, result: InteractionClassification, started: float) -> InteractionClassification:
+        data = self._stats['sources'][result.source]
+        data['count'] += 1
+        data['latency_ms'] += (time.perf_counter() - started) * 1000
+        return result
+
+    # LLM 微批量
+
+    def _llm_available(self) -> bool:
+        return bool(self.llm_adapter and self.llm_adapter.has_filter_provider())
+
+    async def _enqueue(self, key: str, text: str) -> Optional[str]:
+        """加入待分类批次并等待结果（失败返回 None）"""
+        entry = self._pending.get(key)
+        if entry is None:
+            loop = asyncio.get_running_loop()
+            entry = (text, loop.create_future())
+            self._pending[key] = entry
+            if len(self._pending) >= self._batch_max_size:
+                self._flush_pending()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self._batch_max_wait, self._flush_pending)
+        return await asyncio.shield(entry[1])
+
+    def _flush_pending(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self._spawn(self._run_batch(batch))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: Dict[str, Tuple[str, asyncio.Future]]) -> None:
+        entries = list(batch.values())
+        labels: Dict[int, str] = {}
+        try:
+            self._stats['llm_batches'] += 1
+            self._stats['llm_messages'] += len(entries)
+            response = await self.llm_adapter.filter_chat_completion(
+                prompt=self._build_prompt([text for text, _ in entries]),
+                temperature=0.1,
+            )
+            labels = self._parse_response(response, len(entries))
+        except Exception as e:
+            logger.error(f"批量交互类型分析失败: {e}，使用规则分析作为备选")
+        for index, (_, future) in enumerate(entries):
+            if not future.done():
+                future.set_result(labels.get(index))
+
+    def _build_prompt(self, texts: List[str]) -> str:
+        message_lines = "\n".join(
+            f"{i}. {text[:_PROMPT_MESSAGE_MAX_CHARS]}" for i, text in enumerate(texts, 1)
+        )
+        label_lines = "\n".join(
+            f"- {label}: {description}"
+            for label, description in _LABEL_DESCRIPTIONS.items() if label in self.labels
+        )
+        return f"""
+请分析以下每条用户消息属于什么类型的交互行为：
+
+{message_lines}
+
+可能的交互类型：
+{label_lines}
+
+请仔细分析消息的情感色彩和意图，特别注意：
+1. "你好美"、"很漂亮"、"真可爱"等是赞美，应归类为compliment或flirt
+2. 只有明确包含侮辱、攻击性词汇时才是insult
+3. 只有真正的骚扰、威胁性表达才是负面类型
+4. 当不确定时，优先选择积极类型或chat
+
+返回JSON数组，每条消息对应一个元素：
+[
+    {{"index": 消息编号, "type": "类型名称"}}
+]
+
+请只返回JSON数组，不要其他内容。
+"""
+
+    def _parse_response(self, response: Optional[str], size: int) -> Dict[int, str]:
+        if not response:
+            return {}
+        from ...utils.guardrails_manager import get_guardrails_manager
+        parsed = get_guardrails_manager().validate_and_clean_json(response, expected_type="array")
+        if not isinstance(parsed, list):
+            logger.warning("批量交互类型分析LLM返回格式不正确，使用规则分析作为备选")
+            return {}
+        labels: Dict[int, str] = {}
+        for item in parsed:
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(item.get('index', 0)) - 1
+            except (TypeError, ValueError):
+                continue
+            label = str(item.get('type') or '').strip().lower()
+            if 0 <= index < size and label in self.labels:
+                labels[index] = label
+        return labels
+
+    async def _shadow_check(self, key: str, normalized: str, text: str,
+                            local: InteractionClassification) -> None:
+        """后台用 LLM 复核抽样的本地结果，统计一致率"""
+        started = time.perf_counter()
+        label = await self._enqueue(key, text)
+        if not label:
+            return
+        self._record_llm_latency(started)
+        data = self._stats['shadow'][local.source]
+        data['compared'] += 1
+        if label == local.interaction_type:
+            data['agreed'] += 1
+        else:
+            # 以 LLM 结果为准
+            self._cache[key] = (label, 1.0)
+        self._learn(key, normalized, label)
+
+    # 标注学习与持久化
+
+    def _learn(self, key: str, normalized: str, label: str) -> None:
+        if key not in self._trained_hashes:
+            self._trained_hashes[key] = True
+            self.model.add(normalized, label)
+        self._pending_labels.append({
+            'text_hash': key,
+            'normalized_text': normalized,
+            'interaction_type': label,
+            'source': 'llm',
+        })
+        if len(self._pending_labels) >= _LABEL_FLUSH_SIZE:
+            self._spawn(self._flush_labels())
+
+    async def _flush_labels(self) -> None:
+        if not self._pending_labels or not self.label_store \
+                or not hasattr(self.label_store, 'save_interaction_labels'):
+            self._pending_labels = []
+            return
+        labels, self._pending_labels = self._pending_labels, []
+        try:
+            await self.label_store.save_interaction_labels(labels)
+        except Exception as e:
+            logger.warning(f"保存交互标注失败: {e}")
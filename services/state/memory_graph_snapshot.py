@@ -0,0 +1,86 @@
+"""
+记忆图二进制快照 — 用于冷启动时跳过逐行查询数据库
+
+文件格式::
+
+    b"MGS1" | uint32 头部长度 | 头部 JSON | zlib(正文 JSON)
+
+头部只包含群组 ID 与数据库水位（节点/边的行数和最大 last_modified），
+读取时无需解压正文即可与数据库当前水位比较；水位一致说明快照写入后
+数据库没有变化，可直接使用快照内容恢复图。正文按行存储::
+
+    {"n": [[concept, memory_items, weight, created_time, last_modified], ...],
+     "e": [[concept1, concept2, strength, created_time, last_modified], ...]}
+
+所有函数均为同步 I/O，调用方应通过 ``asyncio.to_thread`` 在线程中执行。
+"""
+import json
+import os
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+_MAGIC = b"MGS1"
+_HEADER_LEN = struct.Struct("<I")
+
+NodeRow = Tuple[str, str, float, float, float]
+EdgeRow = Tuple[str, str, float, float, float]
+
+
+def write_snapshot(
+    path: str,
+    header: Dict[str, Any],
+    nodes: List[NodeRow],
+    edges: List[EdgeRow],
+) -> int:
+    """原子写入快照（先写临时文件再替换），返回文件字节数"""
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    body = zlib.compress(
+        json.dumps({"n": nodes, "e": edges}, ensure_ascii=False).encode("utf-8"),
+        level=1,
+    )
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(_HEADER_LEN.pack(len(header_bytes)))
+        f.write(header_bytes)
+        f.write(body)
+    os.replace(tmp_path, path)
+    return len(_MAGIC) + _HEADER_LEN.size + len(header_bytes) + len(body)
+
+
+def read_snapshot_header(path: str) -> Optional[Dict[str, Any]]:
+    """读取快照头部；文件不存在或格式不符时返回 None"""
+    try:
+        with open(path, "rb") as f:
+            return _read_header(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_snapshot(
+    path: str,
+) -> Optional[Tuple[Dict[str, Any], List[NodeRow], List[EdgeRow]]]:
+    """读取完整快照 (头部, 节点行, 边行)；损坏时返回 None"""
+    try:
+        with open(path, "rb") as f:
+            header = _read_header(f)
+            if header is None:
+                return None
+            body = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        return header, body.get("n", []), body.get("e", [])
+    except (OSError, ValueError, zlib.error):
+        return None
+
+
+def _read_header(f) -> Optional[Dict[str, Any]]:
+    if f.read(len(_MAGIC)) != _MAGIC:
+        return None
+    raw_len = f.read(_HEADER_LEN.size)
+    if len(raw_len) != _HEADER_LEN.size:
+        return None
+    (length,) = _HEADER_LEN.unpack(raw_len)
+    return json.loads(f.read(length).decode("utf-8"))
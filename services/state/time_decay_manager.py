@@ -32,8 +32,12 @@ class TimeDecayManager:
     为各种学习数据提供统一的时间衰减管理
 
     所有数据库操作通过 SQLAlchemy ORM 执行，不使用原始 SQL。
+    衰减以主键区间分块的集合式 UPDATE / DELETE 完成，不逐行加载到内存。
     """
 
+    # 每个主键区间的行数（每块一次 DELETE + 一次 UPDATE + 一次提交）
+    DECAY_CHUNK_SIZE = 50000
+
     def __init__(self, config: PluginConfig, db_manager: DatabaseManager):
         self.config = config
         self.db_manager = db_manager
@@ -113,47 +117,99 @@ class TimeDecayManager:
 
     # ---- Per-table decay handlers ----
 
-    async def _decay_learning_batches(
-        self, decay_config: DecayConfig, group_id: Optional[str] = None
+    def _decay_value_expr(self, time_column, decay_config: DecayConfig, current_time: float):
+        """
+        calculate_decay_factor 的 SQL 表达式版本
+
+        与 Python 实现逐项一致：未过期为 0，超过衰减周期为 0.01，
+        其间按二次函数插值。仅使用 CASE 与算术运算，SQLite / MySQL 通用。
+        """
+        from sqlalchemy import case, literal
+
+        decay_days = decay_config.decay_days
+        age_days = (literal(current_time) - time_column) / (24 * 3600)
+        return case(
+            (age_days <= 0, literal(0.0)),
+            (age_days >= decay_days, literal(0.01)),
+            else_=literal(0.01 / (decay_days ** 2)) * age_days * age_days,
+        )
+
+    async def _decay_in_chunks(
+        self,
+        model,
+        value_column,
+        current_value,
+        time_column,
+        decay_config: DecayConfig,
+        filters: List[Any],
     ) -> Tuple[int, int]:
-        """对 learning_batches 表应用衰减"""
-        from sqlalchemy import select, delete
-        from ...models.orm.learning import LearningBatch
+        """
+        按主键区间分块执行集合式衰减
+
+        每个区间先用一条 DELETE 清除衰减后低于阈值的行，再用一条 UPDATE
+        写回 ``current_value - decay``；每块单独提交，避免长事务和大锁。
+        行数据不进入 Python，内存占用与表大小无关。
+        """
+        from sqlalchemy import select, update, delete, func
 
         current_time = time.time()
+        decay = self._decay_value_expr(time_column, decay_config, current_time)
+        new_value = current_value - decay
+        chunk_size = max(1, self.DECAY_CHUNK_SIZE)
         updated_count = 0
         deleted_count = 0
 
         async with self.db_manager.get_session() as session:
-            stmt = select(LearningBatch)
-            if group_id:
-                stmt = stmt.where(LearningBatch.group_id == group_id)
-            result = await session.execute(stmt)
-            batches = result.scalars().all()
-
-            ids_to_delete = []
-            for batch in batches:
-                if batch.start_time is None:
-                    continue
-                time_diff_days = (current_time - batch.start_time) / (24 * 3600)
-                decay_value = self.calculate_decay_factor(time_diff_days, decay_config.decay_days)
-
-                current_score = batch.quality_score or 1.0
-                new_score = max(decay_config.decay_min, current_score - decay_value)
-
-                if new_score <= decay_config.decay_min:
-                    ids_to_delete.append(batch.id)
-                    deleted_count += 1
-                else:
-                    batch.quality_score = new_score
-                    updated_count += 1
-
-            if ids_to_delete:
-                await session.execute(
-                    delete(LearningBatch).where(LearningBatch.id.in_(ids_to_delete))
+            bounds = await session.execute(
+                select(func.min(model.id), func.max(model.id)).where(*filters)
+            )
+            min_id, max_id = bounds.one()
+            if min_id is None:
+                return 0, 0
+
+            for start in range(min_id, max_id + 1, chunk_size):
+                in_chunk = [model.id >= start, model.id < start + chunk_size, *filters]
+
+                result = await session.execute(
+                    delete(model)
+                    .where(*in_chunk, new_value <= decay_config.decay_min)
+                    .execution_options(synchronize_session=False)
                 )
+                deleted_count += max(result.rowcount or 0, 0)
+
+                result = await session.execute(
+                    update(model)
+                    .where(*in_chunk)
+                    .values({value_column: new_value})
+                    .execution_options(synchronize_session=False)
+                )
+                updated_count += max(result.rowcount or 0, 0)
+
+                await session.commit()
+
+        return updated_count, deleted_count
+
+    async def _decay_learning_batches(
+        self, decay_config: DecayConfig, group_id: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """对 learning_batches 表应用衰减（集合式 UPDATE / DELETE）"""
+        from sqlalchemy import case, literal, or_
+        from ...models.orm.learning import LearningBatch
+
+        filters = [LearningBatch.start_time.isnot(None)]
+        if group_id:
+            filters.append(LearningBatch.group_id == group_id)
+
+        # 与原逻辑 ``quality_score or 1.0`` 保持一致：NULL 与 0 均按 1.0 处理
+        current_score = case(
+            (or_(LearningBatch.quality_score.is_(None), LearningBatch.quality_score == 0), literal(1.0)),
+            else_=LearningBatch.quality_score,
+        )
 
-            await session.commit()
+        updated_count, deleted_count = await self._decay_in_chunks(
+            LearningBatch, LearningBatch.quality_score, current_score,
+            LearningBatch.start_time, decay_config, filters,
+        )
 
         if updated_count > 0 or deleted_count > 0:
             group_info = f" (群组: {group_id})" if group_id else ""
@@ -164,40 +220,17 @@ class TimeDecayManager:
     async def _decay_expression_patterns(
         self, decay_config: DecayConfig, group_id: Optional[str] = None
     ) -> Tuple[int, int]:
-        """对 expression_patterns 表应用衰减"""
-        from sqlalchemy import select, delete
+        """对 expression_patterns 表应用衰减（集合式 UPDATE / DELETE）"""
         from ...models.orm.expression import ExpressionPattern
 
-        current_time = time.time()
-        updated_count = 0
-        deleted_count = 0
-
-        async with self.db_manager.get_session() as session:
-            stmt = select(ExpressionPattern)
-            if group_id:
-                stmt = stmt.where(ExpressionPattern.group_id == group_id)
-            result = await session.execute(stmt)
-            patterns = result.scalars().all()
-
-            ids_to_delete = []
-            for pattern in patterns:
-                time_diff_days = (current_time - pattern.last_active_time) / (24 * 3600)
-                decay_value = self.calculate_decay_factor(time_diff_days, decay_config.decay_days)
-                new_weight = max(decay_config.decay_min, pattern.weight - decay_value)
-
-                if new_weight <= decay_config.decay_min:
-                    ids_to_delete.append(pattern.id)
-                    deleted_count += 1
-                else:
-                    pattern.weight = new_weight
-                    updated_count += 1
-
-            if ids_to_delete:
-                await session.execute(
-                    delete(ExpressionPattern).where(ExpressionPattern.id.in_(ids_to_delete))
-                )
+        filters = []
+        if group_id:
+            filters.append(ExpressionPattern.group_id == group_id)
 
-            await session.commit()
+        updated_count, deleted_count = await self._decay_in_chunks(
+            ExpressionPattern, ExpressionPattern.weight, ExpressionPattern.weight,
+            ExpressionPattern.last_active_time, decay_config, filters,
+        )
 
         if updated_count > 0 or deleted_count > 0:
             group_info = f" (群组: {group_id})" if group_id else ""
@@ -0,0 +1,158 @@
+"""
+Unit tests for set-based affection redistribution
+
+Covers:
+- the one-pass plan matches the previous per-user loop
+- redistribution writes all users in one bulk call
+- AffectionRepository.bulk_set_levels upserts a whole group in SQLite
+- the optional in-memory ledger defers writes until flushed
+"""
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.core.database.engine import DatabaseEngine
+from self_learning_EterU.repositories.affection_repository import AffectionRepository
+from self_learning_EterU.services.state.affection_manager import (
+    AffectionManager,
+    InteractionType,
+)
+
+
+def _legacy_redistribution(levels, target, amount, decay):
+    """Previous implementation: per-user loop with one write per user."""
+    total_to_decrease = amount
+    other_users = [
+        {'user_id': u, 'affection_level': level} for u, level in levels.items() if u != target
+    ]
+    other_users.sort(key=lambda x: x['affection_level'], reverse=True)
+    result = {}
+    for user in other_users:
+        if total_to_decrease <= 0:
+            break
+        current_level = user['affection_level']
+        if current_level <= 0:
+            continue
+        decrease_ratio = min(1.0, total_to_decrease / sum(u['affection_level'] for u in other_users))
+        decrease_amount = max(1, int(current_level * decrease_ratio * decay))
+        decrease_amount = min(decrease_amount, current_level, total_to_decrease)
+        result[user['user_id']] = current_level - decrease_amount
+        total_to_decrease -= decrease_amount
+    return result
+
+
+class _AffectionStore:
+    """In-memory stand-in for the affection part of the database manager."""
+
+    def __init__(self, levels):
+        self.levels = dict(levels)
+        self.single_writes = 0
+        self.bulk_writes = []
+
+    async def get_user_affection(self, group_id, user_id):
+        if user_id not in self.levels:
+            return None
+        return {'user_id': user_id, 'affection_level': self.levels[user_id]}
+
+    async def get_all_user_affections(self, group_id):
+        return [
+            {'group_id': group_id, 'user_id': u, 'affection_level': level, 'updated_at': 0}
+            for u, level in self.levels.items()
+        ]
+
+    async def get_total_affection(self, group_id):
+        return sum(self.levels.values())
+
+    async def update_user_affection(self, group_id, user_id, new_level, reason="", mood=""):
+        self.single_writes += 1
+        self.levels[user_id] = new_level
+        return True
+
+    async def bulk_set_user_affections(self, group_id, levels):
+        self.bulk_writes.append(dict(levels))
+        self.levels.update(levels)
+        return True
+
+    async def get_current_bot_mood(self, group_id):
+        return None
+
+
+def _manager(store, **overrides):
+    config = PluginConfig(
+        interaction_classifier_enabled=False,
+        enable_daily_mood=False,
+        enable_startup_random_mood=False,
+        **overrides,
+    )
+    return AffectionManager(config, store)
+
+
+@pytest.mark.unit
+class TestRedistributionPlan:
+
+    def test_matches_previous_algorithm(self):
+        rng = random.Random(7)
+        manager = _manager(_AffectionStore({}))
+        for _ in range(50):
+            levels = {f"u{i}": rng.randint(0, 100) for i in range(rng.randint(1, 40))}
+            amount = rng.randint(1, 30)
+            assert manager._plan_affection_redistribution(levels, "u0", amount) == \
+                _legacy_redistribution(levels, "u0", amount, manager.config.affection_decay_rate)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestBulkRedistribution:
+
+    async def test_redistribution_is_one_bulk_write(self):
+        store = _AffectionStore({f"u{i}": 50 for i in range(200)})
+        manager = _manager(store)
+
+        await manager._redistribute_affection("g1", "u0", 20)
+
+        assert store.single_writes == 0
+        assert len(store.bulk_writes) == 1
+        assert sum(50 - level for level in store.bulk_writes[0].values()) == 20
+        assert "u0" not in store.bulk_writes[0]
+
+    async def test_repository_bulk_set_levels(self, tmp_path):
+        engine = DatabaseEngine(f"sqlite:///{(tmp_path / 'affection.db').as_posix()}")
+        try:
+            await engine.create_tables()
+            async with engine.get_session() as session:
+                repo = AffectionRepository(session)
+                await repo.update_level("g1", "a", 40)
+                assert await repo.bulk_set_levels("g1", {"a": 10, "b": 150, "c": -5})
+
+            async with engine.get_session() as session:
+                repo = AffectionRepository(session)
+                levels = {a.user_id: a.affection_level for a in await repo.find_many(group_id="g1")}
+            assert levels == {"a": 10, "b": 100, "c": 0}
+        finally:
+            await engine.close()
+
+    async def test_ledger_defers_writes_until_flush(self):
+        store = _AffectionStore({"a": 100, "b": 100, "c": 50})
+        manager = _manager(store, affection_ledger_enabled=True, max_total_affection=250)
+
+        result = await manager.update_affection("g1", "c", InteractionType.THANKS)
+
+        assert result['success'] is True
+        assert store.single_writes == 0
+        assert store.bulk_writes == []
+        ledger = manager.user_affections["g1"]
+        assert ledger["c"].affection_level == result['new_level']
+        assert sum(e.affection_level for e in ledger.values()) <= 250
+
+        assert await manager._flush_affection_ledger() == 3
+        assert len(store.bulk_writes) == 1
+        assert store.levels["c"] == result['new_level']
+        assert await manager._flush_affection_ledger() == 0
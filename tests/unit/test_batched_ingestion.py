@@ -0,0 +1,262 @@
+"""
+Unit tests for batched knowledge/memory ingestion
+
+Covers:
+- token estimation for CJK and latin text
+- conversation windows respect the token budget and keep message order
+- oversize single messages form their own window
+- the V2 flush hands the whole buffer to batch-capable engines once
+- per-message fallback for engines without a batch API
+- flush statistics (extraction passes saved, timing)
+- LightRAG/mem0 batch inserts retry in halves and report what was ingested
+- memories from a partly failed mem0 add are removed before the retry
+"""
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.core.interfaces import MessageData
+from self_learning_EterU.services.core_learning.v2_learning_integration import (
+    V2LearningIntegration,
+)
+from self_learning_EterU.services.integration.conversation_packer import (
+    estimate_tokens,
+    format_message_line,
+    group_conversation_windows,
+    pack_conversation_windows,
+)
+from self_learning_EterU.services.integration.lightrag_knowledge_manager import (
+    LightRAGKnowledgeManager,
+)
+from self_learning_EterU.services.integration.mem0_memory_manager import (
+    Mem0MemoryManager,
+)
+
+
+def _message(text, sender="Alice"):
+    return MessageData(
+        sender_id="u1",
+        sender_name=sender,
+        message=text,
+        group_id="g1",
+        timestamp=time.time(),
+        platform="test",
+    )
+
+
+class _MinimalIntegration(V2LearningIntegration):
+    def _create_social_analyzer(self):
+        return None
+
+    def _create_jargon_filter(self):
+        return None
+
+
+def _integration():
+    return _MinimalIntegration(
+        config=PluginConfig(knowledge_engine="legacy", memory_engine="legacy"),
+        llm_adapter=None,
+        db_manager=None,
+        context=None,
+    )
+
+
+class _BatchKnowledge:
+    def __init__(self):
+        self.calls = []
+
+    async def process_messages_batch(self, messages, group_id):
+        self.calls.append((list(messages), group_id))
+        return {"messages": len(messages), "documents": 2}
+
+
+class _BatchMemory:
+    def __init__(self):
+        self.calls = []
+
+    async def add_memories_batch(self, messages, group_id):
+        self.calls.append((list(messages), group_id))
+        return {"messages": len(messages), "documents": 1}
+
+
+class _PerMessageMemory:
+    def __init__(self):
+        self.calls = 0
+
+    async def add_memory_from_message(self, message, group_id):
+        self.calls += 1
+
+
+@pytest.mark.unit
+class TestConversationPacker:
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("你好世界") == 4
+        assert estimate_tokens("abcdefgh") == 2
+
+    def test_format_message_line(self):
+        assert format_message_line(_message("hello"), min_length=1) == "[Alice]: hello"
+        assert format_message_line(_message("hi"), min_length=10) == ""
+
+    def test_windows_respect_budget_and_order(self):
+        lines = [f"[u]: message number {i} " + "x" * 40 for i in range(50)]
+        windows = group_conversation_windows(lines, max_tokens=100)
+
+        assert len(windows) > 1
+        assert [line for window in windows for line in window] == lines
+        for window in windows:
+            assert sum(estimate_tokens(line) + 1 for line in window) <= 100
+
+    def test_oversize_line_gets_own_window(self):
+        big = "y" * 2000
+        docs = pack_conversation_windows(["a", big, "b"], max_tokens=50)
+
+        assert docs == ["a", big, "b"]
+
+    def test_empty_lines_skipped(self):
+        assert pack_conversation_windows(["", "a", "", "b"], max_tokens=50) == ["a\nb"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestFlushIngestionBuffer:
+
+    async def test_batch_engines_called_once(self):
+        integration = _integration()
+        knowledge, memory = _BatchKnowledge(), _BatchMemory()
+        integration._knowledge_manager = knowledge
+        integration._memory_manager = memory
+        messages = [_message(f"message {i} with enough text") for i in range(20)]
+        integration._ingestion_buffer["g1"].extend(messages)
+
+        await integration._flush_ingestion_buffer("g1")
+
+        assert len(knowledge.calls) == 1
+        assert len(memory.calls) == 1
+        assert knowledge.calls[0] == (messages, "g1")
+        assert "g1" not in integration._ingestion_buffer
+
+        stats = integration.get_ingestion_stats()
+        assert stats["flushes"] == 1
+        assert stats["messages"] == 20
+        assert stats["extraction_passes"] == 3
+        assert stats["saved_passes"] == 40 - 3
+        assert stats["avg_flush_ms"] >= 0.0
+
+    async def test_per_message_fallback(self):
+        integration = _integration()
+        memory = _PerMessageMemory()
+        integration._knowledge_manager = None
+        integration._memory_manager = memory
+        integration._ingestion_buffer["g1"].extend(
+            _message(f"message {i}") for i in range(5)
+        )
+
+        await integration._flush_ingestion_buffer("g1")
+
+        assert memory.calls == 5
+        stats = integration.get_ingestion_stats()
+        assert stats["extraction_passes"] == 5
+        assert stats["saved_passes"] == 0
+
+    async def test_empty_buffer_is_noop(self):
+        integration = _integration()
+        await integration._flush_ingestion_buffer("g1")
+        assert integration.get_ingestion_stats()["flushes"] == 0
+
+
+class _FlakyRAG:
+    """Fails any insert containing the word ``poison``."""
+
+    def __init__(self):
+        self.stored = []
+
+    async def ainsert(self, documents):
+        if any("poison" in doc for doc in documents):
+            raise RuntimeError("extraction failed")
+        self.stored.extend(documents)
+
+
+class _RAGPool:
+    def __init__(self, rag):
+        self.rag = rag
+
+    @asynccontextmanager
+    async def lease(self, group_id):
+        yield self.rag
+
+
+class _FlakyMemory:
+    """Writes memories one by one and fails mid-call on a poison message."""
+
+    def __init__(self):
+        self.memories = {}
+        self._next_id = 0
+
+    @property
+    def stored(self):
+        return [entry["memory"] for entry in self.memories.values()]
+
+    def add(self, conversation, metadata=None, **kwargs):
+        for turn in conversation:
+            if "poison" in turn["content"]:
+                raise RuntimeError("extraction failed")
+            self._next_id += 1
+            self.memories[str(self._next_id)] = {
+                "id": str(self._next_id),
+                "memory": turn["content"],
+                "metadata": dict(metadata or {}),
+            }
+
+    def get_all(self, agent_id=None, **kwargs):
+        return {"results": list(self.memories.values())}
+
+    def delete(self, memory_id):
+        del self.memories[memory_id]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestBatchInsertFallback:
+
+    async def test_lightrag_retries_in_halves(self):
+        manager = object.__new__(LightRAGKnowledgeManager)
+        rag = _FlakyRAG()
+        manager._pool = _RAGPool(rag)
+        manager._processed_counts = {}
+        messages = [_message(f"message number {i} " + "x" * 600) for i in range(6)]
+        messages[3] = _message("this one is poison " + "x" * 600)
+
+        result = await manager.process_messages_batch(messages, "g1")
+
+        assert result["messages"] == 5
+        assert result["failed"] == 1
+        assert manager._processed_counts["g1"] == 5
+        stored = "\n".join(rag.stored)
+        assert "poison" not in stored
+        assert all(f"message number {i} " in stored for i in (0, 1, 2, 4, 5))
+
+    async def test_mem0_retries_window_in_halves(self):
+        manager = object.__new__(Mem0MemoryManager)
+        memory = _FlakyMemory()
+        manager._memory = memory
+        messages = [_message(f"message {i}") for i in range(8)]
+        messages[5] = _message("poison pill")
+
+        result = await manager.add_memories_batch(messages, "g1")
+
+        assert result["messages"] == 7
+        assert result["failed"] == 1
+        # Memories written before a call failed are removed before the retry.
+        assert len(memory.stored) == len(set(memory.stored)) == 7
+        assert not any("poison" in line for line in memory.stored)
@@ -8,10 +8,12 @@ Tests the unified cache management system:
 - Cache stats reporting
 - Global singleton management
 - Unknown cache name handling
+- Built-in TTL/LRU fallback used when cachetools is not installed
 """
 import pytest
 from unittest.mock import patch
 
+import utils.cache_manager as cache_module
 from utils.cache_manager import CacheManager, get_cache_manager, cached, async_cached
 
 
@@ -249,3 +251,54 @@ class TestGlobalCacheManager:
         mgr2 = get_cache_manager()
 
         assert mgr1 is mgr2
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+@pytest.mark.skipif(cache_module._HAS_CACHETOOLS, reason="cachetools installed")
+class TestFallbackCache:
+    """Test the built-in cache used when cachetools is missing."""
+
+    def test_ttl_entries_expire(self):
+        """Test entries expire after the TTL, in write order."""
+        clock = [100.0]
+        with patch.object(cache_module.time, "monotonic", lambda: clock[0]):
+            cache = cache_module.TTLCache(maxsize=10, ttl=5)
+            cache["a"] = 1
+            clock[0] = 103.0
+            cache["b"] = 2
+            assert cache["a"] == 1
+
+            clock[0] = 105.0
+            assert "a" not in cache
+            assert cache["b"] == 2
+            assert len(cache) == 1
+
+            # Rewriting a key restarts its TTL.
+            cache["b"] = 3
+            clock[0] = 109.0
+            assert cache["b"] == 3
+
+    def test_lru_eviction_respects_reads(self):
+        """Test the least recently used entry is evicted at maxsize."""
+        cache = cache_module.TTLCache(maxsize=2, ttl=60)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache["a"] == 1
+        cache["c"] = 3
+
+        assert set(cache) == {"a", "c"}
+        del cache["a"]
+        assert len(cache._expiry) == 1
+
+    def test_expiry_does_not_scan_live_entries(self):
+        """Test a write only inspects the oldest entry when nothing expired."""
+        cache = cache_module.TTLCache(maxsize=1000, ttl=60)
+        for i in range(1000):
+            cache[i] = i
+
+        with patch.object(cache_module, "next", create=True, wraps=next) as peek:
+            cache["new"] = 1
+
+        assert peek.call_count == 1
+        assert len(cache) == 1000 and 0 not in cache
@@ -0,0 +1,194 @@
+"""
+Unit tests for FrameworkEmbeddingAdapter caching
+
+Covers:
+- in-memory tier is an LRU (recently used entries survive eviction)
+- persistent disk tier survives a new adapter instance (restart)
+- disk entries are scoped by model name and dimensions
+- batch calls only send texts missing from both tiers to the provider
+- EmbeddingDiskStore prunes least recently used rows beyond its bound
+- lookups skip the worker thread while the disk store is known to be empty
+- concurrent single-text requests are coalesced into batched calls,
+  capped by batch_max_size, with errors fanned out to every caller
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.services.embedding import embedding_store, framework_adapter
+from self_learning_EterU.services.embedding.base import EmbeddingProviderError
+from self_learning_EterU.services.embedding.embedding_store import EmbeddingDiskStore
+from self_learning_EterU.services.embedding.framework_adapter import (
+    FrameworkEmbeddingAdapter,
+)
+
+
+class _CountingProvider:
+    """Framework provider stand-in that records every text it embeds."""
+
+    def __init__(self, model="fake-model", dim=3, fail=False):
+        self.model = model
+        self.dim = dim
+        self.fail = fail
+        self.calls = []
+        self.batches = []
+
+    async def get_embeddings(self, texts):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("provider down")
+        self.calls.extend(texts)
+        return [[float(len(t)), 0.5, float(i)][:self.dim] for i, t in enumerate(texts)]
+
+    def get_model(self):
+        return self.model
+
+    def get_dim(self):
+        return self.dim
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_memory_tier_is_lru(monkeypatch):
+    monkeypatch.setattr(framework_adapter, "_MAX_CACHE_SIZE", 2)
+    provider = _CountingProvider()
+    adapter = FrameworkEmbeddingAdapter(provider)
+
+    await adapter.get_embedding("a")
+    await adapter.get_embedding("b")
+    await adapter.get_embedding("a")  # refresh "a"
+    await adapter.get_embedding("c")  # evicts "b", the least recently used
+    await adapter.get_embedding("a")
+    await adapter.get_embedding("b")
+
+    assert provider.calls == ["a", "b", "c", "b"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart_and_is_model_scoped(tmp_path):
+    path = str(tmp_path / "embedding_cache.db")
+    provider = _CountingProvider()
+    adapter = FrameworkEmbeddingAdapter(provider, EmbeddingDiskStore(path))
+    vec = await adapter.get_embedding("你好世界")
+    await adapter.close()
+
+    restarted = _CountingProvider()
+    adapter = FrameworkEmbeddingAdapter(restarted, EmbeddingDiskStore(path))
+    assert await adapter.get_embedding("你好世界") == pytest.approx(vec)
+    assert restarted.calls == []
+    await adapter.close()
+
+    other_model = _CountingProvider(model="other-model")
+    adapter = FrameworkEmbeddingAdapter(other_model, EmbeddingDiskStore(path))
+    await adapter.get_embedding("你好世界")
+    assert other_model.calls == ["你好世界"]
+    await adapter.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_batch_only_fetches_texts_missing_from_both_tiers(tmp_path):
+    path = str(tmp_path / "embedding_cache.db")
+    adapter = FrameworkEmbeddingAdapter(_CountingProvider(), EmbeddingDiskStore(path))
+    await adapter.get_embeddings(["one", "two"])
+    await adapter.close()
+
+    provider = _CountingProvider()
+    adapter = FrameworkEmbeddingAdapter(provider, EmbeddingDiskStore(path))
+    await adapter.get_embedding("three")
+    vecs = await adapter.get_embeddings(["one", "three", "four", "two"])
+
+    assert provider.calls == ["three", "four"]
+    assert vecs[0][0] == 3.0 and vecs[3][0] == 3.0
+    assert vecs[2][0] == 4.0
+    await adapter.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_disk_store_prunes_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_store, "_PRUNE_CHECK_INTERVAL", 1)
+    store = EmbeddingDiskStore(str(tmp_path / "cache.db"), max_entries=10)
+    for i in range(10):
+        await store.put_many("m", 2, {f"t{i}": [float(i), 1.0]})
+    store._conn.execute("UPDATE embedding_cache SET last_used = 0")
+    # Touch t0 so it is the most recently used of the originals.
+    await store.get_many("m", 2, ["t0"])
+
+    await store.put_many("m", 2, {"new": [9.0, 9.0]})
+
+    remaining = await store.get_many("m", 2, [f"t{i}" for i in range(10)] + ["new"])
+    assert len(remaining) == 9
+    assert "t0" in remaining and "new" in remaining
+    await store.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_empty_disk_store_skips_worker_thread(tmp_path, monkeypatch):
+    path = str(tmp_path / "fresh.db")
+    store = EmbeddingDiskStore(path)
+    thread_calls = []
+    real_to_thread = asyncio.to_thread
+
+    async def counting_to_thread(fn, *args, **kwargs):
+        thread_calls.append(fn.__name__)
+        return await real_to_thread(fn, *args, **kwargs)
+
+    monkeypatch.setattr(embedding_store.asyncio, "to_thread", counting_to_thread)
+
+    assert await store.get_many("m", 2, ["a"]) == {}
+    assert thread_calls == []
+
+    await store.put_many("m", 2, {"a": [1.0, 2.0]})
+    assert await store.get_many("m", 2, ["a"]) == {"a": [1.0, 2.0]}
+    # Another store on the same file sees the write too.
+    other = EmbeddingDiskStore(path)
+    assert await other.get_many("m", 2, ["a"]) == {"a": [1.0, 2.0]}
+    await store.close()
+    await other.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_micro_batched():
+    provider = _CountingProvider()
+    adapter = FrameworkEmbeddingAdapter(provider, batch_max_wait_ms=20)
+    texts = ["a", "bb", "ccc", "bb", "dddd"]
+
+    vecs = await asyncio.gather(*(adapter.get_embedding(t) for t in texts))
+
+    assert provider.batches == [["a", "bb", "ccc", "dddd"]]
+    assert [v[0] for v in vecs] == [1.0, 2.0, 3.0, 2.0, 4.0]
+    stats = adapter.get_batch_stats()
+    assert stats["batches"] == 1 and stats["saved_calls"] == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_micro_batch_size_cap_and_error_fan_out():
+    provider = _CountingProvider()
+    adapter = FrameworkEmbeddingAdapter(
+        provider, batch_max_size=2, batch_max_wait_ms=1000
+    )
+    # A full batch is sent immediately instead of waiting for the timer.
+    await asyncio.wait_for(
+        asyncio.gather(*(adapter.get_embedding(t) for t in ["a", "b", "c", "d"])),
+        timeout=0.5,
+    )
+    assert provider.batches == [["a", "b"], ["c", "d"]]
+
+    failing = FrameworkEmbeddingAdapter(_CountingProvider(fail=True))
+    results = await asyncio.gather(
+        failing.get_embedding("x"), failing.get_embedding("y"),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, EmbeddingProviderError) for r in results)
@@ -0,0 +1,194 @@
+"""
+Unit tests for ExemplarLibrary vector storage
+
+Covers the binary embedding format and the memory-mapped index:
+- float32/float16 blob codec round-trip
+- new exemplars are stored as blobs and retrieved by similarity
+- legacy JSON rows are migrated to blobs on first load
+- the on-disk index is reused (memory-mapped) and rebuilt when stale
+- the in-memory group index follows add/delete/eviction without a rebuild
+- IVF retraining triggered by an incremental add runs in a worker thread
+"""
+import json
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.models.orm.exemplar import Exemplar
+from self_learning_EterU.services.database.sqlalchemy_database_manager import (
+    SQLAlchemyDatabaseManager,
+)
+from self_learning_EterU.services.integration.exemplar_library import (
+    ExemplarLibrary,
+)
+from self_learning_EterU.services.integration.vector_index import IVFFlatIndex
+
+_AXES = ("猫", "狗", "鱼", "鸟")
+
+
+class _KeywordEmbedding:
+    """Deterministic 4-dim embedding: one axis per keyword."""
+
+    async def get_embedding(self, text):
+        return [float(text.count(word)) + 0.01 for word in _AXES]
+
+
+@pytest.fixture
+async def db(tmp_path):
+    config = PluginConfig(
+        data_dir=str(tmp_path),
+        db_type="sqlite",
+        enable_web_interface=False,
+    )
+    manager = SQLAlchemyDatabaseManager(config)
+    assert await manager.start() is True
+    try:
+        yield manager
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("dtype,itemsize", [("float32", 4), ("float16", 2)])
+def test_embedding_codec_round_trip(dtype, itemsize):
+    vec = [0.5, -1.25, 3.0, 0.0]
+    blob = ExemplarLibrary._encode_embedding(vec, dtype)
+
+    assert len(blob) == len(vec) * itemsize
+    decoded = ExemplarLibrary._decode_embedding(blob, len(vec))
+    assert np.allclose(decoded, vec)
+    assert ExemplarLibrary._decode_embedding(blob[:-1], len(vec)) is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_blob_storage_and_legacy_json_migration(db):
+    library = ExemplarLibrary(db, _KeywordEmbedding(), embedding_dtype="float16")
+    await library.add_exemplar("我家的猫猫今天又在窗台上晒太阳", "g1")
+
+    async with db.get_session() as session:
+        session.add(Exemplar(
+            content="小狗狗在公园里追着飞盘跑来跑去",
+            group_id="g1",
+            embedding_json=json.dumps([0.01, 2.01, 0.01, 0.01]),
+            dimensions=4,
+            created_at=1,
+            updated_at=1,
+        ))
+        await session.commit()
+
+    results = await library.get_few_shot_examples("狗狗", "g1", k=1)
+    assert results == ["小狗狗在公园里追着飞盘跑来跑去"]
+
+    async with db.get_session() as session:
+        rows = (await session.execute(select(Exemplar))).scalars().all()
+    assert all(r.embedding_blob for r in rows)
+    assert all(r.embedding_json is None for r in rows)
+    assert {len(r.embedding_blob) for r in rows} == {8}
+    assert (await library.get_group_stats("g1"))["with_embeddings"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_memory_mapped_index_reused_and_rebuilt_when_stale(db, tmp_path):
+    index_dir = str(tmp_path / "exemplar_index")
+    writer = ExemplarLibrary(db, _KeywordEmbedding(), index_dir=index_dir)
+    await writer.add_exemplar("我家的猫猫今天又在窗台上晒太阳", "g1")
+    await writer.add_exemplar("鱼缸里的金鱼吐了一串泡泡出来", "g1")
+
+    assert await writer.get_few_shot_examples("鱼", "g1", k=1) == [
+        "鱼缸里的金鱼吐了一串泡泡出来"
+    ]
+    assert len(list(Path(index_dir).glob("*.npy"))) == 1
+
+    # A fresh instance (cold in-memory cache) maps the file instead of
+    # decoding rows from the DB.
+    reader = ExemplarLibrary(db, _KeywordEmbedding(), index_dir=index_dir)
+    ids, contents, vectors, _ = await reader._load_index("g1")
+    assert isinstance(vectors, np.memmap)
+    assert len(contents) == len(ids) == 2
+    # The flat index searches the mapped (pre-normalised) matrix in place.
+    assert await reader.get_few_shot_examples("猫", "g1", k=1) == [
+        "我家的猫猫今天又在窗台上晒太阳"
+    ]
+    assert isinstance(reader._vector_cache["g1"].index._vecs, np.memmap)
+    reader._vector_cache["g1"].checked_at = 0
+
+    # A write from another instance changes the signature; the index is rebuilt.
+    await writer.add_exemplar("树上的小鸟叽叽喳喳地唱着歌", "g1")
+    ids, contents, vectors, _ = await reader._load_index("g1")
+    assert not isinstance(vectors, np.memmap)
+    assert len(contents) == 3
+    assert await reader.get_few_shot_examples("鸟", "g1", k=1) == [
+        "树上的小鸟叽叽喳喳地唱着歌"
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_group_index_maintained_incrementally(db):
+    library = ExemplarLibrary(db, _KeywordEmbedding(), max_exemplars_per_group=2)
+    cat_id = await library.add_exemplar("我家的猫猫今天又在窗台上晒太阳", "g1")
+    assert await library.get_few_shot_examples("猫", "g1", k=1) == [
+        "我家的猫猫今天又在窗台上晒太阳"
+    ]
+    entry = library._vector_cache["g1"]
+
+    fish_id = await library.add_exemplar("鱼缸里的金鱼吐了一串泡泡出来", "g1")
+    assert set(entry.contents) == {cat_id, fish_id}
+    assert await library.adjust_weight(cat_id, -0.5)
+    assert entry.weights[cat_id] == 0.5
+
+    # Over capacity: the lowest-weight row (the cat) is evicted in place.
+    bird_id = await library.add_exemplar("树上的小鸟叽叽喳喳地唱着歌", "g1")
+    assert set(entry.contents) == {fish_id, bird_id}
+    assert await library.delete_exemplar(bird_id)
+    assert set(entry.contents) == {fish_id}
+
+    # Our own writes keep the signature current, so revalidation after
+    # the TTL reuses the same entry instead of rebuilding it.
+    entry.checked_at = 0
+    assert await library.get_few_shot_examples("猫", "g1", k=5) == [
+        "鱼缸里的金鱼吐了一串泡泡出来"
+    ]
+    assert library._vector_cache["g1"] is entry
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_incremental_add_retrains_ivf_off_loop(db):
+    library = ExemplarLibrary(db, _KeywordEmbedding(), vector_index="ivf")
+    await library.add_exemplar("我家的猫猫今天又在窗台上晒太阳", "g1")
+    await library.get_few_shot_examples("猫", "g1", k=1)
+    entry = library._vector_cache["g1"]
+    entry.index = IVFFlatIndex(4, train_threshold=2)
+    entry.index.add(list(entry.contents), np.ones((1, 4), dtype=np.float32))
+
+    threads = []
+    compute = entry.index.compute_training
+
+    def recording_compute():
+        threads.append(threading.current_thread())
+        return compute()
+
+    entry.index.compute_training = recording_compute
+    await library.add_exemplar("鱼缸里的金鱼吐了一串泡泡出来", "g1")
+    await library.add_exemplar("树上的小鸟叽叽喳喳地唱着歌", "g1")
+    await library.add_exemplar("小狗在院子里追着自己的尾巴转圈", "g1")
+
+    assert threads and threading.main_thread() not in threads
+    assert entry.index.is_trained
+    assert library._vector_cache["g1"] is entry
+    assert await library.get_few_shot_examples("鸟", "g1", k=1) == [
+        "树上的小鸟叽叽喳喳地唱着歌"
+    ]
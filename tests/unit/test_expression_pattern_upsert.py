@@ -0,0 +1,104 @@
+"""
+Unit tests for the batched expression pattern upsert
+
+Covers:
+- one batch costs one lookup query and one upsert statement
+- inserted / updated counts, weight increments and in-batch repeats
+- legacy rows without pattern_key are reused and backfilled
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, select
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.core.database.engine import DatabaseEngine
+from self_learning_EterU.models.orm.expression import ExpressionPattern
+from self_learning_EterU.repositories.expression_repository import (
+    ExpressionPatternRepository,
+    expression_pattern_key,
+)
+
+
+def _record(situation, expression, active=10.0, persona_id="default", user_id=None):
+    return {
+        'group_id': "g1",
+        'persona_id': persona_id,
+        'user_id': user_id,
+        'situation': situation,
+        'expression': expression,
+        'weight': 1.0,
+        'last_active_time': active,
+        'create_time': active,
+    }
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = DatabaseEngine(f"sqlite:///{(tmp_path / 'patterns.db').as_posix()}")
+    await engine.create_tables()
+    yield engine
+    await engine.close()
+
+
+async def _weights(engine):
+    async with engine.get_session() as session:
+        rows = (await session.execute(select(ExpressionPattern))).scalars().all()
+        return {(p.persona_id, p.expression): (p.weight, p.pattern_key) for p in rows}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestExpressionPatternUpsert:
+
+    async def test_batch_uses_one_lookup_and_one_upsert(self, engine):
+        statements = []
+        event.listen(
+            engine.engine.sync_engine, "before_cursor_execute",
+            lambda conn, cursor, stmt, *args: statements.append(stmt.split()[0].upper()),
+        )
+        records = [_record("打招呼", f"说法{i}") for i in range(20)]
+
+        async with engine.get_session() as session:
+            stats = await ExpressionPatternRepository(session).upsert_learned_patterns(records)
+
+        assert stats == {'inserted': 20, 'updated': 0}
+        assert statements.count("SELECT") == 1
+        assert statements.count("INSERT") == 1
+
+    async def test_repeats_increment_weight(self, engine):
+        async with engine.get_session() as session:
+            repo = ExpressionPatternRepository(session)
+            await repo.upsert_learned_patterns([_record("打招呼", "你好"), _record("打招呼", "你好", 11.0)])
+            stats = await repo.upsert_learned_patterns([
+                _record("打招呼", "你好", 20.0),
+                _record("打招呼", "你好", persona_id="bot-b"),
+            ])
+
+        assert stats == {'inserted': 1, 'updated': 1}
+        weights = await _weights(engine)
+        assert weights[("default", "你好")][0] == 3.0
+        assert weights[("bot-b", "你好")][0] == 1.0
+
+    async def test_legacy_rows_are_reused_and_keyed(self, engine):
+        async with engine.get_session() as session:
+            session.add(ExpressionPattern(
+                group_id="g1", situation="打招呼", expression="你好",
+                weight=2.0, last_active_time=1.0, create_time=1.0,
+            ))
+            await session.commit()
+
+        async with engine.get_session() as session:
+            repo = ExpressionPatternRepository(session)
+            first = await repo.upsert_learned_patterns([_record("打招呼", "你好", 5.0)])
+            second = await repo.upsert_learned_patterns([_record("打招呼", "你好", 6.0)])
+
+        assert first == second == {'inserted': 0, 'updated': 1}
+        weight, key = (await _weights(engine))[("default", "你好")]
+        assert weight == 4.0
+        assert key == expression_pattern_key("g1", "default", None, "打招呼", "你好")
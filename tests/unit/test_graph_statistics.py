@@ -0,0 +1,186 @@
+"""
+Unit tests for cheap graph statistics
+
+Covers:
+- incremental counters match networkx (nodes, edges, components, degrees)
+- rebuild from an adjacency mapping
+- estimators are exact when the graph fits in the sample budget
+- sampled estimates stay close to the exact values on larger graphs
+- MemoryGraph statistics avoid the exact networkx algorithms and reuse
+  the cached estimate until the graph version changes
+- SocialGraphAnalyzer reports sampled clustering / path statistics
+"""
+import random
+import sys
+from pathlib import Path
+
+import networkx as nx
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.services.social.social_graph_analyzer import (
+    SocialGraphAnalyzer,
+)
+from self_learning_EterU.services.social.social_graph_index import SocialGraphIndex
+from self_learning_EterU.services.state.enhanced_memory_graph_manager import (
+    MemoryGraph,
+)
+from self_learning_EterU.utils.graph_statistics import (
+    IncrementalGraphCounters,
+    estimate_graph_statistics,
+)
+
+
+def _adjacency(graph):
+    return {node: set(graph.neighbors(node)) for node in graph.nodes}
+
+
+@pytest.mark.unit
+class TestIncrementalGraphCounters:
+
+    def test_matches_networkx(self):
+        rng = random.Random(7)
+        graph = nx.Graph()
+        counters = IncrementalGraphCounters()
+        for i in range(300):
+            graph.add_node(i)
+            counters.add_node(i)
+        for _ in range(250):
+            u, v = rng.randrange(300), rng.randrange(300)
+            if u != v and not graph.has_edge(u, v):
+                graph.add_edge(u, v)
+                counters.add_edge(u, v)
+
+        stats = counters.snapshot()
+        assert stats["nodes_count"] == graph.number_of_nodes()
+        assert stats["edges_count"] == graph.number_of_edges()
+        assert stats["connected_components"] == nx.number_connected_components(graph)
+        assert stats["density"] == pytest.approx(nx.density(graph))
+        histogram = nx.degree_histogram(graph)
+        assert stats["degree_histogram"] == {
+            degree: count for degree, count in enumerate(histogram) if count
+        }
+        assert stats["max_degree"] == len(histogram) - 1
+
+    def test_rebuild_counts_each_edge_once(self):
+        graph = nx.karate_club_graph()
+        counters = IncrementalGraphCounters()
+        counters.add_node("stale")
+        counters.rebuild(_adjacency(graph))
+
+        stats = counters.snapshot()
+        assert stats["nodes_count"] == 34
+        assert stats["edges_count"] == graph.number_of_edges()
+        assert stats["connected_components"] == 1
+
+
+@pytest.mark.unit
+class TestEstimateGraphStatistics:
+
+    def test_exact_within_sample_budget(self):
+        graph = nx.karate_club_graph()
+        stats = estimate_graph_statistics(_adjacency(graph), sample_size=64)
+
+        assert stats["average_clustering"] == pytest.approx(nx.average_clustering(graph))
+        assert stats["largest_component"] == 34
+        # 34 nodes exceed the 4 BFS sources, so the path length is sampled.
+        assert stats["approximate"] is True
+
+        stats = estimate_graph_statistics(_adjacency(graph), sample_size=34 * 32)
+        assert stats["approximate"] is False
+        assert stats["average_shortest_path"] == pytest.approx(
+            nx.average_shortest_path_length(graph)
+        )
+
+    def test_sampled_estimate_close_to_exact(self):
+        graph = nx.connected_watts_strogatz_graph(800, 8, 0.1, seed=3)
+        stats = estimate_graph_statistics(_adjacency(graph), sample_size=256, seed=1)
+
+        assert stats["approximate"] is True
+        assert stats["average_clustering"] == pytest.approx(
+            nx.average_clustering(graph), rel=0.1
+        )
+        exact_path = nx.average_shortest_path_length(graph)
+        assert stats["average_shortest_path"] == pytest.approx(exact_path, rel=0.1)
+
+    def test_empty_graph(self):
+        stats = estimate_graph_statistics({})
+        assert stats["average_clustering"] == 0.0
+        assert stats["largest_component"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_memory_graph_statistics_are_cached(monkeypatch):
+    def _forbidden(*args, **kwargs):
+        raise AssertionError("exact networkx statistics must not be used")
+
+    monkeypatch.setattr(nx, "average_clustering", _forbidden)
+    monkeypatch.setattr(nx, "average_shortest_path_length", _forbidden)
+
+    calls = []
+
+    def _counting_estimate(adjacency, sample_size=256, seed=None):
+        calls.append(sample_size)
+        return estimate_graph_statistics(adjacency, sample_size, seed)
+
+    monkeypatch.setattr(
+        "self_learning_EterU.services.state.enhanced_memory_graph_manager"
+        ".estimate_graph_statistics",
+        _counting_estimate,
+    )
+
+    graph = MemoryGraph()
+    for concept in ("a", "b", "c"):
+        await graph.add_memory_node(concept, f"memory {concept}")
+    graph.connect_concepts("a", "b")
+    graph.connect_concepts("b", "c")
+    graph.connect_concepts("a", "c")
+    await graph.add_memory_node("d", "memory d")
+
+    stats = graph.get_graph_statistics()
+    assert stats["nodes_count"] == 4
+    assert stats["edges_count"] == 3
+    assert stats["connected_components"] == 2
+    assert stats["average_clustering"] == 0
+    assert calls == []
+
+    stats = await graph.get_graph_statistics_async(sample_size=16)
+    assert stats["average_clustering"] == pytest.approx(0.75)
+    assert stats["estimated_version"] == graph.version
+    await graph.get_graph_statistics_async(sample_size=16)
+    assert calls == [16]
+
+    # Strengthening an edge bumps the version and invalidates the estimate.
+    graph.connect_concepts("a", "b")
+    await graph.get_graph_statistics_async(sample_size=16)
+    assert calls == [16, 16]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_social_graph_statistics_include_estimates(monkeypatch):
+    index = SocialGraphIndex()
+    analyzer = SocialGraphAnalyzer(stats_sample_size=64, graph_index=index)
+    index.finish_load("g1", [
+        ("u1", "u2", "friend", 1.0, 1),
+        ("u2", "u3", "friend", 1.0, 1),
+        ("u3", "u1", "friend", 1.0, 1),
+        ("u4", "u5", "friend", 1.0, 1),
+    ])
+
+    async def _communities(group_id):
+        return [{"u1", "u2", "u3"}, {"u4", "u5"}]
+
+    monkeypatch.setattr(analyzer, "detect_communities", _communities)
+
+    stats = await analyzer.get_graph_statistics("g1")
+    assert stats["node_count"] == 5
+    assert stats["connected_components"] == 2
+    assert stats["average_clustering"] == pytest.approx(0.6)
+    assert stats["average_shortest_path"] == pytest.approx(1.0)
+    assert stats["communities"] == 2
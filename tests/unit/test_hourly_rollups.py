@@ -0,0 +1,262 @@
+"""
+Unit tests for the hourly analytics rollups
+
+Covers:
+- set-based rebuild of per-group hourly buckets from source tables
+- rebuilds are idempotent and LLM usage accumulates per hour
+- a rebuild drops buckets whose source rows are gone but keeps LLM rows
+- trends / analytics trends are served from the rollup table only
+- without rollups, trends fall back to grouping the source tables
+- clearing message data also clears the derived rollups
+- a failed rebuild reports None instead of a bucket count
+- AnalyticsRollupService backfills, advances its watermark and records LLM deltas
+- a failed refresh keeps the watermark so the window is recomputed
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete, event, select
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.core.database.engine import DatabaseEngine
+from self_learning_EterU.models.orm import (
+    BotMessage,
+    FilteredMessage,
+    HourlyGroupRollup,
+    LearningBatch,
+    RawMessage,
+)
+from self_learning_EterU.repositories.analytics_rollup_repository import (
+    HourlyRollupRepository,
+    floor_hour,
+)
+from self_learning_EterU.services.database.facades.admin_facade import AdminFacade
+from self_learning_EterU.services.database.facades.metrics_facade import MetricsFacade
+from self_learning_EterU.services.monitoring.rollup_service import AnalyticsRollupService
+
+HOUR = 3600
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = DatabaseEngine(f"sqlite:///{(tmp_path / 'rollup.db').as_posix()}")
+    await engine.create_tables()
+    yield engine
+    await engine.close()
+
+
+async def _seed(engine, hour):
+    async with engine.get_session() as session:
+        for i, sender in enumerate(["a", "a", "b"]):
+            session.add(RawMessage(
+                sender_id=sender, message="hi", group_id="g1",
+                timestamp=hour + 10 + i, created_at=hour,
+            ))
+        session.add(RawMessage(
+            sender_id="c", message="hi", group_id="g2",
+            timestamp=hour - HOUR + 5, created_at=hour,
+        ))
+        session.add(FilteredMessage(
+            message="hi", sender_id="a", group_id="g1", timestamp=hour + 20, created_at=hour,
+        ))
+        session.add(BotMessage(group_id="g1", message="ok", timestamp=hour + 30, created_at=hour))
+        session.add_all([
+            LearningBatch(batch_name="b1", group_id="g1", start_time=hour + 40.5, success=True),
+            LearningBatch(batch_name="b2", group_id="g1", start_time=hour + 50.5, success=False),
+        ])
+        await session.commit()
+
+
+async def _rollups(engine):
+    async with engine.get_session() as session:
+        rows = (await session.execute(select(HourlyGroupRollup))).scalars().all()
+        return {(r.group_id, r.hour_start): r for r in rows}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestHourlyRollups:
+
+    async def test_rebuild_is_grouped_by_hour_and_idempotent(self, engine):
+        hour = floor_hour(time.time()) - 2 * HOUR
+        await _seed(engine, hour)
+        facade = MetricsFacade(engine, PluginConfig())
+
+        assert await facade.refresh_hourly_rollups(hour - HOUR, hour + HOUR) == 2
+        assert await facade.refresh_hourly_rollups(hour - HOUR, hour + HOUR) == 2
+
+        rollups = await _rollups(engine)
+        assert set(rollups) == {("g1", hour), ("g2", hour - HOUR)}
+        g1 = rollups[("g1", hour)]
+        assert (g1.raw_messages, g1.active_users) == (3, 2)
+        assert (g1.filtered_messages, g1.bot_messages) == (1, 1)
+        assert (g1.learning_batches, g1.learning_successes) == (2, 1)
+        assert await facade.get_latest_rollup_hour() == hour
+
+    async def test_trends_read_only_rollups(self, engine):
+        hour = floor_hour(time.time()) - HOUR
+        await _seed(engine, hour)
+        facade = MetricsFacade(engine, PluginConfig())
+        await facade.refresh_hourly_rollups(hour - HOUR, time.time() + 1)
+        assert await facade.record_llm_usage(3, 900.0, hour + 5)
+        assert await facade.record_llm_usage(1, 100.0, hour + 60)
+
+        statements = []
+        event.listen(
+            engine.engine.sync_engine, "before_cursor_execute",
+            lambda conn, cursor, stmt, *args: statements.append(stmt),
+        )
+        trends = await facade.get_analytics_trends()
+
+        assert statements and all("FROM hourly_group_rollups" in stmt for stmt in statements)
+        assert len(trends["hourly_trends"]) == 24
+        last_hour = trends["hourly_trends"][-2]
+        assert last_hour["raw_messages"] == 3
+        assert last_hour["llm_calls"] == 4
+        assert last_hour["response_time"] == 250
+        assert sum(d["total_messages"] for d in trends["daily_trends"]) == 4
+        assert sum(cell[2] for cell in trends["activity_heatmap"]["data"]) == 4
+
+        daily = (await facade.get_trends_data())["daily_messages"]
+        assert sum(daily.values()) == 4
+
+        only_g2 = await facade.get_analytics_trends("g2")
+        assert sum(h["llm_calls"] for h in only_g2["hourly_trends"]) == 0
+
+
+    async def test_rebuild_clears_stale_buckets_but_keeps_llm_rows(self, engine):
+        hour = floor_hour(time.time()) - 2 * HOUR
+        await _seed(engine, hour)
+        facade = MetricsFacade(engine, PluginConfig())
+        await facade.refresh_hourly_rollups(hour - HOUR, hour + HOUR)
+        assert await facade.record_llm_usage(2, 100.0, hour + 5)
+
+        async with engine.get_session() as session:
+            await session.execute(delete(RawMessage).where(RawMessage.group_id == "g2"))
+            await session.commit()
+        await facade.refresh_hourly_rollups(hour - HOUR, hour + HOUR)
+
+        rollups = await _rollups(engine)
+        assert set(rollups) == {("g1", hour), ("*", hour)}
+        assert rollups[("*", hour)].llm_calls == 2
+
+    @pytest.mark.parametrize("enabled", [True, False])
+    async def test_trends_fall_back_to_source_tables(self, engine, enabled):
+        hour = floor_hour(time.time()) - HOUR
+        await _seed(engine, hour)
+        facade = MetricsFacade(engine, PluginConfig(analytics_rollup_enabled=enabled))
+        if not enabled:
+            # Stale rollups are ignored once the compactor is disabled.
+            await facade.refresh_hourly_rollups(hour - HOUR, hour)
+
+        trends = await facade.get_analytics_trends()
+
+        assert trends["hourly_trends"][-2]["raw_messages"] == 3
+        assert trends["hourly_trends"][-2]["active_users"] == 2
+        assert sum(d["total_messages"] for d in trends["daily_trends"]) == 4
+        assert sum(d["learning_sessions"] for d in trends["daily_trends"]) == 2
+        daily = (await facade.get_trends_data())["daily_messages"]
+        assert sum(daily.values()) == 4
+        only_g2 = await facade.get_analytics_trends("g2")
+        assert sum(h["raw_messages"] for h in only_g2["hourly_trends"]) == 1
+
+
+    async def test_failed_rebuild_returns_none(self, engine, monkeypatch):
+        async def _broken(self, *args, **kwargs):
+            raise RuntimeError("source table unavailable")
+
+        monkeypatch.setattr(HourlyRollupRepository, "_compute_buckets", _broken)
+        hour = floor_hour(time.time()) - HOUR
+        facade = MetricsFacade(engine, PluginConfig())
+
+        assert await facade.refresh_hourly_rollups(hour - HOUR, hour + HOUR) is None
+
+    async def test_clearing_messages_clears_rollups(self, engine):
+        hour = floor_hour(time.time()) - HOUR
+        await _seed(engine, hour)
+        await MetricsFacade(engine, PluginConfig()).refresh_hourly_rollups(
+            hour - HOUR, hour + HOUR
+        )
+
+        result = await AdminFacade(engine, PluginConfig()).clear_messages_data()
+
+        assert result["success"]
+        assert await _rollups(engine) == {}
+
+
+class _RollupStore:
+    def __init__(self, latest=None):
+        self.latest = latest
+        self.refreshed = []
+        self.llm = []
+        self.fail = False
+
+    async def get_latest_rollup_hour(self):
+        return self.latest
+
+    async def refresh_hourly_rollups(self, start_ts, end_ts=None):
+        self.refreshed.append((start_ts, end_ts))
+        return None if self.fail else 1
+
+    async def record_llm_usage(self, calls, response_ms, timestamp=None):
+        self.llm.append((calls, response_ms))
+        return True
+
+
+class _Adapter:
+    def __init__(self):
+        self.calls = 0
+
+    def get_call_statistics(self):
+        return {"overall": {"total_calls": self.calls, "avg_response_time_ms": 100.0}}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAnalyticsRollupService:
+
+    async def test_backfill_then_incremental_windows(self):
+        store, adapter = _RollupStore(), _Adapter()
+        service = AnalyticsRollupService(store, adapter, backfill_days=2)
+        now = 1_000_000.0
+
+        adapter.calls = 5
+        await service.compact(now)
+        adapter.calls = 7
+        await service.compact(now + 300)
+        await service.compact(now + 600)
+
+        assert store.refreshed[0][0] == now - 2 * 86400 - HOUR
+        assert store.refreshed[1][0] == now - HOUR
+        assert store.llm == [(5, 500.0), (2, 200.0)]
+        assert service.get_stats()["runs"] == 3
+
+    async def test_resumes_from_latest_rollup_hour(self):
+        store = _RollupStore(latest=900_000)
+        service = AnalyticsRollupService(store)
+
+        await service.compact(1_000_000.0)
+
+        assert store.refreshed == [(900_000 - HOUR, 1_000_001.0)]
+
+    async def test_failed_refresh_keeps_watermark(self):
+        store = _RollupStore(latest=900_000)
+        service = AnalyticsRollupService(store)
+
+        store.fail = True
+        assert await service.compact(1_000_000.0) == 0
+        assert service.get_stats()["watermark"] == 900_000
+        store.fail = False
+        await service.compact(1_000_300.0)
+
+        assert store.refreshed[1][0] == 900_000 - HOUR
+        stats = service.get_stats()
+        assert stats["watermark"] == 1_000_300.0
+        assert stats["failed_runs"] == 1
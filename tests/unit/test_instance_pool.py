@@ -0,0 +1,99 @@
+"""
+Unit tests for AsyncInstancePool
+
+Covers:
+- LRU eviction unloads the least recently used instance
+- leased instances are never evicted (soft overflow instead)
+- idle instances are unloaded and reloaded lazily on next use
+- concurrent first use of a key loads it once
+- load/eviction statistics
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.services.integration.instance_pool import (
+    AsyncInstancePool,
+)
+
+
+class _Recorder:
+    def __init__(self, load_delay=0.0):
+        self.load_delay = load_delay
+        self.loaded = []
+        self.unloaded = []
+
+    async def load(self, key):
+        await asyncio.sleep(self.load_delay)
+        self.loaded.append(key)
+        return {"key": key}
+
+    async def unload(self, key, instance):
+        assert instance["key"] == key
+        self.unloaded.append(key)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_lru_eviction_and_stats():
+    rec = _Recorder()
+    pool = AsyncInstancePool(rec.load, rec.unload, max_size=2)
+
+    await pool.get("a")
+    await pool.get("b")
+    await pool.get("a")  # "b" is now least recently used
+    await pool.get("c")
+
+    assert rec.unloaded == ["b"]
+    assert list(pool.items) == ["a", "c"]
+    stats = pool.get_stats()
+    assert stats["loaded_instances"] == 2
+    assert stats["loads"] == 3 and stats["hits"] == 1
+    assert stats["evictions"] == 1
+
+    await pool.get("b")  # lazy reload
+    assert rec.loaded == ["a", "b", "c", "b"]
+    await pool.close()
+    assert sorted(rec.unloaded) == ["a", "b", "b", "c"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_leased_instances_are_not_evicted():
+    rec = _Recorder()
+    pool = AsyncInstancePool(rec.load, rec.unload, max_size=1)
+
+    async with pool.lease("a"):
+        await pool.get("b")
+        # "a" is in use, so the pool overflows instead of evicting it.
+        assert "a" in pool and "b" in pool
+        assert rec.unloaded == []
+
+    await pool.get("c")
+    assert rec.unloaded == ["a", "b"]
+    assert list(pool.items) == ["c"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_idle_unload_and_single_concurrent_load():
+    rec = _Recorder(load_delay=0.01)
+    pool = AsyncInstancePool(rec.load, rec.unload, max_size=4, idle_timeout=60)
+
+    results = await asyncio.gather(*(pool.get("a") for _ in range(5)))
+    assert rec.loaded == ["a"]
+    assert all(r is results[0] for r in results)
+
+    await pool.get("b")
+    pool._last_used["a"] = time.monotonic() - 120
+    assert await pool.evict_idle() == 1
+    assert rec.unloaded == ["a"] and "b" in pool
+    assert pool.get_stats()["idle_unloads"] == 1
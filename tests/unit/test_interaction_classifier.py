@@ -0,0 +1,202 @@
+"""
+Unit tests for the tiered interaction classifier used by AffectionManager
+
+Covers:
+- confident keyword matches resolve locally without any LLM call
+- ambiguous concurrent messages share one batched LLM request
+- LLM labels are cached by normalized text, learned and persisted
+- the local model trained from stored labels resolves repeat patterns
+- the trained-sample dedupe set stays within ``cache_size``
+- shadow sampling reports agreement of local tiers with the LLM
+- AffectionManager routes analyze_interaction_type through the cascade
+"""
+import asyncio
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.services.state.affection_manager import (
+    AffectionManager,
+    InteractionType,
+)
+from self_learning_EterU.services.state.interaction_classifier import (
+    InteractionClassifier,
+    NaiveBayesInteractionModel,
+    normalize_interaction_text,
+)
+
+_LABELS = [t.value for t in InteractionType]
+
+
+class _BatchLLM:
+    """Labels every numbered message in the prompt with ``label``."""
+
+    def __init__(self, label="tease"):
+        self.prompts = []
+        self.label = label
+
+    def has_filter_provider(self):
+        return True
+
+    async def filter_chat_completion(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        indices = [int(i) for i in re.findall(r"^(\d+)\. ", prompt, flags=re.M)]
+        return json.dumps([{"index": i, "type": self.label} for i in indices])
+
+
+class _LabelStore:
+    def __init__(self, labels=None):
+        self.labels = list(labels or [])
+        self.saved = []
+
+    async def get_interaction_labels(self, limit=5000):
+        return self.labels[:limit]
+
+    async def save_interaction_labels(self, labels):
+        self.saved.extend(labels)
+        return True
+
+
+def _classifier(llm=None, **kwargs):
+    kwargs.setdefault("batch_max_wait_ms", 20)
+    return InteractionClassifier(_LABELS, llm_adapter=llm, **kwargs)
+
+
+@pytest.mark.unit
+class TestTextNormalization:
+
+    def test_strips_punctuation_and_collapses_repeats(self):
+        assert normalize_interaction_text("Hello， 哈哈哈哈哈哈!!") == "hello哈哈哈"
+        assert normalize_interaction_text("  ") == ""
+
+    def test_naive_bayes_learns_labels(self):
+        model = NaiveBayesInteractionModel()
+        for _ in range(5):
+            model.add("今天吃什么", "chat")
+            model.add("你这个笨蛋", "tease")
+
+        label, probability = model.predict("笨蛋")
+        assert label == "tease"
+        assert probability > 0.5
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestInteractionClassifier:
+
+    async def test_keyword_tier_skips_llm(self):
+        llm = _BatchLLM()
+        classifier = _classifier(llm)
+
+        result = await classifier.classify("谢谢你呀")
+
+        assert result.interaction_type == "thanks"
+        assert result.source == "keyword"
+        assert llm.prompts == []
+
+    async def test_weak_keywords_go_to_llm(self):
+        llm = _BatchLLM(label="chat")
+        classifier = _classifier(llm)
+
+        result = await classifier.classify("好")
+
+        assert result.source == "llm"
+        assert len(llm.prompts) == 1
+
+    async def test_concurrent_ambiguous_messages_share_one_request(self):
+        llm = _BatchLLM()
+        store = _LabelStore()
+        classifier = _classifier(llm, label_store=store)
+        texts = [f"你今天又在摸鱼第{i}次" for i in range(6)]
+
+        results = await asyncio.gather(*(classifier.classify(t) for t in texts))
+
+        assert [r.interaction_type for r in results] == ["tease"] * 6
+        assert len(llm.prompts) == 1
+        assert classifier.get_stats()["llm_avg_batch_size"] == 6
+
+        # Normalized-text cache: punctuation and spacing do not matter.
+        again = await classifier.classify("你今天又在摸鱼 第0次！")
+        assert again.source == "cache"
+        assert len(llm.prompts) == 1
+
+        await classifier.close()
+        assert len(store.saved) == 6
+        assert store.saved[0]["interaction_type"] == "tease"
+
+    async def test_model_trained_from_stored_labels(self):
+        labels = [
+            {"normalized_text": f"你又在摸鱼{i}", "interaction_type": "tease"}
+            for i in range(30)
+        ] + [
+            {"normalized_text": f"今天天气不太行{i}", "interaction_type": "chat"}
+            for i in range(30)
+        ]
+        llm = _BatchLLM(label="chat")
+        classifier = _classifier(llm, label_store=_LabelStore(labels))
+
+        assert await classifier.load_training_labels() == 60
+        result = await classifier.classify("又在摸鱼")
+
+        assert result.interaction_type == "tease"
+        assert result.source == "model"
+        assert llm.prompts == []
+
+    async def test_trained_hash_set_is_bounded_by_cache_size(self):
+        labels = [
+            {"normalized_text": f"你又在摸鱼{i}", "interaction_type": "tease"}
+            for i in range(30)
+        ]
+        classifier = _classifier(None, label_store=_LabelStore(labels), cache_size=10)
+
+        assert await classifier.load_training_labels() == 30
+        assert len(classifier._trained_hashes) == 10
+        # Recently trained texts are still deduplicated.
+        classifier.label_store.labels = labels[20:]
+        assert await classifier.load_training_labels() == 0
+
+    async def test_without_llm_falls_back_to_rules(self):
+        classifier = _classifier(None, fallback=lambda text: "care")
+
+        result = await classifier.classify("嗯")
+
+        assert result.interaction_type == "care"
+        assert result.source == "fallback"
+
+    async def test_shadow_sampling_reports_agreement(self):
+        llm = _BatchLLM(label="thanks")
+        classifier = _classifier(llm, shadow_sample_rate=1.0)
+
+        await classifier.classify("谢谢")
+        await classifier.classify("感谢帮忙")
+        await classifier.close()
+
+        stats = classifier.get_stats()
+        assert stats["shadow"]["keyword"] == {"compared": 2, "agreement": 1.0}
+        assert stats["sources"]["keyword"]["count"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAffectionManagerCascade:
+
+    async def test_analyze_interaction_type_uses_classifier(self):
+        llm = _BatchLLM(label="flirt")
+        manager = AffectionManager(PluginConfig(), _LabelStore(), llm)
+
+        assert await manager.analyze_interaction_type("g1", "u1", "对不起嘛") == InteractionType.APOLOGY
+        assert await manager.analyze_interaction_type("g1", "u1", "今晚月色真美") == InteractionType.FLIRT
+        assert len(llm.prompts) == 1
+
+        stats = manager.get_interaction_classifier_stats()
+        assert stats["enabled"] is True
+        assert stats["total"] == 2
@@ -10,6 +10,11 @@ PARENT = PACKAGE_ROOT.parent
 if str(PARENT) not in sys.path:
     sys.path.insert(0, str(PARENT))
 
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.services.core_learning.v2_learning_integration import (
+    V2LearningIntegration,
+)
+from self_learning_EterU.services.jargon.jargon_matcher import JargonMatcher
 from self_learning_EterU.services.jargon.jargon_query import JargonQueryService
 
 
@@ -100,12 +105,14 @@ async def test_check_and_explain_jargon_includes_global_terms_for_any_group():
     assert "做到极致" in result
     assert db.get_recent_jargon_list.await_args_list[0].kwargs == {
         "chat_id": "group-a",
-        "limit": 100,
+        "limit": 500,
+        "offset": 0,
         "only_confirmed": True,
     }
     assert db.get_recent_jargon_list.await_args_list[1].kwargs == {
         "chat_id": None,
-        "limit": 100,
+        "limit": 500,
+        "offset": 0,
         "only_confirmed": True,
         "global_only": True,
     }
@@ -212,3 +219,108 @@ async def test_check_and_explain_jargon_does_not_starve_global_terms_when_group_
     assert result is not None
     assert "全局暗号" in result
     assert "跨群共享释义" in result
+
+
+@pytest.mark.unit
+def test_jargon_matcher_agrees_with_contains_jargon():
+    rows = [
+        {"content": "abc", "meaning": "缩写"},
+        {"content": "C++", "meaning": "语言"},
+        {"content": "拉满", "meaning": "做到极致"},
+        {"content": "满血", "meaning": "状态全满"},
+        {"content": "YYDS哥", "meaning": "某人"},
+    ]
+    matcher = JargonMatcher(rows)
+    texts = [
+        "xabcx", "ABC 来了", "学C++吧", "学c++吧", "这个方案直接拉满血了",
+        "abc_d", "yyds哥", "YYDS哥来了", "", "无关文本",
+    ]
+    for text in texts:
+        expected = [
+            r for r in rows if JargonQueryService._contains_jargon(text, r["content"])
+        ]
+        assert matcher.find(text, limit=10) == expected, text
+
+
+@pytest.mark.unit
+def test_jargon_matcher_skips_unresolved_rows_and_keeps_list_priority():
+    matcher = JargonMatcher([
+        {"content": "上强度", "meaning": "加大力度"},
+        {"content": "强度", "meaning": "含义待推断"},
+        {"content": "拉满", "meaning": ""},
+        {"content": "上强度", "meaning": "重复项"},
+        {"content": "度", "meaning": "单字"},
+    ])
+
+    assert len(matcher) == 2
+    hits = matcher.find("度一下，上强度")
+    assert [h["meaning"] for h in hits] == ["加大力度", "单字"]
+    assert len(matcher.find("度度度上强度", limit=1)) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_check_and_explain_jargon_covers_full_vocabulary_and_invalidates():
+    group_rows = [
+        {"id": idx, "content": f"本群词{idx:04d}", "meaning": f"释义{idx}"}
+        for idx in range(1200)
+    ]
+
+    async def fake_list(chat_id=None, limit=10, offset=0, only_confirmed=None,
+                        global_only=False):
+        if global_only:
+            return []
+        return group_rows[offset:offset + limit]
+
+    db = SimpleNamespace(get_recent_jargon_list=AsyncMock(side_effect=fake_list))
+    service = JargonQueryService(db)
+
+    result = await service.check_and_explain_jargon("提到了本群词1150", chat_id="group-a")
+    assert result is not None and "释义1150" in result
+    calls_after_build = db.get_recent_jargon_list.await_count
+
+    # Cached automaton: no further DB reads.
+    await service.check_and_explain_jargon("本群词0001", chat_id="group-a")
+    assert db.get_recent_jargon_list.await_count == calls_after_build
+
+    group_rows.append({"id": 9999, "content": "新黑话", "meaning": "刚确认"})
+    service.invalidate_group("group-a")
+    result = await service.check_and_explain_jargon("来个新黑话", chat_id="group-a")
+    assert result is not None and "刚确认" in result
+
+
+class _JargonOnlyIntegration(V2LearningIntegration):
+    def _create_social_analyzer(self):
+        return None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_v2_jargon_batch_invalidates_group_matcher(tmp_path):
+    db = SimpleNamespace(
+        get_recent_jargon_list=AsyncMock(return_value=[]),
+        save_or_update_jargon=AsyncMock(),
+    )
+    llm = SimpleNamespace(generate_response=AsyncMock(return_value="刚确认"))
+    invalidated = []
+    integration = _JargonOnlyIntegration(
+        config=PluginConfig(
+            data_dir=str(tmp_path),
+            knowledge_engine="legacy",
+            memory_engine="legacy",
+        ),
+        llm_adapter=llm,
+        db_manager=db,
+        on_jargon_changed=invalidated.append,
+    )
+    integration._jargon_filter = SimpleNamespace(
+        get_jargon_candidates=lambda group_id, top_k, exclude_terms: [{"term": "新黑话"}],
+        update_from_message=lambda *args, **kwargs: None,
+    )
+    integration._register_trigger_operations()
+
+    jargon_batch, _ = integration._trigger._tier2_ops["jargon"]
+    await jargon_batch("group-a")
+
+    db.save_or_update_jargon.assert_awaited_once()
+    assert invalidated == ["group-a"]
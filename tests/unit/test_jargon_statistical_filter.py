@@ -0,0 +1,222 @@
+"""
+Unit tests for JargonStatisticalFilter
+
+Covers the incrementally maintained document-frequency index and the
+memory-bounded term tables:
+- IDF from the index matches a brute-force scan over all groups
+- reset_group keeps the index in sync
+- candidate extraction touches a constant number of group tables as groups grow
+- exponential decay prunes cold terms
+- idle groups decay lazily on read and in the sweep
+- per-group term budget evicts the coldest terms, sparing newly seen ones
+- snapshot save/restore round-trip
+"""
+import math
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.services.jargon.jargon_statistical_filter import (
+    JargonStatisticalFilter,
+)
+
+
+def _make_filter(**kwargs) -> JargonStatisticalFilter:
+    """Filter with whitespace tokenisation so tests do not depend on jieba."""
+    jfilter = JargonStatisticalFilter(**kwargs)
+    jfilter._tokenize = lambda text: [t for t in text.split() if len(t) >= 2]
+    return jfilter
+
+
+def _feed(jfilter, group_id, text, times=5, sender="u1"):
+    for _ in range(times):
+        jfilter.update_from_message(text, group_id, sender)
+
+
+def _brute_force_idf(jfilter, term):
+    num_groups = max(len(jfilter._groups), 1)
+    containing = sum(1 for t in jfilter._groups.values() if term in t.freq)
+    return round(math.log(num_groups / max(containing, 1)), 4)
+
+
+@pytest.mark.unit
+def test_idf_matches_brute_force_scan():
+    jfilter = _make_filter()
+    _feed(jfilter, "g1", "yyds 绝绝子 普通词")
+    _feed(jfilter, "g2", "普通词 绝绝子")
+    _feed(jfilter, "g3", "普通词 其他词")
+
+    candidates = jfilter.get_jargon_candidates("g1", top_k=10)
+    assert {c["term"] for c in candidates} == {"yyds", "绝绝子", "普通词"}
+    for c in candidates:
+        assert c["idf"] == _brute_force_idf(jfilter, c["term"])
+
+    by_term = {c["term"]: c for c in candidates}
+    assert by_term["yyds"]["idf"] > by_term["绝绝子"]["idf"] > by_term["普通词"]["idf"]
+
+
+@pytest.mark.unit
+def test_reset_group_updates_document_frequency():
+    jfilter = _make_filter()
+    _feed(jfilter, "g1", "yyds 普通词")
+    _feed(jfilter, "g2", "yyds")
+
+    assert jfilter._term_group_count["yyds"] == 2
+    jfilter.reset_group("g2")
+    assert jfilter._term_group_count["yyds"] == 1
+    jfilter.reset_group("g1")
+    assert "yyds" not in jfilter._term_group_count
+    assert "普通词" not in jfilter._term_group_count
+
+    # Re-adding after reset counts the group again.
+    _feed(jfilter, "g1", "yyds", times=1)
+    assert jfilter._term_group_count["yyds"] == 1
+
+
+class _CountingGroups(dict):
+    """Group table mapping that counts how many group tables are touched."""
+
+    touched = 0
+
+    def get(self, key, default=None):
+        self.touched += 1
+        return super().get(key, default)
+
+    def __getitem__(self, key):
+        self.touched += 1
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        self.touched += len(self)
+        return super().__iter__()
+
+    def values(self):
+        self.touched += len(self)
+        return super().values()
+
+    def items(self):
+        self.touched += len(self)
+        return super().items()
+
+
+def _groups_touched_by_extraction(num_groups: int, terms_per_group: int = 200) -> int:
+    jfilter = _make_filter()
+    shared = " ".join(f"shared{i:03d}" for i in range(terms_per_group))
+    for g in range(num_groups):
+        _feed(jfilter, f"g{g}", shared, times=5 if g == 0 else 1)
+
+    jfilter._groups = _CountingGroups(jfilter._groups)
+    candidates = jfilter.get_jargon_candidates("g0", top_k=20)
+    assert len(candidates) == 20
+    return jfilter._groups.touched
+
+
+@pytest.mark.unit
+def test_candidate_extraction_scales_independently_of_group_count():
+    """Candidate extraction for one group must not visit the other groups.
+
+    With the document-frequency index, the per-term IDF lookup is O(1),
+    so the number of group tables touched stays constant as groups grow;
+    a per-term scan over all groups would touch every table per term.
+    """
+    touched = {n: _groups_touched_by_extraction(n) for n in (10, 100, 1000)}
+    assert touched[10] == touched[100] == touched[1000]
+    assert touched[1000] < 10
+
+
+@pytest.mark.unit
+def test_decay_halves_counts_and_prunes_cold_terms():
+    jfilter = _make_filter(decay_half_life_days=1.0)
+    _feed(jfilter, "g1", "hot", times=8)
+    _feed(jfilter, "g1", "cold", times=1)
+    _feed(jfilter, "g2", "cold", times=1)
+
+    table = jfilter._groups["g1"]
+    table.last_decay -= 86400.0
+    jfilter._maybe_decay(table, time.time())
+
+    assert table.freq["hot"] == pytest.approx(4.0, rel=1e-3)
+    assert "cold" not in table.freq
+    assert "cold" not in table.users and "cold" not in table.contexts
+    assert jfilter._term_group_count["cold"] == 1
+    assert jfilter.get_stats()["terms_pruned"] == 1
+
+
+@pytest.mark.unit
+def test_term_budget_evicts_coldest_terms():
+    jfilter = _make_filter(max_terms_per_group=10)
+    _feed(jfilter, "g1", "keep1 keep2", times=5)
+    for i in range(20):
+        _feed(jfilter, "g1", f"once{i:02d}", times=1)
+
+    table = jfilter._groups["g1"]
+    assert len(table.freq) <= 10
+    assert {"keep1", "keep2"} <= set(table.freq)
+    assert jfilter.get_stats()["terms_evicted"] > 0
+    assert set(jfilter._term_group_count) == set(table.freq)
+
+
+@pytest.mark.unit
+def test_idle_groups_decay_on_read_and_sweep():
+    jfilter = _make_filter(decay_half_life_days=1.0)
+    _feed(jfilter, "idle", "hot", times=8)
+    _feed(jfilter, "gone", "cold", times=1)
+    for table in jfilter._groups.values():
+        table.last_decay -= 86400.0
+
+    assert jfilter.get_group_stats("idle")["total_occurrences"] == 4
+
+    for table in jfilter._groups.values():
+        table.last_decay -= 86400.0
+    jfilter._decay_idle_groups(time.time())
+    assert jfilter._groups["idle"].freq["hot"] == pytest.approx(2.0, rel=1e-3)
+    assert "gone" not in jfilter._groups
+    assert "cold" not in jfilter._term_group_count
+
+
+@pytest.mark.unit
+def test_eviction_spares_terms_in_grace_period():
+    jfilter = _make_filter(max_terms_per_group=10)
+    _feed(jfilter, "g1", "old1 old2 old3", times=2)
+    table = jfilter._groups["g1"]
+    for term in ("old1", "old2", "old3"):
+        table.first_seen[term] -= 86400.0
+    for i in range(8):
+        _feed(jfilter, "g1", f"new{i}", times=1)
+
+    assert len(table.freq) <= 10
+    assert {f"new{i}" for i in range(8)} <= set(table.freq)
+    assert not {"old1", "old2", "old3"} <= set(table.freq)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_snapshot_round_trip_restores_candidates(tmp_path):
+    path = str(tmp_path / "jargon_filter_snapshot.json")
+    jfilter = _make_filter(snapshot_path=path)
+    _feed(jfilter, "g1", "yyds 普通词", sender="u1")
+    _feed(jfilter, "g1", "yyds", sender="u2")
+    _feed(jfilter, "g2", "普通词")
+    before = jfilter.get_jargon_candidates("g1")
+
+    await jfilter.start()
+    await jfilter.stop()
+
+    restored = _make_filter(snapshot_path=path)
+    await restored.start()
+    try:
+        after = restored.get_jargon_candidates("g1")
+    finally:
+        await restored.stop()
+
+    assert [(c["term"], c["frequency"], c["idf"], c["unique_users"]) for c in after] == [
+        (c["term"], c["frequency"], c["idf"], c["unique_users"]) for c in before
+    ]
+    assert restored._term_group_count == jfilter._term_group_count
@@ -86,7 +86,12 @@ async def test_progressive_learning_fetches_unprocessed_messages_for_current_gro
 async def test_background_learning_persists_filter_stats_and_persona_review():
     service = ProgressiveLearningService.__new__(ProgressiveLearningService)
     service.batch_size = 10
-    service.config = SimpleNamespace(max_messages_per_batch=200)
+    service.config = SimpleNamespace(
+        max_messages_per_batch=200, multidimensional_batch_scoring_enabled=True,
+    )
+    service.multidimensional_analyzer = SimpleNamespace(
+        analyze_messages_batch=AsyncMock(return_value=[]),
+    )
     service._group_sessions = {}
     service.update_system_prompt_callback = None
     service.ml_analyzer = SimpleNamespace()
@@ -157,6 +162,10 @@ async def test_background_learning_persists_filter_stats_and_persona_review():
     filter_payload = service.message_collector.add_filtered_message.await_args.args[0]
     assert filter_payload["raw_message_id"] == 1
     assert filter_payload["confidence"] == 1.0
+    # The batch is scored by the multidimensional analyzer in one batched call.
+    service.multidimensional_analyzer.analyze_messages_batch.assert_awaited_once()
+    scored = service.multidimensional_analyzer.analyze_messages_batch.await_args.args[0]
+    assert [m["sender_id"] for m in scored] == ["user-a"]
     service.db_manager.add_persona_learning_review.assert_awaited_once()
     review_kwargs = service.db_manager.add_persona_learning_review.await_args.kwargs
     assert review_kwargs["group_id"] == "group-a"
@@ -0,0 +1,246 @@
+"""
+Unit tests for the LLM request scheduler
+
+Covers:
+- queued requests are released interactive > realtime > batch, FIFO within a class
+- per-provider concurrency limit and tokens-per-minute budget
+- circuit breaker fails fast while open and recovers through a half-open probe
+- calls from another thread's event loop are forwarded to the bound loop instead
+  of bypassing the lanes, even when that loop used the scheduler first
+- FrameworkLLMAdapter routes provider calls through the scheduler and reports
+  queue-wait and circuit rejection counts in its call statistics
+"""
+import asyncio
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from astrbot.core.provider.entities import ProviderType
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.core.framework_llm_adapter import FrameworkLLMAdapter
+from self_learning_EterU.core.llm_scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_REALTIME,
+    LLMCircuitOpenError,
+    LLMRequestScheduler,
+    current_llm_priority,
+    llm_priority,
+)
+
+
+async def _echo(value):
+    return value
+
+
+def _chat_provider(provider_id="chat-a"):
+    provider = Mock()
+    provider.meta = Mock(return_value=SimpleNamespace(
+        id=provider_id, model="m", provider_type=ProviderType.CHAT_COMPLETION,
+    ))
+    return provider
+
+
+def _adapter(provider, scheduler, **limits):
+    context = SimpleNamespace(
+        get_all_providers=Mock(return_value=[provider]),
+        get_provider_by_id=Mock(return_value=provider),
+    )
+    config = SimpleNamespace(
+        filter_provider_id=None,
+        refine_provider_id="chat-a",
+        reinforce_provider_id=None,
+        **limits,
+    )
+    adapter = FrameworkLLMAdapter(context, scheduler=scheduler)
+    adapter.initialize_providers(config)
+    return adapter
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestLLMRequestScheduler:
+
+    async def test_queued_requests_released_by_priority(self):
+        scheduler = LLMRequestScheduler(max_concurrency=1)
+        gate = asyncio.Event()
+        order = []
+
+        async def hold():
+            await gate.wait()
+
+        async def submit(label, priority=None):
+            await scheduler.run("p", lambda: _echo(order.append(label)), priority=priority)
+
+        blocker = asyncio.create_task(scheduler.run("p", hold))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(submit("batch-1"))]
+        with llm_priority(PRIORITY_REALTIME):
+            tasks.append(asyncio.create_task(submit("realtime")))
+        tasks.append(asyncio.create_task(submit("batch-2", PRIORITY_BATCH)))
+        with llm_priority(PRIORITY_INTERACTIVE):
+            tasks.append(asyncio.create_task(submit("interactive")))
+        await asyncio.sleep(0)
+
+        gate.set()
+        await asyncio.gather(blocker, *tasks)
+
+        assert order == ["interactive", "realtime", "batch-1", "batch-2"]
+        waits = scheduler.get_stats()["queue_wait"]
+        assert waits["interactive"]["requests"] == 1
+        assert waits["batch"]["requests"] == 3
+
+    async def test_priority_context_keeps_the_higher_class(self):
+        assert current_llm_priority() == PRIORITY_BATCH
+        with llm_priority(PRIORITY_INTERACTIVE):
+            with llm_priority(PRIORITY_BATCH):
+                assert current_llm_priority() == PRIORITY_INTERACTIVE
+        assert current_llm_priority() == PRIORITY_BATCH
+
+    async def test_concurrency_is_limited_per_provider(self):
+        scheduler = LLMRequestScheduler(max_concurrency=2)
+        running = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+
+        async def call(provider_id):
+            running[provider_id] += 1
+            peak[provider_id] = max(peak[provider_id], running[provider_id])
+            await asyncio.sleep(0.01)
+            running[provider_id] -= 1
+
+        await asyncio.gather(*[
+            scheduler.run(pid, lambda pid=pid: call(pid))
+            for pid in ["a"] * 6 + ["b"] * 6
+        ])
+
+        assert peak == {"a": 2, "b": 2}
+
+    async def test_token_budget_delays_requests(self):
+        scheduler = LLMRequestScheduler(tokens_per_minute=6000)
+
+        await scheduler.run("p", lambda: _echo(None), tokens=6000)
+        _, second_wait = await scheduler.run("p", lambda: _echo(None), tokens=10)
+
+        # 预算耗尽后按补充速率（100 token/s）等待，10 token 至少约 100ms
+        assert second_wait >= 50
+
+    async def test_circuit_opens_fails_fast_and_recovers(self):
+        scheduler = LLMRequestScheduler(failure_threshold=2, cooldown=0.05)
+        failing = AsyncMock(side_effect=RuntimeError("503"))
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await scheduler.run("p", failing)
+        with pytest.raises(LLMCircuitOpenError):
+            await scheduler.run("p", failing)
+        assert failing.await_count == 2
+
+        await asyncio.sleep(0.06)
+        result, _ = await scheduler.run("p", lambda: _echo("ok"))
+
+        assert result == "ok"
+        stats = scheduler.get_stats()["providers"]["p"]
+        assert stats["state"] == "closed"
+        assert (stats["rejected"], stats["circuit_opened"]) == (1, 1)
+
+    async def test_failed_half_open_probe_reopens_circuit(self):
+        scheduler = LLMRequestScheduler(failure_threshold=1, cooldown=0.05)
+        failing = AsyncMock(side_effect=RuntimeError("503"))
+
+        with pytest.raises(RuntimeError):
+            await scheduler.run("p", failing)
+        await asyncio.sleep(0.06)
+        with pytest.raises(RuntimeError):
+            await scheduler.run("p", failing)
+        with pytest.raises(LLMCircuitOpenError):
+            await scheduler.run("p", failing)
+
+    async def test_foreign_loop_calls_are_forwarded_to_bound_loop(self):
+        scheduler = LLMRequestScheduler(max_concurrency=1)
+        main_loop = asyncio.get_running_loop()
+        seen_loops = []
+
+        async def call(value):
+            seen_loops.append(asyncio.get_running_loop())
+            return value
+
+        # WebUI 线程的循环先于主循环使用调度器
+        result = {}
+        worker = threading.Thread(target=lambda: result.update(
+            value=asyncio.run(scheduler.run("p", lambda: call("webui")))[0]
+        ))
+        worker.start()
+        await asyncio.to_thread(worker.join)
+        assert result["value"] == "webui"
+
+        scheduler.bind_loop(main_loop)
+        for i in range(3):
+            await scheduler.run("p", lambda i=i: call(i))
+
+        worker = threading.Thread(target=lambda: result.update(
+            value=asyncio.run(scheduler.run("p", lambda: call("webui-2")))[0]
+        ))
+        worker.start()
+        await asyncio.to_thread(worker.join)
+        scheduler.charge_tokens("p", 10)
+
+        assert result["value"] == "webui-2"
+        assert seen_loops[1:] == [main_loop] * 4
+        stats = scheduler.get_stats()
+        assert stats["forwarded"] == 1
+        assert stats["providers"]["p"]["completed"] == 4
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAdapterScheduling:
+
+    async def test_adapter_respects_provider_concurrency(self):
+        provider = _chat_provider()
+        running = peak = 0
+
+        async def text_chat(**kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return SimpleNamespace(completion_text="ok")
+
+        provider.text_chat = text_chat
+        adapter = _adapter(provider, LLMRequestScheduler(), llm_provider_max_concurrency=2)
+
+        results = await asyncio.gather(*[
+            adapter.refine_chat_completion(f"prompt {i}") for i in range(6)
+        ])
+
+        assert results == ["ok"] * 6
+        assert peak == 2
+        stats = adapter.get_call_statistics()
+        assert stats["refine"]["avg_queue_wait_ms"] > 0
+        assert stats["overall"]["avg_queue_wait_ms"] > 0
+        assert adapter.get_scheduler_stats()["providers"]["chat-a"]["completed"] == 6
+
+    async def test_adapter_fails_fast_while_circuit_is_open(self):
+        provider = _chat_provider()
+        provider.text_chat = AsyncMock(side_effect=RuntimeError("503 overloaded"))
+        adapter = _adapter(
+            provider, LLMRequestScheduler(),
+            llm_circuit_failure_threshold=2, llm_circuit_cooldown=60,
+        )
+
+        for _ in range(4):
+            assert await adapter.refine_chat_completion("hello") is None
+
+        assert provider.text_chat.await_count == 2
+        stats = adapter.get_call_statistics()["refine"]
+        assert stats["error_count"] == 4
+        assert stats["circuit_rejections"] == 2
@@ -0,0 +1,235 @@
+"""
+Unit tests for incremental memory graph persistence
+
+Covers:
+- graph mutations mark only the touched nodes/edges dirty
+- save upserts only dirty rows and clears the dirty set
+- re-saving a changed node updates its row instead of inserting a new one
+- unchanged graphs are not written at all
+- failed saves keep the dirty set for the next attempt
+- concepts longer than the column width are stored under a truncated,
+  hash-suffixed key instead of being dropped
+- cold load restores nodes and edges as-is, without LLM merge calls
+- lazy per-group loading on first access
+- binary snapshot is used when the database watermark matches, and
+  ignored once the database has changed
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.models.orm import MemoryGraphEdge, MemoryGraphNode
+from self_learning_EterU.services.database.sqlalchemy_database_manager import (
+    SQLAlchemyDatabaseManager,
+)
+from self_learning_EterU.services.state.enhanced_memory_graph_manager import (
+    EnhancedMemoryGraphManager,
+    MemoryGraph,
+)
+
+
+@pytest.fixture
+async def db(tmp_path):
+    config = PluginConfig(
+        data_dir=str(tmp_path),
+        db_type="sqlite",
+        enable_web_interface=False,
+    )
+    manager = SQLAlchemyDatabaseManager(config)
+    assert await manager.start() is True
+    try:
+        yield manager
+    finally:
+        await manager.stop()
+
+
+def _new_manager(monkeypatch, db, tmp_path, llm_adapter=None):
+    monkeypatch.setattr(EnhancedMemoryGraphManager, "_instance", None)
+    monkeypatch.setattr(EnhancedMemoryGraphManager, "_initialized", False)
+    config = PluginConfig(data_dir=str(tmp_path), enable_memory_cleanup=False)
+    return EnhancedMemoryGraphManager(
+        config=config, db_manager=db, llm_adapter=llm_adapter
+    )
+
+
+@pytest.fixture
+def manager(monkeypatch, db, tmp_path):
+    return _new_manager(monkeypatch, db, tmp_path)
+
+
+class _FailingLLM:
+    async def generate_response(self, *args, **kwargs):
+        raise AssertionError("cold load must not call the LLM")
+
+
+async def _populate(manager, group_id="g1", size=30):
+    graph = manager.get_memory_graph(group_id)
+    for i in range(size):
+        await graph.add_memory_node(f"concept{i}", f"memory {i}")
+    for i in range(size - 1):
+        graph.connect_concepts(f"concept{i}", f"concept{i + 1}")
+    await manager.save_memory_graph(group_id)
+    return graph
+
+
+async def _rows(db, model):
+    async with db.get_session() as session:
+        result = await session.execute(select(model))
+        return list(result.scalars().all())
+
+
+async def _count(db, model):
+    async with db.get_session() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_mutations_mark_dirty():
+    graph = MemoryGraph()
+    assert not graph.has_changes
+
+    await graph.add_memory_node("apple", "likes apples")
+    graph.connect_concepts("banana", "apple")
+
+    nodes, edges = graph.take_dirty()
+    assert nodes == {"apple"}
+    assert edges == {("apple", "banana")}
+    assert not graph.has_changes
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_save_writes_only_dirty_rows(manager, db):
+    graph = manager.get_memory_graph("g1")
+    for i in range(20):
+        await graph.add_memory_node(f"concept{i}", f"memory {i}")
+    for i in range(19):
+        graph.connect_concepts(f"concept{i}", f"concept{i + 1}")
+
+    await manager.save_memory_graph("g1")
+    assert await _count(db, MemoryGraphNode) == 20
+    assert await _count(db, MemoryGraphEdge) == 19
+    assert not graph.has_changes
+
+    # Unchanged graph: nothing written.
+    await manager.save_memory_graph("g1")
+    assert manager.get_save_stats()["saves"] == 1
+
+    # One node and one edge change -> one row each, updated in place.
+    await graph.add_memory_node("concept3", "updated memory")
+    graph.connect_concepts("concept1", "concept0")
+    await manager.save_memory_graph("g1")
+
+    stats = manager.get_save_stats()
+    assert stats["saves"] == 2
+    assert stats["nodes_written"] == 21
+    assert stats["edges_written"] == 20
+    assert await _count(db, MemoryGraphNode) == 20
+    assert await _count(db, MemoryGraphEdge) == 19
+
+    nodes = {row.concept: row for row in await _rows(db, MemoryGraphNode)}
+    assert nodes["concept3"].memory_items == "updated memory"
+    edges = {(e.concept1, e.concept2): e for e in await _rows(db, MemoryGraphEdge)}
+    assert edges[("concept0", "concept1")].strength == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_long_concepts_saved_under_bounded_keys(manager, db):
+    graph = manager.get_memory_graph("g1")
+    long_a = "a" * 300
+    long_b = "a" * 300 + "b"
+    await graph.add_memory_node(long_a, "memory a")
+    await graph.add_memory_node(long_b, "memory b")
+    graph.connect_concepts(long_a, long_b)
+
+    await manager.save_memory_graph("g1")
+
+    nodes = await _rows(db, MemoryGraphNode)
+    assert len(nodes) == 2
+    assert len({row.concept for row in nodes}) == 2
+    assert all(len(row.concept) <= 191 for row in nodes)
+    edges = await _rows(db, MemoryGraphEdge)
+    assert len(edges) == 1
+    assert {edges[0].concept1, edges[0].concept2} == {row.concept for row in nodes}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_save_keeps_dirty(manager, monkeypatch):
+    graph = manager.get_memory_graph("g1")
+    await graph.add_memory_node("apple", "likes apples")
+
+    async def _fail(self, rows, commit=True):
+        return False
+
+    monkeypatch.setattr(
+        "self_learning_EterU.repositories.MemoryGraphNodeRepository.upsert_nodes",
+        _fail,
+    )
+    await manager.save_memory_graph("g1")
+
+    assert graph.has_changes
+    assert manager.get_save_stats()["saves"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cold_load_restores_without_llm(monkeypatch, db, tmp_path):
+    original = await _populate(_new_manager(monkeypatch, db, tmp_path))
+    expected_nodes, expected_edges = original.export_rows()
+
+    fresh = _new_manager(monkeypatch, db, tmp_path, llm_adapter=_FailingLLM())
+    assert "g1" not in fresh.memory_graphs
+
+    graph = await fresh.ensure_memory_graph("g1")
+
+    nodes, edges = graph.export_rows()
+    assert sorted(nodes) == sorted(expected_nodes)
+    assert sorted(edges) == sorted(expected_edges)
+    assert not graph.has_changes
+    # Lazy: other groups stay unloaded.
+    assert list(fresh.memory_graphs) == ["g1"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_snapshot_used_until_database_changes(monkeypatch, db, tmp_path):
+    await _populate(_new_manager(monkeypatch, db, tmp_path))
+
+    # First cold load reads the database and writes the snapshot.
+    first = _new_manager(monkeypatch, db, tmp_path)
+    await first.ensure_memory_graph("g1")
+    snapshot_path = first._snapshot_path("g1")
+    assert Path(snapshot_path).exists()
+
+    # Matching watermark: rows come from the snapshot, not the database.
+    async def _no_db_rows(self, group_id):
+        raise AssertionError("snapshot should have been used")
+
+    monkeypatch.setattr(
+        "self_learning_EterU.repositories.MemoryGraphNodeRepository.get_rows_by_group",
+        _no_db_rows,
+    )
+    second = _new_manager(monkeypatch, db, tmp_path)
+    graph = await second.ensure_memory_graph("g1")
+    assert graph.G.number_of_nodes() == 30
+    monkeypatch.undo()
+
+    # A later save changes the watermark; the stale snapshot is ignored.
+    await graph.add_memory_node("concept_new", "new memory")
+    await second.save_memory_graph("g1")
+
+    third = _new_manager(monkeypatch, db, tmp_path)
+    graph = await third.ensure_memory_graph("g1")
+    assert "concept_new" in graph.G
+    assert graph.G.number_of_nodes() == 31
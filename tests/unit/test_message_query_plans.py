@@ -0,0 +1,158 @@
+"""
+EXPLAIN-based regression tests for the message table indexes
+
+Covers:
+- every hot raw / filtered / bot message query is served by an index
+- group + time ordered queries do not need a temporary sort
+- legacy tables receive the new indexes through auto-migration, and the
+  single-column indexes they make redundant are dropped
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, func, select, text
+from sqlalchemy import inspect as sa_inspect
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.core.database.engine import DatabaseEngine
+from self_learning_EterU.models.orm.message import RawMessage
+from self_learning_EterU.repositories.bot_message_repository import BotMessageRepository
+from self_learning_EterU.repositories.filtered_message_repository import FilteredMessageRepository
+from self_learning_EterU.repositories.raw_message_repository import RawMessageRepository
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = DatabaseEngine(f"sqlite:///{(tmp_path / 'messages.db').as_posix()}")
+    await engine.create_tables()
+    yield engine
+    await engine.close()
+
+
+async def _capture(engine, run):
+    """Run ``run(session)`` and return the SELECT statements it executed."""
+    captured = []
+
+    def _listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    sync_engine = engine.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _listener)
+    try:
+        async with engine.get_session() as session:
+            await run(session)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _listener)
+    assert captured
+    return captured
+
+
+async def _plans(engine, captured):
+    plans = []
+    async with engine.engine.connect() as conn:
+        for statement, parameters in captured:
+            rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append(" | ".join(row[-1] for row in rows.fetchall()))
+    return plans
+
+
+def _assert_indexed(plans, sorted_output=False):
+    for plan in plans:
+        for step in plan.split(" | "):
+            if step.startswith(("SCAN", "SEARCH")) and "_messages" in step:
+                assert "USING" in step, plan
+        if sorted_output:
+            assert "TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestMessageQueryPlans:
+
+    async def test_raw_message_hot_queries_use_indexes(self, engine):
+        async def run(session):
+            repo = RawMessageRepository(session)
+            await repo.get_recent(group_id="g1", limit=200)
+            await repo.get_unprocessed(limit=100, group_id="g1")
+            await repo.get_unprocessed(limit=100)
+            await repo.get_by_timerange("g1", 0, int(time.time()))
+
+        _assert_indexed(await _plans(engine, await _capture(engine, run)), sorted_output=True)
+
+    async def test_raw_message_aggregates_and_duplicate_checks_use_indexes(self, engine):
+        async def run(session):
+            await RawMessageRepository(session).get_sender_statistics("g1")
+            await session.execute(
+                select(RawMessage.message_id).where(RawMessage.message_id.in_(["m1", "m2"]))
+            )
+            await session.execute(
+                select(RawMessage.group_id, RawMessage.sender_id, func.count())
+                .where(RawMessage.group_id.isnot(None))
+                .group_by(RawMessage.group_id, RawMessage.sender_id)
+            )
+
+        plans = await _plans(engine, await _capture(engine, run))
+        _assert_indexed(plans)
+        assert "idx_raw_message_id" in plans[1]
+
+    async def test_filtered_and_bot_message_queries_use_indexes(self, engine):
+        async def run(session):
+            await FilteredMessageRepository(session).get_recent(group_id="g1")
+            await FilteredMessageRepository(session).get_for_learning(limit=200)
+            await BotMessageRepository(session).get_recent_responses("g1")
+
+        _assert_indexed(await _plans(engine, await _capture(engine, run)), sorted_output=True)
+
+    async def test_auto_migration_replaces_legacy_indexes(self, tmp_path):
+        engine = DatabaseEngine(f"sqlite:///{(tmp_path / 'legacy.db').as_posix()}")
+        try:
+            async with engine.engine.begin() as conn:
+                await conn.execute(text(
+                    """
+                    CREATE TABLE raw_messages (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        sender_id VARCHAR(255) NOT NULL,
+                        sender_name VARCHAR(255),
+                        message TEXT NOT NULL,
+                        group_id VARCHAR(255),
+                        timestamp BIGINT NOT NULL,
+                        platform VARCHAR(100),
+                        created_at BIGINT NOT NULL,
+                        processed BOOLEAN
+                    )
+                    """
+                ))
+                for name, column in (
+                    ("idx_raw_group", "group_id"),
+                    ("idx_raw_processed", "processed"),
+                    ("ix_raw_messages_group_id", "group_id"),
+                    ("idx_raw_sender", "sender_id"),
+                ):
+                    await conn.execute(text(f"CREATE INDEX {name} ON raw_messages ({column})"))
+
+            await engine.create_tables(enable_auto_migration=True)
+
+            async with engine.engine.begin() as conn:
+                indexes = await conn.run_sync(
+                    lambda sync_conn: {
+                        index["name"] for index in sa_inspect(sync_conn).get_indexes("raw_messages")
+                    }
+                )
+            assert {
+                "idx_raw_group_timestamp",
+                "idx_raw_group_processed_timestamp",
+                "idx_raw_message_id",
+                "idx_raw_sender",
+            } <= indexes
+            assert not {
+                "idx_raw_group", "idx_raw_processed", "ix_raw_messages_group_id",
+            } & indexes
+        finally:
+            await engine.close()
@@ -0,0 +1,159 @@
+"""
+Unit tests for batched relationship classification in MessageRelationshipAnalyzer
+
+Covers:
+- high-confidence rule matches short-circuit without any LLM call
+- unresolved pairs are classified with one structured request per chunk
+- chunking follows the token budget and respects the concurrency bound
+- invalid or missing LLM items fall back to the rule result
+- disabling batch mode keeps the per-pair path
+"""
+import asyncio
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.services.social.message_relationship_analyzer import (
+    MessageRelationshipAnalyzer,
+)
+
+
+class _BatchLLM:
+    """Answers every numbered pair in the prompt as a topic continuation."""
+
+    def __init__(self, delay=0.0, answer=None):
+        self.prompts = []
+        self.delay = delay
+        self.answer = answer
+        self.active = 0
+        self.max_active = 0
+
+    def has_filter_provider(self):
+        return True
+
+    async def filter_chat_completion(self, prompt, system_prompt=None, **kwargs):
+        self.prompts.append(prompt)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.answer is not None:
+            return self.answer(prompt)
+        indices = [int(i) for i in re.findall(r"第(\d+)组", prompt)]
+        return json.dumps([
+            {"index": i, "relationship_type": "topic_continuation",
+             "confidence": 0.9, "reason": "batch"}
+            for i in indices
+        ])
+
+
+def _analyzer(llm, **overrides):
+    config = PluginConfig(**overrides)
+    return MessageRelationshipAnalyzer(config, context=None, llm_adapter=llm)
+
+
+def _conversation(count, start=1000.0):
+    # Alternating senders, neutral content the rules cannot classify
+    # with high confidence.
+    return [
+        {
+            "message_id": f"m{i}",
+            "sender_id": f"user{i % 2}",
+            "message": f"今天的天气情况记录第{i}条内容比较长一点",
+            "timestamp": start + i * 60,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestBatchedRelationshipAnalysis:
+
+    async def test_unresolved_pairs_share_one_request(self):
+        llm = _BatchLLM()
+        analyzer = _analyzer(llm)
+
+        relationships = await analyzer.analyze_message_relationships(_conversation(20), "g1")
+
+        pair_results = [r for r in relationships if r.analysis_reason == "batch"]
+        assert len(pair_results) == 19
+        assert [r.reply_message_id for r in pair_results] == [f"m{i}" for i in range(1, 20)]
+        assert len(llm.prompts) == 1
+        assert analyzer.batch_stats["llm_pairs"] == 19
+
+        # Second pass is served from the cache.
+        await analyzer.analyze_message_relationships(_conversation(20), "g1")
+        assert len(llm.prompts) == 1
+
+    async def test_high_confidence_rules_short_circuit(self):
+        llm = _BatchLLM()
+        analyzer = _analyzer(llm)
+        messages = [
+            {"message_id": "q", "sender_id": "a", "message": "你们 周末 去 哪里 玩", "timestamp": 1000.0},
+            {"message_id": "r", "sender_id": "b", "message": "好的 周末 去 哪里", "timestamp": 1010.0},
+        ]
+
+        relationships = await analyzer.analyze_message_relationships(messages, "g1")
+
+        assert relationships[0].relationship_type == "direct_reply"
+        assert relationships[0].confidence > 0.8
+        assert llm.prompts == []
+        assert analyzer.batch_stats["rule_resolved"] == 1
+
+    async def test_chunks_by_budget_with_bounded_concurrency(self):
+        llm = _BatchLLM(delay=0.02)
+        analyzer = _analyzer(
+            llm,
+            relationship_batch_token_budget=120,
+            relationship_batch_concurrency=2,
+        )
+
+        relationships = await analyzer.analyze_message_relationships(_conversation(30), "g1")
+
+        assert len(llm.prompts) > 2
+        assert llm.max_active == 2
+        batch_ids = {r.reply_message_id for r in relationships if r.analysis_reason == "batch"}
+        assert batch_ids == {f"m{i}" for i in range(1, 30)}
+
+    async def test_bad_items_fall_back_to_rules(self):
+        def _answer(prompt):
+            return json.dumps([
+                {"index": 1, "relationship_type": "bogus", "confidence": 0.9},
+                {"index": 99, "relationship_type": "direct_reply", "confidence": 0.9},
+            ])
+
+        llm = _BatchLLM(answer=_answer)
+        analyzer = _analyzer(llm)
+        messages = [
+            {"message_id": "a", "sender_id": "u1", "message": "刚才说的那个电影", "timestamp": 1000.0},
+            {"message_id": "b", "sender_id": "u2", "message": "对了还有另外一部电影也很好看", "timestamp": 1010.0},
+        ]
+
+        relationships = await analyzer.analyze_message_relationships(messages, "g1")
+
+        assert len(llm.prompts) == 1
+        assert relationships[0].analysis_reason == "检测到主题连续性"
+
+    async def test_disabled_batch_mode_uses_per_pair_calls(self):
+        def _answer(prompt):
+            return json.dumps({"relationship_type": "unrelated", "confidence": 0.5, "reason": "single"})
+
+        llm = _BatchLLM(answer=_answer)
+        analyzer = _analyzer(llm, relationship_batch_analysis_enabled=False)
+
+        await analyzer.analyze_message_relationships(_conversation(6), "g1")
+
+        assert len(llm.prompts) == 5
+        assert analyzer.batch_stats["llm_requests"] == 0
@@ -0,0 +1,193 @@
+"""
+Unit tests for batched style/emotion scoring in MultidimensionalAnalyzer
+
+Covers:
+- N messages x all dimensions are scored with one structured request
+- scores are cached by message hash and reused by the per-message paths
+- inputs larger than the per-request budget are split over several requests
+- the token budget refuses requests and refills over time
+- invalid LLM items leave messages unscored (heuristic fallback)
+"""
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.services.analysis.multidimensional_analyzer import (
+    MultidimensionalAnalyzer,
+)
+from self_learning_EterU.services.analysis.style_batch_scorer import (
+    StyleBatchScorer,
+    TokenBudgetScheduler,
+)
+
+
+class _ScoringLLM:
+    """Scores every numbered message in the prompt with fixed values."""
+
+    providers_configured = 3
+
+    def __init__(self, answer=None):
+        self.prompts = []
+        self.answer = answer
+
+    def has_refine_provider(self):
+        return True
+
+    def has_filter_provider(self):
+        return False
+
+    def has_reinforce_provider(self):
+        return False
+
+    async def refine_chat_completion(self, prompt, system_prompt=None, **kwargs):
+        self.prompts.append(prompt)
+        if self.answer is not None:
+            return self.answer(prompt)
+        indices = [int(i) for i in re.findall(r"^(\d+)\. ", prompt, flags=re.M)]
+        return json.dumps([
+            {
+                "index": i,
+                "formal_level": 0.9,
+                "enthusiasm_level": 0.2,
+                "question_tendency": 0.7,
+                "emotion": {"积极": 0.6, "消极": 0.1, "中性": 0.2, "疑问": 0.1, "惊讶": 0.0},
+            }
+            for i in indices
+        ])
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _texts(count):
+    return [f"今天讨论第{i}个话题，大家觉得怎么样" for i in range(count)]
+
+
+@pytest.mark.unit
+class TestTokenBudgetScheduler:
+
+    def test_refuses_over_budget_and_refills(self):
+        clock = _Clock()
+        scheduler = TokenBudgetScheduler(3600, clock=clock)
+
+        assert scheduler.try_acquire(3000)
+        assert not scheduler.try_acquire(1000)
+        assert scheduler.stats["rejected"] == 1
+
+        clock.now = 400.0  # 400 tokens refilled
+        assert scheduler.try_acquire(1000)
+
+    def test_settle_returns_unused_reservation(self):
+        scheduler = TokenBudgetScheduler(1000, clock=_Clock())
+
+        assert scheduler.try_acquire(800)
+        scheduler.settle(800, 300)
+
+        assert scheduler.available == pytest.approx(700)
+        assert scheduler.stats["tokens_used"] == 300
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestStyleBatchScorer:
+
+    async def test_one_request_scores_all_dimensions(self):
+        llm = _ScoringLLM()
+        scorer = StyleBatchScorer(llm, TokenBudgetScheduler(100000))
+
+        scores = await scorer.score(_texts(10))
+
+        assert len(llm.prompts) == 1
+        assert len(scores) == 10
+        first = scores[StyleBatchScorer.message_hash(_texts(1)[0])]
+        assert first["formal_level"] == 0.9
+        assert first["emotion"]["积极"] == 0.6
+        assert scorer.stats["last_batch"]["requests"] == 1
+        assert scorer.stats["last_batch"]["tokens"] > 0
+        assert "latency_ms" in scorer.stats["last_batch"]
+
+        # Second pass is served from the cache.
+        await scorer.score(_texts(10))
+        assert len(llm.prompts) == 1
+        assert scorer.stats["cache_hits"] == 10
+
+    async def test_splits_by_request_budget(self):
+        llm = _ScoringLLM()
+        scorer = StyleBatchScorer(llm, TokenBudgetScheduler(100000), max_batch_tokens=40)
+
+        scores = await scorer.score(_texts(12))
+
+        assert len(llm.prompts) > 2
+        assert len(scores) == 12
+
+    async def test_exhausted_budget_leaves_messages_unscored(self):
+        llm = _ScoringLLM()
+        scorer = StyleBatchScorer(llm, TokenBudgetScheduler(50))
+
+        scores = await scorer.score(_texts(5))
+
+        assert scores == {}
+        assert llm.prompts == []
+        assert scorer.stats["budget_rejected"] == 1
+
+    async def test_invalid_items_are_dropped(self):
+        def _answer(prompt):
+            return json.dumps([
+                {"index": 1, "formal_level": "high", "enthusiasm_level": 0.5,
+                 "question_tendency": 0.5, "emotion": {}},
+                {"index": 2, "formal_level": 0.4},
+                {"index": 9, "formal_level": 0.4, "enthusiasm_level": 0.5,
+                 "question_tendency": 0.5, "emotion": {}},
+            ])
+
+        scorer = StyleBatchScorer(_ScoringLLM(answer=_answer), TokenBudgetScheduler(100000))
+
+        assert await scorer.score(_texts(2)) == {}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAnalyzerBatchScoring:
+
+    def _analyzer(self, llm, **overrides):
+        return MultidimensionalAnalyzer(PluginConfig(**overrides), db_manager=None, llm_adapter=llm)
+
+    async def test_batch_analysis_uses_one_scoring_request(self):
+        llm = _ScoringLLM()
+        analyzer = self._analyzer(llm)
+        messages = [
+            {"message": text, "sender_id": f"u{i}", "sender_name": f"n{i}", "group_id": "g1"}
+            for i, text in enumerate(_texts(8))
+        ]
+
+        results = await analyzer.analyze_messages_batch(messages)
+
+        assert len(llm.prompts) == 1
+        assert len(results) == 8
+        assert results[0]["style_context"]["formal_level"] == 0.9
+        assert results[0]["emotional_context"]["积极"] == 0.6
+
+    async def test_budget_exhaustion_falls_back_to_heuristics(self):
+        llm = _ScoringLLM()
+        analyzer = self._analyzer(llm, multidimensional_llm_tokens_per_hour=10)
+        text = "您好，请问明天开会吗？"
+
+        result = await analyzer.analyze_message_batch(text, sender_id="u1", group_id="g1")
+
+        assert llm.prompts == []
+        assert result["style_context"]["formal_level"] == analyzer._simple_formal_level(text)
+        assert analyzer.get_batch_scoring_stats()["budget"]["rejected"] >= 1
@@ -0,0 +1,142 @@
+"""
+Unit tests for RawMessageWriteBuffer
+
+Covers the group-commit ingestion path used by MessageCollectorService:
+- size- and time-triggered flushes
+- per-message id acknowledgement
+- backpressure when the pending queue is full
+- flush-on-stop and writes after stop
+- failed batches acknowledged with 0
+- a batch with one bad row is split so only that row fails
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.services.core_learning.raw_message_buffer import (
+    RawMessageWriteBuffer,
+)
+
+
+class _RecordingWriter:
+    """Fake batch writer that assigns sequential ids and records batches."""
+
+    def __init__(self, fail: bool = False, bad=None):
+        self.batches = []
+        self._next_id = 1
+        self._fail = fail
+        self._bad = bad
+
+    async def __call__(self, messages):
+        if self._fail or self._bad in messages:
+            raise RuntimeError("db down")
+        self.batches.append(list(messages))
+        ids = list(range(self._next_id, self._next_id + len(messages)))
+        self._next_id += len(messages)
+        return ids
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrent_submits_are_written_in_one_batch_with_ids():
+    writer = _RecordingWriter()
+    buffer = RawMessageWriteBuffer(writer, max_batch_size=10, flush_interval=0.01)
+
+    ids = await asyncio.gather(*(buffer.submit(f"m{i}") for i in range(5)))
+
+    assert sorted(ids) == [1, 2, 3, 4, 5]
+    assert writer.batches == [["m0", "m1", "m2", "m3", "m4"]]
+    stats = buffer.get_stats()
+    assert stats["flushes"] == 1
+    assert stats["written"] == 5
+    assert stats["time_triggered_flushes"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_size_threshold_flushes_without_waiting_for_timer():
+    writer = _RecordingWriter()
+    buffer = RawMessageWriteBuffer(writer, max_batch_size=3, flush_interval=60)
+
+    ids = await asyncio.wait_for(
+        asyncio.gather(*(buffer.submit(i) for i in range(3))),
+        timeout=1,
+    )
+
+    assert ids == [1, 2, 3]
+    assert buffer.get_stats()["size_triggered_flushes"] == 1
+    await buffer.stop()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_backpressure_flushes_when_pending_queue_is_full():
+    writer = _RecordingWriter()
+    buffer = RawMessageWriteBuffer(
+        writer, max_batch_size=2, flush_interval=60, max_pending=2,
+    )
+
+    await asyncio.wait_for(
+        asyncio.gather(*(buffer.submit(i) for i in range(6))),
+        timeout=1,
+    )
+    await buffer.stop()
+
+    assert sum(len(batch) for batch in writer.batches) == 6
+    assert all(len(batch) <= 2 for batch in writer.batches)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stop_flushes_messages_of_cancelled_submitters():
+    writer = _RecordingWriter()
+    buffer = RawMessageWriteBuffer(writer, max_batch_size=100, flush_interval=60)
+
+    task = asyncio.create_task(buffer.submit("pending"))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert await buffer.stop() == 1
+    assert writer.batches == [["pending"]]
+
+    # 关停后的提交直接同步写入
+    assert await buffer.submit("late") == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_batch_acknowledges_zero():
+    buffer = RawMessageWriteBuffer(
+        _RecordingWriter(fail=True), max_batch_size=2, flush_interval=0.01,
+    )
+
+    ids = await asyncio.gather(buffer.submit("a"), buffer.submit("b"))
+
+    assert ids == [0, 0]
+    assert buffer.get_stats()["failed"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_bad_row_is_isolated_by_splitting_the_batch():
+    writer = _RecordingWriter(bad="bad")
+    buffer = RawMessageWriteBuffer(writer, max_batch_size=5, flush_interval=60)
+    messages = ["m0", "m1", "bad", "m3", "m4"]
+
+    ids = await asyncio.gather(*(buffer.submit(m) for m in messages))
+
+    assert ids[2] == 0
+    assert all(ids[i] for i in (0, 1, 3, 4))
+    assert sorted(m for batch in writer.batches for m in batch) == ["m0", "m1", "m3", "m4"]
+    stats = buffer.get_stats()
+    assert (stats["written"], stats["failed"]) == (4, 1)
+    assert stats["split_retries"] > 0
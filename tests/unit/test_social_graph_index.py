@@ -0,0 +1,276 @@
+"""
+Unit tests for the incremental social graph index
+
+Covers:
+- component upserts / outgoing replacement keep adjacency and edge
+  slots consistent (including tombstone compaction)
+- writes to unloaded groups are ignored; writes during a load are
+  buffered and applied
+- sparse PageRank matches networkx, and warm starts converge faster
+- PageRank / communities are reused until the change threshold is hit
+- analyzer loads a group from the database once and then follows
+  relation writes through the index
+- Louvain runs off the event loop
+- incremental writes and warm PageRank at 1k / 10k member groups
+- benchmark: build, write and PageRank timings at 1k / 10k members,
+  reported but not asserted (slow, deselected by default)
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+import networkx as nx
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.services.database.sqlalchemy_database_manager import (
+    SQLAlchemyDatabaseManager,
+)
+from self_learning_EterU.services.social.social_graph_analyzer import (
+    SocialGraphAnalyzer,
+)
+from self_learning_EterU.services.social.social_graph_index import (
+    SocialGraphIndex,
+    compute_pagerank,
+    get_social_graph_index,
+)
+
+
+def _random_rows(members, edges_per_member, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(members):
+        for _ in range(edges_per_member):
+            j = rng.randrange(members)
+            if j != i:
+                rows.append((f"u{i}", f"u{j}", "friend", rng.random(), 1))
+    return rows
+
+
+def _networkx_graph(graph):
+    digraph = nx.DiGraph()
+    for (source, target) in graph.components:
+        digraph.add_edge(source, target, **graph.edge_attributes(source, target))
+    return digraph
+
+
+@pytest.mark.unit
+class TestSocialGraphIndex:
+
+    def test_upsert_and_replace(self):
+        index = SocialGraphIndex()
+        graph = index.finish_load("g1", [
+            ("a", "b", "friend", 0.5, 1),
+            ("a", "b", "colleague", 0.25, 2),
+            ("a", "c", "friend", 0.5, 1),
+            ("c", "a", "friend", 0.1, 1),
+        ])
+        assert graph.node_count == 3
+        assert graph.edge_count == 3
+        assert graph.edge_attributes("a", "b") == {
+            "weight": 0.75, "relation_type": "friend", "frequency": 3,
+        }
+
+        index.upsert_component("g1", "b", "d", "friend", 0.4)
+        assert graph.successors["b"] == {"d"}
+        assert graph.degree("a") == 3
+
+        index.replace_outgoing("g1", "a", [("d", "friend", 0.9, 1)])
+        assert graph.successors["a"] == {"d"}
+        assert ("a", "b") not in graph.components
+        assert graph.degree("b") == 1
+        assert _networkx_graph(graph).number_of_edges() == 3
+
+    def test_tombstones_are_compacted(self):
+        index = SocialGraphIndex()
+        graph = index.finish_load("g1", _random_rows(100, 3))
+        for i in range(100):
+            index.replace_outgoing("g1", f"u{i}", [])
+        assert graph.edge_count == 0
+        assert graph.node_count == 0
+        assert len(graph.rows) < 64
+        scores, _ = compute_pagerank(*graph.edge_arrays())
+        assert scores == {}
+
+    def test_unloaded_groups_ignored_and_loading_buffered(self):
+        index = SocialGraphIndex()
+        index.upsert_component("g1", "a", "b", "friend", 0.5)
+        assert index.get("g1") is None
+
+        index.begin_load("g1")
+        index.upsert_component("g1", "b", "c", "friend", 0.5)
+        graph = index.finish_load("g1", [("a", "b", "friend", 0.5, 1)])
+        assert set(graph.components) == {("a", "b"), ("b", "c")}
+
+    def test_pagerank_matches_networkx(self):
+        index = SocialGraphIndex()
+        graph = index.finish_load("g1", _random_rows(300, 4))
+        scores, iterations = compute_pagerank(*graph.edge_arrays())
+
+        expected = nx.pagerank(_networkx_graph(graph), weight="weight", tol=1e-10)
+        assert set(scores) == set(expected)
+        for node, score in expected.items():
+            assert scores[node] == pytest.approx(score, abs=1e-5)
+        assert iterations > 0
+
+    def test_warm_start_converges_faster(self):
+        index = SocialGraphIndex()
+        graph = index.finish_load("g1", _random_rows(2000, 5))
+        scores, cold = compute_pagerank(*graph.edge_arrays())
+
+        index.upsert_component("g1", "u1", "u2", "friend", 0.9)
+        _, warm = compute_pagerank(*graph.edge_arrays(), scores)
+        assert warm < cold
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSocialGraphAnalyzerCaching:
+
+    async def test_pagerank_recomputed_past_threshold(self):
+        index = SocialGraphIndex(refresh_ratio=0.1)
+        analyzer = SocialGraphAnalyzer(graph_index=index)
+        index.finish_load("g1", _random_rows(100, 3))
+
+        await analyzer.get_influence_ranking("g1")
+        await analyzer.get_influence_ranking("g1")
+        assert index.get_stats()["pagerank_runs"] == 1
+        assert index.get_stats()["pagerank_cache_hits"] == 1
+
+        index.upsert_component("g1", "u1", "u2", "friend", 0.9)
+        await analyzer.get_influence_ranking("g1")
+        assert index.get_stats()["pagerank_runs"] == 1
+
+        for i in range(40):
+            index.upsert_component("g1", f"u{i}", f"u{i + 1}", "colleague", 0.5)
+        await analyzer.get_influence_ranking("g1")
+        assert index.get_stats()["pagerank_runs"] == 2
+
+    async def test_communities_cached_and_run_off_loop(self):
+        index = SocialGraphIndex()
+        analyzer = SocialGraphAnalyzer(graph_index=index)
+        index.finish_load("g1", _random_rows(1000, 5))
+
+        ticks = 0
+        stop = asyncio.Event()
+
+        async def _ticker():
+            nonlocal ticks
+            while not stop.is_set():
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.create_task(_ticker())
+        first, second = await asyncio.gather(
+            analyzer.detect_communities("g1"),
+            analyzer.detect_communities("g1"),
+        )
+        stop.set()
+        await ticker
+
+        assert first and first is second
+        assert ticks > 1
+        assert await analyzer.detect_communities("g1") is first
+
+
+@pytest.fixture
+async def db(tmp_path):
+    config = PluginConfig(
+        data_dir=str(tmp_path),
+        db_type="sqlite",
+        enable_web_interface=False,
+    )
+    manager = SQLAlchemyDatabaseManager(config)
+    assert await manager.start() is True
+    get_social_graph_index().clear()
+    try:
+        yield manager
+    finally:
+        get_social_graph_index().clear()
+        await manager.stop()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_analyzer_follows_relation_writes(db, monkeypatch):
+    for target in ("b", "c"):
+        assert await db.save_social_relation(
+            "g1", {"from_user": "a", "to_user": target, "strength": 0.6}
+        )
+
+    analyzer = SocialGraphAnalyzer(db_manager=db)
+    graph = await analyzer.get_group_graph("g1")
+    assert set(graph.components) == {("a", "b"), ("a", "c")}
+
+    # Later reads come from the index, writes are applied to it.
+    async def _no_reload(self, group_id):
+        raise AssertionError("group should stay loaded")
+
+    monkeypatch.setattr(SocialGraphAnalyzer, "_load_relation_rows", _no_reload)
+    assert await db.save_social_relation(
+        "g1", {"from_user": "c", "to_user": "b", "strength": 0.9}
+    )
+    ranking = await analyzer.get_influence_ranking("g1")
+    assert ranking[0]["user_id"] == "b"
+    assert ranking[0]["degree"] == 2
+
+
+def _time(fn, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+@pytest.mark.unit
+def test_1k_and_10k_members_write_and_warm_start():
+    """Incremental writes update one edge in place and warm PageRank needs fewer iterations."""
+    for members in (1000, 10000):
+        rows = _random_rows(members, 5, seed=members)
+        index = SocialGraphIndex()
+        graph = index.finish_load("g", rows)
+        edges = graph.edge_count
+        had_edge = ("u1", "u2") in graph.components
+        for strength in (0.3, 0.7):
+            index.upsert_component("g", "u1", "u2", "friend", strength)
+        assert graph.edge_count == edges + (0 if had_edge else 1)
+        assert graph.components[("u1", "u2")]["friend"][0] == 0.7
+
+        scores, cold_iter = compute_pagerank(*graph.edge_arrays())
+        _, warm_iter = compute_pagerank(*graph.edge_arrays(), scores)
+        assert warm_iter < cold_iter
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+def test_benchmark_1k_and_10k_members(record_property):
+    """Micro-benchmark: index build, incremental write, cold vs warm PageRank."""
+    lines = []
+    for members in (1000, 10000):
+        rows = _random_rows(members, 5, seed=members)
+        index = SocialGraphIndex()
+        load_time, graph = _time(lambda: index.finish_load("g", rows), repeat=1)
+        write_time, _ = _time(
+            lambda: index.upsert_component("g", "u1", "u2", "friend", 0.7), repeat=100
+        )
+        cold_time, (scores, cold_iter) = _time(lambda: compute_pagerank(*graph.edge_arrays()))
+        warm_time, (_, warm_iter) = _time(
+            lambda: compute_pagerank(*graph.edge_arrays(), scores)
+        )
+        # Timings are reported only; wall-clock assertions are flaky on shared runners.
+        record_property(f"write_us_{members}", round(write_time * 1e6, 1))
+        record_property(f"pagerank_warm_ms_{members}", round(warm_time * 1000, 1))
+        lines.append(
+            f"{members} members/{graph.edge_count} edges: load {load_time * 1000:.1f} ms, "
+            f"write {write_time * 1e6:.1f} us, PageRank cold {cold_time * 1000:.1f} ms "
+            f"({cold_iter} it), warm {warm_time * 1000:.1f} ms ({warm_iter} it)"
+        )
+    logging.getLogger(__name__).info("[SocialGraphIndex benchmark] " + "; ".join(lines))
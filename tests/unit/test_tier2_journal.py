@@ -0,0 +1,241 @@
+"""
+Unit tests for Tier2Journal
+
+Covers:
+- appended items are replayed in order until committed
+- commit offsets are per (operation, group)
+- compaction removes committed rows only
+- journal contents survive reopening the database file
+- V2 ingestion buffer is journaled, replayed on start and committed on flush
+- a failed flush is retried for the failed engine only and committed once it succeeds
+"""
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.core.interfaces import MessageData
+from self_learning_EterU.services.core_learning.v2_learning_integration import (
+    V2LearningIntegration,
+)
+from self_learning_EterU.services.quality.tier2_journal import Tier2Journal
+
+
+def _row_count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM tier2_journal").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestTier2Journal:
+
+    async def test_replay_until_commit(self, tmp_path):
+        journal = Tier2Journal(str(tmp_path / "journal.db"))
+        seqs = [
+            await journal.append("op", "g1", {"n": i}) for i in range(5)
+        ]
+        assert seqs == sorted(seqs) and seqs[0] > 0
+
+        pending = await journal.replay()
+        assert [p for _, p in pending[("op", "g1")]] == [{"n": i} for i in range(5)]
+
+        await journal.commit("op", "g1", seqs[2])
+        pending = await journal.replay()
+        assert [p["n"] for _, p in pending[("op", "g1")]] == [3, 4]
+        await journal.close()
+
+    async def test_offsets_are_per_operation_and_group(self, tmp_path):
+        journal = Tier2Journal(str(tmp_path / "journal.db"))
+        a = await journal.append("op", "g1", "a")
+        await journal.append("op", "g2", "b")
+        await journal.append("other", "g1", "c")
+
+        await journal.commit("op", "g1", a + 10)
+        pending = await journal.replay()
+
+        assert ("op", "g1") not in pending
+        assert [p for _, p in pending[("op", "g2")]] == ["b"]
+        assert [p for _, p in pending[("other", "g1")]] == ["c"]
+        await journal.close()
+
+    async def test_compaction_removes_committed_rows(self, tmp_path):
+        path = str(tmp_path / "journal.db")
+        journal = Tier2Journal(path, compact_interval=3)
+        seqs = [await journal.append("op", "g1", i) for i in range(4)]
+
+        await journal.commit("op", "g1", seqs[1])
+        assert _row_count(path) == 4  # below the compaction interval
+
+        await journal.commit("op", "g1", seqs[2])
+        assert _row_count(path) == 1
+        stats = journal.get_stats()
+        assert stats["committed"] == 3
+        assert stats["compacted"] == 3
+        await journal.close()
+
+    async def test_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "journal.db")
+        journal = Tier2Journal(path)
+        first = await journal.append("op", "g1", {"text": "你好"})
+        await journal.append("op", "g1", {"text": "second"})
+        await journal.commit("op", "g1", first)
+        await journal.close()
+
+        reopened = Tier2Journal(path)
+        pending = await reopened.replay()
+        assert [p for _, p in pending[("op", "g1")]] == [{"text": "second"}]
+        await reopened.close()
+
+
+class _Integration(V2LearningIntegration):
+    def _create_social_analyzer(self):
+        return None
+
+    def _create_jargon_filter(self):
+        return None
+
+
+class _BatchMemory:
+    def __init__(self):
+        self.batches = []
+
+    async def add_memories_batch(self, messages, group_id):
+        self.batches.append([m.message for m in messages])
+        return {"messages": len(messages), "documents": 1}
+
+
+class _DownMemory:
+    async def add_memories_batch(self, messages, group_id):
+        return {"messages": 0, "documents": 0, "failed": len(messages)}
+
+
+def _integration(tmp_path, memory):
+    integration = _Integration(
+        config=PluginConfig(
+            data_dir=str(tmp_path),
+            knowledge_engine="legacy",
+            memory_engine="mem0",
+            delegate_memory_to_livingmemory=False,
+        ),
+        llm_adapter=None,
+        db_manager=None,
+        context=None,
+    )
+    integration._memory_manager = memory
+    integration._register_trigger_operations()
+    return integration
+
+
+def _message(text):
+    return MessageData(
+        sender_id="u1",
+        sender_name="Alice",
+        message=text,
+        group_id="g1",
+        timestamp=time.time(),
+        platform="test",
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_v2_buffer_replayed_after_restart(tmp_path):
+    first = _integration(tmp_path, _BatchMemory())
+    assert first._journal is not None
+    buffer_op = first._trigger._tier1_ops["ingestion_buffer"]
+    for i in range(3):
+        await buffer_op(_message(f"buffered message number {i}"), "g1")
+    assert len(first._ingestion_buffer["g1"]) == 3
+    # Simulate a crash: no flush, no stop.
+    await first._journal.close()
+
+    memory = _BatchMemory()
+    second = _integration(tmp_path, memory)
+    await second._replay_journal()
+    assert [m.message for m in second._ingestion_buffer["g1"]] == [
+        f"buffered message number {i}" for i in range(3)
+    ]
+
+    await second._flush_ingestion_buffer("g1")
+    assert memory.batches == [[f"buffered message number {i}" for i in range(3)]]
+    assert await second._journal.replay() == {}
+    await second._journal.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_v2_failed_flush_retried_then_committed(tmp_path):
+    integration = _integration(tmp_path, _DownMemory())
+    buffer_op = integration._trigger._tier1_ops["ingestion_buffer"]
+    await buffer_op(_message("message lost by a failed flush"), "g1")
+    await integration._flush_ingestion_buffer("g1")
+
+    # Not committed while the failed range is pending.
+    pending = await integration._journal.replay()
+    assert len(pending[("ingestion_flush", "g1")]) == 1
+
+    memory = _BatchMemory()
+    integration._memory_manager = memory
+    await buffer_op(_message("message flushed after recovery"), "g1")
+    await integration._flush_ingestion_buffer("g1")
+
+    assert memory.batches == [[
+        "message lost by a failed flush",
+        "message flushed after recovery",
+    ]]
+    assert await integration._journal.replay() == {}
+    await integration._journal.close()
+
+
+class _CountingKnowledge:
+    def __init__(self):
+        self.batches = []
+
+    async def process_messages_batch(self, messages, group_id):
+        self.batches.append([m.message for m in messages])
+        return {"messages": len(messages), "documents": 1, "failed": 0}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_v2_retry_only_resends_to_the_failed_engine(tmp_path):
+    integration = _integration(tmp_path, _DownMemory())
+    knowledge = _CountingKnowledge()
+    integration._knowledge_manager = knowledge
+    buffer_op = integration._trigger._tier1_ops["ingestion_buffer"]
+
+    await buffer_op(_message("first message of the group"), "g1")
+    await integration._flush_ingestion_buffer("g1")
+    await buffer_op(_message("second message of the group"), "g1")
+    await integration._flush_ingestion_buffer("g1")
+
+    assert knowledge.batches == [
+        ["first message of the group"], ["second message of the group"],
+    ]
+    retry = integration._ingestion_retry["g1"]
+    assert list(retry) == ["memory"] and retry["memory"][1] == 2
+    assert len((await integration._journal.replay())[("ingestion_flush", "g1")]) == 2
+
+    # A third failed flush gives up on the retried range only.
+    await buffer_op(_message("third message of the group"), "g1")
+    await integration._flush_ingestion_buffer("g1")
+    retry = integration._ingestion_retry["g1"]
+    assert [m.message for m in retry["memory"][0]] == ["third message of the group"]
+    assert retry["memory"][1] == 1
+
+    integration._memory_manager = _BatchMemory()
+    await integration._flush_ingestion_buffer("g1")
+    assert await integration._journal.replay() == {}
+    await integration._journal.close()
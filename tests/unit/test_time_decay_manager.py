@@ -0,0 +1,148 @@
+"""
+Unit tests for set-based time decay in TimeDecayManager
+
+Covers:
+- SQL decay matches the previous per-row Python computation
+- rows falling to the threshold are pruned, NULL start_time is skipped
+- group filtering and multi-chunk primary-key ranges
+- benchmark: decay wall time on a 1M-row table, reported but not asserted
+  (slow, deselected by default; run with -m slow)
+"""
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select, text
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.config import PluginConfig
+from self_learning_EterU.core.database.engine import DatabaseEngine
+from self_learning_EterU.models.orm.expression import ExpressionPattern
+from self_learning_EterU.models.orm.learning import LearningBatch
+from self_learning_EterU.services.state.time_decay_manager import TimeDecayManager
+
+DAY = 24 * 3600
+
+
+def _legacy_decay(manager, value, age_days, decay_config):
+    """Previous per-row computation; returns None when the row is pruned."""
+    decay = manager.calculate_decay_factor(age_days, decay_config.decay_days)
+    new_value = max(decay_config.decay_min, (value or 1.0) - decay)
+    return None if new_value <= decay_config.decay_min else new_value
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = DatabaseEngine(f"sqlite:///{(tmp_path / 'decay.db').as_posix()}")
+    await engine.create_tables()
+    yield engine
+    await engine.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSetBasedDecay:
+
+    async def test_expression_patterns_match_previous_results(self, engine):
+        rng = random.Random(3)
+        now = time.time()
+        rows = []
+        async with engine.get_session() as session:
+            for i in range(300):
+                weight = rng.choice([0.011, 0.015, 0.5, 1.0, rng.uniform(0.01, 2.0)])
+                age = rng.choice([0.0, 1.0, 7.5, 15.0, 40.0, rng.uniform(0, 30)])
+                rows.append((weight, age))
+                session.add(ExpressionPattern(
+                    group_id="g1" if i % 3 else "g2", situation="s", expression=f"e{i}",
+                    weight=weight, last_active_time=now - age * DAY, create_time=now,
+                ))
+            await session.commit()
+
+        manager = TimeDecayManager(PluginConfig(), engine)
+        manager.DECAY_CHUNK_SIZE = 64
+        decay_config = manager.decay_configs['expression_patterns']
+        updated, deleted = await manager.apply_decay_to_table(decay_config)
+
+        expected = [_legacy_decay(manager, w, age, decay_config) for w, age in rows]
+        async with engine.get_session() as session:
+            result = await session.execute(select(ExpressionPattern).order_by(ExpressionPattern.id))
+            actual = {p.expression: p.weight for p in result.scalars()}
+
+        kept = {f"e{i}": v for i, v in enumerate(expected) if v is not None}
+        assert set(actual) == set(kept)
+        for key, value in kept.items():
+            assert actual[key] == pytest.approx(value, rel=1e-6)
+        assert (updated, deleted) == (len(kept), len(rows) - len(kept))
+
+    async def test_learning_batches_group_filter_and_null_scores(self, engine):
+        now = time.time()
+        async with engine.get_session() as session:
+            session.add_all([
+                LearningBatch(batch_name="a", group_id="g1", start_time=now - 30 * DAY, quality_score=None),
+                LearningBatch(batch_name="b", group_id="g1", start_time=now - 30 * DAY, quality_score=0.015),
+                LearningBatch(batch_name="c", group_id="g1", start_time=now - 3.5 * DAY, quality_score=0.5),
+                LearningBatch(batch_name="d", group_id="g2", start_time=now - 30 * DAY, quality_score=0.015),
+            ])
+            await session.commit()
+
+        manager = TimeDecayManager(PluginConfig(), engine)
+        assert await manager.apply_decay_to_all_tables("g1") == {
+            'learning_batches': (2, 1),
+            'expression_patterns': (0, 0),
+        }
+
+        async with engine.get_session() as session:
+            result = await session.execute(select(LearningBatch))
+            scores = {b.batch_name: b.quality_score for b in result.scalars()}
+        assert scores["a"] == pytest.approx(0.99)
+        assert scores["c"] == pytest.approx(0.5 - 0.01 * 0.25)
+        assert scores["d"] == 0.015
+        assert "b" not in scores
+
+
+async def _seed_expression_patterns(engine, count):
+    """Insert ``count`` rows with a recursive CTE so seeding stays cheap."""
+    now = time.time()
+    async with engine.get_session() as session:
+        await session.execute(text(
+            "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :count) "
+            "INSERT INTO expression_patterns "
+            "(group_id, persona_id, situation, expression, weight, last_active_time, create_time) "
+            "SELECT 'g' || (n % 50), 'default', 's', 'e' || n, "
+            "0.012 + (n % 100) * 0.01, :now - (n % 30) * 86400.0, :now FROM seq"
+        ), {"count": count, "now": now})
+        await session.commit()
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_benchmark_decay_1m_rows(engine, record_property):
+    """Benchmark: set-based decay wall time on a 1M-row expression_patterns table."""
+    rows = 1_000_000
+    await _seed_expression_patterns(engine, rows)
+    manager = TimeDecayManager(PluginConfig(), engine)
+
+    start = time.perf_counter()
+    updated, deleted = await manager.apply_decay_to_table(manager.decay_configs['expression_patterns'])
+    elapsed = time.perf_counter() - start
+
+    # Timing is reported only; wall-clock assertions are flaky on shared runners.
+    record_property("decay_seconds", round(elapsed, 3))
+    logging.getLogger(__name__).info(
+        f"[TimeDecay benchmark] {rows} rows: {elapsed:.2f} s "
+        f"({manager.DECAY_CHUNK_SIZE} rows/chunk), updated {updated}, deleted {deleted}"
+    )
+
+    async with engine.get_session() as session:
+        remaining = (await session.execute(select(func.count()).select_from(ExpressionPattern))).scalar()
+    assert updated + deleted == rows
+    assert remaining == updated
+    assert deleted > 0
@@ -0,0 +1,182 @@
+"""
+Unit tests for the exemplar vector indexes
+
+Covers:
+- flat index exactness and incremental add/remove (swap-delete)
+- flat index serves an adopted memory-mapped matrix in place, copying it
+  only on the first mutation
+- IVF index stays exact below its training threshold
+- deferred (off-loop) IVF training is discarded if the index changed
+- IVF bulk load trains from a memory-mapped matrix
+- IVF recall@10 and scanned fraction against brute force on synthetic
+  clustered groups (10k always, 100k marked slow)
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.services.integration.vector_index import (
+    FlatIndex,
+    IVFFlatIndex,
+    create_vector_index,
+    normalize_rows,
+)
+
+_DIM = 64
+
+
+def _clustered(n, dim=_DIM, clusters=200, seed=0):
+    """Synthetic embeddings: gaussian blobs around random unit centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    data = centres[labels] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32)
+    queries = centres[rng.integers(0, clusters, 100)] + 0.35 * rng.standard_normal(
+        (100, dim)
+    ).astype(np.float32)
+    return data, queries
+
+
+def _recall_and_scanned(n):
+    data, queries = _clustered(n)
+    ids = list(range(n))
+    flat = FlatIndex(_DIM)
+    flat.add(ids, data)
+    ivf = IVFFlatIndex(_DIM)
+    ivf.add(ids, data)
+    assert ivf.is_trained
+
+    hits = 0
+    scanned = 0
+    for q in queries:
+        exact = flat.search(q, 10)
+        approx = ivf.search(q, 10)
+        hits += len({i for i, _ in exact} & {i for i, _ in approx})
+        scanned += ivf.scanned_rows(q)
+
+    recall = hits / (10 * len(queries))
+    fraction = scanned / (n * len(queries))
+    return recall, fraction
+
+
+@pytest.mark.unit
+def test_flat_index_incremental_add_remove():
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((50, 8)).astype(np.float32)
+    index = create_vector_index("flat", 8)
+    index.add(list(range(50)), data)
+
+    top_id, top_sim = index.search(data[7], 1)[0]
+    assert top_id == 7 and top_sim == pytest.approx(1.0, abs=1e-5)
+
+    assert index.remove([7, 7, 999]) == 1
+    assert len(index) == 49 and 7 not in index
+    assert all(i != 7 for i, _ in index.search(data[7], 49))
+    # The row swapped into slot 7 is still found under its own id.
+    assert index.search(data[49], 1)[0][0] == 49
+
+    # Re-adding an existing id replaces its vector.
+    index.add([3], data[10:11])
+    assert len(index) == 49
+    assert {i for i, _ in index.search(data[10], 2)} == {3, 10}
+
+
+@pytest.mark.unit
+def test_ivf_exact_below_threshold_and_trains_incrementally():
+    data, queries = _clustered(600, dim=16, clusters=20)
+    flat = FlatIndex(16)
+    ivf = IVFFlatIndex(16, train_threshold=500)
+    flat.add(list(range(400)), data[:400])
+    ivf.add(list(range(400)), data[:400])
+    assert not ivf.is_trained
+    for q in queries[:10]:
+        assert ivf.search(q, 5) == flat.search(q, 5)
+
+    for i in range(400, 600):
+        ivf.add([i], data[i:i + 1])
+    assert ivf.is_trained and ivf.nlist >= 2
+    ivf.remove(list(range(0, 600, 2)))
+    assert len(ivf) == 300
+    assert all(i % 2 for i, _ in ivf.search(queries[0], 20))
+
+
+@pytest.mark.unit
+def test_ivf_deferred_training_applies_only_if_unchanged():
+    data, queries = _clustered(600, dim=16, clusters=20)
+    ivf = IVFFlatIndex(16, train_threshold=500)
+    ivf.add(list(range(600)), data[:600], train=False)
+    assert not ivf.is_trained and ivf.needs_training
+
+    stale = ivf.compute_training()
+    ivf.remove([0])
+    assert ivf.apply_training(stale) is False
+    assert not ivf.is_trained
+
+    assert ivf.apply_training(ivf.compute_training()) is True
+    assert ivf.is_trained and not ivf.needs_training
+    assert len(ivf) == 599 and 0 not in ivf
+    top_id, top_sim = ivf.search(data[5], 1)[0]
+    assert top_id == 5 and top_sim == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.mark.unit
+def test_flat_adopts_memmap_without_copy(tmp_path):
+    data, queries = _clustered(500, dim=16, clusters=10)
+    path = tmp_path / "unit.npy"
+    np.save(path, normalize_rows(data))
+    mapped = np.load(path, mmap_mode="r")
+
+    adopted = FlatIndex(16)
+    adopted.adopt(list(range(500)), mapped)
+    copied = FlatIndex(16)
+    copied.add(list(range(500)), data)
+    assert adopted._vecs is mapped
+    assert [i for i, _ in adopted.search(queries[0], 10)] == [
+        i for i, _ in copied.search(queries[0], 10)
+    ]
+
+    # Mutations work on a private copy; the mapped file is untouched.
+    adopted.remove([0])
+    adopted.add([1000], data[:1])
+    assert adopted._vecs is not mapped and adopted._vecs.flags.writeable
+    assert len(adopted) == 500 and 0 not in adopted
+    assert adopted.search(data[0], 1)[0][0] == 1000
+    with pytest.raises(ValueError):
+        adopted.adopt([1], mapped[:1])
+
+
+@pytest.mark.unit
+def test_ivf_bulk_load_from_memmap(tmp_path):
+    data, queries = _clustered(3000, dim=16, clusters=40)
+    path = tmp_path / "vectors.npy"
+    np.save(path, data)
+    mapped = np.load(path, mmap_mode="r")
+
+    ivf = IVFFlatIndex(16)
+    ivf.add(list(range(3000)), mapped)
+    assert ivf.is_trained and len(ivf) == 3000
+    flat = FlatIndex(16)
+    flat.add(list(range(3000)), data)
+    assert ivf.search(queries[0], 1)[0][0] == flat.search(queries[0], 1)[0][0]
+
+
+@pytest.mark.unit
+def test_ivf_recall_against_brute_force_10k():
+    recall, fraction = _recall_and_scanned(10_000)
+    assert recall >= 0.9
+    assert fraction < 0.5
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+def test_ivf_recall_against_brute_force_100k():
+    recall, fraction = _recall_and_scanned(100_000)
+    assert recall >= 0.9
+    assert fraction < 0.2
@@ -0,0 +1,159 @@
+"""
+Unit tests for GroupWorkScheduler
+
+Covers the bounded per-group queue that replaces per-message create_task:
+- FIFO within a group, round-robin across groups
+- realtime work shed at the soft limit
+- capture work never shed, evicting sheddable work at the hard limit
+- capture backlog bounded by max_size, dropping the oldest capture work
+- stop() drains within the timeout and drops the remainder
+- failures are counted without killing the worker
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+PARENT = PACKAGE_ROOT.parent
+if str(PARENT) not in sys.path:
+    sys.path.insert(0, str(PARENT))
+
+from self_learning_EterU.services.learning.work_scheduler import (
+    PRIORITY_CAPTURE,
+    PRIORITY_NORMAL,
+    PRIORITY_REALTIME,
+    GroupWorkScheduler,
+)
+
+
+async def _record(log, label, gate=None):
+    if gate is not None:
+        await gate.wait()
+    log.append(label)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_round_robin_across_groups_fifo_within_group():
+    scheduler = GroupWorkScheduler(worker_count=1)
+    log = []
+    for i in range(3):
+        scheduler.submit("flood", _record(log, f"flood-{i}"))
+    scheduler.submit("quiet", _record(log, "quiet-0"))
+
+    await scheduler.stop(drain_timeout=1.0)
+
+    assert log == ["flood-0", "quiet-0", "flood-1", "flood-2"]
+    assert scheduler.get_stats()["completed"] == {"learning": 4}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_realtime_shed_at_soft_limit():
+    scheduler = GroupWorkScheduler(worker_count=1, soft_limit=2, hard_limit=4)
+    gate = asyncio.Event()
+    log = []
+
+    assert scheduler.submit("g", _record(log, "a", gate), priority=PRIORITY_NORMAL)
+    assert scheduler.submit("g", _record(log, "b", gate), priority=PRIORITY_NORMAL)
+    assert not scheduler.submit(
+        "g", _record(log, "rt", gate), kind="realtime", priority=PRIORITY_REALTIME,
+    )
+    assert scheduler.submit("g", _record(log, "c", gate), priority=PRIORITY_NORMAL)
+
+    gate.set()
+    await scheduler.stop(drain_timeout=1.0)
+
+    assert log == ["a", "b", "c"]
+    assert scheduler.get_stats()["shed"] == {"realtime": 1}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_capture_never_shed_evicts_sheddable_at_hard_limit():
+    scheduler = GroupWorkScheduler(worker_count=1, soft_limit=1, hard_limit=2)
+    gate = asyncio.Event()
+    log = []
+
+    scheduler.submit("g", _record(log, "n1", gate), kind="affection")
+    scheduler.submit("g", _record(log, "n2", gate), kind="affection")
+    assert not scheduler.submit("g", _record(log, "n3", gate), kind="affection")
+
+    for i in range(3):
+        assert scheduler.submit(
+            "g", _record(log, f"cap{i}", gate),
+            kind="capture", priority=PRIORITY_CAPTURE,
+        )
+
+    gate.set()
+    await scheduler.stop(drain_timeout=1.0)
+
+    assert [x for x in log if x.startswith("cap")] == ["cap0", "cap1", "cap2"]
+    stats = scheduler.get_stats()
+    assert stats["completed"]["capture"] == 3
+    assert "capture" not in stats["shed"]
+    assert stats["shed"]["affection"] == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_capture_backlog_bounded_by_max_size_drops_oldest():
+    scheduler = GroupWorkScheduler(worker_count=1, soft_limit=1, hard_limit=2, max_size=3)
+    gate = asyncio.Event()
+    log = []
+
+    for i in range(6):
+        assert scheduler.submit(
+            f"g{i % 2}", _record(log, f"cap{i}", gate),
+            kind="capture", priority=PRIORITY_CAPTURE,
+        )
+    stats = scheduler.get_stats()
+    assert stats["queued"] == 3
+    assert stats["capture_dropped"] == 3
+
+    gate.set()
+    await scheduler.stop(drain_timeout=1.0)
+
+    assert sorted(log) == ["cap3", "cap4", "cap5"]
+    assert scheduler.get_stats()["shed"]["capture"] == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stop_drops_remaining_work_and_rejects_new_submissions():
+    scheduler = GroupWorkScheduler(worker_count=1)
+    gate = asyncio.Event()
+    log = []
+
+    scheduler.submit("g", _record(log, "blocked", gate), kind="jargon")
+    scheduler.submit("g", _record(log, "queued", gate), kind="jargon")
+    await asyncio.sleep(0)
+
+    await scheduler.stop(drain_timeout=0.05)
+
+    assert log == []
+    assert scheduler.get_stats()["queued"] == 0
+    assert scheduler.get_stats()["shed"]["jargon"] == 1
+    assert not scheduler.submit("g", _record(log, "late"), kind="jargon")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_job_counted_and_worker_keeps_running():
+    scheduler = GroupWorkScheduler(worker_count=1)
+    log = []
+
+    async def _boom():
+        raise RuntimeError("boom")
+
+    scheduler.submit("g", _boom(), kind="affection")
+    scheduler.submit("g", _record(log, "after"), kind="affection")
+    await scheduler.stop(drain_timeout=1.0)
+
+    stats = scheduler.get_stats()
+    assert log == ["after"]
+    assert stats["failed"] == {"affection": 1}
+    assert stats["completed"] == {"affection": 1}
+    assert stats["submitted"] == {"affection": 2}
@@ -17,54 +17,59 @@ except ModuleNotFoundError:
     _HAS_CACHETOOLS = False
 
     class Cache(MutableMapping):
-        """Small dict-like cache fallback used before optional deps are installed."""
+        """Small dict-like cache fallback used before optional deps are installed.
+
+        ``_data`` keeps LRU order (reads move to the end) and ``_expiry``
+        keeps write order. With one TTL per cache, write order is also
+        expiry order, so expiring and evicting only pop from the front:
+        every operation is amortised O(1).
+        """
 
         def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
             self.maxsize = max(1, int(maxsize))
             self.ttl = ttl
-            self._data: OrderedDict[Any, tuple[Any, Optional[float]]] = OrderedDict()
+            self._data: OrderedDict[Any, Any] = OrderedDict()
+            self._expiry: OrderedDict[Any, float] = OrderedDict()
 
         @property
         def currsize(self) -> int:
             self._expire()
             return len(self._data)
 
-        def _expires_at(self) -> Optional[float]:
-            return time.monotonic() + self.ttl if self.ttl is not None else None
-
-        def _is_expired(self, expires_at: Optional[float]) -> bool:
-            return expires_at is not None and expires_at <= time.monotonic()
-
         def _expire(self) -> None:
             if self.ttl is None:
                 return
-            expired_keys = [
-                key for key, (_, expires_at) in self._data.items()
-                if self._is_expired(expires_at)
-            ]
-            for key in expired_keys:
+            now = time.monotonic()
+            while self._expiry:
+                key, expires_at = next(iter(self._expiry.items()))
+                if expires_at > now:
+                    break
+                self._expiry.popitem(last=False)
                 self._data.pop(key, None)
 
         def _evict(self) -> None:
             while len(self._data) > self.maxsize:
-                self._data.popitem(last=False)
+                key, _ = self._data.popitem(last=False)
+                self._expiry.pop(key, None)
 
         def __getitem__(self, key: Any) -> Any:
-            value, expires_at = self._data[key]
-            if self._is_expired(expires_at):
-                del self._data[key]
-                raise KeyError(key)
+            self._expire()
+            value = self._data[key]
             self._data.move_to_end(key)
             return value
 
         def __setitem__(self, key: Any, value: Any) -> None:
-            self._data[key] = (value, self._expires_at())
-            self._data.move_to_end(key)
             self._expire()
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expiry[key] = time.monotonic() + self.ttl
+                self._expiry.move_to_end(key)
             self._evict()
 
         def __delitem__(self, key: Any) -> None:
             del self._data[key]
+            self._expiry.pop(key, None)
 
         def __iter__(self) -> Iterator[Any]:
             self._expire()
@@ -75,11 +80,8 @@ except ModuleNotFoundError:
             return len(self._data)
 
         def __contains__(self, key: object) -> bool:
-            try:
-                self[key]
-                return True
-            except KeyError:
-                return False
+            self._expire()
+            return key in self._data
 
     class TTLCache(Cache):
         def __init__(self, maxsize: int = 128, ttl: float = 600):
@@ -0,0 +1,235 @@
+"""Cheap graph statistics for large undirected graphs.
+
+Exact ``networkx`` statistics such as ``average_clustering`` and
+``average_shortest_path_length`` (all-pairs BFS) are too slow to run on
+the event loop for graphs with tens of thousands of nodes. This module
+offers two complementary pieces:
+
+* ``IncrementalGraphCounters`` -- O(1)-per-update counters for node and
+  edge counts, the degree histogram, and the number of connected
+  components (union-find). The owning graph feeds it every new node
+  and edge.
+* ``estimate_graph_statistics`` -- sampled estimators for the average
+  clustering coefficient (exact local clustering of ``sample_size``
+  random nodes) and the average shortest path length (BFS from a few
+  random sources inside the largest component). It works on a plain
+  adjacency mapping, so callers can snapshot the graph on the event
+  loop and run the estimation in a worker thread.
+
+When the graph has at most ``sample_size`` nodes, both estimators are
+exact over the nodes they cover.
+"""
+
+import random
+from collections import Counter, deque
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Set
+
+# BFS sources for path-length estimation per clustering sample.
+_PATH_SOURCES_RATIO = 32
+_MIN_PATH_SOURCES = 4
+
+Adjacency = Mapping[Hashable, Iterable[Hashable]]
+
+
+class IncrementalGraphCounters:
+    """Incrementally maintained counters for an undirected, grow-only graph.
+
+    Node and edge removal is not tracked; call ``rebuild`` after removing
+    elements from the underlying graph.
+    """
+
+    def __init__(self) -> None:
+        self._degree: Dict[Hashable, int] = {}
+        self._histogram: Counter = Counter()
+        self._parent: Dict[Hashable, Hashable] = {}
+        self._size: Dict[Hashable, int] = {}
+        self.edge_count = 0
+        self.component_count = 0
+
+    @property
+    def node_count(self) -> int:
+        return len(self._degree)
+
+    def add_node(self, node: Hashable) -> None:
+        """Register a node; no-op if it is already known."""
+        if node in self._degree:
+            return
+        self._degree[node] = 0
+        self._histogram[0] += 1
+        self._parent[node] = node
+        self._size[node] = 1
+        self.component_count += 1
+
+    def add_edge(self, u: Hashable, v: Hashable) -> None:
+        """Register a *new* undirected edge (callers skip existing edges)."""
+        if u == v:
+            return
+        self.add_node(u)
+        self.add_node(v)
+        self._bump_degree(u)
+        self._bump_degree(v)
+        self.edge_count += 1
+        self._union(u, v)
+
+    def rebuild(self, adjacency: Adjacency) -> None:
+        """Recompute all counters from an adjacency mapping."""
+        self.__init__()
+        visited: Set[Hashable] = set()
+        for u, neighbours in adjacency.items():
+            self.add_node(u)
+            visited.add(u)
+            for v in neighbours:
+                # Symmetric adjacency: count each edge from its first endpoint.
+                if v not in visited:
+                    self.add_edge(u, v)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters as a statistics dict."""
+        nodes = self.node_count
+        edges = self.edge_count
+        return {
+            "nodes_count": nodes,
+            "edges_count": edges,
+            "density": 0.0 if nodes <= 1 else (2 * edges) / (nodes * (nodes - 1)),
+            "connected_components": self.component_count,
+            "average_degree": 0.0 if not nodes else (2 * edges) / nodes,
+            "max_degree": max(self._histogram) if self._histogram else 0,
+            "degree_histogram": {
+                degree: count
+                for degree, count in sorted(self._histogram.items())
+                if count
+            },
+        }
+
+    def _bump_degree(self, node: Hashable) -> None:
+        degree = self._degree[node]
+        self._histogram[degree] -= 1
+        if not self._histogram[degree]:
+            del self._histogram[degree]
+        self._degree[node] = degree + 1
+        self._histogram[degree + 1] += 1
+
+    def _find(self, node: Hashable) -> Hashable:
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def _union(self, u: Hashable, v: Hashable) -> None:
+        root_u, root_v = self._find(u), self._find(v)
+        if root_u == root_v:
+            return
+        if self._size[root_u] < self._size[root_v]:
+            root_u, root_v = root_v, root_u
+        self._parent[root_v] = root_u
+        self._size[root_u] += self._size.pop(root_v)
+        self.component_count -= 1
+
+
+def estimate_graph_statistics(
+    adjacency: Mapping[Hashable, Set[Hashable]],
+    sample_size: int = 256,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Sampled clustering and path-length estimates for an undirected graph.
+
+    Args:
+        adjacency: ``node -> set(neighbours)``; must be symmetric.
+        sample_size: Nodes sampled for the clustering estimate; BFS
+            sources for the path estimate are ``sample_size / 32``
+            (at least 4).
+        seed: Optional RNG seed for reproducible estimates.
+
+    Returns:
+        Dict with ``average_clustering``, ``average_shortest_path``
+        (over the largest connected component), ``largest_component``
+        and ``approximate`` keys.
+    """
+    nodes: List[Hashable] = list(adjacency)
+    if not nodes:
+        return {
+            "average_clustering": 0.0,
+            "average_shortest_path": 0.0,
+            "largest_component": 0,
+            "approximate": False,
+        }
+
+    rng = random.Random(seed)
+    sample_size = max(1, int(sample_size))
+    approximate = len(nodes) > sample_size
+
+    clustering_nodes = rng.sample(nodes, sample_size) if approximate else nodes
+    clustering = sum(
+        _local_clustering(adjacency, node) for node in clustering_nodes
+    ) / len(clustering_nodes)
+
+    component = _largest_component(adjacency)
+    path_sources = max(_MIN_PATH_SOURCES, sample_size // _PATH_SOURCES_RATIO)
+    if len(component) > path_sources:
+        sources = rng.sample(component, path_sources)
+        approximate = True
+    else:
+        sources = component
+    total = 0
+    pairs = 0
+    for source in sources:
+        distance_sum, reached = _bfs_distance_sum(adjacency, source)
+        total += distance_sum
+        pairs += reached
+    average_path = total / pairs if pairs else 0.0
+
+    return {
+        "average_clustering": clustering,
+        "average_shortest_path": average_path,
+        "largest_component": len(component),
+        "approximate": approximate,
+    }
+
+
+def _local_clustering(adjacency: Mapping[Hashable, Set[Hashable]], node: Hashable) -> float:
+    neighbours = adjacency[node]
+    degree = len(neighbours)
+    if degree < 2:
+        return 0.0
+    links = 0
+    for neighbour in neighbours:
+        links += len(neighbours & adjacency[neighbour])
+    # Every triangle edge is counted from both ends.
+    return links / (degree * (degree - 1))
+
+
+def _largest_component(adjacency: Mapping[Hashable, Set[Hashable]]) -> List[Hashable]:
+    seen: Set[Hashable] = set()
+    best: List[Hashable] = []
+    for start in adjacency:
+        if start in seen:
+            continue
+        seen.add(start)
+        component = [start]
+        queue = deque([start])
+        while queue:
+            for neighbour in adjacency[queue.popleft()]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    component.append(neighbour)
+                    queue.append(neighbour)
+        if len(component) > len(best):
+            best = component
+    return best
+
+
+def _bfs_distance_sum(adjacency: Mapping[Hashable, Set[Hashable]], source: Hashable):
+    """Sum of hop distances from ``source`` and the number of nodes reached."""
+    distance = {source: 0}
+    queue = deque([source])
+    total = 0
+    while queue:
+        node = queue.popleft()
+        next_distance = distance[node] + 1
+        for neighbour in adjacency[node]:
+            if neighbour not in distance:
+                distance[neighbour] = next_distance
+                total += next_distance
+                queue.append(neighbour)
+    return total, len(distance) - 1
@@ -469,58 +469,20 @@ async def get_metrics_trends():
 @metrics_bp.route("/analytics/trends", methods=["GET"])
 @require_auth
 async def get_analytics_trends():
-    """获取分析趋势数据（24小时趋势 + 7天趋势 + 热力图）"""
+    """获取分析趋势数据（24小时趋势 + 7天趋势 + 热力图，读取小时汇总表）"""
     try:
-        import random
-        from datetime import datetime, timedelta
-
-        # Generate 24-hour trend data
-        hours_data = []
-        base_time = datetime.now() - timedelta(hours=23)
-        for i in range(24):
-            current_time = base_time + timedelta(hours=i)
-            hours_data.append({
-                "time": current_time.strftime("%H:%M"),
-                "raw_messages": random.randint(10, 60),
-                "filtered_messages": random.randint(5, 30),
-                "llm_calls": random.randint(2, 15),
-                "response_time": random.randint(400, 1500)
-            })
-
-        # Generate 7-day data
-        days_data = []
-        base_date = datetime.now() - timedelta(days=6)
-        for i in range(7):
-            current_date = base_date + timedelta(days=i)
-            days_data.append({
-                "date": current_date.strftime("%m-%d"),
-                "total_messages": random.randint(200, 800),
-                "learning_sessions": random.randint(5, 20),
-                "persona_updates": random.randint(0, 5),
-                "success_rate": round(random.uniform(0.7, 0.95), 2)
-            })
-
-        # Activity heatmap
-        heatmap_data = []
-        days = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
-        for day_idx in range(7):
-            for hour in range(24):
-                activity_level = random.randint(0, 50)
-                if 9 <= hour <= 18 and day_idx < 5:
-                    activity_level = random.randint(20, 50)
-                elif 19 <= hour <= 23 or day_idx >= 5:
-                    activity_level = random.randint(10, 35)
-                heatmap_data.append([hour, day_idx, activity_level])
-
-        return jsonify({
-            "hourly_trends": hours_data,
-            "daily_trends": days_data,
-            "activity_heatmap": {
-                "data": heatmap_data,
-                "days": days,
-                "hours": [f"{i}:00" for i in range(24)]
-            }
-        }), 200
+        group_id = request.args.get("group_id") or None
+        trends = {
+            "hourly_trends": [],
+            "daily_trends": [],
+            "activity_heatmap": {"data": [], "days": [], "hours": []},
+        }
+
+        database_manager = get_container().database_manager
+        if database_manager and hasattr(database_manager, "get_analytics_trends"):
+            trends.update(await database_manager.get_analytics_trends(group_id))
+
+        return jsonify(trends), 200
     except Exception as e:
         logger.error(f"获取趋势数据失败: {e}", exc_info=True)
         return error_response(str(e), 500)
@@ -170,6 +170,7 @@ class ServiceContainer:
                 llm_adapter=self.llm_adapter,
                 service_registry=service_registry,
                 progressive_learning=self.progressive_learning,
+                work_scheduler=getattr(plugin_instance, "_work_scheduler", None),
             )
             self.health_checker = HealthChecker(
                 service_registry=service_registry,
@@ -23,6 +23,7 @@ class DataManagementService:
     _LEARNING_DIR_NAMES = {
         "lightrag",
         "mem0_qdrant",
+        "memory_graph_snapshots",
         "persona_backups",
         "persona_updates",
     }
@@ -216,6 +217,14 @@ class DataManagementService:
 
         memory_manager = EnhancedMemoryGraphManager.get_instance()
         self._clear_learning_manager_cache(memory_manager)
+        # 已清空的群组需重新懒加载，否则后续访问拿到的是空图
+        self._clear_attr_mapping(memory_manager, "_loaded_groups")
+
+        try:
+            from ...services.social.social_graph_index import get_social_graph_index
+        except ImportError:
+            from services.social.social_graph_index import get_social_graph_index
+        get_social_graph_index().clear()
 
         kg_manager = KnowledgeGraphManager.get_instance()
         self._clear_learning_manager_cache(kg_manager)